@@ -0,0 +1,10 @@
+"""
+Pipeline benchmarks
+
+    synthetic.py    generates notice corpora at a multiple of the real data
+    run.py          times the pipeline tools on them and keeps a JSON history
+
+Usage:
+    python -m benchmarks.run run --scales 10,100
+    python -m benchmarks.run compare
+"""
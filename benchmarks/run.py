@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmarks on synthetic corpora
+
+For each scale, generates (or reuses) a corpus with benchmarks/synthetic.py
+under benchmarks/.work/x<scale>. It then times every pipeline tool on it, in
+dependency order:
+
+    parse_layoff2, build_combined, each export_* script,
+    export_facilities_geojson, export_all,
+    risk_assessment.load (CSV index build) and risk_assessment.query
+    (build_report for sampled facility/title pairs)
+
+Tools run in-process with their normal command line (runpy, output
+discarded), so timings exclude interpreter startup but include argument
+parsing and file I/O. Each benchmark runs --repeat times; min and median are
+recorded. With --only, skipped benchmarks still run once, untimed, when a
+later one needs an output they have not written yet.
+
+Every run is appended to benchmarks/.work/history.json (untracked, like the
+corpora) with the git commit and the machine it ran on. ``compare`` checks
+the latest run against the previous run on the same machine, or against a
+given commit, and exits 1 when a benchmark got slower than --threshold.
+
+Usage:
+    python -m benchmarks.run run --scales 10,100
+    python -m benchmarks.run run --scales 1000 --repeat 1 --only export_all,risk_assessment
+    python -m benchmarks.run compare --threshold 1.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import runpy
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic import REPO_ROOT, ensure_corpus
+
+TOOLS_DIR = os.path.join(REPO_ROOT, "tools")
+DEFAULT_WORK_DIR = os.path.join(REPO_ROOT, "benchmarks", ".work")
+DEFAULT_HISTORY = os.path.join(DEFAULT_WORK_DIR, "history.json")
+HISTORY_VERSION = 1
+
+DEFAULT_SCALES = "10,100"
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.15
+QUERY_SAMPLE = 200
+
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+
+class BenchmarkError(Exception):
+    """Raised when a benchmarked tool exits with an error."""
+
+
+class Workspace:
+    """Paths for one scale's corpus and the tool outputs written next to it."""
+
+    def __init__(self, corpus_dir: str) -> None:
+        self.corpus = corpus_dir
+        self.out = os.path.join(corpus_dir, "out")
+        os.makedirs(self.out, exist_ok=True)
+
+    def src(self, name: str) -> str:
+        return os.path.join(self.corpus, name)
+
+    def dst(self, name: str) -> str:
+        return os.path.join(self.out, name)
+
+
+def run_tool(script: str, args: List[str]) -> None:
+    """Run a tools/ script as __main__ with the given arguments, discarding its output."""
+    saved = sys.argv
+    sys.argv = [os.path.join(TOOLS_DIR, script)] + [str(a) for a in args]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(sys.argv[0], run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise BenchmarkError(f"{script} exited with {e.code}")
+    finally:
+        sys.argv = saved
+
+
+def tool_bench(
+    script: str,
+    args: Callable[[Workspace], List[str]],
+    setup: Optional[Callable[[Workspace], None]] = None,
+) -> Callable[[Workspace], Callable[[], Any]]:
+    def prepare(ws: Workspace) -> Callable[[], Any]:
+        argv = args(ws)
+
+        def once() -> None:
+            if setup:
+                setup(ws)
+            run_tool(script, argv)
+
+        return once
+
+    return prepare
+
+
+def _fresh_layoff2_notice(ws: Workspace) -> None:
+    # parse_layoff2 updates its notice in place; start every run from the template
+    shutil.copyfile(ws.src("layoff2_notice.json"), ws.dst("layoff2_notice.json"))
+
+
+def _risk_load(ws: Workspace) -> Callable[[], Any]:
+    from risk_assessment import load_index
+
+    return lambda: load_index(
+        ws.src("impacts_by_facility.csv"), ws.dst("facility_rollup.csv"), None
+    )
+
+
+def _risk_query(ws: Workspace) -> Callable[[], Any]:
+    from risk_assessment import (
+        build_report,
+        build_spatial_index,
+        load_geocodes_csv,
+        load_csv,
+        load_index,
+    )
+
+    index = load_index(ws.src("impacts_by_facility.csv"), ws.dst("facility_rollup.csv"), None)
+    geocodes = load_geocodes_csv(ws.src("facility_geocodes.csv"))
+    tree = build_spatial_index(index, geocodes)
+    rows = load_csv(ws.src("impacts_by_facility.csv"))
+    rng = random.Random(0)
+    queries = [
+        (r["facilityId"], r["jobTitleCanonical"])
+        for r in rng.sample(rows, min(QUERY_SAMPLE, len(rows)))
+    ]
+
+    def once() -> None:
+        for fid, title in queries:
+            build_report(index, fid, title, 10, geocodes, tree, 10, 30.0)
+
+    return once
+
+
+# (name, prepare, outputs) in dependency order: later benchmarks read earlier outputs.
+# prepare(ws) does untimed setup and returns the function to time.
+BENCHMARKS: List[tuple] = [
+    (
+        "parse_layoff2",
+        tool_bench(
+            "parse_layoff2.py",
+            lambda ws: [ws.src("layoff2_pages.jsonl"), ws.dst("layoff2_notice.json")],
+            setup=_fresh_layoff2_notice,
+        ),
+        [],
+    ),
+    (
+        "build_combined",
+        tool_bench(
+            "build_combined.py",
+            lambda ws: [
+                ws.src("notices"),
+                ws.dst("combined.json"),
+                "--full",
+                "--manifest",
+                ws.dst("combined.manifest.json"),
+            ],
+        ),
+        ["combined.json"],
+    ),
+    (
+        "export_impacts_by_facility",
+        tool_bench(
+            "export_impacts_by_facility.py",
+            lambda ws: [ws.dst("combined.json"), ws.dst("impacts_by_facility.csv")],
+        ),
+        [],
+    ),
+    (
+        "export_facility_rollup_from_impacts",
+        tool_bench(
+            "export_facility_rollup_from_impacts.py",
+            lambda ws: [ws.src("impacts_by_facility.csv"), ws.dst("facility_rollup.csv")],
+        ),
+        ["facility_rollup.csv"],
+    ),
+    (
+        "export_facility_rollup_all_facilities",
+        tool_bench(
+            "export_facility_rollup_all_facilities.py",
+            lambda ws: [
+                ws.dst("combined.json"),
+                ws.dst("facility_rollup.csv"),
+                ws.dst("facility_rollup_all_facilities.csv"),
+            ],
+        ),
+        ["facility_rollup_all_facilities.csv"],
+    ),
+    (
+        "export_job_title_rollup_from_impacts",
+        tool_bench(
+            "export_job_title_rollup_from_impacts.py",
+            lambda ws: [ws.src("impacts_by_facility.csv"), ws.dst("job_title_rollup.csv")],
+        ),
+        ["job_title_rollup.csv"],
+    ),
+    (
+        "export_notice_summary_from_impacts",
+        tool_bench(
+            "export_notice_summary_from_impacts.py",
+            lambda ws: [ws.src("impacts_by_facility.csv"), ws.dst("notice_summary.csv")],
+        ),
+        [],
+    ),
+    (
+        "export_top_facilities",
+        tool_bench(
+            "export_top_facilities.py",
+            lambda ws: [
+                ws.dst("facility_rollup_all_facilities.csv"),
+                ws.dst("top_facilities.csv"),
+                "--top",
+                "0",
+            ],
+        ),
+        [],
+    ),
+    (
+        "export_top_job_titles",
+        tool_bench(
+            "export_top_job_titles.py",
+            lambda ws: [ws.dst("job_title_rollup.csv"), ws.dst("top_job_titles.csv"), "--top", "0"],
+        ),
+        [],
+    ),
+    (
+        "export_facilities_geojson",
+        tool_bench(
+            "export_facilities_geojson.py",
+            lambda ws: [
+                "--geocodes",
+                ws.src("facility_geocodes.csv"),
+                "--facility_rollup",
+                ws.dst("facility_rollup_all_facilities.csv"),
+                "--impacts",
+                ws.src("impacts_by_facility.csv"),
+                "--out",
+                ws.dst("facilities.geojson"),
+            ],
+        ),
+        [],
+    ),
+    (
+        "export_all",
+        tool_bench(
+            "export_all.py",
+            lambda ws: [
+                "--combined",
+                ws.dst("combined.json"),
+                "--geocodes",
+                ws.src("facility_geocodes.csv"),
+                "--out_dir",
+                ws.dst("export_all"),
+            ],
+        ),
+        [],
+    ),
+    ("risk_assessment.load", _risk_load, []),
+    ("risk_assessment.query", _risk_query, []),
+]
+
+
+def time_benchmark(fn: Callable[[], Any], repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                cwd=REPO_ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def machine_key() -> str:
+    return (
+        f"{platform.node()}|{platform.system()}|{platform.machine()}|py{platform.python_version()}"
+    )
+
+
+def load_history(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"version": HISTORY_VERSION, "runs": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path: str, history: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    # risk_assessment logs each load at INFO; keep the table readable
+    logging.disable(logging.INFO)
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    only = [s.strip() for s in args.only.split(",")] if args.only else None
+    results = []
+    for scale in scales:
+        corpus_dir = os.path.join(args.work_dir, f"x{scale}")
+        started = time.perf_counter()
+        meta = ensure_corpus(corpus_dir, scale, args.seed)
+        seconds = time.perf_counter() - started
+        print(
+            f"x{scale}: notices={meta['notices']} facilities={meta['facilities']} "
+            f"impactRows={meta['impactRows']} (corpus ready in {seconds:.1f}s)"
+        )
+        ws = Workspace(corpus_dir)
+        for name, prepare, outputs in BENCHMARKS:
+            selected = not only or any(name == o or name.startswith(o + ".") for o in only)
+            if not selected:
+                # Produce inputs for later benchmarks once, untimed, if an earlier run has not
+                if any(not os.path.exists(ws.dst(o)) for o in outputs):
+                    prepare(ws)()
+                continue
+            fn = prepare(ws)
+            times = time_benchmark(fn, args.repeat)
+            result = {
+                "name": name,
+                "scale": scale,
+                "impactRows": meta["impactRows"],
+                "repeat": args.repeat,
+                "min_s": round(min(times), 6),
+                "median_s": round(statistics.median(times), 6),
+            }
+            if name == "risk_assessment.query":
+                result["queries"] = QUERY_SAMPLE
+            results.append(result)
+            print(f"  {name:<40} min {result['min_s']:9.4f}s  median {result['median_s']:9.4f}s")
+
+    entry = {
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        **git_revision(),
+        "machine": machine_key(),
+        "cpuCount": os.cpu_count(),
+        "seed": args.seed,
+        "results": results,
+    }
+    history = load_history(args.history)
+    history["runs"].append(entry)
+    save_history(args.history, history)
+    print(f"OK: wrote {args.history}")
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    runs = load_history(args.history)["runs"]
+    if not runs:
+        print(f"ERROR: no runs in {args.history}")
+        return 2
+    latest = runs[-1]
+    same_machine = [r for r in runs[:-1] if r.get("machine") == latest.get("machine")]
+    if args.against:
+        candidates = [r for r in same_machine if (r.get("commit") or "").startswith(args.against)]
+    else:
+        candidates = same_machine
+    # Most recent earlier run that timed at least one of the same benchmarks
+    latest_keys = {(r["name"], r["scale"]) for r in latest["results"]}
+    base = next(
+        (
+            r
+            for r in reversed(candidates)
+            if latest_keys & {(x["name"], x["scale"]) for x in r["results"]}
+        ),
+        None,
+    )
+    if base is None:
+        print("ERROR: no earlier run on this machine with the same benchmarks to compare with")
+        return 2
+
+    base_times = {(r["name"], r["scale"]): r["median_s"] for r in base["results"]}
+    regressions = 0
+    print(
+        f"{base.get('commit')} ({base['timestamp']}) -> "
+        f"{latest.get('commit')} ({latest['timestamp']})"
+    )
+    for r in latest["results"]:
+        old = base_times.get((r["name"], r["scale"]))
+        if not old:
+            continue
+        ratio = r["median_s"] / old
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        new = r["median_s"]
+        print(f"  x{r['scale']:<5} {r['name']:<40} {old:9.4f}s -> {new:9.4f}s  {ratio:5.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the pipeline tools on synthetic corpora")
+    ap.add_argument("--history", default=DEFAULT_HISTORY)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser(
+        "run", help="Run the benchmarks and append the results to the history file"
+    )
+    run_p.add_argument(
+        "--scales", default=DEFAULT_SCALES, help="Comma-separated multiples of the real data"
+    )
+    run_p.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run_p.add_argument("--seed", type=int, default=0)
+    run_p.add_argument(
+        "--only", default=None, help="Comma-separated benchmark names (prefixes before '.')"
+    )
+    run_p.add_argument("--work_dir", default=DEFAULT_WORK_DIR)
+
+    cmp_p = sub.add_parser(
+        "compare", help="Compare the latest run with an earlier one on the same machine"
+    )
+    cmp_p.add_argument(
+        "--against", default=None, help="Commit (prefix) to compare with; default: previous run"
+    )
+    cmp_p.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Median slowdown ratio reported as a regression",
+    )
+
+    args = ap.parse_args(argv)
+    if args.command == "run":
+        return cmd_run(args)
+    return cmd_compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
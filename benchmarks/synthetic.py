@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Synthetic notice corpora for benchmarks
+
+Scales the real data (2 notices, about 1000 impact rows, about 60
+facilities) by a factor. Title popularity and facility-ID prefixes are taken
+from data/normalized/combined.json, so counts and skew look like the real
+notices. Everything is drawn from a seeded RNG, so the same scale and seed
+always give the same files.
+
+Files written to out_dir:
+
+    notices/notice_<n>.json     normalized notices; odd numbers use the
+                                notice_1 row shape (jobTitleRaw/Canonical),
+                                even numbers the notice_2 shape (jobTitle)
+    layoff2_pages.jsonl         extracted page text for one layoff2-format
+                                notice, plus layoff2_notice.json to parse into
+    impacts_by_facility.csv     the corpus' impact rows (exporter inputs)
+    facility_geocodes.csv       one geocode per facility, a few sharing a point
+    corpus.json                 parameters and counts; a matching file means
+                                the corpus is already generated
+
+Usage:
+    python -m benchmarks.synthetic --scale 10 --out_dir benchmarks/.work/x10
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import random
+import re
+import sys
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_COMBINED = os.path.join(REPO_ROOT, "data", "normalized", "combined.json")
+
+GENERATOR_VERSION = 3
+
+# Real-data baseline that a scale of 1 reproduces
+BASE_NOTICES = 2
+BASE_FACILITIES = 60
+ROWS_PER_NOTICE = 500
+FACILITIES_PER_NOTICE = 30
+REMOTE_ROW_SHARE = 0.1
+DUPLICATE_POINT_SHARE = 0.05
+PAGE_ROWS = 45
+
+IMPACT_COLUMNS = ["noticeId", "facilityId", "jobTitleRaw", "jobTitleCanonical", "affectedCount"]
+GEOCODE_COLUMNS = [
+    "facilityId",
+    "lat",
+    "lon",
+    "source",
+    "notes",
+    "buildingName",
+    "streetAddress",
+    "city",
+    "state",
+    "zip",
+]
+
+# (city, zip, lat, lon) for synthetic addresses
+CITIES = [
+    ("Seattle", "98101", 47.6101, -122.3344),
+    ("Seattle", "98109", 47.6262, -122.3381),
+    ("Seattle", "98121", 47.6154, -122.3450),
+    ("Bellevue", "98004", 47.6153, -122.2015),
+    ("Redmond", "98052", 47.6740, -122.1215),
+    ("Kent", "98032", 47.3809, -122.2348),
+    ("Everett", "98201", 47.9790, -122.2021),
+    ("Tacoma", "98402", 47.2529, -122.4443),
+    ("Spokane", "99201", 47.6588, -117.4260),
+    ("Olympia", "98501", 47.0379, -122.9007),
+]
+STREETS = [
+    "Terry Ave",
+    "Boren Ave N",
+    "Westlake Ave N",
+    "9th Ave N",
+    "108th Ave NE",
+    "Pine St",
+    "Fairview Ave N",
+    "6th Ave",
+    "Stewart St",
+    "Elliott Ave W",
+    "Military Road E",
+    "International Pl",
+]
+ORG_SUFFIXES = ["Retail", "Devices", "Ads", "Cloud", "Games", "Health", "Logistics", "Payments"]
+
+FALLBACK_TITLES = [
+    ("Software Dev Engineer II", 120),
+    ("Program Manager III", 40),
+    ("Data Engineer II", 20),
+    ("Sr Manager, Software Dev", 15),
+    ("UX Designer II", 8),
+    ("Recruiter I", 5),
+]
+FALLBACK_PREFIXES = [("SEA", 46), ("BFI", 3), ("DWA", 2), ("GEG", 2), ("PSC", 1)]
+
+
+def load_template(
+    path: str = TEMPLATE_COMBINED,
+) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+    """
+    (title, weight) and (facility-ID prefix, weight) pairs from combined.json.
+
+    Falls back to a small built-in list when combined.json is missing.
+    """
+    if not os.path.exists(path):
+        return FALLBACK_TITLES, FALLBACK_PREFIXES
+    with open(path, "r", encoding="utf-8") as f:
+        combined = json.load(f)
+    titles = [
+        (t["jobTitleCanonical"], max(1, int(t.get("affectedCount") or 1)))
+        for t in combined.get("jobTitles", {}).get("canonicalTitles", [])
+    ]
+    prefixes = Counter()
+    for fac in combined.get("facilities", []):
+        m = re.match(r"[A-Z]+", fac.get("facilityId") or "")
+        if m and not fac["facilityId"].startswith("REMOTE"):
+            prefixes[m.group(0)] += 1
+    return (titles or FALLBACK_TITLES), (sorted(prefixes.items()) or FALLBACK_PREFIXES)
+
+
+class Facility:
+    __slots__ = ("facility_id", "street", "city", "state", "zip", "lat", "lon")
+
+    def __init__(
+        self, facility_id: str, street: str, city: str, zipc: str, lat: float, lon: float
+    ) -> None:
+        self.facility_id = facility_id
+        self.street = street
+        self.city = city
+        self.state = "WA"
+        self.zip = zipc
+        self.lat = lat
+        self.lon = lon
+
+    @property
+    def address(self) -> str:
+        return f"{self.street}, {self.city}, {self.state} {self.zip}"
+
+
+class Corpus:
+    """A generated corpus held in memory; write() puts it on disk."""
+
+    def __init__(self, scale: int, seed: int = 0, template: str = TEMPLATE_COMBINED) -> None:
+        self.scale = scale
+        self.seed = seed
+        self.rng = random.Random(f"{seed}:{scale}")
+        titles, prefixes = load_template(template)
+
+        # Title vocabulary grows with the square root of the scale (team-suffixed variants)
+        variants = max(1, int(scale**0.5))
+        self.titles: List[str] = []
+        self.title_weights: List[int] = []
+        for title, weight in titles:
+            for v in range(variants):
+                self.titles.append(
+                    title if v == 0 else f"{title} - {ORG_SUFFIXES[v % len(ORG_SUFFIXES)]}"
+                )
+                self.title_weights.append(max(1, weight // (v + 1)))
+
+        self.facilities = self._make_facilities(BASE_FACILITIES * scale, prefixes)
+        self.notices = [self._make_notice(n) for n in range(1, BASE_NOTICES * scale + 1)]
+
+    def _make_facilities(self, count: int, prefixes: List[Tuple[str, int]]) -> List[Facility]:
+        rng = self.rng
+        names = [p for p, _ in prefixes]
+        weights = [w for _, w in prefixes]
+        used: Dict[str, int] = Counter()
+        out: List[Facility] = []
+        for _ in range(count):
+            prefix = rng.choices(names, weights)[0]
+            used[prefix] += 1
+            city, zipc, lat, lon = rng.choice(CITIES)
+            street = f"{rng.randint(100, 24999)} {rng.choice(STREETS)}"
+            if out and rng.random() < DUPLICATE_POINT_SHARE:
+                # Several facilities in one building, as in the real geocodes
+                twin = rng.choice(out)
+                lat, lon, city, zipc, street = twin.lat, twin.lon, twin.city, twin.zip, twin.street
+            else:
+                lat += rng.uniform(-0.04, 0.04)
+                lon += rng.uniform(-0.06, 0.06)
+            out.append(
+                Facility(
+                    f"{prefix}{used[prefix]}", street, city, zipc, round(lat, 6), round(lon, 6)
+                )
+            )
+        return out
+
+    def _title_rows(self, facility_ids: List[str], rows: int) -> List[Tuple[str, str, int]]:
+        """(facilityId, title, affectedCount) rows spread over the given facilities."""
+        rng = self.rng
+        per_facility = max(1, rows // max(1, len(facility_ids)))
+        out = []
+        for fid in facility_ids:
+            picked = dict.fromkeys(rng.choices(self.titles, self.title_weights, k=per_facility))
+            for title in picked:
+                out.append((fid, title, min(200, int(rng.paretovariate(1.5)))))
+        return out
+
+    def _make_notice(self, n: int) -> Dict[str, Any]:
+        rng = self.rng
+        notice_id = f"notice_{n}"
+        layoff1_style = n % 2 == 1
+        chosen = rng.sample(self.facilities, min(FACILITIES_PER_NOTICE, len(self.facilities)))
+        chosen.sort(key=lambda f: f.facility_id)
+        remote_rows = int(ROWS_PER_NOTICE * REMOTE_ROW_SHARE)
+        rows = self._title_rows([f.facility_id for f in chosen], ROWS_PER_NOTICE - remote_rows)
+        rows += self._title_rows(["REMOTE_WA"], remote_rows)
+
+        totals = Counter()
+        for fid, _, count in rows:
+            totals[fid] += count
+        remote_count = totals["REMOTE_WA"]
+        day = 1 + (n * 3) % 28
+        month = 1 + (n // 9) % 12
+        letter_date = f"2025-{month:02d}-{day:02d}"
+
+        facilities = []
+        for fac in chosen:
+            entry = {
+                "noticeId": notice_id,
+                "facilityId": fac.facility_id,
+                "affectedApprox": totals[fac.facility_id],
+            }
+            if not layoff1_style:
+                entry["includesRemoteWA"] = True
+            entry["notes"] = fac.address
+            facilities.append(entry)
+        # Like the real notices, remote rows point at a synthetic REMOTE_WA facility entry
+        facilities.append(
+            {
+                "noticeId": notice_id,
+                "facilityId": "REMOTE_WA",
+                "affectedApprox": remote_count,
+                "notes": "Remote employees residing within WA (no facility address).",
+            }
+        )
+
+        if layoff1_style:
+            remote_clauses = [
+                {
+                    "type": "REMOTE_RESIDENCE_STATE",
+                    "state": "WA",
+                    "notes": (
+                        f"plus {remote_count} affected remote employees "
+                        "residing within the state of Washington."
+                    ),
+                }
+            ]
+            impacts = [
+                {
+                    "noticeId": notice_id,
+                    "facilityId": fid,
+                    "jobTitleRaw": title.upper(),
+                    "jobTitleCanonical": title,
+                    "affectedCount": count,
+                }
+                for fid, title, count in rows
+            ]
+        else:
+            remote_clauses = [
+                {
+                    "text": (
+                        f"plus {remote_count} affected remote employees "
+                        "residing within the state of Washington."
+                    ),
+                    "affectedCount": remote_count,
+                    "state": "WA",
+                }
+            ]
+            impacts = [
+                {"facilityId": fid, "jobTitle": title, "affectedCount": count}
+                for fid, title, count in rows
+            ]
+
+        return {
+            "version": "0.1.0",
+            "generatedAt": "2026-01-07T00:00:00Z",
+            "notice": {
+                "noticeId": notice_id,
+                "source": {
+                    "filename": f"layoff{n}.pdf",
+                    "receivedDate": letter_date,
+                    "letterDate": letter_date,
+                },
+                "jurisdiction": "WA",
+                "remoteClauses": remote_clauses,
+                "separationDates": sorted(
+                    {f"2026-{1 + (n + k) % 12:02d}-{1 + (7 * k) % 28:02d}" for k in range(8)}
+                ),
+                "facilities": facilities,
+                "jobTitleImpacts": impacts,
+            },
+        }
+
+    def impact_rows(self) -> List[List[Any]]:
+        out = []
+        for blob in self.notices:
+            notice = blob["notice"]
+            for r in notice["jobTitleImpacts"]:
+                raw = r.get("jobTitleRaw") or r["jobTitle"]
+                canonical = r.get("jobTitleCanonical") or r["jobTitle"]
+                out.append(
+                    [notice["noticeId"], r["facilityId"], raw, canonical, r["affectedCount"]]
+                )
+        return out
+
+    def layoff2_pages(self) -> List[Dict[str, Any]]:
+        """Extracted page text for one layoff2-format notice, about 940 rows times the scale."""
+        rng = self.rng
+        chosen = sorted(
+            rng.sample(
+                self.facilities, min(len(self.facilities), FACILITIES_PER_NOTICE * self.scale)
+            ),
+            key=lambda f: f.facility_id,
+        )
+        rows = self._title_rows([f.facility_id for f in chosen], 940 * self.scale)
+        remote = self._title_rows(["REMOTE_WA"], int(100 * self.scale))
+        totals = Counter()
+        for fid, _, count in rows:
+            totals[fid] += count
+        remote_total = sum(c for _, _, c in remote)
+
+        pages = [
+            "Employment Security\nReceived 10/28/25\nOctober 28, 2025\n"
+            "Employment Security Department\n"
+            "To the Employment Security Department:\n"
+            "This letter is being issued to notify you of a layoff affecting the facilities "
+            "listed below, "
+            f"plus {remote_total} affected remote employees "
+            "residing within the state of Washington.\n"
+            "Separations are expected to begin on January 26, 2026 "
+            "and continue through May 26, 2026."
+        ]
+        bullets = [
+            f"\uf0b7 {f.facility_id} facility at {f.address} "
+            f"(approximately {totals[f.facility_id]} "
+            f"employee{'s' if totals[f.facility_id] != 1 else ''} affected);"
+            for f in chosen
+        ]
+        pages += ["\n".join(bullets[i : i + PAGE_ROWS]) for i in range(0, len(bullets), PAGE_ROWS)]
+        pages.append("This notice is given based upon the best information available at this time.")
+        pages.append(
+            "LIST OF AFFECTED JOB TITLES AT THE FACILITIES\n"
+            "Number of Affected Employees\nFacility Job Title"
+        )
+        lines = [f"{fid} {title} {count}" for fid, title, count in rows]
+        lines += [f"Remote {title} {count}" for _, title, count in remote]
+        pages += ["\n".join(lines[i : i + PAGE_ROWS]) for i in range(0, len(lines), PAGE_ROWS)]
+        return [{"page": i, "text": text} for i, text in enumerate(pages, start=1)]
+
+    def write(self, out_dir: str) -> Dict[str, Any]:
+        notices_dir = os.path.join(out_dir, "notices")
+        os.makedirs(notices_dir, exist_ok=True)
+        for blob in self.notices:
+            with open(
+                os.path.join(notices_dir, f"{blob['notice']['noticeId']}.json"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                json.dump(blob, f, indent=2)
+
+        rows = self.impact_rows()
+        with open(
+            os.path.join(out_dir, "impacts_by_facility.csv"), "w", newline="", encoding="utf-8"
+        ) as f:
+            w = csv.writer(f)
+            w.writerow(IMPACT_COLUMNS)
+            w.writerows(rows)
+
+        with open(
+            os.path.join(out_dir, "facility_geocodes.csv"), "w", newline="", encoding="utf-8"
+        ) as f:
+            w = csv.writer(f)
+            w.writerow(GEOCODE_COLUMNS)
+            for fac in self.facilities:
+                w.writerow(
+                    [
+                        fac.facility_id,
+                        fac.lat,
+                        fac.lon,
+                        "precise",
+                        "",
+                        "",
+                        fac.street,
+                        fac.city,
+                        fac.state,
+                        fac.zip,
+                    ]
+                )
+
+        pages = self.layoff2_pages()
+        with open(os.path.join(out_dir, "layoff2_pages.jsonl"), "w", encoding="utf-8") as f:
+            for page in pages:
+                f.write(json.dumps(page, ensure_ascii=False) + "\n")
+        template = {
+            "version": "0.1.0",
+            "generatedAt": "2026-01-07T00:00:00Z",
+            "notice": {
+                "noticeId": "notice_2",
+                "source": {"filename": "layoff2.pdf"},
+                "jurisdiction": "WA",
+            },
+        }
+        with open(os.path.join(out_dir, "layoff2_notice.json"), "w", encoding="utf-8") as f:
+            json.dump(template, f, indent=2)
+
+        meta = corpus_key(self.scale, self.seed)
+        meta.update(
+            {
+                "notices": len(self.notices),
+                "facilities": len(self.facilities),
+                "impactRows": len(rows),
+                "titles": len(self.titles),
+                "pages": len(pages),
+            }
+        )
+        with open(os.path.join(out_dir, "corpus.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return meta
+
+
+def corpus_key(scale: int, seed: int) -> Dict[str, Any]:
+    return {"generatorVersion": GENERATOR_VERSION, "scale": scale, "seed": seed}
+
+
+def ensure_corpus(out_dir: str, scale: int, seed: int = 0) -> Dict[str, Any]:
+    """Generate the corpus into out_dir unless an identical one is already there."""
+    meta_path = os.path.join(out_dir, "corpus.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if all(meta.get(k) == v for k, v in corpus_key(scale, seed).items()):
+            return meta
+    return Corpus(scale, seed).write(out_dir)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(
+        description="Generate a synthetic notice corpus at a multiple of the real data"
+    )
+    ap.add_argument(
+        "--scale", type=int, default=10, help="Multiple of the real data (e.g. 10, 100, 1000)"
+    )
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out_dir", default=None, help="Default: benchmarks/.work/x<scale>")
+    args = ap.parse_args(argv)
+
+    out_dir = args.out_dir or os.path.join(REPO_ROOT, "benchmarks", ".work", f"x{args.scale}")
+    meta = Corpus(args.scale, args.seed).write(out_dir)
+    print(f"OK: wrote {out_dir}")
+    print(
+        f"  notices={meta['notices']} facilities={meta['facilities']} "
+        f"impactRows={meta['impactRows']} pages={meta['pages']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
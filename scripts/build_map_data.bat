@@ -1,5 +1,8 @@
 @echo off
-REM Build Map Data - Generates and syncs facilities.geojson
+REM Build Map Data - Rebuilds out-of-date exports and syncs facilities.geojson
+REM Extra arguments are passed to the pipeline, e.g.:
+REM   scripts\build_map_data.bat --target facilities.geojson
+REM   scripts\build_map_data.bat --dry_run
 setlocal
 
 echo ========================================
@@ -7,18 +10,9 @@ echo Building Map Data
 echo ========================================
 echo.
 
-echo [1/2] Exporting facilities.geojson...
-python tools\export_facilities_geojson.py
+python tools\pipeline.py build %*
 if errorlevel 1 (
-    echo ERROR: Export failed.
-    exit /b 1
-)
-
-echo.
-echo [2/2] Syncing to app\public...
-copy /Y data\exports\facilities.geojson app\public\facilities.geojson >nul
-if errorlevel 1 (
-    echo ERROR: Copy failed.
+    echo ERROR: Build failed.
     exit /b 1
 )
 
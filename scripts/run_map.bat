@@ -26,9 +26,9 @@ echo Press Ctrl+C to stop the server when done.
 echo.
 
 REM Step 2: Start server and open browser
-cd app\public
+REM risk_server.py serves app\public plus the /api/assess lookups used by map popups
 start http://localhost:8000
-python -m http.server 8000
+python tools\risk_server.py --port 8000
 
 REM Step 3: Cleanup (runs when server stops)
 echo.
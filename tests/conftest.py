@@ -0,0 +1,13 @@
+"""
+Shared pytest setup: the tools/ scripts import their siblings by bare name,
+and the risk-assessment console script imports them as tools.<module>.
+"""
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TOOLS_DIR = REPO_ROOT / "tools"
+for path in (TOOLS_DIR, REPO_ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
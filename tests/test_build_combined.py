@@ -0,0 +1,72 @@
+"""Incremental combined.json builds in tools/build_combined.py."""
+
+import json
+
+import build_combined
+
+
+def _write(path, notice_id, rows, **links):
+    notice = {
+        "noticeId": notice_id,
+        "jurisdiction": "WA",
+        "source": {"filename": f"{notice_id}.pdf"},
+        "facilities": [{"facilityId": fid, "notes": ""} for fid in sorted({r[0] for r in rows})],
+        "jobTitleImpacts": [
+            {"facilityId": fid, "jobTitleCanonical": title, "affectedCount": count}
+            for fid, title, count in rows
+        ],
+        **links,
+    }
+    path.write_text(json.dumps({"notice": notice}), encoding="utf-8")
+
+
+def _build(tmp_path, full=False):
+    out = tmp_path / "combined.json"
+    manifest = tmp_path / "combined.manifest.json"
+    paths = build_combined.resolve_inputs([str(tmp_path / "notices")])
+    combined, stats = build_combined.build(paths, str(out), str(manifest), full=full)
+    if not full:
+        out.write_text(json.dumps(combined), encoding="utf-8")
+        manifest.write_text(
+            json.dumps(
+                {
+                    "version": build_combined.MANIFEST_VERSION,
+                    "combinedSha256": build_combined.file_sha256(out),
+                    "files": stats["files"],
+                    "state": stats["state"].to_json(),
+                    "reconcile": stats["lineages"].to_json(),
+                }
+            ),
+            encoding="utf-8",
+        )
+    return combined, stats
+
+
+def test_by_facility_order_follows_deltas(tmp_path):
+    notices = tmp_path / "notices"
+    notices.mkdir()
+    _write(notices / "notice_1.json", "n1", [("SEA2", "Recruiter", 1), ("SEA1", "Recruiter", 2)])
+    _write(notices / "notice_2.json", "n2", [("SEA3", "Recruiter", 1), ("SEA1", "PM", 1)])
+    combined, _ = _build(tmp_path)
+    assert list(combined["jobTitles"]["byFacility"]) == ["SEA2", "SEA1", "SEA3"]
+
+    # SEA2 now first appears in notice_2, after SEA3; SEA4 is new
+    _write(notices / "notice_1.json", "n1", [("SEA1", "Recruiter", 2)])
+    _write(
+        notices / "notice_2.json", "n2", [("SEA3", "PM", 1), ("SEA4", "PM", 1), ("SEA2", "PM", 1)]
+    )
+    _write(notices / "notice_10.json", "n10", [("SEA5", "PM", 1), ("SEA1", "PM", 1)])
+    combined, stats = _build(tmp_path)
+    assert (stats["added"], stats["changed"]) == (1, 2)
+    by_facility = combined["jobTitles"]["byFacility"]
+    assert list(by_facility) == ["SEA1", "SEA3", "SEA4", "SEA2", "SEA5"]
+    assert by_facility == _build(tmp_path, full=True)[0]["jobTitles"]["byFacility"]
+
+    (notices / "notice_1.json").unlink()
+    combined, _ = _build(tmp_path)
+    assert list(combined["jobTitles"]["byFacility"]) == ["SEA3", "SEA4", "SEA2", "SEA5", "SEA1"]
+
+    # Rows replaced through a lineage drop out of the order as well
+    _write(notices / "notice_11.json", "n11", [("SEA6", "PM", 1)], supersedes="n10")
+    combined, _ = _build(tmp_path)
+    assert list(combined["jobTitles"]["byFacility"]) == ["SEA3", "SEA4", "SEA2", "SEA6"]
@@ -0,0 +1,80 @@
+"""Snapshot contents and staleness checks in tools/impact_snapshot.py."""
+
+import os
+
+import pytest
+
+import impact_snapshot
+from impact_snapshot import ImpactSnapshot, SnapshotError, load_current_snapshot
+from risk_assessment import ImpactIndex, load_csv
+
+IMPACTS_CSV = (
+    "noticeId,facilityId,jobTitleRaw,jobTitleCanonical,affectedCount\n"
+    "n1,SEA40,PM III,Program Manager III,6\n"
+    "n1, SEA40 ,Recruiter,Recruiter,2\n"
+    "n2,SEA41,PM III,Program Manager III,x\n"
+    "n2,,Recruiter,Recruiter,4\n"
+)
+ROLLUP_CSV = "facilityId,totalAffected\nSEA40,8\nSEA41,0\n"
+
+
+@pytest.fixture
+def csvs(tmp_path):
+    impacts = tmp_path / "impacts_by_facility.csv"
+    rollup = tmp_path / "facility_rollup.csv"
+    impacts.write_text(IMPACTS_CSV, encoding="utf-8")
+    rollup.write_text(ROLLUP_CSV, encoding="utf-8")
+    return str(impacts), str(rollup)
+
+
+def test_snapshot_index_matches_the_csv_index(csvs, tmp_path):
+    path = str(tmp_path / "impacts.snapshot")
+    ImpactSnapshot.from_csv(*csvs).write(path)
+    snap = ImpactSnapshot.read(path)
+    assert len(snap) == 4
+    # Only the folded tables are stored, not the rows
+    assert set(snap.aggregates) == set(impact_snapshot.AGGREGATES)
+
+    from_snap = ImpactIndex.from_snapshot(snap)
+    from_csv = ImpactIndex.from_records(load_csv(csvs[0]), load_csv(csvs[1]))
+    for name in impact_snapshot.AGGREGATES + ("facility_metadata", "record_count"):
+        assert getattr(from_snap, name) == getattr(from_csv, name), name
+
+
+def test_is_current_hashes_only_touched_files(csvs, monkeypatch):
+    snap = ImpactSnapshot.from_csv(*csvs)
+    hashed = []
+    real_sha256 = impact_snapshot.file_sha256
+    monkeypatch.setattr(
+        impact_snapshot, "file_sha256", lambda path: hashed.append(path) or real_sha256(path)
+    )
+    assert snap.is_current(*csvs)
+    assert hashed == []
+
+    # Same size, new mtime: hashed, and still current if the bytes match
+    stat = os.stat(csvs[0])
+    os.utime(csvs[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert snap.is_current(*csvs)
+    assert hashed == [csvs[0]]
+
+    with open(csvs[0], "r+", encoding="utf-8") as f:
+        f.seek(len(IMPACTS_CSV) - 2)
+        f.write("5")
+    os.utime(csvs[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert not snap.is_current(*csvs)
+
+
+def test_stale_or_foreign_snapshots_are_not_loaded(csvs, tmp_path):
+    path = str(tmp_path / "impacts.snapshot")
+    ImpactSnapshot.from_csv(*csvs).write(path)
+    with open(csvs[1], "a", encoding="utf-8") as f:
+        f.write("SEA42,1\n")
+    snap, reason = load_current_snapshot(path, *csvs)
+    assert snap is None and "older than" in reason
+    assert load_current_snapshot(path, csvs[0], str(tmp_path / "missing.csv"))[0] is None
+
+    with open(path, "r+b") as f:
+        f.seek(8)
+        f.write(b"\x02\x00")
+    with pytest.raises(SnapshotError):
+        ImpactSnapshot.read(path)
@@ -0,0 +1,63 @@
+"""Regression tests for the single-pass notice parser in tools/notice_parser.py."""
+
+import json
+from datetime import date
+
+from conftest import REPO_ROOT
+from notice_parser import FACILITY_RE, TABLE_HEADER, iter_pages, parse_notice_pages
+
+NORMALIZED = REPO_ROOT / "data" / "normalized"
+FIELDS = ("facilities", "remoteClauses", "separationDates", "jobTitleImpacts")
+
+
+def _notice(name):
+    return json.loads((NORMALIZED / f"{name}.json").read_text(encoding="utf-8"))["notice"]
+
+
+def _layoff1_pages(notice):
+    """
+    Letter, header and enclosure pages for a layoff1-style notice, with every
+    facility bullet and date wrapped over several lines.
+    """
+    bullets = [
+        f"• {f['facilityId']} facility at {f['notes']} (approximately\n"
+        f"{f['affectedApprox']}\nemployees affected);"
+        for f in notice["facilities"]
+        if f["facilityId"] != "REMOTE_WA"
+    ]
+    dates = [date.fromisoformat(d) for d in notice["separationDates"]]
+    letter = "\n".join(
+        ["Dear Commissioner,", "The affected sites are:"]
+        + bullets
+        + [notice["remoteClauses"][0]["notes"], "Separations will occur on"]
+        + [f"{d:%B} {d.day},\n{d.year}" for d in dates]
+    )
+    rows = [
+        f"Remote {r['jobTitleRaw']} {r['affectedCount']}"
+        if r["facilityId"] == "REMOTE_WA"
+        else f"{r['facilityId']} {r['jobTitleRaw']} {r['affectedCount']}"
+        for r in notice["jobTitleImpacts"]
+    ]
+    return [
+        {"page": 1, "text": letter},
+        {"page": 2, "text": f"Enclosure\n{TABLE_HEADER}"},
+        {"page": 3, "text": "\n".join(["Facility Job Title Number of Affected Employees"] + rows)},
+    ]
+
+
+def test_layoff2_pages_parse_like_the_committed_notice():
+    pages = iter_pages(REPO_ROOT / "data" / "extracted" / "layoff2_pages.jsonl")
+    fields = parse_notice_pages(pages, "layoff2", "notice_2")
+    notice = _notice("notice_2")
+    assert {k: fields[k] for k in FIELDS} == {k: notice[k] for k in FIELDS}
+
+
+def test_layoff1_notice_round_trips_with_wrapped_matches():
+    notice = _notice("notice_1")
+    pages = _layoff1_pages(notice)
+    # Facility bullets span three lines, as a per-page finditer still finds them
+    matches = [m for p in pages for m in FACILITY_RE.finditer(p["text"])]
+    assert matches and all(m.group(0).count("\n") == 2 for m in matches)
+
+    fields = parse_notice_pages(pages, "layoff1", "notice_1")
+    assert {k: fields[k] for k in FIELDS} == {k: notice[k] for k in FIELDS}
@@ -0,0 +1,81 @@
+"""Stage graph and incremental rebuilds in tools/pipeline.py."""
+
+import pipeline
+from pipeline import Pipeline, Stage
+
+
+def _downstream(stages, changed):
+    """Stages that (transitively) read the changed file."""
+    producer = {out: s.name for s in stages for out in s.outputs}
+    hit = set()
+    files = {changed}
+    grew = True
+    while grew:
+        grew = False
+        for s in stages:
+            if s.name not in hit and files & set(s.inputs):
+                hit.add(s.name)
+                files |= set(s.outputs)
+                grew = True
+    assert all(producer.get(f) in hit for f in files if f != changed)
+    return hit
+
+
+def test_geocode_fix_rebuilds_only_the_map_side():
+    stages = pipeline.default_stages()
+    hit = _downstream(stages, f"{pipeline.NORMALIZED}/facility_geocodes.csv")
+    # The database and the validation gate read the geocodes too; no CSV export does
+    assert hit == {"map", "database", "validate", "publish_map"}
+
+
+def test_rollups_are_independent_stages():
+    p = Pipeline(pipeline.default_stages(), state_path=pipeline.REPO_ROOT / "unused.json")
+    assert "title_rollups" not in p.deps["facility_rollups"]
+    assert "facility_rollups" not in p.deps["title_rollups"]
+    assert p.deps["facility_rollups"] == p.deps["title_rollups"] == ["combine"]
+
+
+def test_notice_files_follow_the_directory():
+    notices = pipeline.notice_files()
+    assert f"{pipeline.NORMALIZED}/notice_1.json" in notices
+    assert notices.index(f"{pipeline.NORMALIZED}/notice_2.json") > 0
+
+
+def test_only_stages_downstream_of_an_edit_rerun(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "REPO_ROOT", tmp_path)
+    (tmp_path / "a.txt").write_text("a1", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("b1", encoding="utf-8")
+    runs = []
+
+    def copier(src, dst):
+        def run():
+            runs.append(dst)
+            (tmp_path / dst).write_text((tmp_path / src).read_text(encoding="utf-8"), "utf-8")
+
+        run.__name__ = f"copy_{src}_{dst}".replace(".", "_")
+        return run
+
+    def make():
+        stages = [
+            Stage("a", ["a.txt"], ["a.out"], copier("a.txt", "a.out")),
+            Stage("b", ["b.txt"], ["b.out"], copier("b.txt", "b.out")),
+            Stage("a2", ["a.out"], ["a2.out"], copier("a.out", "a2.out")),
+        ]
+        return Pipeline(stages, state_path=tmp_path / "state.json")
+
+    assert set(make().build(jobs=2).values()) == {"built"}
+    assert set(make().build().values()) == {"fresh"}
+
+    runs.clear()
+    (tmp_path / "b.txt").write_text("b2", encoding="utf-8")
+    assert make().build() == {"a": "fresh", "b": "built", "a2": "fresh"}
+    assert runs == ["b.out"]
+
+
+def test_layoff2_pages_flow_as_jsonl():
+    stages = {s.name: s for s in pipeline.default_stages()}
+    pages = f"{pipeline.EXTRACTED}/layoff2_pages.jsonl"
+    assert stages["extract_layoff2"].outputs == [pages]
+    assert stages["parse_layoff2"].inputs == [pages]
+    # extract_pages.py writes JSONL unless --format json is asked for
+    assert "--format" not in stages["extract_layoff2"].action
@@ -0,0 +1,124 @@
+"""Notice links and effective rows in tools/reconcile.py."""
+
+import pytest
+
+from reconcile import ReconcileError, reconcile
+
+
+def _notice(notice_id, rows, letter_date="2025-01-15", filename=None, **links):
+    return {
+        "noticeId": notice_id,
+        "jurisdiction": "WA",
+        "source": {"filename": filename or f"{notice_id}.pdf", "letterDate": letter_date},
+        "jobTitleImpacts": [
+            {"facilityId": fid, "jobTitleCanonical": title, "affectedCount": count}
+            for fid, title, count in rows
+        ],
+        **links,
+    }
+
+
+ROWS = [("SEA40", "Program Manager III", 6), ("SEA40", "Recruiter", 2)]
+
+
+def _links(result):
+    return [(link.notice, link.kind, link.target, link.reason) for link in result.links]
+
+
+def _effective(result):
+    return sorted((r[0], r[1], r[3], r[4]) for r in result.rows)
+
+
+def test_explicit_amends_replaces_only_restated_rows():
+    result = reconcile(
+        [
+            _notice("n1", ROWS),
+            _notice("n2", [("SEA40", "Recruiter", 5)], "2025-02-01", amends="n1"),
+        ]
+    )
+    assert _links(result) == [("n2", "amends", "n1", "explicit")]
+    assert _effective(result) == [
+        ("n1", "SEA40", "Program Manager III", 6),
+        ("n2", "SEA40", "Recruiter", 5),
+    ]
+    assert [d["reason"] for d in result.dropped] == ["restated"]
+
+
+def test_explicit_supersedes_replaces_everything_and_flags_unknown_targets():
+    result = reconcile(
+        [
+            _notice("n1", ROWS),
+            _notice("n2", [("SEA40", "Recruiter", 1)], "2025-02-01", supersedes=["n1", "n9"]),
+        ]
+    )
+    assert _effective(result) == [("n2", "SEA40", "Recruiter", 1)]
+    assert result.unresolved == [{"notice": "n2", "kind": "supersedes", "target": "n9"}]
+
+
+def test_identical_rows_alone_are_reported_not_dropped():
+    result = reconcile([_notice("n1", ROWS), _notice("n2", ROWS, "2025-06-01")])
+    assert result.links == []
+    assert result.possible_duplicates == [{"notice": "n2", "target": "n1"}]
+    assert result.to_json()["possibleDuplicates"] == result.possible_duplicates
+    assert result.affected_out == result.affected_in == 16
+
+
+@pytest.mark.parametrize(
+    "refiling",
+    [
+        _notice("n2", ROWS),  # same letter date
+        _notice("n2", ROWS, "2025-06-01", filename="layoff_corrected.pdf"),
+    ],
+)
+def test_corroborated_duplicate_supersedes(refiling):
+    result = reconcile([_notice("n1", ROWS), refiling])
+    assert _links(result) == [("n2", "supersedes", "n1", "duplicate")]
+    assert result.possible_duplicates == []
+    assert {r[0] for r in result.rows} == {"n2"}
+    assert result.affected_out == 8
+
+
+def test_amendment_hint_links_the_overlapping_notice():
+    result = reconcile(
+        [
+            _notice("n1", [("GEG1", "Data Engineer II", 3)]),
+            _notice("n2", ROWS, "2025-01-20"),
+            _notice(
+                "n3",
+                [
+                    ("SEA40", "Program Manager III", 4),
+                    ("SEA40", "Recruiter", 2),
+                    ("SEA41", "Recruiter", 1),
+                ],
+                "2025-03-01",
+                filename="layoff_amended.pdf",
+            ),
+        ]
+    )
+    assert _links(result) == [("n3", "amends", "n2", "amendment hint")]
+    assert _effective(result) == [
+        ("n1", "GEG1", "Data Engineer II", 3),
+        ("n3", "SEA40", "Program Manager III", 4),
+        ("n3", "SEA40", "Recruiter", 2),
+        ("n3", "SEA41", "Recruiter", 1),
+    ]
+
+
+def test_amendment_hint_needs_enough_overlap():
+    result = reconcile(
+        [
+            _notice("n1", ROWS),
+            _notice(
+                "n2",
+                [("SEA40", "Recruiter", 1), ("GEG1", "Recruiter", 1), ("GEG2", "Recruiter", 1)],
+                "2025-03-01",
+                filename="revised.pdf",
+            ),
+        ]
+    )
+    assert result.links == []
+
+
+def test_cycles_are_rejected():
+    with pytest.raises(ReconcileError):
+        reconcile([_notice("n1", ROWS, amends="n2"), _notice("n2", ROWS, amends="n1")])
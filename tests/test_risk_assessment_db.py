@@ -0,0 +1,93 @@
+"""risk_assessment --db through the tools.risk_assessment package path (the console script)."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from conftest import REPO_ROOT
+
+COMBINED = {
+    "generatedAt": "2025-01-15T00:00:00Z",
+    "notices": [
+        {
+            "noticeId": "notice_1",
+            "jurisdiction": "WA",
+            "source": {"filename": "notice_1.pdf", "receivedDate": "2025-01-15"},
+            "facilities": [{"facilityId": "SEA40", "notes": ""}],
+            "jobTitleImpacts": [
+                {
+                    "facilityId": "SEA40",
+                    "jobTitleRaw": "PROGRAM MANAGER III",
+                    "jobTitleCanonical": "Program Manager III",
+                    "affectedCount": 6,
+                },
+                {
+                    "facilityId": "SEA41",
+                    "jobTitleRaw": "PROGRAM MANAGER III",
+                    "jobTitleCanonical": "Program Manager III",
+                    "affectedCount": 2,
+                },
+            ],
+        }
+    ],
+    "facilities": [
+        {"facilityId": "SEA40", "label": "SEA40 - Seattle, WA", "address": {"city": "Seattle"}},
+        {"facilityId": "SEA41", "label": "SEA41 - Seattle, WA", "address": {"city": "Seattle"}},
+    ],
+}
+
+GEOCODES_CSV = (
+    "facilityId,lat,lon,source,notes,buildingName,streetAddress,city,state,zip\n"
+    "SEA40,47.6205,-122.3493,precise,,,,Seattle,WA,98109\n"
+    "SEA41,47.6550,-122.3080,precise,,,,Seattle,WA,98105\n"
+)
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    from tools.impact_db import import_database
+
+    combined = tmp_path / "combined.json"
+    combined.write_text(json.dumps(COMBINED), encoding="utf-8")
+    geocodes = tmp_path / "facility_geocodes.csv"
+    geocodes.write_text(GEOCODES_CSV, encoding="utf-8")
+    path = str(tmp_path / "impacts.db")
+    import_database(path, str(combined), str(geocodes), geocode_versions=[])
+    return path
+
+
+def test_main_db_under_package_path(db_path, tmp_path):
+    # A subprocess sees only the repo root, as the installed console script does,
+    # so a bare sibling import would fail here instead of finding tools/ on sys.path
+    script = (
+        "import sys\n"
+        "from tools import risk_assessment\n"
+        "sys.argv = ['risk-assessment', '--db', sys.argv[1], '--facility', 'SEA40',\n"
+        "            '--title', 'Program Manager III']\n"
+        "code = risk_assessment.main_db(risk_assessment.parse_arguments())\n"
+        "bare = sorted({'impact_db', 'risk_assessment'} & set(sys.modules))\n"
+        "print('EXIT', code, 'BARE', bare)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-c", script, db_path],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "EXIT 0 BARE []" in proc.stdout
+    assert "Program Manager III" in proc.stdout
+
+
+def test_main_db_missing_database(tmp_path, monkeypatch):
+    from tools import risk_assessment
+
+    missing = str(tmp_path / "missing.db")
+    argv = ["risk-assessment", "--db", missing, "--facility", "SEA40", "--title", "x"]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(risk_assessment.DataLoadError):
+        risk_assessment.main_db(risk_assessment.parse_arguments())
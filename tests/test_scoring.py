@@ -0,0 +1,220 @@
+"""Unit tests for the docs/SCORING.md tier rules in tools/scoring.py."""
+
+import pytest
+
+import scoring
+from scoring import (
+    NEARBY_RADIUS_KM,
+    TIER_HIGH,
+    TIER_LOW,
+    TIER_MEDIUM,
+    TIER_UNKNOWN,
+    LRUCache,
+    ScoringIndex,
+    remote_facility,
+    resolve,
+    score,
+    score_roster,
+)
+
+# Two facilities 5 km apart in Seattle and one in Spokane, far from both
+GEOCODES = {
+    "SEA40": (47.6205, -122.3493),
+    "SEA41": (47.6550, -122.3080),
+    "GEG1": (47.6588, -117.4260),
+    "SEA99": (47.6300, -122.3400),
+}
+
+
+def _notice(notice_id, facilities, impacts, remote_clauses=None):
+    return {
+        "noticeId": notice_id,
+        "jurisdiction": "WA",
+        "source": {"filename": f"{notice_id}.pdf", "letterDate": "2025-01-15"},
+        "facilities": [{"facilityId": fid, "notes": ""} for fid in facilities],
+        "jobTitleImpacts": [
+            {"facilityId": fid, "jobTitleCanonical": title, "affectedCount": count}
+            for fid, title, count in impacts
+        ],
+        "remoteClauses": remote_clauses or [],
+    }
+
+
+def _combined():
+    return {
+        "notices": [
+            _notice(
+                "notice_1",
+                ["SEA40", "GEG1", "REMOTE_WA"],
+                [
+                    ("SEA40", "Program Manager III", 6),
+                    ("GEG1", "Data Engineer II", 2),
+                    ("REMOTE_WA", "Software Dev Engineer II", 3),
+                    ("", "Recruiter", 4),
+                ],
+                [{"state": "WA", "affectedCount": 3, "notes": "Remote employees residing in WA"}],
+            ),
+            _notice("notice_2", ["SEA41"], [("SEA41", "Solutions Architect", 1)]),
+        ]
+    }
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ScoringIndex.from_combined(_combined(), GEOCODES, {})
+
+
+def test_high_via_pair_rows(index):
+    result = score(index, "sea40", "Program Manager III", "Program Manager III", "High")
+    assert result.tier == TIER_HIGH
+    assert result.facility_id == "SEA40"
+    assert [e["kind"] for e in result.evidence] == ["jobTitleImpact"]
+    assert result.evidence[0]["noticeId"] == "notice_1"
+    assert result.evidence[0]["affectedCount"] == 6
+    assert result.reasons[0]["evidence"] == [0]
+    assert result.similar_titles == []
+
+
+def test_medium_facility_only(index):
+    result = score(index, "SEA40", "Data Engineer II", "Data Engineer II", "High")
+    assert result.tier == TIER_MEDIUM
+    assert [e["kind"] for e in result.evidence] == ["facility"]
+    assert "Data Engineer II is not listed for it" in result.reasons[0]["text"]
+
+
+def test_medium_fuzzy_title_match(index):
+    # A Medium title match for a listed pair never reaches High
+    result = score(index, "SEA40", "Program Mgr III", "Program Manager III", "Medium")
+    assert result.tier == TIER_MEDIUM
+    assert result.evidence[0]["kind"] == "jobTitleImpact"
+    assert result.evidence[0]["titleConfidence"] == "Medium"
+    assert "close (Medium confidence) match" in result.reasons[0]["text"]
+
+
+def test_medium_title_without_facility(index):
+    result = score(index, "", "Recruiter", "Recruiter", "High")
+    assert result.tier == TIER_MEDIUM
+    assert [e["kind"] for e in result.evidence] == ["jobTitleImpact"]
+    assert result.evidence[0]["facilityId"] is None
+    assert "without a specific facility" in result.reasons[0]["text"]
+
+
+def test_low_via_nearby_facility(index):
+    result = score(index, "SEA99", "Barista", None, "None")
+    assert result.tier == TIER_LOW
+    nearby = [n["facilityId"] for n in result.nearby_facilities]
+    assert nearby == ["SEA40", "SEA41"]
+    assert all(n["distanceKm"] <= NEARBY_RADIUS_KM for n in result.nearby_facilities)
+    assert {e["kind"] for e in result.evidence} == {"nearbyFacility"}
+    assert "context only" in result.reasons[0]["text"]
+
+
+def test_low_via_title_elsewhere(index):
+    result = score(index, "SEA41", "Data Engineer II", "Data Engineer II", "High")
+    # SEA41 is listed, so this is Medium; an unlisted facility without neighbours is Low
+    assert result.tier == TIER_MEDIUM
+    result = score(index, "NOWHERE1", "Data Engineer II", "Data Engineer II", "High")
+    assert result.tier == TIER_LOW
+    assert result.nearby_facilities is None
+    assert result.evidence[0]["facilityId"] == "GEG1"
+    assert "listed at other facilities" in result.reasons[0]["text"]
+
+
+def test_low_via_similar_titles(index):
+    canonical, confidence = resolve(index, "Data Engineering Lead")
+    assert confidence == "Low"
+    result = score(index, "NOWHERE1", "Data Engineering Lead", canonical, confidence)
+    assert result.tier == TIER_LOW
+    assert result.similar_titles[0]["title"] == "Data Engineer II"
+    assert result.evidence and all(e["titleConfidence"] == "Low" for e in result.evidence)
+    assert "only loosely resembles" in result.reasons[0]["text"]
+
+
+def test_unknown(index):
+    result = score(index, "NOWHERE1", "Zookeeper", None, "None")
+    assert result.tier == TIER_UNKNOWN
+    assert result.evidence == []
+    assert result.reasons[0]["evidence"] == []
+    assert result.notice_ids() == []
+
+
+def test_remote_scope_requires_named_state(index):
+    assert remote_facility(index, True, "wa") == "REMOTE_WA"
+    assert remote_facility(index, True, "OR") is None
+    assert remote_facility(index, True, None) is None
+    assert remote_facility(index, False, "WA") is None
+
+    title = "Software Dev Engineer II"
+    assert score(index, "NOWHERE1", title, title, "High", True, "WA").tier == TIER_HIGH
+    # Not remote, or resident in a state no clause names: the remote rows do not apply
+    assert score(index, "NOWHERE1", title, title, "High", False, "WA").tier == TIER_LOW
+    assert score(index, "NOWHERE1", title, title, "High", True, "OR").tier == TIER_LOW
+
+
+def test_remote_scope_alone_is_not_high(index):
+    result = score(index, "NOWHERE1", "Zookeeper", None, "None", True, "WA")
+    assert result.tier == TIER_MEDIUM
+    assert result.evidence[0]["kind"] == "remoteClause"
+    assert "remote employees residing in WA" in result.reasons[0]["text"]
+
+
+def test_score_roster_maps_rows_to_distinct_keys(index):
+    scores = score_roster(
+        index,
+        ["SEA40", "sea40 ", "SEA40", "NOWHERE1", "NOWHERE1"],
+        [
+            "Program Manager III",
+            "Program Manager III",
+            "Data Engineer II",
+            "Zookeeper",
+            "Software Dev Engineer II",
+        ],
+        [False, False, False, False, True],
+        [None, None, None, None, "wa"],
+    )
+    assert len(scores) == 5
+    assert len(scores.results) == 4
+    assert list(scores.row_keys) == [0, 0, 1, 2, 3]
+    assert scores[0] is scores[1]
+    assert scores.tiers() == [TIER_HIGH, TIER_HIGH, TIER_MEDIUM, TIER_UNKNOWN, TIER_HIGH]
+    assert scores.tier_counts() == {TIER_HIGH: 3, TIER_MEDIUM: 1, TIER_LOW: 0, TIER_UNKNOWN: 1}
+    assert [r.tier for r in scores] == scores.tiers()
+
+
+def test_score_roster_rejects_ragged_columns(index):
+    with pytest.raises(ValueError):
+        score_roster(index, ["SEA40"], [])
+
+
+def test_score_roster_drops_state_of_onsite_rows(index):
+    scores = score_roster(
+        index,
+        ["SEA40", "SEA40", None],
+        ["Program Manager III", "Program Manager III", None],
+        [0, 0, 0],
+        ["WA", None, "WA"],
+    )
+    assert list(scores.row_keys) == [0, 0, 1]
+    assert scores.tiers() == [TIER_HIGH, TIER_HIGH, TIER_UNKNOWN]
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+    assert list(cache) == ["a", "c"]
+    assert cache.get("b", "miss") == "miss"
+
+
+def test_index_caches_stay_bounded(monkeypatch):
+    monkeypatch.setattr(scoring, "SCORE_CACHE_SIZE", 3)
+    monkeypatch.setattr(scoring, "TITLE_CACHE_SIZE", 2)
+    small = ScoringIndex.from_combined(_combined(), GEOCODES, {})
+    titles = ["Program Manager III", "Recruiter", "Zookeeper", "Data Engineer II"]
+    first = score_roster(small, ["SEA40"] * 4, titles).tiers()
+    assert len(small._score_cache) == 3
+    assert len(small._resolve_cache) == 2
+    # Evicted keys are simply scored again
+    assert score_roster(small, ["SEA40"] * 4, titles).tiers() == first
@@ -0,0 +1,60 @@
+"""Normalization and matching rules in tools/title_matcher.py."""
+
+from title_matcher import TitleMatcher, normalize_title
+
+TITLES = {
+    "Software Dev Engineer II": 40,
+    "Software Dev Engineer III": 12,
+    "Program Manager III": 6,
+    "Sr. Mgr, Business Intelligence": 3,
+    "Senior Manager Business Intelligence": 9,
+}
+
+
+def _matcher(aliases=None):
+    return TitleMatcher(TITLES.keys(), aliases, TITLES)
+
+
+def test_normalize_expands_abbreviations_and_levels():
+    assert normalize_title("Sr. Mgr, SDE-II") == "senior manager software dev engineer 2"
+    assert normalize_title("sde2") == normalize_title("Software Dev Engineer II")
+
+
+def test_exact_normalized_and_alias_matches_are_high():
+    m = _matcher({"pgm 3": "Program Manager III", "ghost": "Not A Title"})
+    assert m.exact("Program Manager III").via == "exact"
+    hit = m.match("sde 2")
+    assert (hit.title, hit.confidence, hit.via) == (
+        "Software Dev Engineer II",
+        "High",
+        "normalized",
+    )
+    assert m.match("PGM 3").via == "alias"
+    # Aliases to titles outside the vocabulary are dropped
+    assert m.exact("ghost") is None
+
+
+def test_shared_key_prefers_the_most_affected_title():
+    hit = _matcher().exact("sr manager business intelligence")
+    assert hit.title == "Senior Manager Business Intelligence"
+    assert hit.affected == 9
+
+
+def test_level_mismatch_is_never_above_low():
+    similar = _matcher().similar("Software Dev Engineer IV", 2)
+    assert [s.title for s in similar] == ["Software Dev Engineer II", "Software Dev Engineer III"]
+    assert {s.confidence for s in similar} == {"Low"}
+
+
+def test_similar_excludes_and_ranks_best_first():
+    m = _matcher()
+    similar = m.similar("Software Dev Engineer", 5, exclude="Software Dev Engineer III")
+    assert "Software Dev Engineer III" not in [s.title for s in similar]
+    scores = [s.score for s in similar]
+    assert scores == sorted(scores, reverse=True)
+    assert m.similar("Software Dev Engineer", 0) == []
+
+
+def test_no_match_below_the_low_threshold():
+    assert _matcher().match("Zookeeper") is None
+    assert _matcher().match("") is None
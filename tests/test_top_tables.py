@@ -0,0 +1,61 @@
+"""Top-K selection, file round trip and staleness in tools/top_tables.py."""
+
+import pytest
+
+from top_tables import TopTables, TopTablesError, load_current_tables, top_k
+
+IMPACTS_CSV = (
+    "facilityId,jobTitleCanonical,affectedCount\n"
+    "SEA40,Program Manager III,6\n"
+    "SEA40,Data Engineer II,6\n"
+    "SEA40,Recruiter,2\n"
+    " SEA41 ,Program Manager III,x\n"
+    "SEA41,Program Manager III,3\n"
+    ",Recruiter,4\n"
+)
+
+
+def test_top_k_ranks_like_a_full_sort():
+    counts = {"a": 1, "b": 5, "c": 5, "d": 3}
+    full = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)
+    for k in range(6):
+        assert top_k(counts, k) == full[:k]
+    assert top_k(counts, -1) == []
+
+
+def test_from_csv_normalizes_and_skips_rows_without_a_facility(tmp_path):
+    impacts = tmp_path / "impacts.csv"
+    impacts.write_text(IMPACTS_CSV, encoding="utf-8")
+    tables = TopTables.from_csv(str(impacts), k=2)
+    # Ties keep first-seen order; the third title is past k
+    assert tables.titles_at("SEA40", 5) == [("Program Manager III", 6), ("Data Engineer II", 6)]
+    # A malformed count is 0 and the padded ID is stripped
+    assert tables.facilities_for("Program Manager III", 5) == [("SEA40", 6), ("SEA41", 3)]
+    assert tables.facilities_for("Recruiter", 5) == [("SEA40", 2)]
+    assert tables.covers(2) and not tables.covers(3)
+
+
+def test_round_trip_and_staleness(tmp_path):
+    impacts = tmp_path / "impacts.csv"
+    impacts.write_text(IMPACTS_CSV, encoding="utf-8")
+    path = str(tmp_path / "top_tables.json")
+    TopTables.from_csv(str(impacts)).write(path)
+
+    tables, reason = load_current_tables(path, str(impacts))
+    assert reason == ""
+    assert tables.by_facility == TopTables.from_csv(str(impacts)).by_facility
+
+    impacts.write_text(IMPACTS_CSV + "SEA42,Recruiter,1\n", encoding="utf-8")
+    tables, reason = load_current_tables(path, str(impacts))
+    assert tables is None and "older than" in reason
+
+
+def test_read_rejects_other_versions_and_corrupt_files(tmp_path):
+    path = tmp_path / "top_tables.json"
+    path.write_text('{"version": 0}', encoding="utf-8")
+    with pytest.raises(TopTablesError):
+        TopTables.read(str(path))
+    path.write_text("{", encoding="utf-8")
+    with pytest.raises(TopTablesError):
+        TopTables.read(str(path))
+    assert load_current_tables(str(tmp_path / "missing.json"), str(path))[0] is None
@@ -1,6 +1,17 @@
+import argparse
+import hashlib
 import json
+import os
+import re
 import sys
+from collections import defaultdict
 from datetime import datetime, timezone
+from pathlib import Path
+
+import instrumentation
+from reconcile import impact_row, link_scope, reconcile
+
+MANIFEST_VERSION = 3
 
 def utc_now_iso():
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -40,116 +51,457 @@ def load_notice(path):
     # normalized file shape: { version, generatedAt, notice: {...} }
     return blob["notice"]
 
-def main():
-    if len(sys.argv) != 4:
-        print("Usage: python tools/build_combined.py data/normalized/notice_1.json data/normalized/notice_2.json data/normalized/combined.json")
-        sys.exit(2)
 
-    notice1_path, notice2_path, out_path = sys.argv[1], sys.argv[2], sys.argv[3]
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
 
-    n1 = load_notice(notice1_path)
-    n2 = load_notice(notice2_path)
 
-    notices = [n1, n2]
+def natural_key(path):
+    # notice_2.json sorts before notice_10.json
+    return [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", Path(path).name)]
 
-    # ----- Build deduped Facility[] definitions -----
-    # FacilityImpact has: {noticeId, facilityId, affectedApprox, notes, ...}
-    # We create Facility definitions from the first seen impact that has notes.
-    facility_defs = {}
 
-    for n in notices:
-        for imp in n.get("facilities", []):
-            fid = imp["facilityId"]
-            if fid not in facility_defs:
-                notes = imp.get("notes", "") or ""
-                addr = parse_address_best_effort(notes)
-
-                # Label best-effort: "SEA104 - Bellevue, WA" etc
-                label_city = addr.get("city", "").strip()
-                label_state = addr.get("state", "").strip()
-                suffix = ""
-                if label_city and label_state:
-                    suffix = f" - {label_city}, {label_state}"
-                elif label_city:
-                    suffix = f" - {label_city}"
-                elif label_state:
-                    suffix = f" - {label_state}"
-
-                facility_defs[fid] = {
-                    "facilityId": fid,
-                    "label": f"{fid}{suffix}",
-                    "address": addr,
-                }
-
-    # If you keep REMOTE_WA as a synthetic facilityId, define it here too (in case notes parsing is empty).
-    if "REMOTE_WA" in facility_defs:
-        # make sure it has a reasonable label/address
-        facility_defs["REMOTE_WA"]["label"] = "REMOTE_WA - Remote, WA"
-        facility_defs["REMOTE_WA"]["address"] = {
-            "line1": "",
-            "city": "",
-            "state": "WA",
-        }
+def resolve_inputs(inputs):
+    """Expand directories to their notice_*.json files; keep explicit files in the given order."""
+    paths = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            paths.extend(sorted((str(x) for x in p.glob("notice_*.json")), key=natural_key))
+        else:
+            paths.append(str(p))
+    return paths
 
-    facilities = sorted(facility_defs.values(), key=lambda x: x["facilityId"])
 
+def row_title(row):
+    title = row.get("jobTitleCanonical") or row.get("jobTitle") or row.get("jobTitleRaw")
+    if not title:
+        raise KeyError(
+            f"Missing job title field in jobTitleImpacts row. Keys={list(row.keys())}"
+        )
+    return title
 
-    # ----- Build jobTitles indexes -----
-    # We want:
-    # - jobTitles.canonicalTitles = list[dict] with counts and facility coverage
-    # - jobTitles.byFacility      = dict[facilityId] -> list[str] of titles present at that facility
 
-    from collections import defaultdict
+def facility_def_from_impact(imp):
+    """Facility definition from a FacilityImpact row (best-effort address from notes)."""
+    fid = imp["facilityId"]
+    notes = imp.get("notes", "") or ""
+    addr = parse_address_best_effort(notes)
+
+    # Label best-effort: "SEA104 - Bellevue, WA" etc
+    label_city = addr.get("city", "").strip()
+    label_state = addr.get("state", "").strip()
+    suffix = ""
+    if label_city and label_state:
+        suffix = f" - {label_city}, {label_state}"
+    elif label_city:
+        suffix = f" - {label_city}"
+    elif label_state:
+        suffix = f" - {label_state}"
+
+    return {
+        "facilityId": fid,
+        "label": f"{fid}{suffix}",
+        "address": addr,
+    }
 
-    title_to_total = defaultdict(int)      # title -> total affectedCount across all notices/facilities
-    title_to_facilities = defaultdict(set) # title -> set of facilityIds where it appears
-    by_facility = defaultdict(set)         # facilityId -> set of titles present
 
-    for n in notices:
-        for row in n.get("jobTitleImpacts", []):
+class CombinedState:
+    """
+    Aggregates behind combined.json, kept in a form that supports deltas:
+
+      titleTotals        title -> total affectedCount
+      titleFacilityRefs  title -> {facilityId: number of rows}  (refcounts, so
+                         removing a notice can drop a facility from a title's
+                         set without rescanning the other notices)
+      facilityNotices    facilityId -> noticeIds listing it, in notice order
+                         (the first one defines the Facility entry)
+      facilityRows       facilityId -> {noticeId: index of the facility's first
+                         row in that notice}
+      facilityOrder      facilityIds with rows, in the order their rows first
+                         appear across notices (the jobTitles.byFacility order)
+
+    Adding or removing one notice touches only that notice's rows; reorder()
+    then moves just the facilities those rows mention.
+    """
+
+    def __init__(self, blob=None):
+        blob = blob or {}
+        self.title_totals = defaultdict(int, blob.get("titleTotals", {}))
+        self.title_facility_refs = defaultdict(lambda: defaultdict(int))
+        for title, refs in blob.get("titleFacilityRefs", {}).items():
+            self.title_facility_refs[title].update(refs)
+        self.facility_notices = defaultdict(list)
+        for fid, nids in blob.get("facilityNotices", {}).items():
+            self.facility_notices[fid].extend(nids)
+        self.facility_rows = {
+            fid: dict(firsts) for fid, firsts in blob.get("facilityRows", {}).items()
+        }
+        self.facility_order = list(blob.get("facilityOrder", []))
+        # Facilities whose rows changed since the last reorder()
+        self.moved = set()
+
+    def to_json(self):
+        return {
+            "titleTotals": dict(self.title_totals),
+            "titleFacilityRefs": {t: dict(refs) for t, refs in self.title_facility_refs.items()},
+            "facilityNotices": dict(self.facility_notices),
+            "facilityRows": self.facility_rows,
+            "facilityOrder": self.facility_order,
+        }
+
+    def apply(self, notice, sign):
+        """Fold a notice's jobTitleImpacts in (sign=+1) or out (sign=-1)."""
+        nid = notice.get("noticeId")
+        for i, row in enumerate(notice.get("jobTitleImpacts", [])):
             fid = row.get("facilityId")
-            title = row.get("jobTitleCanonical") or row.get("jobTitle") or row.get("jobTitleRaw")
-            if not title:
-                raise KeyError(
-                    f"Missing job title field in jobTitleImpacts row. Keys={list(row.keys())}"
-                )
+            title = row_title(row)
 
             # affectedCount is required for aggregation; default to 0 if absent
             count = int(row.get("affectedCount", 0))
 
-            title_to_total[title] += count
+            self.title_totals[title] += sign * count
 
             if fid:
-                title_to_facilities[title].add(fid)
-                by_facility[fid].add(title)
+                refs = self.title_facility_refs[title]
+                refs[fid] += sign
+                if refs[fid] <= 0:
+                    del refs[fid]
+
+                firsts = self.facility_rows.setdefault(fid, {})
+                if sign > 0:
+                    firsts.setdefault(nid, i)
+                else:
+                    firsts.pop(nid, None)
+                if not firsts:
+                    del self.facility_rows[fid]
+                self.moved.add(fid)
+
+            if sign < 0 and not self.title_facility_refs[title] and self.title_totals[title] == 0:
+                del self.title_totals[title]
+                del self.title_facility_refs[title]
+
+    def reorder(self, rank, full=False):
+        """
+        Put the facilities moved since the last call back in first-appearance
+        order, by binary search over the rest. full=True re-sorts everything
+        (needed when notices already present changed their relative order).
+
+        Args:
+            rank: noticeId -> position of the notice in the inputs
+        """
+        def first_row(fid):
+            return min((rank[nid], i) for nid, i in self.facility_rows[fid].items())
+
+        if full:
+            self.facility_order = sorted(self.facility_rows, key=first_row)
+            self.moved = set()
+            return
+        order = [fid for fid in self.facility_order if fid not in self.moved]
+        for fid in self.moved:
+            if fid not in self.facility_rows:
+                continue
+            key = first_row(fid)
+            lo, hi = 0, len(order)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if first_row(order[mid]) < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            order.insert(lo, fid)
+        self.facility_order = order
+        self.moved = set()
+
+
+class LineageState:
+    """
+    Reconciliation results kept in the manifest so a build only reconciles
+    the notices a change can reach (reconcile.link_scope):
+
+      lineageOf   noticeId -> lineageId, for notices in a lineage
+      impacts     noticeId -> rows still in effect, for those notices
+      unresolved  explicit links to notices not (yet) in the inputs
+    """
+
+    def __init__(self, blob=None):
+        blob = blob or {}
+        self.lineage_of = dict(blob.get("lineageOf", {}))
+        self.impacts = {
+            nid: [tuple(r) for r in rows] for nid, rows in blob.get("impacts", {}).items()
+        }
+        self.unresolved = list(blob.get("unresolved", []))
 
+    def to_json(self):
+        return {
+            "lineageOf": self.lineage_of,
+            "impacts": {nid: [list(r) for r in rows] for nid, rows in self.impacts.items()},
+            "unresolved": self.unresolved,
+        }
+
+    def update(self, recon, notices_by_id, scope=None):
+        """Replace what is known about the notices in scope (all of them when None)."""
+        if scope is None:
+            self.lineage_of, self.impacts, self.unresolved = {}, {}, []
+        else:
+            self.forget(scope)
+        self.lineage_of.update(recon.lineage_of)
+        for nid in recon.lineage_of:
+            self.impacts[nid] = [impact_row(nid, r) for r in recon.impacts_for(notices_by_id[nid])]
+        self.unresolved.extend(recon.unresolved)
+
+    def forget(self, nids):
+        """Drop what is known about these notices."""
+        for nid in nids:
+            self.lineage_of.pop(nid, None)
+            self.impacts.pop(nid, None)
+        self.unresolved = [u for u in self.unresolved if u["notice"] not in nids]
+
+    def impacts_for(self, notice):
+        """jobTitleImpacts rows of a notice that are still in effect."""
+        nid = notice["noticeId"]
+        if nid not in self.lineage_of:
+            return notice.get("jobTitleImpacts", [])
+        return [
+            {
+                "facilityId": r[1],
+                "jobTitleRaw": r[2],
+                "jobTitleCanonical": r[3],
+                "affectedCount": r[4],
+            }
+            for r in self.impacts.get(nid, [])
+        ]
+
+
+def build(paths, out_path, manifest_path, full=False, prof=None):
+    """
+    Incrementally (re)build combined.json from notice files.
+
+    Returns (combined, stats) or (None, stats) when nothing changed.
+    Stages are timed on prof (an instrumentation.Profiler) when given.
+    """
+    prof = prof or instrumentation.Profiler("build_combined")
+    manifest = None
+    combined = None
+    if not full and Path(manifest_path).exists() and Path(out_path).exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        # combined.json edited or rebuilt by something else -> start over
+        if (manifest.get("version") != MANIFEST_VERSION
+                or manifest.get("combinedSha256") != file_sha256(out_path)):
+            manifest = None
+        else:
+            with open(out_path, "r", encoding="utf-8") as f:
+                combined = json.load(f)
+
+    prev_files = manifest["files"] if manifest else {}
+    state = CombinedState(manifest["state"] if manifest else None)
+    lineages = LineageState(manifest["reconcile"] if manifest else None)
+    notices_by_id = {n["noticeId"]: n for n in (combined or {}).get("notices", [])}
+    facilities = {f["facilityId"]: f for f in (combined or {}).get("facilities", [])}
+
+    # ----- Diff inputs against the manifest -----
+    files = {}
+    added, changed, removed = [], [], []
+    for path in paths:
+        st = os.stat(path)
+        prev = prev_files.get(path)
+        if prev and prev["size"] == st.st_size and prev["mtimeNs"] == st.st_mtime_ns:
+            files[path] = prev
+            continue
+        digest = file_sha256(path)
+        entry = {"sha256": digest, "size": st.st_size, "mtimeNs": st.st_mtime_ns}
+        if prev and prev["sha256"] == digest:
+            entry["noticeId"] = prev["noticeId"]
+            files[path] = entry
+            continue
+        files[path] = entry
+        (changed if prev else added).append(path)
+    removed = [p for p in prev_files if p not in files]
+    prof.lap("diff", rows=len(paths))
+
+    order_changed = list(prev_files) != paths
+    if not (added or changed or removed or order_changed):
+        return None, {"added": 0, "changed": 0, "removed": 0, "notices": len(paths)}
+
+    # ----- Fold out stale notices, fold in new/changed ones -----
+    touched_facilities = set()
+    touched_notices = set()
+    for path in removed + changed:
+        old = notices_by_id.pop(prev_files[path]["noticeId"], None)
+        if old is None:
+            continue
+        touched_notices.add(old["noticeId"])
+        state.apply(old, -1)
+        for imp in old.get("facilities", []):
+            fid = imp["facilityId"]
+            if old["noticeId"] in state.facility_notices[fid]:
+                state.facility_notices[fid].remove(old["noticeId"])
+            touched_facilities.add(fid)
+
+    for path in added + changed:
+        notice = load_notice(path)
+        files[path]["noticeId"] = notice["noticeId"]
+        notices_by_id[notice["noticeId"]] = notice
+        touched_notices.add(notice["noticeId"])
+        state.apply(notice, +1)
+        for imp in notice.get("facilities", []):
+            state.facility_notices[imp["facilityId"]].append(notice["noticeId"])
+            touched_facilities.add(imp["facilityId"])
+
+    notice_order = [files[p]["noticeId"] for p in paths]
+    rank = {nid: i for i, nid in enumerate(notice_order)}
+    if order_changed:
+        touched_facilities.update(state.facility_notices)
+
+    # ----- Re-derive Facility definitions only where their notices changed -----
+    # The definition comes from the first notice (in input order) that lists the facility.
+    for fid in touched_facilities:
+        nids = sorted(set(state.facility_notices.get(fid, [])), key=rank.__getitem__)
+        if not nids:
+            state.facility_notices.pop(fid, None)
+            facilities.pop(fid, None)
+            continue
+        state.facility_notices[fid] = nids
+        first = notices_by_id[nids[0]]
+        imp = next(i for i in first.get("facilities", []) if i["facilityId"] == fid)
+        facilities[fid] = facility_def_from_impact(imp)
+
+        # If you keep REMOTE_WA as a synthetic facilityId, define it here too
+        # (in case notes parsing is empty).
+        if fid == "REMOTE_WA":
+            # make sure it has a reasonable label/address
+            facilities[fid]["label"] = "REMOTE_WA - Remote, WA"
+            facilities[fid]["address"] = {
+                "line1": "",
+                "city": "",
+                "state": "WA",
+            }
+
+    # ----- Correct title totals for amended/superseded notices -----
+    # Only the notices a change can reach are reconciled again; lineages
+    # elsewhere keep their rows from the manifest. Reordering the notices that
+    # were already there changes which one counts as earlier, so that
+    # reconciles everything (adding or removing files does not).
+    notices = [notices_by_id[nid] for nid in notice_order]
+    kept = [p for p in paths if p in prev_files]
+    reordered = manifest is None or [p for p in prev_files if p in files] != kept
+    state.reorder(rank, full=reordered)
+    if reordered:
+        scope = None
+        recon = reconcile(notices)
+    else:
+        scope = link_scope(
+            notices_by_id,
+            touched_notices,
+            state.facility_notices,
+            lineages.lineage_of,
+            lineages.unresolved,
+        )
+        lineages.forget(touched_notices - set(notices_by_id))
+        recon = reconcile(notices_by_id[nid] for nid in notice_order if nid in scope)
+    lineages.update(recon, notices_by_id, scope)
+
+    # The manifest state keeps every notice's rows as filed so it can be folded
+    # incrementally; only notices in a lineage are re-folded, on a copy.
+    titles = state
+    if lineages.lineage_of:
+        titles = CombinedState(state.to_json())
+        for notice in notices:
+            if notice["noticeId"] in lineages.lineage_of:
+                titles.apply(notice, -1)
+                effective = lineages.impacts_for(notice)
+                titles.apply({"noticeId": notice["noticeId"], "jobTitleImpacts": effective}, +1)
+        titles.reorder(rank)
+
+    # ----- Build jobTitles indexes -----
+    # We want:
+    # - jobTitles.canonicalTitles = list[dict] with counts and facility coverage
+    # - jobTitles.byFacility      = dict[facilityId] -> list[str] of titles present at that facility
+    by_facility = defaultdict(set)
     canonical_titles = []
-    for title in sorted(title_to_total.keys()):
-        facs = title_to_facilities[title]
+    for title in sorted(titles.title_totals.keys()):
+        facs = titles.title_facility_refs[title]
+        for fid in facs:
+            by_facility[fid].add(title)
         canonical_titles.append({
             "jobTitleCanonical": title,
-            "affectedCount": title_to_total[title],
+            "affectedCount": titles.title_totals[title],
             "facilityCount": len(facs),
             "facilityIds": sorted(facs),
         })
 
+    # Facilities in the order their rows first appear across notices
+    facility_order = {fid: sorted(by_facility[fid]) for fid in titles.facility_order}
+
     combined = {
         "version": "1.0.0",
         "generatedAt": utc_now_iso(),
         "notices": notices,
-        "facilities": facilities,
+        "facilities": sorted(facilities.values(), key=lambda x: x["facilityId"]),
         "jobTitles": {
             "canonicalTitles": canonical_titles,
-            "byFacility": {fid: sorted(list(titles)) for fid, titles in by_facility.items()},
+            "byFacility": facility_order,
         },
     }
 
+    prof.lap("load+combine", rows=len(added) + len(changed) + len(removed))
+
+    stats = {"added": len(added), "changed": len(changed), "removed": len(removed),
+             "notices": len(paths)}
+    return combined, {**stats, "files": files, "state": state, "lineages": lineages,
+                      "reconciled": len(notices) if scope is None else len(scope)}
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Merge normalized notices into combined.json, "
+                    "folding in only new or changed notices."
+    )
+    ap.add_argument("inputs", nargs="+",
+                    help="notice_*.json files and/or directories containing them")
+    ap.add_argument("out", help="data/normalized/combined.json")
+    ap.add_argument("--manifest", default=None,
+                    help="Manifest of input hashes and aggregates (default: <out>.manifest.json)")
+    ap.add_argument("--full", action="store_true",
+                    help="Ignore the manifest and rebuild from scratch")
+    instrumentation.add_arguments(ap)
+    args = ap.parse_args()
+    prof = instrumentation.start("build_combined", args)
+
+    out_path = args.out
+    manifest_path = args.manifest or str(Path(out_path).with_suffix(".manifest.json"))
+    paths = resolve_inputs(args.inputs)
+    if not paths:
+        print("ERROR: no notice files found")
+        sys.exit(2)
+
+    combined, stats = build(paths, out_path, manifest_path, full=args.full, prof=prof)
+    if combined is None:
+        print(f"OK: {out_path} is up to date ({stats['notices']} notices unchanged)")
+        return
+
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump(combined, f, indent=2, ensure_ascii=False)
 
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": MANIFEST_VERSION,
+            "combinedSha256": file_sha256(out_path),
+            "files": stats["files"],
+            "state": stats["state"].to_json(),
+            "reconcile": stats["lineages"].to_json(),
+        }, f, ensure_ascii=False)
+    prof.lap("write", rows=len(combined["notices"]))
+
     print(f"OK: wrote {out_path}")
-    print(f"  notices={len(notices)}")
-    print(f"  facilities={len(facilities)}")
+    print(f"  notices={len(combined['notices'])} (added={stats['added']}, "
+          f"changed={stats['changed']}, removed={stats['removed']})")
+    print(f"  facilities={len(combined['facilities'])} (notices reconciled={stats['reconciled']})")
     print(f"  canonicalTitles={len(combined['jobTitles']['canonicalTitles'])}")
 
 
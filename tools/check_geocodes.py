@@ -1,10 +1,19 @@
+import argparse
 import csv
-import collections
 from pathlib import Path
 
+from spatial_index import DUPLICATE_TOLERANCE_M, group_near_duplicates
+
 CSV_PATH = Path(r"data\normalized\facility_geocodes.csv")
 
 def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Sanity-check facility geocodes and report near-duplicate points")
+    ap.add_argument("--tolerance_m", type=float, default=DUPLICATE_TOLERANCE_M,
+                    help="Points closer than this (meters) count as duplicates; "
+                         "0 for exact matches only")
+    args = ap.parse_args()
+
     if not CSV_PATH.exists():
         print(f"ERROR: missing file: {CSV_PATH}")
         return 2
@@ -25,7 +34,8 @@ def main() -> int:
         if not (15 <= lat <= 75) or not (-175 <= lon <= -50):
             bad.append((fid, "out_of_range", lat, lon))
 
-    m = collections.defaultdict(list)
+    ids = []
+    points = []
     for r in rows:
         fid = (r.get("facilityId") or "").strip()
         try:
@@ -33,10 +43,12 @@ def main() -> int:
             lon = float(r.get("lon"))
         except Exception:
             continue
-        m[(lat, lon)].append(fid)
+        ids.append(fid)
+        points.append((lat, lon))
 
+    groups = group_near_duplicates(points, args.tolerance_m)
     dups = sorted(
-        [(k, v) for k, v in m.items() if len(v) > 1],
+        [(points[g[0]], [ids[i] for i in g]) for g in groups],
         key=lambda x: len(x[1]),
         reverse=True,
     )
@@ -47,8 +59,8 @@ def main() -> int:
     for x in bad[:25]:
         print(" ", x)
 
-    print(f"\nunique_points={len(m)}")
-    print(f"duplicate_groups={len(dups)}")
+    print(f"\nunique_points={len(points) - sum(len(g) - 1 for g in groups)}")
+    print(f"duplicate_groups={len(dups)} (within {args.tolerance_m:g} m)")
     print("top duplicate groups:")
     for (latlon, ids) in dups[:15]:
         print(" ", latlon, "count=", len(ids), "example=", ids[:15])
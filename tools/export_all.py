@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+export_all.py
+
+Input:  data/normalized/combined.json (+ data/normalized/facility_geocodes.csv for the map),
+        or with --db, a database built by tools/impact_db.py
+Output: every file in data/exports, from one parse of combined.json and one
+aggregation pass over its jobTitleImpacts rows:
+
+  impacts_by_facility.csv
+  facility_rollup.csv
+  facility_rollup_all_facilities.csv
+  job_title_rollup.csv
+  job_titles.csv
+  notice_summary.csv
+  top_facilities.csv                  (--top_facilities, default 15)
+  top_facilities_all_facilities.csv
+  top_job_titles.csv                  (--top_job_titles, default 25)
+  top_job_titles_all.csv
+  facilities.geojson                  (--compact: minified, plus .gz/.br)
+  facility_tiles/                     (clustered per-zoom map tiles, see map_tiles.py)
+  impacts.snapshot                    (binary impacts + facility rollup, for risk_assessment.py)
+  top_tables.json                     (top titles per facility and facilities per title)
+
+Output is the same as running the individual export_* scripts in sequence;
+those scripts remain for one-off use.
+
+--only NAME (repeatable) writes just the named outputs, so tools/pipeline.py
+can give each group of outputs its own stage and rebuild it alone.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+import instrumentation
+from export_facilities_geojson import (
+    build_features,
+    load_geocodes_csv,
+    norm_fid,
+    write_feature_collection,
+)
+from export_facility_rollup_all_facilities import facility_ids_from_combined
+from impact_snapshot import ImpactSnapshot, file_sha256, source_stamp
+from map_tiles import write_tiles
+from reconcile import reconcile
+from top_tables import DEFAULT_K, TopTables
+
+IMPACT_COLUMNS = ["noticeId", "facilityId", "jobTitleRaw", "jobTitleCanonical", "affectedCount"]
+FACILITY_ROLLUP_COLUMNS = ["facilityId", "totalAffected", "jobTitleCount", "noticeCount"]
+TITLE_ROLLUP_COLUMNS = ["jobTitleCanonical", "totalAffected", "facilityCount", "noticeCount"]
+NOTICE_SUMMARY_COLUMNS = ["noticeId", "totalAffected", "totalFacilities", "totalTitles"]
+
+# Names accepted by --only, in the order outputs are written
+OUTPUT_NAMES = [
+    "impacts_by_facility.csv",
+    "facility_rollup.csv",
+    "facility_rollup_all_facilities.csv",
+    "job_title_rollup.csv",
+    "job_titles.csv",
+    "notice_summary.csv",
+    "top_facilities.csv",
+    "top_facilities_all_facilities.csv",
+    "top_job_titles.csv",
+    "top_job_titles_all.csv",
+    "facilities.geojson",
+    "facility_tiles",
+    "impacts.snapshot",
+    "top_tables.json",
+]
+MAP_OUTPUTS = {"facilities.geojson", "facility_tiles"}
+
+
+def ensure_parent_dir(path: str) -> None:
+    parent = os.path.dirname(os.path.abspath(path))
+    if parent and not os.path.isdir(parent):
+        os.makedirs(parent, exist_ok=True)
+
+
+class ExportAggregates:
+    """Every rollup the exports need, filled in by a single pass over impact rows."""
+
+    def __init__(self) -> None:
+        self.impact_rows: List[List[Any]] = []
+
+        self.facility_totals: Dict[str, int] = defaultdict(int)
+        self.facility_titles: Dict[str, Set[str]] = defaultdict(set)
+        self.facility_notices: Dict[str, Set[str]] = defaultdict(set)
+
+        self.title_totals: Dict[str, int] = defaultdict(int)
+        self.title_facilities: Dict[str, Set[str]] = defaultdict(set)
+        self.title_notices: Dict[str, Set[str]] = defaultdict(set)
+
+        self.notice_totals: Dict[str, int] = defaultdict(int)
+        self.notice_facilities: Dict[str, Set[str]] = defaultdict(set)
+        self.notice_titles: Dict[str, Set[str]] = defaultdict(set)
+
+        # Map popups: normalized facilityId -> title -> affected, in first-seen order
+        self.facility_title_totals: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+
+    @classmethod
+    def from_combined(cls, combined: Dict[str, Any]) -> "ExportAggregates":
+        # Amended and superseded rows are reconciled first, as in export_impacts_by_facility.py
+        return cls.from_rows(reconcile(combined.get("notices", [])).rows)
+
+    @classmethod
+    def from_rows(cls, rows) -> "ExportAggregates":
+        """Aggregate (noticeId, facilityId, jobTitleRaw, jobTitleCanonical, affectedCount) rows."""
+        agg = cls()
+        for notice_id, facility_id, raw, canonical, count in rows:
+            agg.add(notice_id, facility_id, raw, canonical, int(count))
+        return agg
+
+    def add(self, notice_id: str, facility_id: str, raw: str, canonical: str, count: int) -> None:
+        self.impact_rows.append([notice_id, facility_id, raw, canonical, count])
+
+        notice_id = notice_id.strip()
+        facility_id = facility_id.strip()
+        title = canonical.strip() or raw.strip()
+
+        if facility_id:
+            self.facility_totals[facility_id] += count
+            self.facility_titles[facility_id].add(title)
+            if notice_id:
+                self.facility_notices[facility_id].add(notice_id)
+
+        if title:
+            self.title_totals[title] += count
+            if facility_id:
+                self.title_facilities[title].add(facility_id)
+            if notice_id:
+                self.title_notices[title].add(notice_id)
+
+        if notice_id:
+            self.notice_totals[notice_id] += count
+            if facility_id:
+                self.notice_facilities[notice_id].add(facility_id)
+            if title:
+                self.notice_titles[notice_id].add(title)
+
+        fid = norm_fid(facility_id)
+        if fid and canonical.strip():
+            self.facility_title_totals[fid][canonical.strip()] += count
+
+    # ----- Derived tables -----
+
+    def facility_rollup(self) -> List[List[Any]]:
+        return [
+            [
+                fid,
+                self.facility_totals[fid],
+                len(self.facility_titles[fid]),
+                len(self.facility_notices[fid]),
+            ]
+            for fid in sorted(self.facility_totals)
+        ]
+
+    def facility_rollup_all(self, facility_ids: List[str]) -> List[List[Any]]:
+        """Left join of the combined facility list onto facility_rollup, busiest first."""
+        rows = []
+        for fid in facility_ids:
+            if fid in self.facility_totals:
+                rows.append(
+                    [
+                        fid,
+                        self.facility_totals[fid],
+                        len(self.facility_titles[fid]),
+                        len(self.facility_notices[fid]),
+                        "true",
+                    ]
+                )
+            else:
+                rows.append([fid, 0, 0, 0, "false"])
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows
+
+    def title_rollup(self) -> List[List[Any]]:
+        return [
+            [t, self.title_totals[t], len(self.title_facilities[t]), len(self.title_notices[t])]
+            for t in sorted(self.title_totals)
+        ]
+
+    def notice_summary(self) -> List[List[Any]]:
+        return [
+            [
+                nid,
+                self.notice_totals[nid],
+                len(self.notice_facilities[nid]),
+                len(self.notice_titles[nid]),
+            ]
+            for nid in sorted(self.notice_totals)
+        ]
+
+
+def top_rows(rows: List[List[Any]], top: int) -> List[List[Any]]:
+    """Sort by totalAffected (second column) desc, keeping input order for ties."""
+    ranked = sorted(rows, key=lambda r: r[1], reverse=True)
+    return ranked[:top] if top and top > 0 else ranked
+
+
+def write_csv(path: str, header: List[str], rows: List[List[Any]]) -> int:
+    ensure_parent_dir(path)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        w.writerows(rows)
+    return len(rows)
+
+
+def write_geojson(path: str, features: List[Dict[str, Any]], compact: bool = False) -> int:
+    ensure_parent_dir(path)
+    write_feature_collection(path, features, compact)
+    return len(features)
+
+
+def plan_outputs(
+    facility_ids: List[str],
+    agg: ExportAggregates,
+    geos: Dict[str, Any],
+    args: argparse.Namespace,
+    names: Set[str],
+) -> List[Tuple[str, Callable[[str], int]]]:
+    """Compute the tables the named outputs need up front and return (path, write) pairs."""
+
+    def out(name: str) -> str:
+        return os.path.join(args.out_dir, name)
+
+    facility_rollup = agg.facility_rollup()
+    facility_rollup_all = agg.facility_rollup_all(facility_ids)
+    title_rollup = agg.title_rollup()
+
+    features: List[Dict[str, Any]] = []
+    if names & MAP_OUTPUTS:
+        rollup_dicts = [
+            dict(zip(FACILITY_ROLLUP_COLUMNS + ["hasImpacts"], r)) for r in facility_rollup_all
+        ]
+        features, missing_geo, _ = build_features(
+            rollup_dicts, geos, agg.facility_title_totals, args.top_titles
+        )
+        if missing_geo:
+            print(f"  warning: {missing_geo} facilities have no geocode and are left off the map")
+
+    all_cols = FACILITY_ROLLUP_COLUMNS + ["hasImpacts"]
+    writers: Dict[str, Callable[[str], int]] = {
+        "impacts_by_facility.csv": lambda p: write_csv(p, IMPACT_COLUMNS, agg.impact_rows),
+        "facility_rollup.csv": lambda p: write_csv(p, FACILITY_ROLLUP_COLUMNS, facility_rollup),
+        "facility_rollup_all_facilities.csv": lambda p: write_csv(p, all_cols, facility_rollup_all),
+        "job_title_rollup.csv": lambda p: write_csv(p, TITLE_ROLLUP_COLUMNS, title_rollup),
+        "job_titles.csv": lambda p: write_csv(
+            p, TITLE_ROLLUP_COLUMNS[:3], [r[:3] for r in title_rollup]
+        ),
+        "notice_summary.csv": lambda p: write_csv(p, NOTICE_SUMMARY_COLUMNS, agg.notice_summary()),
+        "top_facilities.csv": lambda p: write_csv(
+            p, FACILITY_ROLLUP_COLUMNS, top_rows(facility_rollup, args.top_facilities)
+        ),
+        "top_facilities_all_facilities.csv": lambda p: write_csv(
+            p, all_cols, top_rows(facility_rollup_all, 0)
+        ),
+        "top_job_titles.csv": lambda p: write_csv(
+            p, TITLE_ROLLUP_COLUMNS, top_rows(title_rollup, args.top_job_titles)
+        ),
+        "top_job_titles_all.csv": lambda p: write_csv(
+            p, TITLE_ROLLUP_COLUMNS, top_rows(title_rollup, 0)
+        ),
+        "facilities.geojson": lambda p: write_geojson(p, features, args.compact),
+        "facility_tiles": lambda p: write_tiles(features, p),
+    }
+    return [(out(name), write) for name, write in writers.items() if name in names]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Write every export from one pass over combined.json")
+    ap.add_argument("--combined", default=os.path.join("data", "normalized", "combined.json"))
+    ap.add_argument(
+        "--geocodes", default=os.path.join("data", "normalized", "facility_geocodes.csv")
+    )
+    ap.add_argument(
+        "--db",
+        default=None,
+        help="Read impacts, facilities and geocodes from a tools/impact_db.py database instead",
+    )
+    ap.add_argument("--out_dir", default=os.path.join("data", "exports"))
+    ap.add_argument(
+        "--top_facilities", type=int, default=15, help="Rows in top_facilities.csv (0 for all)"
+    )
+    ap.add_argument(
+        "--top_job_titles", type=int, default=25, help="Rows in top_job_titles.csv (0 for all)"
+    )
+    ap.add_argument(
+        "--top_titles", type=int, default=5, help="Top titles per facility in the geojson"
+    )
+    ap.add_argument(
+        "--top_k",
+        type=int,
+        default=DEFAULT_K,
+        help="Entries per facility and title in top_tables.json",
+    )
+    ap.add_argument(
+        "--compact",
+        action="store_true",
+        help="Minified facilities.geojson with .gz/.br copies (see export_facilities_geojson.py)",
+    )
+    ap.add_argument(
+        "--jobs", type=int, default=1, help="Write outputs on this many threads (default 1)"
+    )
+    ap.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        choices=OUTPUT_NAMES,
+        metavar="NAME",
+        help="Write only this output (e.g. facilities.geojson); repeatable. Default: all",
+    )
+    instrumentation.add_arguments(ap)
+    args = ap.parse_args()
+    prof = instrumentation.start("export_all", args)
+    names = set(args.only or OUTPUT_NAMES)
+
+    started = time.perf_counter()
+    if args.db:
+        # Imported here so the default path does not pull in risk_assessment
+        from impact_db import ImpactDB
+
+        db = ImpactDB(args.db)
+        try:
+            agg = ExportAggregates.from_rows(db.iter_impact_rows())
+            prof.lap("load+aggregate", rows=len(agg.impact_rows))
+            facility_ids = db.facility_ids()
+            geos = db.geocode_records()
+            notice_count = db.conn.execute("SELECT COUNT(*) FROM notices").fetchone()[0]
+        finally:
+            db.close()
+        prof.lap("load", rows=len(facility_ids) + len(geos))
+    else:
+        with open(args.combined, "r", encoding="utf-8") as f:
+            combined = json.load(f)
+        geos = load_geocodes_csv(args.geocodes)
+        notice_count = len(combined.get("notices", []))
+        prof.lap("load", rows=notice_count + len(geos))
+        agg = ExportAggregates.from_combined(combined)
+        facility_ids = facility_ids_from_combined(combined)
+        prof.lap("aggregate", rows=len(agg.impact_rows))
+
+    outputs = plan_outputs(facility_ids, agg, geos, args, names)
+    prof.lap("plan", rows=len(outputs))
+
+    def write_timed(output: Tuple[str, Callable[[str], int]]) -> int:
+        path, write = output
+        t0 = time.perf_counter()
+        n = write(path)
+        prof.record(f"write {os.path.basename(path)}", time.perf_counter() - t0, n)
+        return n
+
+    if args.jobs > 1:
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            counts = list(pool.map(write_timed, outputs))
+    else:
+        counts = [write_timed(o) for o in outputs]
+    prof.lap("write", rows=sum(counts))
+
+    for (path, _), n in zip(outputs, counts):
+        print(f"OK: wrote {path}")
+        print(f"  rows={n}")
+
+    # The snapshot and top tables record the hashes of the CSVs they mirror, so they are
+    # written last (with --only, from the CSVs already in out_dir)
+    impacts_csv = os.path.join(args.out_dir, "impacts_by_facility.csv")
+    rollup_csv = os.path.join(args.out_dir, "facility_rollup.csv")
+    if "impacts.snapshot" in names:
+        write_snapshot(agg, impacts_csv, rollup_csv, args.out_dir, prof)
+    if "top_tables.json" in names:
+        write_top_tables(agg, impacts_csv, args.top_k, args.out_dir, prof)
+
+    print(
+        f"  notices={notice_count} impactRows={len(agg.impact_rows)} "
+        f"in {time.perf_counter() - started:.3f}s"
+    )
+    return 0
+
+
+def write_snapshot(
+    agg: ExportAggregates,
+    impacts_csv: str,
+    rollup_csv: str,
+    out_dir: str,
+    prof: instrumentation.Profiler,
+) -> None:
+    """Write impacts.snapshot, recording stamps of the CSVs it mirrors."""
+    snapshot = ImpactSnapshot.from_rows(
+        ((r[0], r[1], r[3], r[4]) for r in agg.impact_rows),
+        FACILITY_ROLLUP_COLUMNS,
+        agg.facility_rollup(),
+    )
+    snapshot.sources = {
+        "impacts": source_stamp(impacts_csv),
+        "facility_rollup": source_stamp(rollup_csv),
+    }
+    snapshot_path = os.path.join(out_dir, "impacts.snapshot")
+    snapshot.write(snapshot_path)
+    prof.lap("write impacts.snapshot", rows=len(snapshot))
+    print(f"OK: wrote {snapshot_path}")
+    print(f"  rows={len(snapshot)}")
+
+
+def write_top_tables(
+    agg: ExportAggregates, impacts_csv: str, k: int, out_dir: str, prof: instrumentation.Profiler
+) -> None:
+    """Write top_tables.json, recording the hash of the impacts CSV it mirrors."""
+    # Keyed like risk_assessment's index of impacts_by_facility.csv, hence the stripped columns
+    tables = TopTables.from_rows(((r[1].strip(), r[3].strip(), r[4]) for r in agg.impact_rows), k)
+    tables.sources = {"impacts": file_sha256(impacts_csv)}
+    tables_path = os.path.join(out_dir, "top_tables.json")
+    tables.write(tables_path)
+    prof.lap("write top_tables.json", rows=len(tables.by_facility) + len(tables.by_title))
+    print(f"OK: wrote {tables_path}")
+    print(f"  facilities={len(tables.by_facility)} titles={len(tables.by_title)} k={tables.k}")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
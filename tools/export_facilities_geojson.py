@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import math
 import argparse
 import csv
+import gzip
 import json
 from collections import defaultdict
 
+import instrumentation
+from spatial_index import DUPLICATE_TOLERANCE_M, RING_SPACING_M, group_near_duplicates, ring_layout
+from top_tables import top_k
+
+# Decimal places kept for coordinates in --compact output (5 is about 1 m)
+COMPACT_PRECISION = 5
+
 
 def norm_fid(x: str) -> str:
     """
@@ -53,21 +60,13 @@ def load_geocodes_csv(path: str) -> dict:
     return geos
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--geocodes", default=r"data\normalized\facility_geocodes.csv")
-    ap.add_argument("--facility_rollup", default=r"data\exports\facility_rollup_all_facilities.csv")
-    ap.add_argument("--impacts", default=r"data\exports\impacts_by_facility.csv")
-    ap.add_argument("--out", default=r"data\exports\facilities.geojson")
-    ap.add_argument("--top_titles", type=int, default=5, help="Top titles per facility by affectedCount")
-    ap.add_argument("--exclude_remote", action="store_true", default=True, help="Exclude REMOTE_WA from map output")
-    args = ap.parse_args()
-
-    geos = load_geocodes_csv(args.geocodes)
-    rollup = load_csv(args.facility_rollup)
-    impacts = load_csv(args.impacts)
+def facility_title_totals(impacts) -> dict:
+    """
+    Per-facility title totals from impacts_by_facility rows.
 
-    # Build per-facility title ranking (keyed by normalized fid)
+    Returns dict[facilityId] -> dict[title] -> affected (fid normalized, titles in
+    first-seen order).
+    """
     fac_title_totals = defaultdict(lambda: defaultdict(int))
     for r in impacts:
         fid = norm_fid(r.get("facilityId") or "")
@@ -77,14 +76,31 @@ def main() -> int:
         if not title:
             continue
         fac_title_totals[fid][title] += to_int(r.get("affectedCount"))
+    return fac_title_totals
 
+
+def build_features(
+    rollup,
+    geos: dict,
+    fac_title_totals: dict,
+    top_titles_n: int = 5,
+    exclude_remote: bool = True,
+    dup_tolerance_m: float = DUPLICATE_TOLERANCE_M,
+):
+    """
+    Build one Point feature per facility rollup row that has a geocode.
+
+    Facilities within dup_tolerance_m of each other are spread onto rings
+    around the first one (see spatial_index.ring_layout) and marked
+    geoQuality "duplicate".
+
+    Returns (features, missing_geo, excluded_remote).
+    """
     features = []
+    points = []
     missing_geo = 0
     excluded_remote = 0
 
-    # Track how many times we see the same (lat, lon) so we can jitter duplicates
-    coord_counts = {}  # (lat, lon) -> count seen so far
-
     for r in rollup:
         fid_raw = r.get("facilityId") or ""
         fid = norm_fid(fid_raw)
@@ -92,7 +108,7 @@ def main() -> int:
             continue
 
         # REMOTE_WA is not a physical site; do not plot on the map
-        if args.exclude_remote and fid == "REMOTE_WA":
+        if exclude_remote and fid == "REMOTE_WA":
             excluded_remote += 1
             continue
 
@@ -111,32 +127,13 @@ def main() -> int:
         else:
             hasImpacts_bool = totalAffected > 0
 
-        top_titles = sorted(
-            fac_title_totals.get(fid, {}).items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:args.top_titles]
+        # Partial selection (heap of top_titles_n), same ranking as a full sort
+        top_titles = top_k(fac_title_totals.get(fid, {}), top_titles_n)
         top_titles = [{"title": t, "affected": n} for (t, n) in top_titles]
 
-        # Read lat/lon and jitter duplicates deterministically
         lat = float(g["lat"])
         lon = float(g["lon"])
-
-        key = (lat, lon)
-        idx = coord_counts.get(key, 0)
-        coord_counts[key] = idx + 1
-
-        is_duplicate = idx > 0
-        geo_quality = "duplicate" if is_duplicate else "ok"
-
-        # Jitter duplicates by ~60m, ~120m, ... in a simple diagonal pattern
-        if is_duplicate:
-            meters = 60.0 * idx
-            dlat = meters / 111000.0
-            denom = 111000.0 * max(0.1, math.cos(math.radians(lat)))
-            dlon = meters / denom
-            lat = lat + dlat
-            lon = lon + dlon
+        points.append((lat, lon))
 
         feat = {
             "type": "Feature",
@@ -149,20 +146,152 @@ def main() -> int:
                 "hasImpacts": hasImpacts_bool,
                 "geoSource": g.get("source", ""),
                 "geoNotes": g.get("notes", ""),
-                "geoQuality": geo_quality,
+                "geoQuality": "ok",
                 "topTitles": top_titles,
             },
         }
         features.append(feat)
 
-    fc = {"type": "FeatureCollection", "features": features}
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(fc, f, indent=2)
+    # Spread near-duplicate locations apart deterministically (input order decides the anchor)
+    for group in group_near_duplicates(points, dup_tolerance_m):
+        anchor_lat, anchor_lon = points[group[0]]
+        positions = ring_layout(anchor_lat, anchor_lon, len(group), RING_SPACING_M)
+        for i, (lat, lon) in zip(group[1:], positions[1:]):
+            features[i]["geometry"]["coordinates"] = [lon, lat]
+            features[i]["properties"]["geoQuality"] = "duplicate"
+
+    return features, missing_geo, excluded_remote
+
+
+def compact_feature_collection(features, precision: int = COMPACT_PRECISION) -> dict:
+    """
+    Minified form of the FeatureCollection for the map.
+
+    Coordinates are rounded to ``precision`` decimals and each topTitles entry
+    becomes [titleIndex, affected], indexing a shared top-level "titles" list.
+    expand_feature_collection() reverses it.
+    """
+    titles = []
+    title_ids = {}
+    out = []
+    for feat in features:
+        props = dict(feat.get("properties") or {})
+        refs = []
+        for t in props.get("topTitles") or []:
+            idx = title_ids.get(t["title"])
+            if idx is None:
+                idx = title_ids[t["title"]] = len(titles)
+                titles.append(t["title"])
+            refs.append([idx, t["affected"]])
+        props["topTitles"] = refs
+        coords = [round(c, precision) for c in feat["geometry"]["coordinates"]]
+        geometry = {"type": "Point", "coordinates": coords}
+        out.append({"type": "Feature", "geometry": geometry, "properties": props})
+    return {"type": "FeatureCollection", "titles": titles, "features": out}
+
 
-    print(f"OK: wrote {args.out}")
+def expand_feature_collection(fc: dict) -> dict:
+    """Undo compact_feature_collection() in place; plain FeatureCollections pass through."""
+    titles = fc.pop("titles", None)
+    if titles is None:
+        return fc
+    for feat in fc.get("features", []):
+        props = feat.get("properties") or {}
+        refs = props.get("topTitles") or []
+        props["topTitles"] = [{"title": titles[i], "affected": n} for i, n in refs]
+    return fc
+
+
+def write_precompressed(path: str, data: bytes) -> list:
+    """
+    Write path.gz (and path.br when the brotli package is installed) next to path.
+
+    Returns the paths written. The gzip header carries no timestamp, so
+    unchanged data gives byte-identical files.
+    """
+    written = []
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    written.append(path + ".gz")
+    try:
+        import brotli
+    except ImportError:
+        return written
+    with open(path + ".br", "wb") as f:
+        f.write(brotli.compress(data, quality=11))
+    written.append(path + ".br")
+    return written
+
+
+def write_feature_collection(
+    path: str, features, compact: bool = False, precision: int = COMPACT_PRECISION
+) -> list:
+    """
+    Write facilities.geojson, indented by default or minified with --compact.
+
+    With compact, .gz/.br siblings are written after the file itself so a
+    server can send them as-is. Returns the paths written.
+    """
+    if not compact:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"type": "FeatureCollection", "features": features}, f, indent=2)
+        return [path]
+
+    fc = compact_feature_collection(features, precision)
+    data = json.dumps(fc, separators=(",", ":")).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    return [path] + write_precompressed(path, data)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--geocodes", default=r"data\normalized\facility_geocodes.csv")
+    ap.add_argument("--facility_rollup", default=r"data\exports\facility_rollup_all_facilities.csv")
+    ap.add_argument("--impacts", default=r"data\exports\impacts_by_facility.csv")
+    ap.add_argument("--out", default=r"data\exports\facilities.geojson")
+    ap.add_argument("--top_titles", type=int, default=5, help="Top titles per facility by affectedCount")
+    ap.add_argument("--exclude_remote", action="store_true", default=True, help="Exclude REMOTE_WA from map output")
+    ap.add_argument("--dup_tolerance_m", type=float, default=DUPLICATE_TOLERANCE_M,
+                    help="Facilities closer than this (meters) are spread apart on the map")
+    ap.add_argument("--compact", action="store_true",
+                    help="Minified output with rounded coordinates and shared topTitles, "
+                         "plus .gz/.br copies")
+    ap.add_argument("--precision", type=int, default=COMPACT_PRECISION,
+                    help="Coordinate decimals for --compact")
+    ap.add_argument("--tiles_dir", default=None,
+                    help="Also write clustered per-zoom map tiles here")
+    instrumentation.add_arguments(ap)
+    args = ap.parse_args()
+    prof = instrumentation.start("export_facilities_geojson", args)
+
+    geos = load_geocodes_csv(args.geocodes)
+    rollup = load_csv(args.facility_rollup)
+    impacts = load_csv(args.impacts)
+    prof.lap("load", rows=len(geos) + len(rollup) + len(impacts))
+
+    fac_title_totals = facility_title_totals(impacts)
+    features, missing_geo, excluded_remote = build_features(
+        rollup, geos, fac_title_totals, args.top_titles, args.exclude_remote, args.dup_tolerance_m
+    )
+    prof.lap("aggregate", rows=len(impacts))
+
+    written = write_feature_collection(args.out, features, args.compact, args.precision)
+    prof.lap("write", rows=len(features))
+
+    for path in written:
+        print(f"OK: wrote {path}")
     print(f"  features={len(features)}")
     print(f"  missingGeoForFacilitiesInRollup={missing_geo}")
     print(f"  excludedRemoteWA={excluded_remote}")
+
+    if args.tiles_dir:
+        from map_tiles import write_tiles
+
+        tiles = write_tiles(features, args.tiles_dir)
+        prof.lap("write_tiles", rows=tiles)
+        print(f"OK: wrote {args.tiles_dir}")
+        print(f"  tiles={tiles}")
     return 0
 
 
@@ -25,6 +25,8 @@ import json
 import os
 from typing import Any, Dict, List, Optional, Set
 
+import instrumentation
+
 
 def ensure_parent_dir(path: str) -> None:
     parent = os.path.dirname(os.path.abspath(path))
@@ -47,7 +49,10 @@ def _as_int(val: Any) -> Optional[int]:
 def load_combined_facility_ids(combined_path: str) -> List[str]:
     with open(combined_path, "r", encoding="utf-8") as f:
         combined = json.load(f)
+    return facility_ids_from_combined(combined)
+
 
+def facility_ids_from_combined(combined: Dict[str, Any]) -> List[str]:
     facilities = combined.get("facilities")
     if facilities is None:
         raise ValueError("combined.json missing top-level key: 'facilities'")
@@ -104,7 +109,9 @@ def main() -> int:
     ap.add_argument("combined_json", help="data/normalized/combined.json")
     ap.add_argument("facility_rollup_csv", help="data/exports/facility_rollup.csv")
     ap.add_argument("output_csv", help="data/exports/facility_rollup_all_facilities.csv")
+    instrumentation.add_arguments(ap)
     args = ap.parse_args()
+    prof = instrumentation.start("export_facility_rollup_all_facilities", args)
 
     facility_ids = load_combined_facility_ids(args.combined_json)
 
@@ -114,6 +121,7 @@ def main() -> int:
             raise ValueError("facility_rollup.csv missing header row.")
         fieldnames = list(reader.fieldnames)
         rows = list(reader)
+    prof.lap("load", rows=len(facility_ids) + len(rows))
 
     # Detect facility id column (expected facilityId)
     lower_map = {c.lower(): c for c in fieldnames}
@@ -155,6 +163,7 @@ def main() -> int:
         out_rows.sort(key=lambda r: (_as_int(r.get(total_col, "")) or 0), reverse=True)
     else:
         out_rows.sort(key=lambda r: r.get(facility_col, ""))
+    prof.lap("aggregate", rows=len(out_rows))
 
     ensure_parent_dir(args.output_csv)
     with open(args.output_csv, "w", newline="", encoding="utf-8") as f:
@@ -162,6 +171,7 @@ def main() -> int:
         writer.writeheader()
         for r in out_rows:
             writer.writerow(r)
+    prof.lap("write", rows=len(out_rows))
 
     print("OK: wrote", args.output_csv)
     print(f"  combinedFacilities={len(facility_ids)}")
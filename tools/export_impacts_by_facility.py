@@ -3,7 +3,11 @@ import csv
 import sys
 import os
 
+import instrumentation
+from reconcile import reconcile
+
 def main():
+    prof = instrumentation.start("export_impacts_by_facility")
     if len(sys.argv) != 3:
         print("Usage: python tools/export_impacts_by_facility.py <combined.json> <out.csv>")
         sys.exit(1)
@@ -20,31 +24,27 @@ def main():
         combined = json.load(f)
 
     notices = combined.get("notices", [])
+    prof.lap("load", rows=len(notices))
 
+    # Rows restated by amending or superseding notices are counted once (see reconcile.py)
     rows_out = []
-    for n in notices:
-        notice_id = n.get("noticeId") or n.get("notice", {}).get("noticeId") or ""
-
-        impacts = n.get("jobTitleImpacts", [])
-        for r in impacts:
-            facility_id = r.get("facilityId", "")
-            raw = r.get("jobTitleRaw") or r.get("jobTitle") or ""
-            canonical = r.get("jobTitleCanonical") or r.get("jobTitle") or ""
-            count = int(r.get("affectedCount", 0))
-
-            rows_out.append({
-                "noticeId": notice_id,
-                "facilityId": facility_id,
-                "jobTitleRaw": raw,
-                "jobTitleCanonical": canonical,
-                "affectedCount": count,
-            })
+    for notice_id, facility_id, raw, canonical, count in reconcile(notices).rows:
+        rows_out.append({
+            "noticeId": notice_id,
+            "facilityId": facility_id,
+            "jobTitleRaw": raw,
+            "jobTitleCanonical": canonical,
+            "affectedCount": count,
+        })
+
+    prof.lap("aggregate", rows=len(rows_out))
 
     with open(out_path, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(["noticeId", "facilityId", "jobTitleRaw", "jobTitleCanonical", "affectedCount"])
         for r in rows_out:
             w.writerow([r["noticeId"], r["facilityId"], r["jobTitleRaw"], r["jobTitleCanonical"], r["affectedCount"]])
+    prof.lap("write", rows=len(rows_out))
 
     print(f"OK: wrote {out_path}")
     print(f"  rows={len(rows_out)}")
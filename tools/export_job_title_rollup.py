@@ -4,6 +4,9 @@ import os
 import sys
 from collections import defaultdict
 
+import instrumentation
+from reconcile import reconcile
+
 def canonical_title_from_row(row: dict) -> str:
     # notice_1 rows have jobTitleCanonical
     if "jobTitleCanonical" in row and row["jobTitleCanonical"]:
@@ -17,6 +20,7 @@ def canonical_title_from_row(row: dict) -> str:
     raise KeyError(f"Missing job title fields in row. Keys={list(row.keys())}")
 
 def main():
+    prof = instrumentation.start("export_job_title_rollup")
     if len(sys.argv) != 3:
         print("Usage: python tools/export_job_title_rollup.py <combined.json> <out.csv>")
         sys.exit(1)
@@ -29,14 +33,17 @@ def main():
 
     notices = combined.get("notices", [])
     titles_index = combined.get("jobTitles", {}).get("canonicalTitles", [])
+    prof.lap("load", rows=len(notices))
 
     totals = defaultdict(int)          # title -> total affected
     facilities = defaultdict(set)      # title -> set(facilityId)
     notices_seen = defaultdict(set)    # title -> set(noticeId)
 
+    # Rows replaced by amending or superseding notices are left out
+    recon = reconcile(notices)
     for n in notices:
         notice_id = n.get("noticeId") or n.get("notice", {}).get("noticeId")
-        impacts = n.get("jobTitleImpacts", [])
+        impacts = recon.impacts_for(n)
 
         for row in impacts:
             title = canonical_title_from_row(row)
@@ -49,6 +56,8 @@ def main():
             if notice_id:
                 notices_seen[title].add(notice_id)
 
+    prof.lap("aggregate", rows=len(recon.rows))
+
     # Ensure directory exists
     out_dir = os.path.dirname(out_path)
     if out_dir:
@@ -69,6 +78,7 @@ def main():
                 len(facilities.get(t, set())),
                 len(notices_seen.get(t, set())),
             ])
+    prof.lap("write", rows=len(all_titles))
 
     print(f"OK: wrote {out_path}")
     print(f"  titles={len(all_titles)}")
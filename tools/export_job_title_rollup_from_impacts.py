@@ -3,7 +3,10 @@ import os
 import sys
 from collections import defaultdict
 
+import instrumentation
+
 def main():
+    prof = instrumentation.start("export_job_title_rollup_from_impacts")
     if len(sys.argv) != 3:
         print("Usage: python tools/export_job_title_rollup_from_impacts.py <impacts_by_facility.csv> <out.csv>")
         sys.exit(1)
@@ -39,6 +42,7 @@ def main():
                 facilities[title].add(facility_id)
             if notice_id:
                 notices[title].add(notice_id)
+        prof.lap("load+aggregate", rows=r.line_num - 1)
 
     out_dir = os.path.dirname(out_path)
     if out_dir:
@@ -51,6 +55,7 @@ def main():
         w.writerow(["jobTitleCanonical", "totalAffected", "facilityCount", "noticeCount"])
         for t in all_titles:
             w.writerow([t, totals[t], len(facilities[t]), len(notices[t])])
+    prof.lap("write", rows=len(all_titles))
 
     print(f"OK: wrote {out_path}")
     print(f"  titles={len(all_titles)}")
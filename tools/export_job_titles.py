@@ -2,7 +2,10 @@ import csv
 import sys
 from collections import defaultdict
 
+import instrumentation
+
 def main():
+    prof = instrumentation.start("export_job_titles")
     if len(sys.argv) != 3:
         print("Usage: python tools/export_facility_rollup_from_impacts.py <impacts_by_facility.csv> <out.csv>")
         sys.exit(1)
@@ -25,6 +28,7 @@ def main():
             totals[fid] += count
             titles[fid].add(title)
             notices[fid].add(notice)
+        prof.lap("load+aggregate", rows=reader.line_num - 1)
 
     with open(out_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
@@ -42,6 +46,7 @@ def main():
                 len(titles[fid]),
                 len(notices[fid])
             ])
+    prof.lap("write", rows=len(totals))
 
     print(f"OK: wrote {out_path}")
     print(f"  facilities={len(totals)}")
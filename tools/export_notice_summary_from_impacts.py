@@ -15,6 +15,8 @@ import os
 from collections import defaultdict
 from typing import Dict, Set
 
+import instrumentation
+
 
 def ensure_parent_dir(path: str) -> None:
     parent = os.path.dirname(os.path.abspath(path))
@@ -26,7 +28,9 @@ def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("input_csv", help="data/exports/impacts_by_facility.csv")
     ap.add_argument("output_csv", help="data/exports/notice_summary.csv")
+    instrumentation.add_arguments(ap)
     args = ap.parse_args()
+    prof = instrumentation.start("export_notice_summary_from_impacts", args)
 
     totals: Dict[str, int] = defaultdict(int)
     facilities: Dict[str, Set[str]] = defaultdict(set)
@@ -53,6 +57,7 @@ def main() -> int:
                 facilities[notice].add(facility)
             if title:
                 titles[notice].add(title)
+        prof.lap("load+aggregate", rows=reader.line_num - 1)
 
     out_rows = []
     for notice_id in sorted(totals.keys()):
@@ -69,6 +74,7 @@ def main() -> int:
         writer.writeheader()
         for r in out_rows:
             writer.writerow(r)
+    prof.lap("write", rows=len(out_rows))
 
     print("OK: wrote", args.output_csv)
     print(f"  notices={len(out_rows)}")
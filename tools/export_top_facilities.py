@@ -18,6 +18,8 @@ import os
 import sys
 from typing import Dict, List, Tuple, Optional
 
+import instrumentation
+
 
 FACILITY_ID_CANDIDATES = ["facilityId", "facility_id", "facility", "site", "code"]
 TOTAL_AFFECTED_CANDIDATES = ["totalAffected", "total_affected", "affectedTotal", "affected_total", "affected", "total"]
@@ -124,9 +126,12 @@ def main() -> int:
     ap.add_argument("input_csv", help="Path to facility_rollup.csv")
     ap.add_argument("output_csv", help="Path to top_facilities.csv")
     ap.add_argument("--top", type=int, default=15, help="How many rows to keep (default 15). Use 0 for all.")
+    instrumentation.add_arguments(ap)
     args = ap.parse_args()
+    prof = instrumentation.start("export_top_facilities", args)
 
     rows, fieldnames = read_rows(args.input_csv)
+    prof.lap("load", rows=len(rows))
     facility_col, total_col_guess = detect_columns(fieldnames)
     total_col = choose_total_affected_column(rows, fieldnames, facility_col, total_col_guess)
 
@@ -144,6 +149,7 @@ def main() -> int:
 
     if args.top and args.top > 0:
         enriched = enriched[: args.top]
+    prof.lap("aggregate", rows=len(rows))
 
     ensure_parent_dir(args.output_csv)
 
@@ -154,6 +160,7 @@ def main() -> int:
         writer.writeheader()
         for _, r in enriched:
             writer.writerow(r)
+    prof.lap("write", rows=len(enriched))
 
     print("OK: wrote", args.output_csv)
     print(f"  inputRows={len(rows)}")
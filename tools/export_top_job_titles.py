@@ -13,6 +13,8 @@ import csv
 import os
 from typing import Dict, List, Optional, Tuple
 
+import instrumentation
+
 
 TITLE_CANDIDATES = ["jobTitleCanonical", "job_title_canonical", "title", "canonicalTitle"]
 TOTAL_CANDIDATES = ["totalAffected", "total_affected", "affectedTotal", "affected_total", "affected", "total"]
@@ -51,7 +53,9 @@ def main() -> int:
     ap.add_argument("input_csv")
     ap.add_argument("output_csv")
     ap.add_argument("--top", type=int, default=25, help="Default 25. Use 0 for all.")
+    instrumentation.add_arguments(ap)
     args = ap.parse_args()
+    prof = instrumentation.start("export_top_job_titles", args)
 
     with open(args.input_csv, "r", newline="", encoding="utf-8-sig") as f:
         reader = csv.DictReader(f)
@@ -59,6 +63,7 @@ def main() -> int:
             raise ValueError("CSV appears to have no header row.")
         fieldnames = list(reader.fieldnames)
         rows = list(reader)
+    prof.lap("load", rows=len(rows))
 
     title_col = detect(fieldnames, TITLE_CANDIDATES, 0)
     total_col = detect(fieldnames, TOTAL_CANDIDATES, 1)
@@ -75,6 +80,7 @@ def main() -> int:
     enriched.sort(key=lambda x: x[0], reverse=True)
     if args.top and args.top > 0:
         enriched = enriched[: args.top]
+    prof.lap("aggregate", rows=len(rows))
 
     ensure_parent_dir(args.output_csv)
     with open(args.output_csv, "w", newline="", encoding="utf-8") as f:
@@ -82,6 +88,7 @@ def main() -> int:
         writer.writeheader()
         for _, r in enriched:
             writer.writerow(r)
+    prof.lap("write", rows=len(enriched))
 
     print("OK: wrote", args.output_csv)
     print(f"  inputRows={len(rows)}")
@@ -1,23 +1,301 @@
+import argparse
+import hashlib
 import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+
 import pdfplumber
 
-def extract_pages(pdf_path: Path):
-    pages = []
+import instrumentation
+
+DEFAULT_PDF = Path("data/raw/layoff2.pdf")
+DEFAULT_OUT_DIR = Path("data/extracted")
+DEFAULT_CACHE_DIR = Path("data/extracted/.page_cache")
+
+# Pages handed to a worker per task; each task opens the PDF once
+CHUNK_PAGES = 8
+
+# Chunks extracted ahead of the writer, per worker
+CHUNKS_AHEAD_PER_WORKER = 2
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class PageCache:
+    """
+    Per-page text cache keyed by the PDF's content hash and page index:
+
+      <cache_dir>/<sha256>/meta.json      {"pageCount": N}
+      <cache_dir>/<sha256>/<index>.json   {"page": index + 1, "text": "..."}
+
+    Renaming or moving a PDF keeps its cache; editing it invalidates it.
+    """
+
+    def __init__(self, cache_dir: Path, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+
+    def _dir(self, digest: str) -> Path:
+        return self.cache_dir / digest
+
+    def page_count(self, digest: str):
+        if not self.enabled:
+            return None
+        meta = self._dir(digest) / "meta.json"
+        if not meta.exists():
+            return None
+        return json.loads(meta.read_text(encoding="utf-8"))["pageCount"]
+
+    def set_page_count(self, digest: str, count: int) -> None:
+        if not self.enabled:
+            return
+        d = self._dir(digest)
+        d.mkdir(parents=True, exist_ok=True)
+        (d / "meta.json").write_text(json.dumps({"pageCount": count}), encoding="utf-8")
+
+    def has(self, digest: str, index: int) -> bool:
+        return self.enabled and (self._dir(digest) / f"{index}.json").exists()
+
+    def get(self, digest: str, index: int):
+        if not self.enabled:
+            return None
+        path = self._dir(digest) / f"{index}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))["text"]
+
+    def put(self, digest: str, index: int, text: str) -> None:
+        if not self.enabled:
+            return
+        d = self._dir(digest)
+        d.mkdir(parents=True, exist_ok=True)
+        tmp = d / f"{index}.json.tmp"
+        tmp.write_text(json.dumps({"page": index + 1, "text": text}), encoding="utf-8")
+        tmp.replace(d / f"{index}.json")
+
+
+def count_pages(pdf_path: Path) -> int:
     with pdfplumber.open(str(pdf_path)) as pdf:
-        for i, page in enumerate(pdf.pages):
-            text = page.extract_text() or ""
-            pages.append({"page": i + 1, "text": text})
-    return pages
+        return len(pdf.pages)
+
+
+def _extract_chunk(pdf_path: str, indexes):
+    """Worker: open the PDF once and extract text for the given page indexes."""
+    out = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for i in indexes:
+            out.append((i, pdf.pages[i].extract_text() or ""))
+    return out
+
+
+class Chunk:
+    """Consecutive pages of one PDF, those missing from the cache and their pending extraction."""
+
+    def __init__(self, indexes, missing):
+        self.indexes = indexes
+        self.missing = missing
+        self.future = None
+
+
+class PdfJob:
+    """One PDF scheduled for extraction: its hash, page count and page chunks."""
+
+    def __init__(self, pdf_path: Path, digest: str, page_count: int):
+        self.pdf_path = pdf_path
+        self.digest = digest
+        self.page_count = page_count
+        self.chunks = []
+
+
+class ChunkWindow:
+    """
+    Sliding window of chunk extractions on a process pool.
+
+    Chunks are queued in the order they will be written and at most `size`
+    are submitted ahead of the writer; each chunk taken submits the next.
+    Extracted text waiting to be written is bounded by the window, not by
+    the size of the PDFs.
+    """
+
+    def __init__(self, pool, size: int):
+        self.pool = pool
+        self.size = max(1, size)
+        self.queue = deque()
+        self.in_flight = 0
+
+    def add(self, job: PdfJob) -> None:
+        for chunk in job.chunks:
+            if chunk.missing:
+                self.queue.append((job, chunk))
+        self._fill()
+
+    def _submit_next(self) -> None:
+        job, chunk = self.queue.popleft()
+        chunk.future = self.pool.submit(_extract_chunk, str(job.pdf_path), chunk.missing)
+        self.in_flight += 1
+
+    def _fill(self) -> None:
+        while self.queue and self.in_flight < self.size:
+            self._submit_next()
+
+    def take(self, chunk: Chunk):
+        """Wait for a chunk's pages, then top the window back up."""
+        # Only reached out of order (chunks are written in queue order)
+        while chunk.future is None and self.queue:
+            self._submit_next()
+        results = chunk.future.result()
+        chunk.future = None
+        self.in_flight -= 1
+        self._fill()
+        return results
+
+
+def plan_pdf(pdf_path: Path, cache: PageCache, window: ChunkWindow = None) -> PdfJob:
+    """
+    Hash the PDF, find uncached pages and (if a window is given) queue them.
+
+    Queueing every PDF before consuming any lets the pool stay busy across
+    files while pages are written out in order.
+    """
+    digest = file_sha256(pdf_path)
+    n = cache.page_count(digest)
+    if n is None:
+        n = count_pages(pdf_path)
+        cache.set_page_count(digest, n)
+
+    job = PdfJob(pdf_path, digest, n)
+    missing_total = 0
+    for start in range(0, n, CHUNK_PAGES):
+        indexes = list(range(start, min(n, start + CHUNK_PAGES)))
+        missing = [i for i in indexes if not cache.has(digest, i)]
+        job.chunks.append(Chunk(indexes, missing))
+        missing_total += len(missing)
+    if window is not None:
+        window.add(job)
+
+    print(f"{pdf_path}: {n} pages, {n - missing_total} cached, {missing_total} to extract",
+          file=sys.stderr)
+    return job
+
+
+def iter_job_pages(job: PdfJob, cache: PageCache, window: ChunkWindow = None):
+    """
+    Yield {"page": n, "text": str} for every page of a planned PDF, in order.
+
+    Serially, one chunk of extracted text is held at a time. With a window,
+    up to window.size chunks are extracted ahead of the one being written.
+    Cached pages are read from disk as they are reached.
+    """
+    for chunk in job.chunks:
+        fresh = {}
+        if chunk.missing:
+            if window is not None:
+                results = window.take(chunk)
+            else:
+                results = _extract_chunk(str(job.pdf_path), chunk.missing)
+            for i, text in results:
+                cache.put(job.digest, i, text)
+                fresh[i] = text
+        for i in chunk.indexes:
+            text = fresh[i] if i in fresh else cache.get(job.digest, i)
+            yield {"page": i + 1, "text": text}
+
+
+def extract_pages(pdf_path: Path, cache_dir: Path = DEFAULT_CACHE_DIR):
+    """Extract a single PDF (serially) into a list of pages."""
+    cache = PageCache(cache_dir)
+    return list(iter_job_pages(plan_pdf(pdf_path, cache), cache))
+
+
+def write_pages_json(pages, out) -> int:
+    """
+    One indented JSON array (`--format json`), byte-identical to
+    json.dumps(list(pages), indent=2) but written page by page.
+    """
+    n = 0
+    for page in pages:
+        body = json.dumps(page, indent=2).replace("\n", "\n  ")
+        out.write(("[\n  " if n == 0 else ",\n  ") + body)
+        n += 1
+    out.write("\n]" if n else "[]")
+    return n
+
+
+def write_pages_jsonl(pages, out) -> int:
+    """One page per line, flushed as each page is written so readers can follow along."""
+    n = 0
+    for page in pages:
+        out.write(json.dumps(page, ensure_ascii=False))
+        out.write("\n")
+        out.flush()
+        n += 1
+    return n
+
 
 def main():
-    pdf_path = Path("data/raw/layoff2.pdf")
-    out_path = Path("data/extracted/layoff2_pages.json")
-    out_path.parent.mkdir(parents=True, exist_ok=True)
+    ap = argparse.ArgumentParser(description="Extract page text from one or more PDFs")
+    ap.add_argument("pdfs", nargs="*", type=Path, default=[DEFAULT_PDF],
+                    help=f"PDF files to extract (default: {DEFAULT_PDF})")
+    ap.add_argument("--out", default=None,
+                    help="Output path, or - for stdout (single PDF only; "
+                         "default: <out_dir>/<stem>_pages.<format>)")
+    ap.add_argument("--out_dir", type=Path, default=DEFAULT_OUT_DIR)
+    ap.add_argument("--format", choices=["jsonl", "json"], default="jsonl",
+                    help="jsonl: one page per line, streamed (default); "
+                         "json: one indented array, for older consumers")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="Worker processes for page extraction (default: CPU count)")
+    ap.add_argument("--cache_dir", type=Path, default=DEFAULT_CACHE_DIR)
+    ap.add_argument("--no_cache", action="store_true",
+                    help="Ignore and do not write the page cache")
+    instrumentation.add_arguments(ap)
+    args = ap.parse_args()
+    prof = instrumentation.start("extract_pages", args)
+
+    if args.out and len(args.pdfs) != 1:
+        ap.error("--out can only be used with a single PDF")
+
+    fmt = args.format
+    # Readers pick the parser from the suffix, so the two must agree
+    if args.out not in (None, "-") and Path(args.out).suffix != f".{fmt}":
+        ap.error(f"--out must end in .{fmt} for --format {fmt}")
+    writer = write_pages_jsonl if fmt == "jsonl" else write_pages_json
+    cache = PageCache(args.cache_dir, enabled=not args.no_cache)
+
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    window = None
+    if pool is not None:
+        window = ChunkWindow(pool, args.workers * CHUNKS_AHEAD_PER_WORKER)
+    try:
+        jobs = [plan_pdf(p, cache, window) for p in args.pdfs]
+        prof.lap("plan", rows=len(jobs))
+        for job in jobs:
+            pages = iter_job_pages(job, cache, window)
+            if args.out == "-":
+                n = writer(pages, sys.stdout)
+                prof.lap(f"extract {job.pdf_path.name}", rows=n)
+                print(f"Wrote <stdout> ({n} pages)", file=sys.stderr)
+                continue
+
+            out_path = Path(args.out or args.out_dir / f"{job.pdf_path.stem}_pages.{fmt}")
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            with out_path.open("w", encoding="utf-8") as f:
+                n = writer(pages, f)
+            prof.lap(f"extract {job.pdf_path.name}", rows=n)
+            print(f"Wrote {out_path} ({n} pages)", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
-    pages = extract_pages(pdf_path)
-    out_path.write_text(json.dumps(pages, indent=2), encoding="utf-8")
-    print(f"Wrote {out_path} ({len(pages)} pages)")
 
 if __name__ == "__main__":
     main()
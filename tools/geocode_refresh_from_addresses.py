@@ -1,16 +1,28 @@
+import argparse
 import csv
 import time
 from pathlib import Path
-from geopy.geocoders import Nominatim
+
+from geocoding import (
+    BACKENDS,
+    DAY_SECONDS,
+    DEFAULT_BURST,
+    DEFAULT_CACHE,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_NEGATIVE_TTL_DAYS,
+    DEFAULT_RATE,
+    DEFAULT_TTL_DAYS,
+    GeocodeCache,
+    geocode_all,
+    make_backend,
+    normalize_query,
+)
 
 IN_PATH = Path(r"data/normalized/facility_geocodes.csv")
 OUT_CANDIDATE = Path(r"data/normalized/facility_geocodes_REFRESH_CANDIDATE.csv")
 OUT_CHANGES = Path(r"data/normalized/geocode_refresh_changes.csv")
 OUT_UNRESOLVED = Path(r"data/normalized/geocode_refresh_unresolved.csv")
 
-# Be polite to OSM. 1 second is usually OK; increase if you get throttled.
-SLEEP_SECONDS = 1.5
-
 # If notes contain any of these tokens, we assume the current location is intentional
 # (centroid/approx placement) and we do NOT replace lat/lon.
 SKIP_IF_NOTES_CONTAIN = [
@@ -43,7 +55,32 @@ def build_query(row: dict) -> str:
 
     return ", ".join(parts)
 
+def parse_args():
+    ap = argparse.ArgumentParser(
+        description="Re-geocode facility addresses into a refresh candidate CSV")
+    ap.add_argument("--backend", choices=sorted(BACKENDS), default="nominatim")
+    ap.add_argument("--gazetteer",
+                    help="Gazetteer file for --backend gazetteer (query,lat,lon CSV) or offline")
+    ap.add_argument("--cache", default=DEFAULT_CACHE,
+                    help="Geocode cache file keyed by normalized query")
+    ap.add_argument("--no_cache", action="store_true",
+                    help="Ignore the cache and geocode every address")
+    ap.add_argument("--ttl_days", type=float, default=DEFAULT_TTL_DAYS,
+                    help="Reuse cached results this long")
+    ap.add_argument("--negative_ttl_days", type=float, default=DEFAULT_NEGATIVE_TTL_DAYS,
+                    help="Reuse cached 'no result' answers this long")
+    # Be polite to OSM: Nominatim allows 1 request/second
+    ap.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                    help="Max backend requests per second")
+    ap.add_argument("--burst", type=int, default=DEFAULT_BURST)
+    ap.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                    help="Requests in flight at once")
+    return ap.parse_args()
+
 def main():
+    args = parse_args()
+    started = time.perf_counter()
+
     with IN_PATH.open(newline="", encoding="utf-8") as f:
         rows = list(csv.DictReader(f))
 
@@ -54,32 +91,47 @@ def main():
     if missing_cols:
         raise SystemExit(f"Missing required columns in {IN_PATH}: {missing_cols}")
 
-    geolocator = Nominatim(user_agent="27z6_facility_geocode_refresh_v1", timeout=10)
-
-
+    # Pass 1: decide which rows need a geocode
+    queries = []
+    for row in rows:
+        if any(tok in upper(row.get("notes")) for tok in SKIP_IF_NOTES_CONTAIN):
+            queries.append(None)
+            continue
+        queries.append(build_query(row))
+
+    options = {"path": args.gazetteer} if args.gazetteer else {}
+    backend = make_backend(args.backend, **options)
+    cache = GeocodeCache(
+        None if args.no_cache else args.cache,
+        ttl=args.ttl_days * DAY_SECONDS,
+        negative_ttl=args.negative_ttl_days * DAY_SECONDS,
+    )
+    results = geocode_all(
+        [q for q in queries if q and q.count(",") >= 1],
+        backend,
+        cache,
+        rate=args.rate,
+        burst=args.burst,
+        concurrency=args.concurrency,
+    )
+    cache.save()
+
+    # Pass 2: apply results in input order
     changes = []
     unresolved = []
     out_rows = []
 
-    for i, row in enumerate(rows, start=1):
+    for row, query in zip(rows, queries):
         fid = norm(row.get("facilityId"))
         old_lat = norm(row.get("lat"))
         old_lon = norm(row.get("lon"))
-        notes = upper(row.get("notes"))
-
-        # Default: keep existing
-        new_lat = old_lat
-        new_lon = old_lon
-        new_source = row.get("source", "")
         new_notes = row.get("notes", "")
 
         # Skip geocoding if notes indicate intentional approximation/cluster
-        if any(tok in notes for tok in SKIP_IF_NOTES_CONTAIN):
+        if query is None:
             out_rows.append(row)
             continue
 
-        query = build_query(row)
-
         if not query or query.count(",") < 1:
             # Not enough info to geocode
             unresolved.append({
@@ -90,35 +142,32 @@ def main():
             out_rows.append(row)
             continue
 
-        try:
-            loc = geolocator.geocode(query)
-        except Exception as e:
+        res = results[normalize_query(query)]
+        if res.error:
             unresolved.append({
                 "facilityId": fid,
-                "reason": f"geocode error: {e}",
+                "reason": f"geocode error: {res.error}",
                 "query": query,
             })
             out_rows.append(row)
-            time.sleep(SLEEP_SECONDS)
             continue
 
-        if not loc:
+        if not res.coord:
             unresolved.append({
                 "facilityId": fid,
-                "reason": "no geocode result",
+                "reason": "no geocode result (cached)" if res.cached else "no geocode result",
                 "query": query,
             })
             out_rows.append(row)
-            time.sleep(SLEEP_SECONDS)
             continue
 
-        new_lat = f"{loc.latitude:.6f}"
-        new_lon = f"{loc.longitude:.6f}"
+        new_lat = f"{res.coord[0]:.6f}"
+        new_lon = f"{res.coord[1]:.6f}"
 
         # Update row
         row["lat"] = new_lat
         row["lon"] = new_lon
-        row["source"] = "OpenStreetMap Nominatim (refresh)"
+        row["source"] = f"{backend.source} (refresh)"
         if new_notes:
             row["notes"] = f"{new_notes} | refreshed from address: {query}"
         else:
@@ -136,7 +185,6 @@ def main():
             })
 
         out_rows.append(row)
-        time.sleep(SLEEP_SECONDS)
 
     # Write candidate output
     with OUT_CANDIDATE.open("w", newline="", encoding="utf-8") as f:
@@ -156,8 +204,11 @@ def main():
             w.writeheader()
             w.writerows(unresolved)
 
+    looked_up = sum(1 for r in results.values() if not r.cached)
     print(f"OK: wrote {OUT_CANDIDATE}")
     print(f"changes: {len(changes)}  unresolved: {len(unresolved)}  total: {len(rows)}")
+    print(f"geocoded: {looked_up} via {backend.name}  cached: {len(results) - looked_up}  "
+          f"elapsed: {time.perf_counter() - started:.2f}s")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Geocoding backends, result cache and rate limiter
+
+Shared by geocode_refresh_from_addresses.py (and anything else that turns
+address strings into lat/lon):
+
+    GeocodeCache    persistent JSON cache keyed by normalized query string,
+                    with separate TTLs for hits and misses (negative caching)
+    TokenBucket     asyncio rate limiter; lets requests through at the full
+                    allowed rate instead of sleeping a fixed time after each
+    backends        "nominatim" (geopy, network), "gazetteer" (a local CSV of
+                    query,lat,lon) and "offline" (address points and ZIP
+                    centroids, see offline_geocoder.py), selected by name
+                    via make_backend()
+    geocode_all()   resolves many queries concurrently through the cache and
+                    the limiter
+
+A backend is any object with a ``name``, a ``source`` label and a blocking
+``geocode(query) -> (lat, lon) | None`` method that raises on transient
+errors. Blocking calls run in worker threads, so slow HTTP round trips overlap
+while the bucket still caps the request rate.
+
+Usage:
+    python tools/geocoding.py "410 Terry Ave N, Seattle, WA 98109"
+    python tools/geocoding.py --backend gazetteer --gazetteer places.csv "..."
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE = os.path.join("data", "normalized", "geocode_cache.json")
+CACHE_VERSION = 1
+
+DAY_SECONDS = 24 * 60 * 60
+DEFAULT_TTL_DAYS = 180.0
+DEFAULT_NEGATIVE_TTL_DAYS = 7.0
+
+# Nominatim usage policy: at most one request per second
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 1
+DEFAULT_CONCURRENCY = 4
+
+Coord = Tuple[float, float]
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: lowercase, single spaces, ", " between parts."""
+    parts = [" ".join(p.split()) for p in (query or "").lower().split(",")]
+    return ", ".join(p for p in parts if p)
+
+
+class GeocodeCache:
+    """
+    On-disk geocode results keyed by normalized query.
+
+    Entries are {"lat", "lon", "at"} for hits and {"lat": None, "lon": None,
+    "at"} for misses. A hit older than ``ttl`` or a miss older than
+    ``negative_ttl`` (seconds) is treated as absent. Errors are never cached.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        ttl: float = DEFAULT_TTL_DAYS * DAY_SECONDS,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL_DAYS * DAY_SECONDS,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                blob = json.load(f)
+            if blob.get("version") == CACHE_VERSION:
+                self.entries = blob.get("entries", {})
+
+    def lookup(self, query: str, now: Optional[float] = None) -> Tuple[bool, Optional[Coord]]:
+        """
+        Returns:
+            (found, coord): found is False when the query must be geocoded;
+            coord is None for a cached miss
+        """
+        entry = self.entries.get(normalize_query(query))
+        if entry is None:
+            return False, None
+        age = (now if now is not None else time.time()) - entry.get("at", 0)
+        if entry.get("lat") is None:
+            return (age <= self.negative_ttl), None
+        if age > self.ttl:
+            return False, None
+        return True, (entry["lat"], entry["lon"])
+
+    def store(
+        self, query: str, coord: Optional[Coord], backend: str, now: Optional[float] = None
+    ) -> None:
+        self.entries[normalize_query(query)] = {
+            "lat": coord[0] if coord else None,
+            "lon": coord[1] if coord else None,
+            "backend": backend,
+            "at": now if now is not None else time.time(),
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.path or not self.dirty:
+            return
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": CACHE_VERSION, "entries": self.entries}, f, indent=1, sort_keys=True
+            )
+            f.write("\n")
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+class TokenBucket:
+    """
+    asyncio token bucket: ``rate`` tokens per second, at most ``burst`` stored.
+
+    acquire() waits only as long as needed for the next token, so a steady
+    stream of requests runs at exactly ``rate`` per second.
+    """
+
+    def __init__(
+        self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class NominatimBackend:
+    """OpenStreetMap Nominatim through geopy (imported on first use)."""
+
+    name = "nominatim"
+    source = "OpenStreetMap Nominatim"
+
+    def __init__(
+        self, user_agent: str = "27z6_facility_geocode_refresh_v1", timeout: float = 10
+    ) -> None:
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self._client = None
+
+    def geocode(self, query: str) -> Optional[Coord]:
+        if self._client is None:
+            from geopy.geocoders import Nominatim
+
+            self._client = Nominatim(user_agent=self.user_agent, timeout=self.timeout)
+        loc = self._client.geocode(query)
+        return (loc.latitude, loc.longitude) if loc else None
+
+
+class GazetteerBackend:
+    """Local lookup table: a CSV with query, lat and lon columns (no network)."""
+
+    name = "gazetteer"
+    source = "Local gazetteer"
+
+    def __init__(self, path: str) -> None:
+        self.places: Dict[str, Coord] = {}
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                try:
+                    self.places[normalize_query(row["query"])] = (
+                        float(row["lat"]),
+                        float(row["lon"]),
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+    def geocode(self, query: str) -> Optional[Coord]:
+        return self.places.get(normalize_query(query))
+
+
+def _offline_backend(path: Optional[str] = None) -> Any:
+    from offline_geocoder import OfflineBackend
+
+    return OfflineBackend(path)
+
+
+BACKENDS: Dict[str, Callable[..., Any]] = {
+    "nominatim": NominatimBackend,
+    "gazetteer": GazetteerBackend,
+    "offline": _offline_backend,
+}
+
+
+def make_backend(name: str, **options: Any) -> Any:
+    """
+    Instantiate a backend by name.
+
+    Raises:
+        ValueError: For an unknown backend name
+    """
+    factory = BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(
+            f"unknown geocoder backend {name!r} (choose from {', '.join(sorted(BACKENDS))})"
+        )
+    return factory(**options)
+
+
+class GeocodeResult:
+    """Outcome for one query: coord (None for no result), error text, and whether it was cached."""
+
+    __slots__ = ("query", "coord", "error", "cached")
+
+    def __init__(
+        self, query: str, coord: Optional[Coord], error: str = "", cached: bool = False
+    ) -> None:
+        self.query = query
+        self.coord = coord
+        self.error = error
+        self.cached = cached
+
+
+async def _geocode_all(
+    queries: List[str],
+    backend: Any,
+    cache: GeocodeCache,
+    rate: float,
+    burst: int,
+    concurrency: int,
+) -> Dict[str, GeocodeResult]:
+    results: Dict[str, GeocodeResult] = {}
+    pending: List[str] = []
+    for q in queries:
+        key = normalize_query(q)
+        if key in results:
+            continue
+        found, coord = cache.lookup(q)
+        if found:
+            results[key] = GeocodeResult(q, coord, cached=True)
+        else:
+            pending.append(key)
+            results[key] = GeocodeResult(q, None)
+
+    if not pending:
+        return results
+
+    bucket = TokenBucket(rate, burst)
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    loop = asyncio.get_running_loop()
+
+    async def one(key: str) -> None:
+        res = results[key]
+        async with slots:
+            await bucket.acquire()
+            try:
+                # run_in_executor rather than asyncio.to_thread (3.9+); we support 3.8
+                res.coord = await loop.run_in_executor(None, backend.geocode, res.query)
+            except Exception as e:  # network/service errors are reported, not cached
+                res.error = str(e) or e.__class__.__name__
+                return
+        cache.store(res.query, res.coord, backend.name)
+
+    await asyncio.gather(*(one(k) for k in pending))
+    return results
+
+
+def geocode_all(
+    queries: Iterable[str],
+    backend: Any,
+    cache: GeocodeCache,
+    rate: float = DEFAULT_RATE,
+    burst: int = DEFAULT_BURST,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Dict[str, GeocodeResult]:
+    """
+    Geocode queries through the cache, calling the backend only for misses.
+
+    Duplicate queries (after normalization) are sent once. The cache is
+    updated in memory; call cache.save() to persist it.
+
+    Returns:
+        {normalized query: GeocodeResult}
+    """
+    return asyncio.run(_geocode_all(list(queries), backend, cache, rate, burst, concurrency))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Geocode address strings through the cache")
+    ap.add_argument("queries", nargs="+")
+    ap.add_argument("--backend", choices=sorted(BACKENDS), default="nominatim")
+    ap.add_argument("--gazetteer", help="Gazetteer file for the gazetteer/offline backends")
+    ap.add_argument("--cache", default=DEFAULT_CACHE)
+    ap.add_argument("--no_cache", action="store_true", help="Ignore and do not update the cache")
+    args = ap.parse_args()
+
+    options = {"path": args.gazetteer} if args.gazetteer else {}
+    backend = make_backend(args.backend, **options)
+    cache = GeocodeCache(None if args.no_cache else args.cache)
+    results = geocode_all(args.queries, backend, cache)
+    cache.save()
+    for q in args.queries:
+        res = results[normalize_query(q)]
+        where = (
+            f"{res.coord[0]:.6f},{res.coord[1]:.6f}"
+            if res.coord
+            else ("ERROR " + res.error if res.error else "no result")
+        )
+        print(f"{where}\t{'cache' if res.cached else backend.name}\t{q}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
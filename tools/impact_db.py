@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+"""
+Impact Database
+
+Imports combined.json and the facility geocode files into one SQLite database
+with indexes for the lookups the CLI and exporters make, and answers those
+lookups (plus ad-hoc proximity questions) with indexed queries.
+
+Tables:
+    notices           one row per notice (full JSON kept in ``body``)
+    facilities        facility definitions from combined.json
+    impacts           one row per job title impact, in notice order
+                      indexes: (facilityId, jobTitleCanonical), (jobTitleCanonical,
+                      facilityId), (noticeId)
+    geocodes          current facility_geocodes.csv
+    geocodes_rtree    R*Tree over geocodes (lat/lon bounding boxes)
+    geocode_versions  every facility_geocodes_*.csv backup, keyed by file suffix
+    facility_rollup   view: per-facility totals, same columns as facility_rollup.csv
+
+Usage:
+    python tools/impact_db.py import
+    python tools/impact_db.py titles-near --facility SEA40 --radius_km 20 --min_affected 5
+    python tools/impact_db.py sql \
+        "SELECT * FROM facility_rollup ORDER BY totalAffected DESC LIMIT 5"
+
+    python tools/risk_assessment.py --db data/impacts.db --facility SEA40 \
+        --title "Program Manager III"
+    python tools/export_all.py --db data/impacts.db
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Package-relative under tools.risk_assessment (the risk-assessment console
+# script), bare when run as a script from tools/
+try:
+    from .reconcile import reconcile
+    from .risk_assessment import NON_PHYSICAL_FACILITIES, DataLoadError, logger, to_int
+    from .spatial_index import EARTH_RADIUS_KM, chord_to_km, km_to_chord, to_unit_vector
+except ImportError:
+    from reconcile import reconcile
+    from risk_assessment import NON_PHYSICAL_FACILITIES, DataLoadError, logger, to_int
+    from spatial_index import EARTH_RADIUS_KM, chord_to_km, km_to_chord, to_unit_vector
+
+DEFAULT_DB = os.path.join("data", "impacts.db")
+DEFAULT_COMBINED = os.path.join("data", "normalized", "combined.json")
+DEFAULT_GEOCODES = os.path.join("data", "normalized", "facility_geocodes.csv")
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE notices (
+    noticeId     TEXT PRIMARY KEY,
+    filename     TEXT,
+    receivedDate TEXT,
+    jurisdiction TEXT,
+    body         TEXT NOT NULL
+);
+
+CREATE TABLE facilities (
+    facilityId TEXT PRIMARY KEY,
+    label      TEXT,
+    line1      TEXT,
+    city       TEXT,
+    state      TEXT,
+    postalCode TEXT
+);
+
+CREATE TABLE impacts (
+    id                INTEGER PRIMARY KEY,
+    noticeId          TEXT NOT NULL,
+    facilityId        TEXT NOT NULL,
+    jobTitleRaw       TEXT NOT NULL,
+    jobTitleCanonical TEXT NOT NULL,
+    affectedCount     INTEGER NOT NULL
+);
+CREATE INDEX idx_impacts_facility_title ON impacts (facilityId, jobTitleCanonical);
+CREATE INDEX idx_impacts_title_facility ON impacts (jobTitleCanonical, facilityId);
+CREATE INDEX idx_impacts_notice ON impacts (noticeId);
+
+CREATE TABLE geocodes (
+    id            INTEGER PRIMARY KEY,
+    facilityId    TEXT NOT NULL UNIQUE,
+    lat           REAL NOT NULL,
+    lon           REAL NOT NULL,
+    source        TEXT,
+    notes         TEXT,
+    buildingName  TEXT,
+    streetAddress TEXT,
+    city          TEXT,
+    state         TEXT,
+    zip           TEXT
+);
+CREATE VIRTUAL TABLE geocodes_rtree USING rtree (id, minLat, maxLat, minLon, maxLon);
+
+CREATE TABLE geocode_versions (
+    version    TEXT NOT NULL,
+    facilityId TEXT NOT NULL,
+    lat        REAL,
+    lon        REAL,
+    source     TEXT,
+    notes      TEXT,
+    PRIMARY KEY (version, facilityId)
+);
+
+CREATE VIEW facility_rollup AS
+SELECT facilityId,
+       SUM(affectedCount)                AS totalAffected,
+       COUNT(DISTINCT jobTitleCanonical) AS jobTitleCount,
+       COUNT(DISTINCT noticeId)          AS noticeCount
+FROM impacts
+WHERE facilityId != ''
+GROUP BY facilityId;
+"""
+
+GEOCODE_COLUMNS = [
+    "lat",
+    "lon",
+    "source",
+    "notes",
+    "buildingName",
+    "streetAddress",
+    "city",
+    "state",
+    "zip",
+]
+
+
+class ImpactDBError(DataLoadError):
+    """Raised when the database is missing, from another schema version, or cannot be built."""
+
+
+# ----- Import -----
+
+
+def _read_geocode_rows(path: Path) -> Iterable[Dict[str, Any]]:
+    with path.open("r", newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            facility_id = (row.get("facilityId") or "").strip()
+            if not facility_id:
+                continue
+            try:
+                lat = float(row.get("lat", 0))
+                lon = float(row.get("lon", 0))
+            except (TypeError, ValueError):
+                continue
+            out = {k: (row.get(k) or "").strip() for k in GEOCODE_COLUMNS}
+            out.update(facilityId=facility_id, lat=lat, lon=lon)
+            yield out
+
+
+def import_database(
+    db_path: str,
+    combined_path: str = DEFAULT_COMBINED,
+    geocodes_path: str = DEFAULT_GEOCODES,
+    geocode_versions: Optional[List[str]] = None,
+) -> Dict[str, int]:
+    """
+    Build the database from scratch (written to a temp file, then swapped in).
+
+    Args:
+        db_path: Output database path
+        combined_path: combined.json
+        geocodes_path: Current facility_geocodes.csv
+        geocode_versions: Other geocode CSVs to keep as named versions
+            (default: every facility_geocodes_*.csv next to geocodes_path)
+
+    Returns:
+        Row counts per table
+    """
+    with open(combined_path, "r", encoding="utf-8") as f:
+        combined = json.load(f)
+
+    geo_path = Path(geocodes_path)
+    if geocode_versions is None:
+        geocode_versions = sorted(str(p) for p in geo_path.parent.glob(f"{geo_path.stem}_*.csv"))
+
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT INTO meta VALUES ('schemaVersion', ?)", (str(SCHEMA_VERSION),))
+        conn.execute(
+            "INSERT INTO meta VALUES ('generatedAt', ?)", (combined.get("generatedAt", ""),)
+        )
+
+        for n in combined.get("notices", []):
+            source = n.get("source") or {}
+            conn.execute(
+                "INSERT INTO notices VALUES (?, ?, ?, ?, ?)",
+                (
+                    n.get("noticeId", ""),
+                    source.get("filename", ""),
+                    source.get("receivedDate", ""),
+                    n.get("jurisdiction", ""),
+                    json.dumps(n, ensure_ascii=False),
+                ),
+            )
+
+        for fac in combined.get("facilities", []):
+            addr = fac.get("address") or {}
+            conn.execute(
+                "INSERT INTO facilities VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    fac["facilityId"],
+                    fac.get("label", ""),
+                    addr.get("line1", ""),
+                    addr.get("city", ""),
+                    addr.get("state", ""),
+                    addr.get("postalCode") or "",
+                ),
+            )
+
+        # Same reconciled rows, in the same order, as export_impacts_by_facility.py
+        conn.executemany(
+            "INSERT INTO impacts "
+            "(noticeId, facilityId, jobTitleRaw, jobTitleCanonical, affectedCount) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (notice_id.strip(), (facility_id or "").strip(), raw, canonical.strip(), count)
+                for notice_id, facility_id, raw, canonical, count in reconcile(
+                    combined.get("notices", [])
+                ).rows
+            ),
+        )
+
+        if geo_path.exists():
+            # Last row wins for a repeated facilityId, as in load_geocodes_csv
+            latest = {row["facilityId"]: row for row in _read_geocode_rows(geo_path)}
+            for row in latest.values():
+                cur = conn.execute(
+                    "INSERT INTO geocodes (facilityId, " + ", ".join(GEOCODE_COLUMNS) + ") "
+                    "VALUES (?" + ", ?" * len(GEOCODE_COLUMNS) + ")",
+                    [row["facilityId"]] + [row[k] for k in GEOCODE_COLUMNS],
+                )
+                conn.execute(
+                    "INSERT INTO geocodes_rtree VALUES (?, ?, ?, ?, ?)",
+                    (cur.lastrowid, row["lat"], row["lat"], row["lon"], row["lon"]),
+                )
+
+        prefix = geo_path.stem + "_"
+        for version_path in geocode_versions:
+            version = Path(version_path).stem
+            if version.startswith(prefix):
+                version = version[len(prefix) :]
+            conn.executemany(
+                "INSERT OR REPLACE INTO geocode_versions VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (version, r["facilityId"], r["lat"], r["lon"], r["source"], r["notes"])
+                    for r in _read_geocode_rows(Path(version_path))
+                ),
+            )
+
+        conn.commit()
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("notices", "facilities", "impacts", "geocodes", "geocode_versions")
+        }
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return counts
+
+
+# ----- Queries -----
+
+
+def _bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Smallest lat/lon box containing the spherical cap of radius_km around (lat, lon)."""
+    angle = radius_km / EARTH_RADIUS_KM
+    if angle >= math.pi:
+        return -90.0, 90.0, -180.0, 180.0
+    dlat = math.degrees(angle)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    dlon = math.degrees(math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(lat)))))
+    if lon - dlon < -180.0 or lon + dlon > 180.0:
+        # Crosses the antimeridian; fall back to the full longitude band
+        return min_lat, max_lat, -180.0, 180.0
+    # Pad slightly: the R*Tree stores 32-bit floats
+    pad = 1e-6
+    return min_lat - pad, max_lat + pad, lon - dlon - pad, lon + dlon + pad
+
+
+class ImpactDB:
+    """
+    Read-only query interface over an imported database.
+
+    Method results match the in-memory lookups in risk_assessment.py, including
+    tie order (ties keep the order rows first appear in the notices).
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a database.
+
+        Raises:
+            ImpactDBError: If the file is missing or has a different schema version
+        """
+        if not Path(path).exists():
+            raise ImpactDBError(f"Database not found: {path} (run tools/impact_db.py import)")
+        self.path = path
+        self.conn = sqlite3.connect(
+            f"file:{Path(path).resolve().as_posix()}?mode=ro", uri=True, check_same_thread=False
+        )
+        try:
+            version = self.conn.execute(
+                "SELECT value FROM meta WHERE key = 'schemaVersion'"
+            ).fetchone()
+        except sqlite3.DatabaseError as e:
+            raise ImpactDBError(f"{path} is not an impact database: {e}") from e
+        if not version or int(version[0]) != SCHEMA_VERSION:
+            raise ImpactDBError(
+                f"{path} has schema version {version and version[0]}, expected {SCHEMA_VERSION}"
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- report sections --
+
+    def facility_metadata(self, facility_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT facilityId, totalAffected, jobTitleCount, noticeCount FROM facility_rollup "
+            "WHERE facilityId = ?",
+            (facility_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("facilityId", "totalAffected", "jobTitleCount", "noticeCount"), row))
+
+    def direct_match(self, facility_id: str, title: str) -> Tuple[int, Set[str]]:
+        total = 0
+        notices: Set[str] = set()
+        for count, notice_id in self.conn.execute(
+            "SELECT affectedCount, noticeId FROM impacts "
+            "WHERE facilityId = ? AND jobTitleCanonical = ?",
+            (facility_id, title),
+        ):
+            total += count
+            if notice_id:
+                notices.add(notice_id)
+        return total, notices
+
+    def top_titles(self, facility_id: str, top_n: int = 10) -> List[Tuple[str, int]]:
+        return self.conn.execute(
+            "SELECT jobTitleCanonical, SUM(affectedCount) AS n FROM impacts "
+            "WHERE facilityId = ? AND jobTitleCanonical != '' "
+            "GROUP BY jobTitleCanonical ORDER BY n DESC, MIN(id) LIMIT ?",
+            (facility_id, max(0, top_n)),
+        ).fetchall()
+
+    def top_facilities(
+        self, title: str, top_n: int = 10
+    ) -> Tuple[List[Tuple[str, int]], Dict[str, Set[str]]]:
+        top = self.conn.execute(
+            "SELECT facilityId, SUM(affectedCount) AS n FROM impacts "
+            "WHERE jobTitleCanonical = ? AND facilityId != '' "
+            "GROUP BY facilityId ORDER BY n DESC, MIN(id) LIMIT ?",
+            (title, max(0, top_n)),
+        ).fetchall()
+        notices: Dict[str, Set[str]] = {fid: set() for fid, _ in top}
+        if top:
+            marks = ", ".join("?" * len(top))
+            for fid, notice_id in self.conn.execute(
+                f"SELECT DISTINCT facilityId, noticeId FROM impacts "
+                f"WHERE jobTitleCanonical = ? AND facilityId IN ({marks}) AND noticeId != ''",
+                [title] + [fid for fid, _ in top],
+            ):
+                notices[fid].add(notice_id)
+        return top, notices
+
+    def geocode(self, facility_id: str) -> Optional[Tuple[float, float]]:
+        row = self.conn.execute(
+            "SELECT lat, lon FROM geocodes WHERE facilityId = ?", (facility_id,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _within(
+        self, lat: float, lon: float, radius_km: float, impacted_only: bool = True
+    ) -> List[Tuple[float, str]]:
+        """(squared chord, facilityId) for physical facilities within radius_km, nearest first."""
+        min_lat, max_lat, min_lon, max_lon = _bounding_box(lat, lon, radius_km)
+        sql = (
+            "SELECT g.facilityId, g.lat, g.lon "
+            "FROM geocodes_rtree r JOIN geocodes g ON g.id = r.id "
+            "WHERE r.maxLat >= ? AND r.minLat <= ? AND r.maxLon >= ? AND r.minLon <= ?"
+        )
+        if impacted_only:
+            sql += " AND EXISTS (SELECT 1 FROM impacts i WHERE i.facilityId = g.facilityId)"
+        target = to_unit_vector(lat, lon)
+        bound = km_to_chord(radius_km) ** 2
+        hits = []
+        for fid, flat, flon in self.conn.execute(sql, (min_lat, max_lat, min_lon, max_lon)):
+            if fid in NON_PHYSICAL_FACILITIES:
+                continue
+            vec = to_unit_vector(flat, flon)
+            d2 = sum((a - b) * (a - b) for a, b in zip(vec, target))
+            if d2 <= bound:
+                hits.append((d2, fid))
+        hits.sort()
+        return hits
+
+    def nearby(
+        self, facility_id: str, title: str, nearest: int = 10, radius_km: Optional[float] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Same contract as risk_assessment.get_nearby_facilities."""
+        origin = self.geocode(facility_id)
+        if origin is None:
+            return None
+        lat, lon = origin
+
+        if radius_km is not None:
+            hits = [h for h in self._within(lat, lon, radius_km) if h[1] != facility_id]
+            if nearest > 0:
+                hits = hits[:nearest]
+        elif nearest > 0:
+            # k-nearest: widen the R*Tree window until it holds k candidates
+            search_km = 25.0
+            while True:
+                hits = [h for h in self._within(lat, lon, search_km) if h[1] != facility_id]
+                if len(hits) >= nearest or search_km >= math.pi * EARTH_RADIUS_KM:
+                    break
+                search_km *= 4
+            hits = hits[:nearest]
+        else:
+            hits = []
+
+        out = []
+        for d2, fid in hits:
+            total = self.conn.execute(
+                "SELECT COALESCE(SUM(affectedCount), 0) FROM impacts WHERE facilityId = ?", (fid,)
+            ).fetchone()[0]
+            title_total = self.direct_match(fid, title)[0]
+            out.append(
+                {
+                    "facilityId": fid,
+                    "distanceKm": round(chord_to_km(math.sqrt(d2)), 2),
+                    "totalAffected": total,
+                    "titleAffected": title_total,
+                }
+            )
+        return out
+
+    def report(
+        self,
+        facility_id: str,
+        title: str,
+        top_n: int = 10,
+        nearest: int = 10,
+        radius_km: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Same dictionary as risk_assessment.build_report, answered from the database."""
+        metadata = self.facility_metadata(facility_id)
+        direct_total, direct_notices = self.direct_match(facility_id, title)
+        top_titles = self.top_titles(facility_id, top_n)
+        top_facilities, facility_notices = self.top_facilities(title, top_n)
+
+        facility_totals = None
+        if metadata:
+            facility_totals = {
+                k: to_int(metadata[k]) for k in ("totalAffected", "jobTitleCount", "noticeCount")
+            }
+
+        return {
+            "facilityId": facility_id,
+            "title": title,
+            "facilityTotals": facility_totals,
+            "directMatch": {"affectedCount": direct_total, "notices": sorted(direct_notices)},
+            "topTitles": [{"title": t, "affected": n} for t, n in top_titles],
+            "topFacilities": [
+                {
+                    "facilityId": fid,
+                    "affected": n,
+                    "notices": sorted(facility_notices.get(fid, set())),
+                }
+                for fid, n in top_facilities
+            ],
+            "nearbyFacilities": self.nearby(facility_id, title, nearest, radius_km),
+        }
+
+    # -- ad-hoc --
+
+    def titles_near(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        min_affected: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Every (facility, title) within radius_km whose total affected count exceeds min_affected.
+
+        Returns:
+            Rows with facilityId, distanceKm, title, affected; largest first
+        """
+        hits = self._within(lat, lon, radius_km)
+        if not hits:
+            return []
+        distance = {fid: round(chord_to_km(math.sqrt(d2)), 2) for d2, fid in hits}
+        marks = ", ".join("?" * len(distance))
+        rows = self.conn.execute(
+            f"SELECT facilityId, jobTitleCanonical, SUM(affectedCount) AS n FROM impacts "
+            f"WHERE facilityId IN ({marks}) AND jobTitleCanonical != '' "
+            f"GROUP BY facilityId, jobTitleCanonical HAVING n > ? "
+            f"ORDER BY n DESC, facilityId, jobTitleCanonical",
+            list(distance) + [min_affected],
+        ).fetchall()
+        return [
+            {"facilityId": fid, "distanceKm": distance[fid], "title": title, "affected": n}
+            for fid, title, n in rows
+        ]
+
+    # -- exporters --
+
+    def iter_impact_rows(self) -> Iterable[Tuple[str, str, str, str, int]]:
+        """(noticeId, facilityId, jobTitleRaw, jobTitleCanonical, affectedCount) in notice order."""
+        return self.conn.execute(
+            "SELECT noticeId, facilityId, jobTitleRaw, jobTitleCanonical, affectedCount "
+            "FROM impacts ORDER BY id"
+        )
+
+    def title_totals(self) -> Dict[str, int]:
+        """{jobTitleCanonical: total affected}, the vocabulary for title matching."""
+        return dict(
+            self.conn.execute(
+                "SELECT jobTitleCanonical, SUM(affectedCount) FROM impacts "
+                "WHERE jobTitleCanonical != '' GROUP BY jobTitleCanonical"
+            )
+        )
+
+    def facility_ids(self) -> List[str]:
+        return [
+            r[0] for r in self.conn.execute("SELECT facilityId FROM facilities ORDER BY facilityId")
+        ]
+
+    def geocode_records(self) -> Dict[str, Dict[str, Any]]:
+        """Geocodes in the shape export_facilities_geojson.load_geocodes_csv returns."""
+        return {
+            fid.upper(): {"lat": lat, "lon": lon, "source": source or "", "notes": notes or ""}
+            for fid, lat, lon, source, notes in self.conn.execute(
+                "SELECT facilityId, lat, lon, source, notes FROM geocodes ORDER BY id"
+            )
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Build and query the SQLite impact database")
+    ap.add_argument("--db", default=DEFAULT_DB, help=f"Database path (default: {DEFAULT_DB})")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser(
+        "import", help="(Re)build the database from combined.json and geocode CSVs"
+    )
+    imp.add_argument("--combined", default=DEFAULT_COMBINED)
+    imp.add_argument("--geocodes", default=DEFAULT_GEOCODES)
+
+    near = sub.add_parser("titles-near", help="Titles at facilities within a radius")
+    origin = near.add_mutually_exclusive_group(required=True)
+    origin.add_argument("--facility", help="Center on this facility's geocode")
+    origin.add_argument("--latlon", nargs=2, type=float, metavar=("LAT", "LON"))
+    near.add_argument("--radius_km", type=float, required=True)
+    near.add_argument(
+        "--min_affected", type=int, default=0, help="Only rows with more than this many affected"
+    )
+
+    sql = sub.add_parser("sql", help="Run a read-only SQL query and print CSV")
+    sql.add_argument("query")
+
+    args = ap.parse_args(argv)
+
+    try:
+        if args.command == "import":
+            counts = import_database(args.db, args.combined, args.geocodes)
+            print(f"OK: wrote {args.db}")
+            for table, n in counts.items():
+                print(f"  {table}={n}")
+            return 0
+
+        db = ImpactDB(args.db)
+        out = csv.writer(sys.stdout)
+        if args.command == "titles-near":
+            if args.facility:
+                origin_coord = db.geocode(args.facility.strip())
+                if origin_coord is None:
+                    logger.error(f"No geocode for facility {args.facility}")
+                    return 1
+            else:
+                origin_coord = tuple(args.latlon)
+            rows = db.titles_near(
+                origin_coord[0], origin_coord[1], args.radius_km, args.min_affected
+            )
+            out.writerow(["facilityId", "distanceKm", "title", "affected"])
+            for r in rows:
+                out.writerow([r["facilityId"], r["distanceKm"], r["title"], r["affected"]])
+            return 0
+
+        cur = db.conn.execute(args.query)
+        out.writerow([d[0] for d in cur.description or []])
+        out.writerows(cur)
+        return 0
+    except (DataLoadError, sqlite3.Error) as e:
+        logger.error(str(e))
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Stage timing and profiling for the tools/ scripts
+
+Each tool marks the end of its stages (load, aggregate, write, ...) with
+``prof.lap(name, rows=n)``. When profiling is on, every run records per stage:
+wall time, rows processed, rows per second and the process's peak RSS so far.
+The run is appended as one JSON line to ``data/.profiles/<tool>.jsonl``, and
+a table is printed to stderr.
+
+Profiling is off by default and costs nothing beyond a clock read per stage.
+Turn it on with:
+
+    --profile               on any instrumented tool
+    --cprofile              also run the tool under cProfile: writes a .prof
+                            file next to the JSON and lists the top functions
+    TOOLS_PROFILE=1         same as --profile, for every tool; it is inherited
+                            by the tools pipeline.py runs
+    TOOLS_PROFILE=cprofile  same as --cprofile
+    TOOLS_PROFILE_DIR=...   write somewhere other than data/.profiles
+
+To see which stage regressed, compare each tool's latest run with the one
+before it:
+
+    python tools/instrumentation.py report
+    python tools/instrumentation.py report --tool export_all --threshold 1.2
+
+Record format:
+
+    {"tool": "export_impacts_by_facility", "startedAt": "2026-01-08T02:00:00Z",
+     "argv": [...], "wallSeconds": 0.41, "peakRssBytes": 48234496,
+     "stages": [{"name": "load", "seconds": 0.22, "rows": 2, "rowsPerSecond": 9.1,
+                 "peakRssBytes": 46137344}, ...],
+     "cprofile": {"path": "...", "top": [...]}}
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PROFILE_DIR = REPO_ROOT / "data" / ".profiles"
+ENV_PROFILE = "TOOLS_PROFILE"
+ENV_PROFILE_DIR = "TOOLS_PROFILE_DIR"
+
+# Functions listed from a cProfile run (by cumulative time)
+CPROFILE_TOP_N = 25
+
+# report flags a stage that got this much slower
+DEFAULT_THRESHOLD = 1.15
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, or None if unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _windows_peak_rss() -> Optional[int]:
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(
+            handle, ctypes.byref(counters), counters.cb
+        ):
+            return None
+        return int(counters.PeakWorkingSetSize)
+    except Exception:
+        return None
+
+
+class Profiler:
+    """
+    Per-stage timings for one run of a tool.
+
+    Args:
+        tool: Tool name, used for the output file name
+        enabled: Record and write the run
+        cprofile: Also run under cProfile (implies enabled)
+        out_dir: Where records go (default data/.profiles or $TOOLS_PROFILE_DIR)
+    """
+
+    def __init__(
+        self,
+        tool: str,
+        enabled: bool = False,
+        cprofile: bool = False,
+        out_dir: Optional[str] = None,
+    ) -> None:
+        self.tool = tool
+        self.enabled = enabled or cprofile
+        self.out_dir = Path(out_dir or os.environ.get(ENV_PROFILE_DIR) or DEFAULT_PROFILE_DIR)
+        self.stages: List[Dict[str, Any]] = []
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.finished = False
+        self._cprofile: Optional[cProfile.Profile] = None
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        if self.enabled:
+            atexit.register(self.finish)
+
+    def lap(self, name: str, rows: Optional[int] = None) -> float:
+        """
+        End a stage that started at the previous lap (or at startup).
+
+        Args:
+            name: Stage name (load, aggregate, write, ...)
+            rows: Rows the stage processed, if meaningful
+
+        Returns:
+            Stage duration in seconds
+        """
+        now = time.perf_counter()
+        seconds = now - self.last
+        self.last = now
+        if self.enabled:
+            self.record(name, seconds, rows)
+        return seconds
+
+    def record(self, name: str, seconds: float, rows: Optional[int] = None) -> None:
+        """Record a stage timed elsewhere (e.g. one that ran on another thread)."""
+        if not self.enabled:
+            return
+        stage: Dict[str, Any] = {"name": name, "seconds": round(seconds, 6)}
+        if rows is not None:
+            stage["rows"] = rows
+            stage["rowsPerSecond"] = round(rows / seconds, 1) if seconds > 0 else None
+        stage["peakRssBytes"] = peak_rss_bytes()
+        self.stages.append(stage)
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Write the run record (once); called automatically at exit when enabled."""
+        if not self.enabled or self.finished:
+            return None
+        self.finished = True
+        record: Dict[str, Any] = {
+            "tool": self.tool,
+            "startedAt": self.started_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "argv": sys.argv[1:],
+            "wallSeconds": round(time.perf_counter() - self.start, 6),
+            "peakRssBytes": peak_rss_bytes(),
+            "stages": self.stages,
+        }
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            stamp = self.started_at.strftime("%Y%m%dT%H%M%SZ")
+            prof_path = self.out_dir / f"{self.tool}-{stamp}.prof"
+            self._cprofile.dump_stats(str(prof_path))
+            record["cprofile"] = {"path": str(prof_path), "top": _top_functions(self._cprofile)}
+
+        path = self.out_dir / f"{self.tool}.jsonl"
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print_record(record, sys.stderr)
+        print(f"  profile appended to {path}", file=sys.stderr)
+        return record
+
+
+def _top_functions(prof: cProfile.Profile, limit: int = CPROFILE_TOP_N) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(prof)
+    rows = []
+    entries = stats.stats.items()  # type: ignore[attr-defined]
+    for (filename, line, func), (_, calls, total, cumulative, _) in entries:
+        rows.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({func})",
+                "calls": calls,
+                "totalSeconds": round(total, 6),
+                "cumulativeSeconds": round(cumulative, 6),
+            }
+        )
+    rows.sort(key=lambda r: r["cumulativeSeconds"], reverse=True)
+    return rows[:limit]
+
+
+def _mb(n: Optional[int]) -> str:
+    return "-" if n is None else f"{n / (1 << 20):.1f} MB"
+
+
+def print_record(record: Dict[str, Any], out: Any = None) -> None:
+    out = out or sys.stdout
+    print(
+        f"profile {record['tool']}: {record['wallSeconds']:.3f}s wall, "
+        f"peak RSS {_mb(record.get('peakRssBytes'))}",
+        file=out,
+    )
+    stages = record.get("stages", [])
+    width = max([28] + [len(s["name"]) for s in stages])
+    for s in stages:
+        rows = (
+            f"{s['rows']:>10} rows {s['rowsPerSecond'] or 0:>12,.0f}/s" if "rows" in s else " " * 30
+        )
+        print(
+            f"  {s['name']:<{width}} {s['seconds']:>9.3f}s {rows}  {_mb(s.get('peakRssBytes'))}",
+            file=out,
+        )
+    for fn in (record.get("cprofile") or {}).get("top", [])[:10]:
+        print(
+            f"    {fn['cumulativeSeconds']:>9.3f}s cum {fn['calls']:>9} calls  {fn['function']}",
+            file=out,
+        )
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    """Add --profile and --cprofile to a tool's argument parser."""
+    ap.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Record per-stage timings to {os.path.relpath(DEFAULT_PROFILE_DIR)} "
+        f"(or set {ENV_PROFILE}=1)",
+    )
+    ap.add_argument(
+        "--cprofile", action="store_true", help="As --profile, and also run under cProfile"
+    )
+
+
+def start(tool: str, args: Optional[argparse.Namespace] = None) -> Profiler:
+    """
+    Create the profiler for a tool run.
+
+    Args:
+        tool: Tool name
+        args: Parsed arguments from a parser set up with add_arguments(). Tools
+            that read sys.argv directly pass None; --profile / --cprofile are
+            then removed from sys.argv here, so call this before checking it.
+
+    Returns:
+        Profiler (recording only if enabled by the flags or $TOOLS_PROFILE)
+    """
+    if args is not None:
+        profile = bool(getattr(args, "profile", False))
+        cprofile = bool(getattr(args, "cprofile", False))
+    else:
+        profile = "--profile" in sys.argv
+        cprofile = "--cprofile" in sys.argv
+        sys.argv[:] = [a for a in sys.argv if a not in ("--profile", "--cprofile")]
+    env = os.environ.get(ENV_PROFILE, "").strip().lower()
+    if env == "cprofile":
+        cprofile = True
+    elif env and env not in ("0", "false", "no"):
+        profile = True
+    return Profiler(tool, enabled=profile, cprofile=cprofile)
+
+
+def load_runs(path: Path) -> List[Dict[str, Any]]:
+    runs = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                runs.append(json.loads(line))
+    return runs
+
+
+def report(profile_dir: Path, tool: Optional[str], threshold: float) -> int:
+    """
+    Print each tool's latest run against the previous one.
+
+    Returns:
+        Number of regressed stages
+    """
+    paths = sorted(profile_dir.glob(f"{tool}.jsonl" if tool else "*.jsonl"))
+    if not paths:
+        print(f"No profiles in {profile_dir}")
+        return 0
+    regressed = 0
+    for path in paths:
+        runs = load_runs(path)
+        if not runs:
+            continue
+        latest = runs[-1]
+        previous = runs[-2] if len(runs) > 1 else None
+        print(f"{latest['tool']}  ({len(runs)} runs, latest {latest['startedAt']})")
+        before = {s["name"]: s for s in (previous or {}).get("stages", [])}
+        rows = [("total", latest["wallSeconds"], (previous or {}).get("wallSeconds"))]
+        rows += [
+            (s["name"], s["seconds"], before.get(s["name"], {}).get("seconds"))
+            for s in latest["stages"]
+        ]
+        width = max(len(name) for name, _, _ in rows)
+        for name, now, then in rows:
+            if not then:
+                print(f"  {name:<{width}} {now:>9.3f}s")
+                continue
+            ratio = now / then
+            flag = "  REGRESSED" if ratio > threshold and now - then > 0.01 else ""
+            if flag and name != "total":
+                regressed += 1
+            print(f"  {name:<{width}} {now:>9.3f}s  was {then:>9.3f}s  x{ratio:.2f}{flag}")
+    return regressed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Compare recorded tool profiles")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rp = sub.add_parser("report", help="Latest run of each tool against the one before")
+    rp.add_argument("--tool", help="Only this tool")
+    rp.add_argument("--dir", default=os.environ.get(ENV_PROFILE_DIR) or str(DEFAULT_PROFILE_DIR))
+    rp.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Flag stages slower than this ratio (default 1.15)",
+    )
+    args = ap.parse_args()
+
+    regressed = report(Path(args.dir), args.tool, args.threshold)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
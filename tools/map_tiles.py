@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Clustered map tiles for facilities.geojson
+
+Builds a zoom-level hierarchy of facility clusters (in the style of
+supercluster) and writes it as small per-tile JSON files, so the map only
+loads what is in view:
+
+    <tiles_dir>/index.json                  zoom range, bounds, non-empty tiles
+                                            per zoom, facility positions
+    <tiles_dir>/<layer>/<z>/<x>/<y>.json    FeatureCollection for one tile
+
+Two layers are written: "all" (every mapped facility) and "impacted"
+(totalAffected > 0), matching the map's "impacts only" toggle.
+
+Clustering works bottom-up. At zoom ``max_zoom + 1`` every facility is its
+own point. Each zoom below greedily merges points within ``radius`` pixels
+(on 256 px tiles), using a grid hash for the neighbour search. A cluster
+carries a count-weighted centroid, the summed ``totalAffected``, its largest
+facilities and the zoom at which it splits (``expansionZoom``). Every tile
+also records the summed ``totalAffected`` of its features.
+
+Usage:
+    python tools/map_tiles.py --geojson data/exports/facilities.geojson \
+        --out_dir data/exports/facility_tiles
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import instrumentation
+from export_facilities_geojson import expand_feature_collection
+
+TILE_SIZE = 256
+DEFAULT_RADIUS_PX = 48
+DEFAULT_MIN_ZOOM = 0
+DEFAULT_MAX_ZOOM = 14
+
+# Largest member facilities listed on a cluster
+CLUSTER_TOP_N = 3
+
+LAYERS = {
+    "all": lambda props: True,
+    "impacted": lambda props: bool(props.get("hasImpacts"))
+    and int(props.get("totalAffected") or 0) > 0,
+}
+
+
+def lon_to_x(lon: float) -> float:
+    return lon / 360.0 + 0.5
+
+
+def lat_to_y(lat: float) -> float:
+    s = math.sin(math.radians(lat))
+    y = 0.5 - 0.25 * math.log((1 + s) / (1 - s)) / math.pi
+    return min(1.0, max(0.0, y))
+
+
+def x_to_lon(x: float) -> float:
+    return (x - 0.5) * 360.0
+
+
+def y_to_lat(y: float) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+
+
+class ClusterNode:
+    """A facility or a cluster at one zoom level, in Web Mercator unit coordinates."""
+
+    __slots__ = (
+        "x",
+        "y",
+        "count",
+        "total",
+        "top",
+        "zoom",
+        "cluster_id",
+        "feature",
+        "expansion_zoom",
+    )
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        count: int,
+        total: int,
+        top: List[Tuple[int, str]],
+        feature: Optional[Dict[str, Any]] = None,
+        cluster_id: Optional[int] = None,
+    ) -> None:
+        self.x = x
+        self.y = y
+        self.count = count
+        self.total = total
+        self.top = top
+        self.zoom = math.inf  # lowest zoom at which this node has been placed
+        self.feature = feature
+        self.cluster_id = cluster_id
+        self.expansion_zoom: Optional[int] = None
+
+    def to_feature(self) -> Dict[str, Any]:
+        if self.feature is not None:
+            return self.feature
+        return {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [round(x_to_lon(self.x), 6), round(y_to_lat(self.y), 6)],
+            },
+            "properties": {
+                "cluster": True,
+                "clusterId": self.cluster_id,
+                "pointCount": self.count,
+                "totalAffected": self.total,
+                "expansionZoom": self.expansion_zoom,
+                "topFacilities": [{"facilityId": fid, "totalAffected": n} for n, fid in self.top],
+            },
+        }
+
+
+def _merge_top(nodes: List[ClusterNode]) -> List[Tuple[int, str]]:
+    merged = [t for n in nodes for t in n.top]
+    merged.sort(key=lambda t: (-t[0], t[1]))
+    return merged[:CLUSTER_TOP_N]
+
+
+def build_hierarchy(
+    features: List[Dict[str, Any]],
+    min_zoom: int = DEFAULT_MIN_ZOOM,
+    max_zoom: int = DEFAULT_MAX_ZOOM,
+    radius_px: int = DEFAULT_RADIUS_PX,
+) -> Dict[int, List[ClusterNode]]:
+    """
+    Cluster point features for every zoom from ``max_zoom + 1`` down to ``min_zoom``.
+
+    Args:
+        features: GeoJSON Point features with a totalAffected property
+        min_zoom: Lowest zoom level
+        max_zoom: Highest zoom that still clusters; max_zoom + 1 is unclustered
+        radius_px: Cluster radius in screen pixels
+
+    Returns:
+        {zoom: nodes visible at that zoom}
+    """
+    level: List[ClusterNode] = []
+    for feat in features:
+        lon, lat = feat["geometry"]["coordinates"][:2]
+        props = feat.get("properties") or {}
+        total = int(props.get("totalAffected") or 0)
+        level.append(
+            ClusterNode(
+                lon_to_x(lon),
+                lat_to_y(lat),
+                1,
+                total,
+                [(total, str(props.get("facilityId") or ""))],
+                feature=feat,
+            )
+        )
+
+    levels = {max_zoom + 1: level}
+    next_id = 0
+    for z in range(max_zoom, min_zoom - 1, -1):
+        r = radius_px / (TILE_SIZE * (2**z))
+        grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, node in enumerate(level):
+            grid[(int(node.x / r), int(node.y / r))].append(i)
+
+        merged_level: List[ClusterNode] = []
+        for i, node in enumerate(level):
+            if node.zoom <= z:
+                continue
+            node.zoom = z
+            cx, cy = int(node.x / r), int(node.y / r)
+            neighbours = []
+            for gx in (cx - 1, cx, cx + 1):
+                for gy in (cy - 1, cy, cy + 1):
+                    for j in grid.get((gx, gy), ()):
+                        other = level[j]
+                        if (
+                            other.zoom > z
+                            and (other.x - node.x) ** 2 + (other.y - node.y) ** 2 <= r * r
+                        ):
+                            neighbours.append(other)
+            if not neighbours:
+                merged_level.append(node)
+                continue
+
+            members = [node] + neighbours
+            count = 0
+            wx = wy = 0.0
+            for m in members:
+                m.zoom = z
+                wx += m.x * m.count
+                wy += m.y * m.count
+                count += m.count
+            cluster = ClusterNode(
+                wx / count,
+                wy / count,
+                count,
+                sum(m.total for m in members),
+                _merge_top(members),
+                cluster_id=next_id,
+            )
+            cluster.expansion_zoom = z + 1
+            next_id += 1
+            merged_level.append(cluster)
+
+        levels[z] = merged_level
+        level = merged_level
+    return levels
+
+
+def tile_layer(
+    levels: Dict[int, List[ClusterNode]]
+) -> Dict[int, Dict[Tuple[int, int], Dict[str, Any]]]:
+    """Group each zoom's nodes into tiles: {zoom: {(x, y): tile FeatureCollection}}."""
+    tiles: Dict[int, Dict[Tuple[int, int], Dict[str, Any]]] = {}
+    for z, nodes in sorted(levels.items()):
+        n = 2**z
+        by_tile: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        for node in nodes:
+            key = (min(n - 1, int(node.x * n)), min(n - 1, int(node.y * n)))
+            tile = by_tile.get(key)
+            if tile is None:
+                tile = by_tile[key] = {
+                    "type": "FeatureCollection",
+                    "z": z,
+                    "x": key[0],
+                    "y": key[1],
+                    "totalAffected": 0,
+                    "features": [],
+                }
+            tile["features"].append(node.to_feature())
+            tile["totalAffected"] += node.total
+        tiles[z] = by_tile
+    return tiles
+
+
+def write_tiles(
+    features: List[Dict[str, Any]],
+    out_dir: str,
+    min_zoom: int = DEFAULT_MIN_ZOOM,
+    max_zoom: int = DEFAULT_MAX_ZOOM,
+    radius_px: int = DEFAULT_RADIUS_PX,
+) -> int:
+    """
+    Write both tile layers and index.json under ``out_dir`` (replacing it).
+
+    Returns:
+        Number of tile files written
+    """
+    tmp_dir = out_dir.rstrip("/\\") + ".tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+
+    written = 0
+    index: Dict[str, Any] = {
+        "version": 1,
+        "minZoom": min_zoom,
+        "maxZoom": max_zoom + 1,
+        "clusterRadiusPx": radius_px,
+        "layers": {},
+        "facilities": {},
+    }
+    for name, keep in LAYERS.items():
+        subset = [f for f in features if keep(f.get("properties") or {})]
+        tiles = tile_layer(build_hierarchy(subset, min_zoom, max_zoom, radius_px))
+        index["layers"][name] = {
+            "featureCount": len(subset),
+            "totalAffected": sum(
+                int((f.get("properties") or {}).get("totalAffected") or 0) for f in subset
+            ),
+            "tiles": {
+                str(z): sorted(f"{x}/{y}" for x, y in by_tile) for z, by_tile in tiles.items()
+            },
+        }
+        for z, by_tile in tiles.items():
+            for (x, y), tile in by_tile.items():
+                path = os.path.join(tmp_dir, name, str(z), str(x), f"{y}.json")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(tile, f, separators=(",", ":"))
+                written += 1
+
+    lons = [f["geometry"]["coordinates"][0] for f in features]
+    lats = [f["geometry"]["coordinates"][1] for f in features]
+    index["bounds"] = [min(lons), min(lats), max(lons), max(lats)] if features else None
+    # Lets the page jump to a facility without loading every tile
+    index["facilities"] = {
+        (f.get("properties") or {}).get("facilityId"): [
+            round(c, 6) for c in f["geometry"]["coordinates"][:2]
+        ]
+        for f in features
+        if (f.get("properties") or {}).get("facilityId")
+    }
+    os.makedirs(tmp_dir, exist_ok=True)
+    with open(os.path.join(tmp_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    os.replace(tmp_dir, out_dir)
+    return written
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Write clustered per-zoom tiles for facilities.geojson"
+    )
+    ap.add_argument("--geojson", default=os.path.join("data", "exports", "facilities.geojson"))
+    ap.add_argument("--out_dir", default=os.path.join("data", "exports", "facility_tiles"))
+    ap.add_argument("--min_zoom", type=int, default=DEFAULT_MIN_ZOOM)
+    ap.add_argument(
+        "--max_zoom", type=int, default=DEFAULT_MAX_ZOOM, help="Highest zoom that clusters"
+    )
+    ap.add_argument("--radius_px", type=int, default=DEFAULT_RADIUS_PX)
+    instrumentation.add_arguments(ap)
+    args = ap.parse_args()
+    prof = instrumentation.start("map_tiles", args)
+
+    with open(args.geojson, "r", encoding="utf-8") as f:
+        features = expand_feature_collection(json.load(f)).get("features", [])
+    prof.lap("load", rows=len(features))
+    written = write_tiles(features, args.out_dir, args.min_zoom, args.max_zoom, args.radius_px)
+    prof.lap("cluster+write", rows=written)
+    print(f"OK: wrote {args.out_dir}")
+    print(f"  features={len(features)} tiles={written}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
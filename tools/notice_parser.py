@@ -0,0 +1,462 @@
+"""
+Single-pass WARN notice parser engine.
+
+Each page's text is split into lines once, and every line is handed to every
+extractor registered for the notice format. Regex fields whose matches can
+wrap any number of lines (facility bullets, the remote clause, dates) are
+matched over the whole page text instead, exactly like a per-page finditer.
+Pages are consumed one at a time, so only the current page is held in memory.
+
+A notice format is a small rule set: which extractors to run and how to shape
+their results into the normalized notice fields (see docs/DATA_SCHEMA.md).
+Both layouts we have share the same extractors and differ only in output shape:
+
+  layoff2  - notice_2 style: jobTitle rows, {"text", "affectedCount", "state"} remote clauses
+  layoff1  - notice_1 style: jobTitleRaw/jobTitleCanonical rows with noticeId,
+             typed REMOTE_RESIDENCE_STATE remote clauses
+
+Usage:
+  python tools/notice_parser.py --format layoff1 data/extracted/layoff1_pages.jsonl \
+      data/normalized/notice_1.json
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import instrumentation
+
+FACILITY_RE = re.compile(
+    r"(?:\u2022|\uf0b7|•)\s+([A-Z0-9]+)\s+facility\s+at\s+(.+?)\s+"
+    r"\(approximately\s+(\d+)\s+employee[s]?\s+affected\);",
+    re.IGNORECASE,
+)
+
+REMOTE_CLAUSE_RE = re.compile(
+    r"plus\s+(\d+)\s+affected\s+remote\s+employees\s+"
+    r"residing\s+within\s+the\s+state\s+of\s+Washington",
+    re.IGNORECASE,
+)
+
+DATE_RE = re.compile(
+    r"(January|February|March|April|May|June|July|August|September|October|November|December)"
+    r"\s+(\d{1,2}),\s+(\d{4})"
+)
+
+MONTHS = {
+    "January": 1,
+    "February": 2,
+    "March": 3,
+    "April": 4,
+    "May": 5,
+    "June": 6,
+    "July": 7,
+    "August": 8,
+    "September": 9,
+    "October": 10,
+    "November": 11,
+    "December": 12,
+}
+
+# Example line: "SEA106 Software Dev Engineer II 11"
+JOB_LINE_RE = re.compile(r"^([A-Z0-9]+)\s+(.+?)\s+(\d+)$")
+
+# Example line: "Remote Manager Team, Customer Service 1"
+REMOTE_LINE_RE = re.compile(r"^Remote\s+(.+?)\s+(\d+)$")
+
+TABLE_HEADER = "LIST OF AFFECTED JOB TITLES"
+TABLE_SKIP_PREFIXES = ("Number of Affected Employees", "Facility Job Title")
+
+# Tokens kept upper-case when canonicalizing ALL-CAPS titles
+ROMAN_NUMERALS = {"I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X"}
+TITLE_ACRONYMS = {"AI", "AWS", "BP", "HR", "IT", "ML", "PM", "QA", "SDE", "TPM", "UI", "UX", "VP"}
+
+
+def canonicalize_title(raw: str) -> str:
+    """
+    Title-case an ALL-CAPS notice title, keeping roman numerals and acronyms.
+
+      "SR.MGR, GENERAL MKTG" -> "Sr Mgr, General Mktg"
+      "UX DESIGNER II"       -> "UX Designer II"
+    """
+    text = re.sub(r"\.\s*", " ", raw.strip())
+    text = re.sub(r"\s+", " ", text).strip()
+    out = []
+    for tok in re.split(r"(\s+|[,/()&-])", text):
+        if tok.upper() in ROMAN_NUMERALS or tok.upper() in TITLE_ACRONYMS:
+            out.append(tok.upper())
+        elif tok[:1].isalpha():
+            out.append(tok[0].upper() + tok[1:].lower())
+        else:
+            out.append(tok)
+    return "".join(out)
+
+
+# ----- Extractors -----
+
+
+class Extractor:
+    """Receives every page's text, then every line of it, in order."""
+
+    def start_page(self):
+        pass
+
+    def feed_page(self, text: str):
+        pass
+
+    def feed(self, line: str):
+        pass
+
+    def end_page(self):
+        pass
+
+
+class PageRegexExtractor(Extractor):
+    """
+    Runs a regex over each page's full text, so a match may wrap any number of
+    line breaks (but never a page break).
+    """
+
+    pattern = None
+
+    def feed_page(self, text: str):
+        for m in self.pattern.finditer(text):
+            self.on_match(m)
+
+    def on_match(self, m):
+        raise NotImplementedError
+
+
+class FacilityExtractor(PageRegexExtractor):
+    pattern = FACILITY_RE
+
+    def __init__(self):
+        self.facilities = []  # (facilityId, address, approx)
+
+    def on_match(self, m):
+        self.facilities.append((m.group(1), m.group(2).strip(), int(m.group(3))))
+
+
+class RemoteClauseExtractor(PageRegexExtractor):
+    """Keeps the first remote-employee clause in the notice."""
+
+    pattern = REMOTE_CLAUSE_RE
+
+    def __init__(self):
+        self.count = None
+
+    def feed_page(self, text: str):
+        if self.count is None:
+            m = self.pattern.search(text)
+            if m:
+                self.on_match(m)
+
+    def on_match(self, m):
+        if self.count is None:
+            self.count = int(m.group(1))
+
+
+class SeparationDateExtractor(PageRegexExtractor):
+    pattern = DATE_RE
+
+    def __init__(self):
+        self.dates = set()
+
+    def on_match(self, m):
+        month_name, day_str, year_str = m.groups()
+        dt = datetime(int(year_str), MONTHS[month_name], int(day_str))
+        self.dates.add(dt.strftime("%Y-%m-%d"))
+
+
+class JobTableExtractor(Extractor):
+    """
+    Rows of the "LIST OF AFFECTED JOB TITLES" enclosure.
+
+    The table begins on the page after the header page (the header page
+    itself is skipped), so rows are buffered per page and only committed at
+    end_page once we know the page did not contain the header.
+    """
+
+    def __init__(self):
+        self.in_table = False
+        self.rows = []  # (facilityId, title, count)
+        self._page_rows = []
+        self._header_seen = False
+
+    def start_page(self):
+        self._page_rows = []
+        self._header_seen = False
+
+    def feed(self, line: str):
+        ln = line.strip()
+        if not ln:
+            return
+        if TABLE_HEADER in ln:
+            self._header_seen = True
+            return
+        if not self.in_table or self._header_seen:
+            return
+        if ln.startswith(TABLE_SKIP_PREFIXES):
+            return
+        m = JOB_LINE_RE.match(ln)
+        if m:
+            self._page_rows.append((m.group(1), m.group(2).strip(), int(m.group(3))))
+
+    def end_page(self):
+        if self._header_seen:
+            self.in_table = True
+        else:
+            self.rows.extend(self._page_rows)
+        self._page_rows = []
+
+
+class RemoteJobLineExtractor(Extractor):
+    """Job rows for remote employees ("Remote <title> <count>"), on any page."""
+
+    def __init__(self):
+        self.rows = []  # (title, count)
+
+    def feed(self, line: str):
+        ln = line.strip()
+        if not ln.startswith("Remote "):
+            return
+        m = REMOTE_LINE_RE.match(ln)
+        if m:
+            self.rows.append((m.group(1).strip(), int(m.group(2))))
+
+
+# ----- Notice formats -----
+
+
+class NoticeFormat:
+    """Rule set for one notice layout: extractors to run and how to shape results."""
+
+    name = ""
+
+    def make_extractors(self):
+        return {
+            "facilities": FacilityExtractor(),
+            "remoteClause": RemoteClauseExtractor(),
+            "separationDates": SeparationDateExtractor(),
+            "jobTable": JobTableExtractor(),
+            "remoteJobs": RemoteJobLineExtractor(),
+        }
+
+    def build(self, notice_id: str, ex) -> dict:
+        """Return the notice fields: facilities, remoteClauses, separationDates, jobTitleImpacts."""
+        raise NotImplementedError
+
+
+class Layoff2Format(NoticeFormat):
+    name = "layoff2"
+
+    def build(self, notice_id, ex):
+        facilities = [
+            {
+                "noticeId": notice_id,
+                "facilityId": fid,
+                "affectedApprox": approx,
+                "includesRemoteWA": True,
+                "notes": address,
+            }
+            for fid, address, approx in ex["facilities"].facilities
+        ]
+
+        remote_count = ex["remoteClause"].count
+        remote_clauses = []
+        if remote_count is not None:
+            remote_clauses.append(
+                {
+                    "text": (
+                        f"plus {remote_count} affected remote employees "
+                        "residing within the state of Washington."
+                    ),
+                    "affectedCount": remote_count,
+                    "state": "WA",
+                }
+            )
+            # Synthetic facility entry for remote WA
+            facilities.append(
+                {
+                    "noticeId": notice_id,
+                    "facilityId": "REMOTE_WA",
+                    "affectedApprox": int(remote_count),
+                    "includesRemoteWA": True,
+                    "notes": "Remote employees residing within WA (no facility address).",
+                }
+            )
+
+        job_titles = [
+            {"facilityId": fid, "jobTitle": title, "affectedCount": count}
+            for fid, title, count in ex["jobTable"].rows
+        ]
+        job_titles.extend(
+            {"facilityId": "REMOTE_WA", "jobTitle": title, "affectedCount": count}
+            for title, count in ex["remoteJobs"].rows
+        )
+
+        return {
+            "facilities": facilities,
+            "remoteClauses": remote_clauses,
+            "separationDates": sorted(ex["separationDates"].dates),
+            "jobTitleImpacts": job_titles,
+        }
+
+
+class Layoff1Format(NoticeFormat):
+    """
+    notice_1 style output. Same letter/enclosure layout as layoff2; titles are
+    ALL-CAPS in the enclosure so rows carry both raw and canonical titles.
+    """
+
+    name = "layoff1"
+
+    def build(self, notice_id, ex):
+        facilities = [
+            {"noticeId": notice_id, "facilityId": fid, "affectedApprox": approx, "notes": address}
+            for fid, address, approx in ex["facilities"].facilities
+        ]
+
+        remote_count = ex["remoteClause"].count
+        remote_clauses = []
+        if remote_count is not None:
+            remote_clauses.append(
+                {
+                    "type": "REMOTE_RESIDENCE_STATE",
+                    "state": "WA",
+                    "notes": (
+                        f"plus {remote_count} affected remote employees "
+                        "residing within the state of Washington."
+                    ),
+                }
+            )
+            facilities.append(
+                {
+                    "noticeId": notice_id,
+                    "facilityId": "REMOTE_WA",
+                    "affectedApprox": int(remote_count),
+                    "notes": "Remote employees residing in WA (explicitly stated in notice)",
+                }
+            )
+
+        rows = list(ex["jobTable"].rows)
+        rows.extend(("REMOTE_WA", title, count) for title, count in ex["remoteJobs"].rows)
+        job_titles = [
+            {
+                "noticeId": notice_id,
+                "facilityId": fid,
+                "jobTitleRaw": title,
+                "jobTitleCanonical": canonicalize_title(title),
+                "affectedCount": count,
+            }
+            for fid, title, count in rows
+        ]
+
+        return {
+            "facilities": facilities,
+            "remoteClauses": remote_clauses,
+            "separationDates": sorted(ex["separationDates"].dates),
+            "jobTitleImpacts": job_titles,
+        }
+
+
+FORMATS = {f.name: f for f in (Layoff1Format(), Layoff2Format())}
+
+
+def run_extractors(pages, extractors):
+    """Single pass: hand each page's text to every extractor, then each of its lines."""
+    ex_list = list(extractors.values())
+    for page in pages:
+        text = page["text"]
+        for ex in ex_list:
+            ex.start_page()
+            ex.feed_page(text)
+        for line in text.splitlines():
+            for ex in ex_list:
+                ex.feed(line)
+        for ex in ex_list:
+            ex.end_page()
+    return extractors
+
+
+def parse_notice_pages(pages, fmt, notice_id: str) -> dict:
+    """
+    Parse an iterable of {"page", "text"} dicts (consumed once, lazily).
+
+    Args:
+        pages: any iterable of pages, e.g. parse_layoff2.iter_pages(...)
+        fmt: a NoticeFormat or a key of FORMATS
+        notice_id: noticeId stamped on facility (and, for layoff1, job) rows
+    """
+    if isinstance(fmt, str):
+        fmt = FORMATS[fmt]
+    return fmt.build(notice_id, run_extractors(pages, fmt.make_extractors()))
+
+
+def iter_pages(path: Path):
+    """
+    Yield pages one at a time.
+
+    .jsonl files (from `extract_pages.py --format jsonl`) are read lazily, one
+    page per line, so only the current page is held in memory.
+    """
+    if path.suffix == ".jsonl":
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    # supports both list-of-pages and {"pages":[...]} shapes if you ever change extract later
+    if isinstance(data, dict) and "pages" in data:
+        yield from data["pages"]
+    elif isinstance(data, list):
+        yield from data
+    else:
+        raise ValueError("Unexpected pages JSON structure")
+
+
+def iter_page_stream(stream):
+    """Yield pages from a JSONL text stream (e.g. stdin piped from extract_pages.py --out -)."""
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Parse extracted notice pages into a normalized notice"
+    )
+    ap.add_argument(
+        "pages", help="pages .json/.jsonl from extract_pages.py, or - for JSONL on stdin"
+    )
+    ap.add_argument("notice", help="normalized notice JSON to update in place")
+    ap.add_argument("--format", choices=sorted(FORMATS), required=True)
+    instrumentation.add_arguments(ap)
+    args = ap.parse_args()
+    prof = instrumentation.start("notice_parser", args)
+
+    notice_path = Path(args.notice)
+    notice = json.loads(notice_path.read_text(encoding="utf-8"))
+    notice_id = notice["notice"].get("noticeId") or notice_path.stem
+    prof.lap("load")
+
+    pages = iter_page_stream(sys.stdin) if args.pages == "-" else iter_pages(Path(args.pages))
+    fields = parse_notice_pages(pages, args.format, notice_id)
+    notice["notice"].update(fields)
+    prof.lap("parse", rows=len(fields["jobTitleImpacts"]))
+
+    notice_path.write_text(json.dumps(notice, indent=2, ensure_ascii=False), encoding="utf-8")
+    prof.lap("write", rows=len(fields["jobTitleImpacts"]))
+
+    print(f"OK: wrote {notice_path}")
+    for key in ("facilities", "remoteClauses", "separationDates", "jobTitleImpacts"):
+        print(f"  {key}={len(fields[key])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Offline Geocoder
+
+Resolves streetAddress/city/state/zip to lat/lon from a local gazetteer, with
+no network access. The gazetteer holds two kinds of rows:
+
+    address      one point per (ZIP, normalized street name, house number)
+    zip          a ZIP centroid
+
+Address points sit in one sorted list of (zip, street, number) tuples with
+parallel coordinate arrays, so a lookup is a bisect:
+
+    1. exact house number on the street in the ZIP      precision "address"
+    2. between two known numbers on that street         precision "interpolated"
+    3. only one side known (nearest number)             precision "street"
+    4. ZIP centroid                                     precision "zip_centroid"
+
+Gazetteer sources for ``build``:
+    - facility_geocodes.csv rows whose source and notes carry no APPROX /
+      CENTROID marker (their ZIP averages also seed ZIP centroids)
+    - OpenAddresses CSVs (LON, LAT, NUMBER, STREET, POSTCODE columns)
+    - Census ZCTA gazetteer files (GEOID, INTPTLAT, INTPTLONG; tab separated)
+
+Usage:
+    python tools/offline_geocoder.py build
+    python tools/offline_geocoder.py build --openaddresses wa_statewide.csv \
+        --zcta 2023_Gaz_zcta_national.txt
+    python tools/offline_geocoder.py resolve --include_approx \
+        --out data/normalized/offline_geocodes.csv
+
+The "offline" backend in tools/geocoding.py wraps this module, so
+geocode_refresh_from_addresses.py --backend offline uses it as well.
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_GAZETTEER = os.path.join("data", "normalized", "offline_gazetteer.csv")
+DEFAULT_GEOCODES = os.path.join("data", "normalized", "facility_geocodes.csv")
+
+GAZETTEER_COLUMNS = ["kind", "zip", "street", "number", "lat", "lon"]
+
+# Rows whose placement was deliberately approximate are never used as address points
+APPROX_TOKENS = ("APPROX", "CENTROID", "REMOTE_CLUSTER")
+
+STREET_WORDS = {
+    "NORTH": "N",
+    "SOUTH": "S",
+    "EAST": "E",
+    "WEST": "W",
+    "NORTHEAST": "NE",
+    "NORTHWEST": "NW",
+    "SOUTHEAST": "SE",
+    "SOUTHWEST": "SW",
+    "AVENUE": "AVE",
+    "AV": "AVE",
+    "STREET": "ST",
+    "ROAD": "RD",
+    "DRIVE": "DR",
+    "BOULEVARD": "BLVD",
+    "PLACE": "PL",
+    "LANE": "LN",
+    "COURT": "CT",
+    "PARKWAY": "PKWY",
+    "HIGHWAY": "HWY",
+    "TERRACE": "TER",
+    "CIRCLE": "CIR",
+    "SQUARE": "SQ",
+    "LOOP": "LOOP",
+    "WAY": "WAY",
+}
+
+# Everything from one of these tokens on is a unit, not part of the street
+UNIT_TOKENS = {"SUITE", "STE", "UNIT", "APT", "FL", "FLOOR", "BLDG", "BUILDING", "RM", "ROOM"}
+
+HOUSE_NUMBER_RE = re.compile(r"^(\d+)[A-Z]?(?:-\d+)?\s+(.*)$")
+
+Key = Tuple[str, str, int]
+
+
+def normalize_zip(zipc: str) -> str:
+    digits = re.sub(r"\D", "", zipc or "")
+    return digits[:5] if len(digits) >= 5 else ""
+
+
+def normalize_street(street: str) -> str:
+    """Uppercase street name with standard suffix/directional abbreviations and no unit."""
+    text = re.sub(r"#.*$", "", (street or "").upper())
+    tokens = []
+    for tok in re.sub(r"[^A-Z0-9 ]+", " ", text).split():
+        if tok in UNIT_TOKENS:
+            break
+        tokens.append(STREET_WORDS.get(tok, tok))
+    return " ".join(tokens)
+
+
+def split_street(street: str) -> Tuple[Optional[int], str]:
+    """
+    Split "7277 Perimeter Rd S" into (7277, "PERIMETER RD S").
+
+    Returns:
+        (house number or None, normalized street name)
+    """
+    match = HOUSE_NUMBER_RE.match((street or "").strip().upper())
+    if not match:
+        return None, normalize_street(street)
+    return int(match.group(1)), normalize_street(match.group(2))
+
+
+def parse_query(query: str) -> Tuple[str, str, str, str]:
+    """
+    Split a "street, city, ST 12345" query (see build_query in the refresh script).
+
+    Returns:
+        (street, city, state, zip)
+    """
+    parts = [p.strip() for p in (query or "").split(",") if p.strip()]
+    street = city = state = zipc = ""
+    if parts and re.fullmatch(r"[A-Za-z]{2}(\s+\d{5}(-\d{4})?)?|\d{5}(-\d{4})?", parts[-1]):
+        tail = parts.pop().split()
+        zipc = tail[-1] if tail[-1][0].isdigit() else ""
+        state = tail[0] if tail[0].isalpha() else ""
+    if parts:
+        street = parts.pop(0)
+    if parts:
+        city = parts[-1]
+    return street, city, state, zipc
+
+
+class OfflineMatch:
+    """One resolution: coordinates, precision label and the gazetteer key it came from."""
+
+    __slots__ = ("lat", "lon", "precision", "matched")
+
+    def __init__(self, lat: float, lon: float, precision: str, matched: str) -> None:
+        self.lat = lat
+        self.lon = lon
+        self.precision = precision
+        self.matched = matched
+
+    def __repr__(self) -> str:
+        return f"OfflineMatch({self.lat:.6f}, {self.lon:.6f}, {self.precision}, {self.matched!r})"
+
+
+class Gazetteer:
+    """
+    Sorted address-point index plus ZIP centroids.
+
+    Attributes:
+        keys: Sorted (zip, street, number) tuples
+        lats: Latitudes parallel to ``keys``
+        lons: Longitudes parallel to ``keys``
+        zips: ZIP -> (lat, lon) centroid
+    """
+
+    def __init__(
+        self,
+        points: Iterable[Tuple[Key, float, float]] = (),
+        zips: Optional[Dict[str, Tuple[float, float]]] = None,
+    ) -> None:
+        # Later points for the same key win, as in the source files' order
+        by_key: Dict[Key, Tuple[float, float]] = {}
+        for key, lat, lon in points:
+            by_key[key] = (lat, lon)
+        self.keys: List[Key] = sorted(by_key)
+        self.lats = array("d", (by_key[k][0] for k in self.keys))
+        self.lons = array("d", (by_key[k][1] for k in self.keys))
+        self.zips: Dict[str, Tuple[float, float]] = dict(zips or {})
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def load(cls, path: str) -> Gazetteer:
+        """Read a gazetteer CSV written by save()."""
+        points = []
+        zips: Dict[str, Tuple[float, float]] = {}
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                coord = (float(row["lat"]), float(row["lon"]))
+                if row["kind"] == "zip":
+                    zips[row["zip"]] = coord
+                else:
+                    points.append(
+                        ((row["zip"], row["street"], int(row["number"])), coord[0], coord[1])
+                    )
+        return cls(points, zips)
+
+    def save(self, path: str) -> None:
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(GAZETTEER_COLUMNS)
+            for zipc in sorted(self.zips):
+                lat, lon = self.zips[zipc]
+                w.writerow(["zip", zipc, "", "", f"{lat:.6f}", f"{lon:.6f}"])
+            for (zipc, street, number), lat, lon in zip(self.keys, self.lats, self.lons):
+                w.writerow(["address", zipc, street, number, f"{lat:.6f}", f"{lon:.6f}"])
+        os.replace(tmp, path)
+
+    def _street_range(self, zipc: str, street: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, (zipc, street, -1))
+        hi = bisect_left(self.keys, (zipc, street + "\0", -1))
+        return lo, hi
+
+    def lookup(self, street: str, zipc: str) -> Optional[OfflineMatch]:
+        """
+        Resolve a street line within a ZIP.
+
+        Args:
+            street: Street line, e.g. "410 Terry Ave N, Suite 2"
+            zipc: ZIP or ZIP+4
+
+        Returns:
+            OfflineMatch, or None if neither the street nor the ZIP is known
+        """
+        zipc = normalize_zip(zipc)
+        if not zipc:
+            return None
+        number, name = split_street(street)
+
+        if name:
+            lo, hi = self._street_range(zipc, name)
+            if lo < hi:
+                if number is None:
+                    mid = (lo + hi - 1) // 2
+                    return OfflineMatch(self.lats[mid], self.lons[mid], "street", f"{zipc} {name}")
+                i = bisect_left(self.keys, (zipc, name, number), lo, hi)
+                if i < hi and self.keys[i][2] == number:
+                    return OfflineMatch(
+                        self.lats[i], self.lons[i], "address", f"{number} {name} {zipc}"
+                    )
+                if lo < i < hi:
+                    n0, n1 = self.keys[i - 1][2], self.keys[i][2]
+                    t = (number - n0) / (n1 - n0)
+                    return OfflineMatch(
+                        self.lats[i - 1] + t * (self.lats[i] - self.lats[i - 1]),
+                        self.lons[i - 1] + t * (self.lons[i] - self.lons[i - 1]),
+                        "interpolated",
+                        f"{n0}-{n1} {name} {zipc}",
+                    )
+                j = i - 1 if i == hi else i
+                return OfflineMatch(
+                    self.lats[j], self.lons[j], "street", f"{self.keys[j][2]} {name} {zipc}"
+                )
+
+        centroid = self.zips.get(zipc)
+        if centroid is not None:
+            return OfflineMatch(centroid[0], centroid[1], "zip_centroid", zipc)
+        return None
+
+    def resolve(self, rows: Iterable[Dict[str, str]]) -> List[Optional[OfflineMatch]]:
+        """Resolve many streetAddress/zip rows; one result (or None) per row."""
+        return [self.lookup(r.get("streetAddress") or "", r.get("zip") or "") for r in rows]
+
+
+class OfflineBackend:
+    """geocoding.py backend over a Gazetteer (no network)."""
+
+    name = "offline"
+    source = "Offline gazetteer"
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.gazetteer = Gazetteer.load(path or DEFAULT_GAZETTEER)
+
+    def geocode(self, query: str) -> Optional[Tuple[float, float]]:
+        street, _city, _state, zipc = parse_query(query)
+        match = self.gazetteer.lookup(street, zipc)
+        return (match.lat, match.lon) if match else None
+
+
+def is_precise(row: Dict[str, str]) -> bool:
+    """
+    True for a geocode placed at the address itself.
+
+    Rows whose source or notes mention any of APPROX_TOKENS (approx_*, centroids, remote
+    clusters) are not precise.
+    """
+    text = f"{row.get('source') or ''} {row.get('notes') or ''}".upper()
+    return not any(tok in text for tok in APPROX_TOKENS)
+
+
+def points_from_geocodes(path: str) -> Iterable[Tuple[Key, float, float]]:
+    """Address points from the precise rows of facility_geocodes.csv."""
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            if not is_precise(row):
+                continue
+            number, name = split_street(row.get("streetAddress") or "")
+            zipc = normalize_zip(row.get("zip") or "")
+            try:
+                lat, lon = float(row["lat"]), float(row["lon"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if number is not None and name and zipc:
+                yield (zipc, name, number), lat, lon
+
+
+def points_from_openaddresses(path: str) -> Iterable[Tuple[Key, float, float]]:
+    """Address points from an OpenAddresses CSV (LON, LAT, NUMBER, STREET, POSTCODE)."""
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            row = {k.upper(): v for k, v in row.items() if k}
+            match = re.match(r"\d+", row.get("NUMBER") or "")
+            zipc = normalize_zip(row.get("POSTCODE") or "")
+            name = normalize_street(row.get("STREET") or "")
+            try:
+                lat, lon = float(row["LAT"]), float(row["LON"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if match and name and zipc:
+                yield (zipc, name, int(match.group(0))), lat, lon
+
+
+def zips_from_zcta(path: str) -> Dict[str, Tuple[float, float]]:
+    """ZIP centroids from a Census ZCTA gazetteer file (GEOID, INTPTLAT, INTPTLONG)."""
+    zips = {}
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            row = {k.strip().upper(): (v or "").strip() for k, v in row.items() if k}
+            try:
+                zips[normalize_zip(row["GEOID"])] = (
+                    float(row["INTPTLAT"]),
+                    float(row["INTPTLONG"]),
+                )
+            except (KeyError, ValueError):
+                continue
+    return zips
+
+
+def build_gazetteer(
+    geocodes_path: Optional[str], openaddresses: List[str], zcta: List[str]
+) -> Gazetteer:
+    """
+    Assemble a gazetteer from the available sources.
+
+    ZIP centroids from ZCTA files take precedence; other ZIPs get the mean of
+    their address points.
+    """
+    points: List[Tuple[Key, float, float]] = []
+    if geocodes_path:
+        points.extend(points_from_geocodes(geocodes_path))
+    for path in openaddresses:
+        points.extend(points_from_openaddresses(path))
+
+    sums: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+    for (zipc, _, _), lat, lon in points:
+        acc = sums[zipc]
+        acc[0] += lat
+        acc[1] += lon
+        acc[2] += 1
+    zips = {z: (acc[0] / acc[2], acc[1] / acc[2]) for z, acc in sums.items()}
+    for path in zcta:
+        zips.update(zips_from_zcta(path))
+    return Gazetteer(points, zips)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Build or query the offline geocoding gazetteer")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("build", help="Build the gazetteer from local files")
+    b.add_argument(
+        "--geocodes",
+        default=DEFAULT_GEOCODES,
+        help="facility_geocodes.csv (non-approximate rows are used)",
+    )
+    b.add_argument("--openaddresses", nargs="*", default=[], help="OpenAddresses CSV files")
+    b.add_argument("--zcta", nargs="*", default=[], help="Census ZCTA gazetteer files")
+    b.add_argument("--out", default=DEFAULT_GAZETTEER)
+
+    r = sub.add_parser("resolve", help="Geocode a CSV with streetAddress/city/state/zip columns")
+    r.add_argument("--in", dest="in_path", default=DEFAULT_GEOCODES)
+    r.add_argument("--gazetteer", default=DEFAULT_GAZETTEER)
+    r.add_argument(
+        "--include_approx",
+        action="store_true",
+        help="Also resolve APPROX/CENTROID placements (normally left to hand edits)",
+    )
+    r.add_argument(
+        "--out", default=None, help="Write facilityId,lat,lon,precision,matched CSV here"
+    )
+
+    args = ap.parse_args()
+
+    if args.command == "build":
+        gaz = build_gazetteer(args.geocodes, args.openaddresses, args.zcta)
+        gaz.save(args.out)
+        print(f"OK: wrote {args.out}")
+        print(f"address points: {len(gaz)}  zip centroids: {len(gaz.zips)}")
+        return 0
+
+    gaz = Gazetteer.load(args.gazetteer)
+    with open(args.in_path, "r", newline="", encoding="utf-8-sig") as f:
+        rows = [row for row in csv.DictReader(f) if args.include_approx or is_precise(row)]
+
+    started = time.perf_counter()
+    matches = gaz.resolve(rows)
+    elapsed = time.perf_counter() - started
+
+    counts: Dict[str, int] = defaultdict(int)
+    for m in matches:
+        counts[m.precision if m else "unresolved"] += 1
+
+    if args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["facilityId", "lat", "lon", "precision", "matched"])
+            for row, m in zip(rows, matches):
+                w.writerow(
+                    [
+                        row.get("facilityId", ""),
+                        f"{m.lat:.6f}" if m else "",
+                        f"{m.lon:.6f}" if m else "",
+                        m.precision if m else "unresolved",
+                        m.matched if m else "",
+                    ]
+                )
+        print(f"OK: wrote {args.out}")
+    print(f"rows: {len(rows)}  " + "  ".join(f"{k}: {v}" for k, v in sorted(counts.items())))
+    print(f"elapsed: {elapsed * 1000:.2f} ms ({elapsed * 1e6 / max(1, len(rows)):.1f} us/row)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+pipeline.py
+
+Dependency-aware build runner for the data pipeline:
+
+  layoff2.pdf -> layoff2_pages.jsonl -> notice_2.json
+      -> combined.json (every data/normalized/notice_*.json, see build_combined.py)
+      -> reconciliation.json (amended / superseded notices, see reconcile.py)
+      -> impacts_by_facility.csv, facility rollups, title rollups, notice summary
+         (export_all.py --only, one stage per group, each reading combined.json)
+      -> facilities.geojson + facility_tiles/ (clustered per-zoom map tiles),
+         from combined.json and facility_geocodes.csv
+      -> impacts.snapshot and top_tables.json, from the CSVs they mirror
+      -> validation.py gate over the notices, combined.json and CSVs
+      -> app/public/facilities.geojson, app/public/facility_tiles/
+      (+ data/impacts.db)
+
+Each stage declares its input and output files. A stage is skipped when the
+content hashes of its inputs (and its command line) match the last successful
+run and its outputs are still on disk unchanged. Stages whose inputs are ready
+run concurrently, so e.g. the facility and title rollups build side by side,
+and a geocode fix rebuilds the map outputs (plus the database and the
+validation gate, which also read the geocodes) but none of the CSVs.
+
+Hashes are recorded in data/.pipeline_state.json. A file's hash is only
+recomputed when its size or mtime changes.
+
+With --profile (or TOOLS_PROFILE=1) each stage's wall time is recorded by
+tools/instrumentation.py, and the tools the stages run record their own
+load/aggregate/write breakdown, all under data/.profiles/.
+
+Usage:
+  python tools/pipeline.py build
+  python tools/pipeline.py build --target facilities.geojson
+  python tools/pipeline.py build --dry_run
+  python tools/pipeline.py build --force
+  python tools/pipeline.py build --profile
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import instrumentation
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STATE_PATH = REPO_ROOT / "data" / ".pipeline_state.json"
+STATE_VERSION = 1
+
+RAW = "data/raw"
+EXTRACTED = "data/extracted"
+NORMALIZED = "data/normalized"
+EXPORTS = "data/exports"
+
+
+class PipelineError(Exception):
+    """Raised when the stage graph is invalid or a stage fails."""
+
+
+class Stage:
+    """
+    One build step.
+
+    Args:
+        name: Stage name (used by --target and in the state file)
+        inputs: Repo-relative files the stage reads
+        outputs: Repo-relative files the stage writes
+        action: Argument list for a tools/ script, or a callable taking no arguments
+    """
+
+    def __init__(
+        self,
+        name: str,
+        inputs: Sequence[str],
+        outputs: Sequence[str],
+        action: Union[List[str], Callable[[], None]],
+    ) -> None:
+        self.name = name
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.action = action
+
+    def signature(self) -> str:
+        """Identifies the command, so changing arguments forces a rebuild."""
+        if callable(self.action):
+            return f"{self.action.__module__}.{self.action.__name__}"
+        return " ".join(self.action)
+
+    def run(self) -> str:
+        """Run the stage from the repo root; returns its captured output."""
+        if callable(self.action):
+            self.action()
+            return ""
+        cmd = [sys.executable, str(REPO_ROOT / "tools" / self.action[0])] + self.action[1:]
+        proc = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise PipelineError(
+                f"stage {self.name} failed (exit {proc.returncode}):\n{proc.stdout}{proc.stderr}"
+            )
+        return proc.stdout
+
+
+def publish_geojson() -> None:
+    # The map gets the compact form with precompressed siblings; data/exports keeps the readable one
+    from export_facilities_geojson import write_feature_collection
+
+    with open(REPO_ROOT / EXPORTS / "facilities.geojson", "r", encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    write_feature_collection(
+        str(REPO_ROOT / "app/public/facilities.geojson"), features, compact=True
+    )
+    published_tiles = REPO_ROOT / "app/public/facility_tiles"
+    if published_tiles.exists():
+        shutil.rmtree(published_tiles)
+    shutil.copytree(REPO_ROOT / EXPORTS / "facility_tiles", published_tiles)
+
+
+def notice_files() -> List[str]:
+    """Repo-relative notice_*.json files, in the order build_combined.py reads them."""
+    from build_combined import natural_key
+
+    parsed = f"{NORMALIZED}/notice_2.json"
+    found = {
+        p.relative_to(REPO_ROOT).as_posix() for p in (REPO_ROOT / NORMALIZED).glob("notice_*.json")
+    }
+    # notice_2.json is produced by parse_layoff2, so it is an input even before the first build
+    return sorted(found | {parsed}, key=natural_key)
+
+
+def export_stage(name: str, inputs: Sequence[str], outputs: Sequence[str]) -> Stage:
+    """A stage writing only these data/exports outputs with export_all.py --only."""
+    combined = f"{NORMALIZED}/combined.json"
+    cmd = ["export_all.py", "--combined", combined, "--out_dir", EXPORTS]
+    if f"{NORMALIZED}/facility_geocodes.csv" in inputs:
+        cmd += ["--geocodes", f"{NORMALIZED}/facility_geocodes.csv"]
+    for out in outputs:
+        # facility_tiles/index.json is written with the rest of the facility_tiles directory
+        rel = out[len(EXPORTS) + 1 :]
+        cmd += ["--only", rel.split("/")[0]]
+    return Stage(name, inputs, outputs, cmd)
+
+
+def default_stages() -> List[Stage]:
+    notices = notice_files()
+    combined = f"{NORMALIZED}/combined.json"
+    impacts = f"{EXPORTS}/impacts_by_facility.csv"
+    facility_rollup = f"{EXPORTS}/facility_rollup.csv"
+    facility_rollup_all = f"{EXPORTS}/facility_rollup_all_facilities.csv"
+    title_rollup = f"{EXPORTS}/job_title_rollup.csv"
+    geocodes = f"{NORMALIZED}/facility_geocodes.csv"
+    geojson = f"{EXPORTS}/facilities.geojson"
+    tiles_index = f"{EXPORTS}/facility_tiles/index.json"
+    validation_report = "data/.validation_report.json"
+    validated = notices + [
+        combined,
+        f"{NORMALIZED}/job_title_aliases.json",
+        geocodes,
+        impacts,
+        facility_rollup,
+        facility_rollup_all,
+        title_rollup,
+        f"{EXPORTS}/notice_summary.csv",
+        f"{EXPORTS}/top_facilities.csv",
+        f"{EXPORTS}/top_facilities_all_facilities.csv",
+        f"{EXPORTS}/top_job_titles.csv",
+        f"{EXPORTS}/top_job_titles_all.csv",
+    ]
+    geocode_versions = sorted(
+        p.relative_to(REPO_ROOT).as_posix()
+        for p in (REPO_ROOT / NORMALIZED).glob("facility_geocodes_*.csv")
+    )
+
+    return [
+        Stage(
+            "extract_layoff2",
+            [f"{RAW}/layoff2.pdf"],
+            [f"{EXTRACTED}/layoff2_pages.jsonl"],
+            ["extract_pages.py", f"{RAW}/layoff2.pdf", "--out", f"{EXTRACTED}/layoff2_pages.jsonl"],
+        ),
+        Stage(
+            "parse_layoff2",
+            [f"{EXTRACTED}/layoff2_pages.jsonl"],
+            [f"{NORMALIZED}/notice_2.json"],
+            ["parse_layoff2.py", f"{EXTRACTED}/layoff2_pages.jsonl", f"{NORMALIZED}/notice_2.json"],
+        ),
+        # Directory mode: a new notice file changes the inputs, not the command
+        Stage("combine", notices, [combined], ["build_combined.py", NORMALIZED, combined]),
+        # Report of amended/superseded notices; the exporters reconcile the same way themselves
+        Stage(
+            "reconcile",
+            [combined],
+            [f"{EXPORTS}/reconciliation.json"],
+            ["reconcile.py", "--combined", combined, "--report", f"{EXPORTS}/reconciliation.json"],
+        ),
+        # Each group declares only what it reads, so the groups skip and run independently
+        export_stage("impacts", [combined], [impacts]),
+        export_stage(
+            "facility_rollups",
+            [combined],
+            [
+                facility_rollup,
+                facility_rollup_all,
+                f"{EXPORTS}/top_facilities.csv",
+                f"{EXPORTS}/top_facilities_all_facilities.csv",
+            ],
+        ),
+        export_stage(
+            "title_rollups",
+            [combined],
+            [
+                title_rollup,
+                f"{EXPORTS}/job_titles.csv",
+                f"{EXPORTS}/top_job_titles.csv",
+                f"{EXPORTS}/top_job_titles_all.csv",
+            ],
+        ),
+        export_stage("notice_summary", [combined], [f"{EXPORTS}/notice_summary.csv"]),
+        export_stage("map", [combined, geocodes], [geojson, tiles_index]),
+        Stage(
+            "snapshot",
+            [impacts, facility_rollup],
+            [f"{EXPORTS}/impacts.snapshot"],
+            [
+                "impact_snapshot.py",
+                "build",
+                "--impacts",
+                impacts,
+                "--facility_rollup",
+                facility_rollup,
+                "--out",
+                f"{EXPORTS}/impacts.snapshot",
+            ],
+        ),
+        Stage(
+            "top_tables",
+            [impacts],
+            [f"{EXPORTS}/top_tables.json"],
+            ["top_tables.py", "build", "--impacts", impacts, "--out", f"{EXPORTS}/top_tables.json"],
+        ),
+        Stage(
+            "database",
+            [combined, geocodes] + geocode_versions,
+            ["data/impacts.db"],
+            [
+                "impact_db.py",
+                "--db",
+                "data/impacts.db",
+                "import",
+                "--combined",
+                combined,
+                "--geocodes",
+                geocodes,
+            ],
+        ),
+        # Gate: nothing is published unless every input and export passes the schema checks
+        Stage(
+            "validate",
+            validated,
+            [validation_report],
+            ["validation.py"] + validated + ["--report", validation_report],
+        ),
+        Stage(
+            "publish_map",
+            [geojson, tiles_index, validation_report],
+            [
+                "app/public/facilities.geojson",
+                "app/public/facilities.geojson.gz",
+                "app/public/facility_tiles/index.json",
+            ],
+            publish_geojson,
+        ),
+    ]
+
+
+class FileHasher:
+    """sha256 of repo files, reusing the recorded hash while size and mtime are unchanged."""
+
+    def __init__(self, known: Dict[str, Dict]) -> None:
+        self.known = known
+        self._lock = threading.Lock()
+
+    def stat_entry(self, rel: str) -> Optional[Dict]:
+        path = REPO_ROOT / rel
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            prev = self.known.get(rel)
+        if prev and prev["size"] == st.st_size and prev["mtimeNs"] == st.st_mtime_ns:
+            return prev
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        entry = {"sha256": h.hexdigest(), "size": st.st_size, "mtimeNs": st.st_mtime_ns}
+        with self._lock:
+            self.known[rel] = entry
+        return entry
+
+    def digest(self, rel: str) -> Optional[str]:
+        entry = self.stat_entry(rel)
+        return entry["sha256"] if entry else None
+
+
+class Pipeline:
+    """A stage graph plus the recorded state of its last successful runs."""
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        state_path: Path = STATE_PATH,
+        prof: Optional[instrumentation.Profiler] = None,
+    ) -> None:
+        self.stages = {s.name: s for s in stages}
+        self.prof = prof or instrumentation.Profiler("pipeline")
+        self.producer: Dict[str, str] = {}
+        for s in stages:
+            for out in s.outputs:
+                if out in self.producer:
+                    raise PipelineError(
+                        f"{out} is produced by both {self.producer[out]} and {s.name}"
+                    )
+                self.producer[out] = s.name
+        self.deps = {
+            s.name: sorted({self.producer[i] for i in s.inputs if i in self.producer})
+            for s in stages
+        }
+
+        self.state_path = state_path
+        state = {}
+        if state_path.exists():
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+            if state.get("version") != STATE_VERSION:
+                state = {}
+        self.stage_state: Dict[str, Dict] = state.get("stages", {})
+        self.hasher = FileHasher(state.get("files", {}))
+
+    def resolve_targets(self, targets: Sequence[str]) -> List[str]:
+        """Stage names needed for the targets (stage names or output file names), in graph order."""
+        if not targets:
+            wanted = set(self.stages)
+        else:
+            wanted = set()
+            todo = []
+            for t in targets:
+                if t in self.stages:
+                    todo.append(t)
+                    continue
+                matches = [o for o in self.producer if o == t or Path(o).name == t]
+                if not matches:
+                    raise PipelineError(f"unknown target: {t}")
+                todo.extend(self.producer[m] for m in matches)
+            while todo:
+                name = todo.pop()
+                if name not in wanted:
+                    wanted.add(name)
+                    todo.extend(self.deps[name])
+        return [n for n in self.topological_order() if n in wanted]
+
+    def topological_order(self) -> List[str]:
+        order: List[str] = []
+        marks: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if marks.get(name) == 1:
+                raise PipelineError(f"dependency cycle through stage {name}")
+            if marks.get(name) == 2:
+                return
+            marks[name] = 1
+            for dep in self.deps[name]:
+                visit(dep)
+            marks[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def fingerprint(self, stage: Stage) -> Dict:
+        inputs = {}
+        for rel in stage.inputs:
+            digest = self.hasher.digest(rel)
+            if digest is None:
+                raise PipelineError(f"stage {stage.name}: missing input {rel}")
+            inputs[rel] = digest
+        return {"command": stage.signature(), "inputs": inputs}
+
+    def is_fresh(self, stage: Stage) -> bool:
+        prev = self.stage_state.get(stage.name)
+        if not prev or prev.get("fingerprint") != self.fingerprint(stage):
+            return False
+        return all(self.hasher.digest(o) == prev["outputs"].get(o) for o in stage.outputs)
+
+    def record(self, stage: Stage) -> None:
+        self.stage_state[stage.name] = {
+            "fingerprint": self.fingerprint(stage),
+            "outputs": {o: self.hasher.digest(o) for o in stage.outputs},
+        }
+
+    def save(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"version": STATE_VERSION, "stages": self.stage_state, "files": self.hasher.known},
+                indent=2,
+                sort_keys=True,
+            ),
+            encoding="utf-8",
+        )
+        tmp.replace(self.state_path)
+
+    def build(
+        self,
+        targets: Sequence[str] = (),
+        jobs: int = 4,
+        force: bool = False,
+        dry_run: bool = False,
+        skip: Sequence[str] = (),
+    ) -> Dict[str, str]:
+        """
+        Run out-of-date stages, each as soon as the stages it depends on finish.
+
+        Args:
+            targets: Stage names or output files to build (default: all)
+            jobs: Maximum stages running at once
+            force: Rebuild even fresh stages
+            dry_run: Only report what would run
+            skip: Stages to leave alone, using their outputs as they are on disk
+
+        Returns:
+            Mapping of stage name -> "built", "fresh", "skipped" or "would build"
+        """
+        names = self.resolve_targets(targets)
+        unknown = [n for n in skip if n not in self.stages]
+        if unknown:
+            raise PipelineError(f"unknown stage(s) in --skip: {', '.join(unknown)}")
+        results: Dict[str, str] = {}
+
+        if dry_run:
+            # Without running anything, a stage is stale if it or anything upstream is
+            for name in names:
+                if name in skip:
+                    results[name] = "skipped"
+                    continue
+                stale = force or any(results.get(d) == "would build" for d in self.deps[name])
+                try:
+                    stale = stale or not self.is_fresh(self.stages[name])
+                except PipelineError:
+                    stale = True  # input produced by an upstream stage that has not run yet
+                results[name] = "would build" if stale else "fresh"
+            return results
+
+        pending = set(names)
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            try:
+                while pending or running:
+                    ready = [
+                        n for n in names if n in pending and all(d in results for d in self.deps[n])
+                    ]
+                    for name in ready:
+                        pending.discard(name)
+                        stage = self.stages[name]
+                        if name in skip:
+                            results[name] = "skipped"
+                            print(f"  skip   {name}")
+                            continue
+                        if not force and self.is_fresh(stage):
+                            results[name] = "fresh"
+                            print(f"  fresh  {name}")
+                            continue
+                        running[pool.submit(self._run_stage, stage)] = name
+                    if ready and not running:
+                        continue
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        future.result()
+                        self.record(self.stages[name])
+                        results[name] = "built"
+            finally:
+                self.save()
+        return results
+
+    def _run_stage(self, stage: Stage) -> None:
+        started = time.perf_counter()
+        stage.run()
+        seconds = time.perf_counter() - started
+        self.prof.record(stage.name, seconds)
+        print(f"  built  {stage.name} ({seconds:.2f}s)")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Incremental build runner for the data pipeline")
+    sub = ap.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="Rebuild out-of-date outputs")
+    b.add_argument(
+        "--target",
+        action="append",
+        default=[],
+        help="Stage name or output file (e.g. facilities.geojson); repeatable. Default: everything",
+    )
+    b.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Stages to run at once")
+    b.add_argument("--force", action="store_true", help="Rebuild every selected stage")
+    b.add_argument(
+        "--skip",
+        action="append",
+        default=[],
+        help="Stage to leave as-is (e.g. extract_layoff2 without pdfplumber); repeatable",
+    )
+    b.add_argument(
+        "--dry_run", action="store_true", help="Show what would be rebuilt without running it"
+    )
+    instrumentation.add_arguments(b)
+    args = ap.parse_args()
+
+    prof = instrumentation.start("pipeline", args)
+    if prof.enabled:
+        # Stage subprocesses inherit this and profile themselves
+        os.environ.setdefault(instrumentation.ENV_PROFILE, "1")
+    pipeline = Pipeline(default_stages(), prof=prof)
+    started = time.perf_counter()
+    try:
+        results = pipeline.build(
+            args.target, jobs=args.jobs, force=args.force, dry_run=args.dry_run, skip=args.skip
+        )
+    except PipelineError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    if args.dry_run:
+        for name, status in results.items():
+            print(f"  {status:<11} {name}")
+        return 0
+
+    built = sum(1 for s in results.values() if s == "built")
+    fresh = sum(1 for s in results.values() if s == "fresh")
+    print(f"OK: {built} built, {fresh} fresh in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+Cross-notice reconciliation of jobTitleImpacts
+
+combined.json keeps every notice as filed. When a later WARN notice amends or
+supersedes an earlier one it restates the same facility/title rows, and
+summing every notice's rows would count those people twice. This module works
+out which rows are in effect and produces the deduplicated impact table the
+exporters, the database and the scoring index build from.
+
+Notices are linked into lineages by:
+
+    supersedes      "supersedes": "<noticeId>" (or a list) on the notice. The
+                    notice replaces everything the target said.
+    amends          "amends": "<noticeId>" (or a list). The notice's rows
+                    replace the target's rows for the same facility and title;
+                    rows it does not mention stay in effect.
+    duplicate       a later notice in the same jurisdiction with exactly the
+                    same rows as an earlier one supersedes it, when something
+                    corroborates the re-filing: its filename carries an
+                    amendment hint, or both notices have the same letter (or
+                    received) date. Identical rows alone are reported under
+                    "possibleDuplicates" and both notices stay in effect.
+    amendment hint  a notice without explicit links whose source filename
+                    says amended/revised/corrected/superseding amends the
+                    earlier notice (same jurisdiction) sharing most of its
+                    facility/title keys (Jaccard >= AMEND_MIN_OVERLAP).
+
+Within a lineage every row gets a hashed key of (lineage, facilityId,
+normalized canonical title). Members are applied in order (targets before the
+notices that amend them, then by letter date and input order), and each
+notice's rows are hash-joined against the lineage's current rows by that
+key. Everything is a single pass over the rows, so reconciliation is linear
+in the number of rows.
+
+Notices outside any lineage pass through untouched, including repeated
+facility/title rows within one notice (those are separate lines on the
+notice, not restatements).
+
+Usage:
+    python tools/reconcile.py --combined data/normalized/combined.json \
+        --report data/exports/reconciliation.json
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+AMENDMENT_HINT = re.compile(r"amend|revis|correct|supersed", re.IGNORECASE)
+
+# Share of facility/title keys an amendment-hinted notice must have in common
+# with its target (the two real notices share about 6%)
+AMEND_MIN_OVERLAP = 0.5
+
+ROW_KEY_BYTES = 8
+
+# (noticeId, facilityId, jobTitleRaw, jobTitleCanonical, affectedCount),
+# the impacts_by_facility.csv columns
+ImpactRow = Tuple[str, str, str, str, int]
+
+
+class ReconcileError(ValueError):
+    """Raised when notice links cannot be ordered (e.g. two notices amend each other)."""
+
+
+def title_key(title: str) -> str:
+    return " ".join(title.split()).casefold()
+
+
+def row_key(lineage_id: str, facility_id: str, title: str) -> str:
+    """Stable hashed key of one facility/title within a lineage."""
+    text = f"{lineage_id}\x1f{facility_id}\x1f{title_key(title)}"
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=ROW_KEY_BYTES).hexdigest()
+
+
+def notice_id_of(notice: Dict[str, Any]) -> str:
+    return (notice.get("noticeId") or notice.get("notice", {}).get("noticeId") or "").strip()
+
+
+def impact_row(notice_id: str, r: Dict[str, Any]) -> ImpactRow:
+    # Same fields and fallbacks as export_impacts_by_facility.py (notice_2 rows carry only jobTitle)
+    return (
+        notice_id,
+        r.get("facilityId", ""),
+        r.get("jobTitleRaw") or r.get("jobTitle") or "",
+        r.get("jobTitleCanonical") or r.get("jobTitle") or "",
+        int(r.get("affectedCount", 0)),
+    )
+
+
+def notice_refs(value: Any) -> List[str]:
+    """A supersedes/amends value: one noticeId or a list of them."""
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [v for v in value if isinstance(v, str) and v.strip()]
+    return []
+
+
+def notice_date(notice: Dict[str, Any]) -> str:
+    source = notice.get("source") or {}
+    return source.get("letterDate") or source.get("receivedDate") or ""
+
+
+class Link:
+    """One notice superseding or amending another."""
+
+    __slots__ = ("notice", "target", "kind", "reason")
+
+    def __init__(self, notice: str, target: str, kind: str, reason: str) -> None:
+        self.notice = notice
+        self.target = target
+        self.kind = kind  # "supersedes" or "amends"
+        self.reason = reason  # "explicit", "duplicate" or "amendment hint"
+
+    def to_json(self) -> Dict[str, str]:
+        return {
+            "notice": self.notice,
+            "kind": self.kind,
+            "target": self.target,
+            "reason": self.reason,
+        }
+
+
+def _key_set(notice: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    return {
+        (
+            (r.get("facilityId") or "").strip(),
+            title_key(r.get("jobTitleCanonical") or r.get("jobTitle") or ""),
+        )
+        for r in notice.get("jobTitleImpacts", [])
+    }
+
+
+def _row_multiset(notice: Dict[str, Any]) -> Counter:
+    return Counter(
+        (
+            (r.get("facilityId") or "").strip(),
+            title_key(r.get("jobTitleCanonical") or r.get("jobTitle") or ""),
+            int(r.get("affectedCount", 0)),
+        )
+        for r in notice.get("jobTitleImpacts", [])
+    )
+
+
+def _has_amendment_hint(notice: Dict[str, Any]) -> bool:
+    return bool(AMENDMENT_HINT.search((notice.get("source") or {}).get("filename") or ""))
+
+
+def detect_links(
+    notices: List[Dict[str, Any]]
+) -> Tuple[List[Link], List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Find supersede/amend links between notices.
+
+    Returns:
+        (links, unresolved, possible_duplicates) where unresolved lists explicit
+        links to unknown notices and possible_duplicates lists later notices
+        with the same rows as an earlier one but nothing else tying them together
+    """
+    by_id = {notice_id_of(n): n for n in notices}
+    rank = {nid: (notice_date(n), i) for i, (nid, n) in enumerate(by_id.items())}
+    links: List[Link] = []
+    unresolved: List[Dict[str, str]] = []
+    possible_duplicates: List[Dict[str, str]] = []
+    linked: Set[str] = set()
+
+    for nid, n in by_id.items():
+        for kind in ("supersedes", "amends"):
+            for target in notice_refs(n.get(kind)):
+                if target not in by_id or target == nid:
+                    unresolved.append({"notice": nid, "kind": kind, "target": target})
+                    continue
+                links.append(Link(nid, target, kind, "explicit"))
+                linked.add(nid)
+
+    # Exact restatements: bucket by a hash of the row multiset, confirm by comparing the rows
+    first_seen: Dict[Tuple[str, int], List[Tuple[str, Counter]]] = defaultdict(list)
+    for nid in sorted(by_id, key=rank.__getitem__):
+        n = by_id[nid]
+        if nid in linked or not n.get("jobTitleImpacts"):
+            continue
+        rows = _row_multiset(n)
+        bucket = first_seen[(n.get("jurisdiction") or "", hash(frozenset(rows.items())))]
+        original = next((oid for oid, other in bucket if other == rows), None)
+        if original is None:
+            bucket.append((nid, rows))
+            continue
+        # Two notices can legitimately list the same people (e.g. consecutive
+        # rounds at one site), so identical rows alone only get reported
+        date = notice_date(n)
+        if _has_amendment_hint(n) or (date and date == notice_date(by_id[original])):
+            links.append(Link(nid, original, "supersedes", "duplicate"))
+            linked.add(nid)
+        else:
+            possible_duplicates.append({"notice": nid, "target": original})
+
+    # Amendments named as such but not linked explicitly. An inverted index of
+    # (jurisdiction, facilityId, title) -> notices means only notices sharing a
+    # key with the hinted one are scored, instead of every earlier notice.
+    hinted = [nid for nid, n in by_id.items() if nid not in linked and _has_amendment_hint(n)]
+    if hinted:
+        order = {nid: i for i, nid in enumerate(by_id)}
+        key_sets: Dict[str, Set[Tuple[str, str, str]]] = {}
+        postings: Dict[Tuple[str, str, str], List[str]] = defaultdict(list)
+        for nid, n in by_id.items():
+            jurisdiction = n.get("jurisdiction") or ""
+            keys = key_sets[nid] = {(jurisdiction, fid, title) for fid, title in _key_set(n)}
+            for key in keys:
+                postings[key].append(nid)
+
+        for nid in hinted:
+            keys = key_sets[nid]
+            shared: Dict[str, int] = defaultdict(int)
+            for key in keys:
+                for oid in postings[key]:
+                    if rank[oid] < rank[nid]:
+                        shared[oid] += 1
+            best, best_overlap = None, 0.0
+            # Ties go to the notice that comes first in the input
+            for oid in sorted(shared, key=order.__getitem__):
+                union = len(keys) + len(key_sets[oid]) - shared[oid]
+                overlap = shared[oid] / union
+                if overlap > best_overlap:
+                    best, best_overlap = oid, overlap
+            if best is not None and best_overlap >= AMEND_MIN_OVERLAP:
+                links.append(Link(nid, best, "amends", "amendment hint"))
+
+    return links, unresolved, possible_duplicates
+
+
+def link_scope(
+    by_id: Dict[str, Dict[str, Any]],
+    seeds: Iterable[str],
+    facility_notices: Dict[str, List[str]],
+    lineage_of: Dict[str, str],
+    unresolved: Iterable[Dict[str, str]],
+) -> Set[str]:
+    """
+    Notices whose links or effective rows can change when the seed notices change.
+
+    Every link joins notices that share a facility/title key in one
+    jurisdiction or that name each other explicitly, so the result is closed
+    under those relations (and under the previous lineages): reconciling just
+    these notices gives the same links and rows as reconciling the corpus.
+
+    Args:
+        by_id: Current notices by noticeId, in input order
+        seeds: noticeIds added, changed or removed
+        facility_notices: facilityId -> noticeIds listing it (combined.json
+            facilities; every jobTitleImpacts facilityId is among them)
+        lineage_of: noticeId -> lineageId from the previous reconciliation
+        unresolved: Explicit links to unknown notices from the previous reconciliation
+
+    Returns:
+        Set of current noticeIds to reconcile again
+    """
+    members: Dict[str, List[str]] = defaultdict(list)
+    for nid, lineage_id in lineage_of.items():
+        members[lineage_id].append(nid)
+    referrers: Dict[str, List[str]] = defaultdict(list)
+    for u in unresolved:
+        referrers[u["target"]].append(u["notice"])
+
+    scope: Set[str] = set()
+    seen: Set[str] = set()
+    stack = list(seeds)
+    while stack:
+        nid = stack.pop()
+        if nid in seen:
+            continue
+        seen.add(nid)
+        stack.extend(members.get(lineage_of.get(nid, ""), []))
+        stack.extend(referrers.get(nid, []))
+        notice = by_id.get(nid)
+        if notice is None:
+            continue
+        scope.add(nid)
+        for kind in ("supersedes", "amends"):
+            stack.extend(notice_refs(notice.get(kind)))
+        jurisdiction = notice.get("jurisdiction")
+        for fid in {(r.get("facilityId") or "").strip() for r in notice.get("jobTitleImpacts", [])}:
+            stack.extend(
+                oid
+                for oid in facility_notices.get(fid, [])
+                if oid not in seen and by_id.get(oid, {}).get("jurisdiction") == jurisdiction
+            )
+    return scope
+
+
+class Reconciliation:
+    """
+    Effective impact rows after applying notice lineages.
+
+    Attributes:
+        rows: Deduplicated ImpactRow tuples
+        links: Supersede/amend links found between notices
+        lineages: {lineageId: member noticeIds in the order they were applied}
+        dropped: Rows no longer in effect, with the notice that replaced them
+        unresolved: Explicit links to notices that are not in the data
+        possible_duplicates: Later notices restating an earlier one's rows
+            without corroboration; both stay in effect
+    """
+
+    def __init__(self) -> None:
+        self.rows: List[ImpactRow] = []
+        self.links: List[Link] = []
+        self.lineages: Dict[str, List[str]] = {}
+        self.lineage_of: Dict[str, str] = {}
+        self.dropped: List[Dict[str, Any]] = []
+        self.unresolved: List[Dict[str, str]] = []
+        self.possible_duplicates: List[Dict[str, str]] = []
+        self.rows_in = 0
+        self.affected_in = 0
+        self._by_notice: Dict[str, List[ImpactRow]] = {}
+
+    @property
+    def affected_out(self) -> int:
+        return sum(r[4] for r in self.rows)
+
+    def impacts_for(self, notice: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """jobTitleImpacts rows of a notice that are still in effect."""
+        nid = notice_id_of(notice)
+        if nid not in self.lineage_of:
+            return notice.get("jobTitleImpacts", [])
+        return [
+            {
+                "noticeId": r[0],
+                "facilityId": r[1],
+                "jobTitleRaw": r[2],
+                "jobTitleCanonical": r[3],
+                "affectedCount": r[4],
+            }
+            for r in self._by_notice.get(nid, [])
+        ]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "version": 1,
+            "rowsIn": self.rows_in,
+            "rowsOut": len(self.rows),
+            "affectedIn": self.affected_in,
+            "affectedOut": self.affected_out,
+            "links": [link.to_json() for link in self.links],
+            "lineages": [
+                {"lineageId": lid, "notices": members} for lid, members in self.lineages.items()
+            ],
+            "unresolved": self.unresolved,
+            "possibleDuplicates": self.possible_duplicates,
+            "dropped": self.dropped,
+        }
+
+
+def _order_lineage(
+    members: List[str], links: List[Link], rank: Dict[str, Tuple[str, int]]
+) -> List[str]:
+    # Targets before the notices that amend or supersede them; otherwise by date and input order
+    member_set = set(members)
+    waiting = {m: 0 for m in members}
+    after: Dict[str, List[str]] = defaultdict(list)
+    for link in links:
+        if link.notice in member_set:
+            waiting[link.notice] += 1
+            after[link.target].append(link.notice)
+    ready = [(rank[m], m) for m in members if waiting[m] == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        _, m = heapq.heappop(ready)
+        order.append(m)
+        for nxt in after[m]:
+            waiting[nxt] -= 1
+            if waiting[nxt] == 0:
+                heapq.heappush(ready, (rank[nxt], nxt))
+    if len(order) != len(members):
+        stuck = sorted(m for m in members if m not in order)
+        raise ReconcileError(
+            f"notices supersede or amend each other in a cycle: {', '.join(stuck)}"
+        )
+    return order
+
+
+def reconcile(notices: Iterable[Dict[str, Any]]) -> Reconciliation:
+    """
+    Deduplicate jobTitleImpacts across amended and superseding notices.
+
+    Args:
+        notices: Notice objects, as in combined.json "notices"
+
+    Returns:
+        Reconciliation whose rows are in notice order
+    """
+    notices = list(notices)
+    result = Reconciliation()
+    result.links, result.unresolved, result.possible_duplicates = detect_links(notices)
+    by_id = {notice_id_of(n): n for n in notices}
+
+    for n in notices:
+        rows = n.get("jobTitleImpacts", [])
+        result.rows_in += len(rows)
+        result.affected_in += sum(int(r.get("affectedCount", 0)) for r in rows)
+
+    if not result.links:
+        result.rows = [
+            impact_row(notice_id_of(n), r) for n in notices for r in n.get("jobTitleImpacts", [])
+        ]
+        return result
+
+    # Lineages are the connected groups of linked notices, named after their earliest member
+    rank = {nid: (notice_date(n), i) for i, (nid, n) in enumerate(by_id.items())}
+    parent = {nid: nid for nid in by_id}
+
+    def find(x: str) -> str:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for link in result.links:
+        a, b = find(link.notice), find(link.target)
+        if a != b:
+            if rank[b] < rank[a]:
+                a, b = b, a
+            parent[b] = a
+
+    in_links = {link.notice for link in result.links} | {link.target for link in result.links}
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for nid in by_id:
+        if nid in in_links:
+            groups[find(nid)].append(nid)
+
+    targets_of: Dict[str, List[Link]] = defaultdict(list)
+    for link in result.links:
+        targets_of[link.notice].append(link)
+
+    for members in groups.values():
+        order = _order_lineage(members, result.links, rank)
+        lineage_id = order[0]
+        result.lineages[lineage_id] = order
+        for m in order:
+            result.lineage_of[m] = lineage_id
+        _apply_lineage(result, lineage_id, order, by_id, targets_of)
+
+    for n in notices:
+        nid = notice_id_of(n)
+        if nid in result.lineage_of:
+            result.rows.extend(result._by_notice.get(nid, []))
+        else:
+            result.rows.extend(impact_row(nid, r) for r in n.get("jobTitleImpacts", []))
+    return result
+
+
+def _apply_lineage(
+    result: Reconciliation,
+    lineage_id: str,
+    order: List[str],
+    by_id: Dict[str, Dict[str, Any]],
+    targets_of: Dict[str, List[Link]],
+) -> None:
+    # state: rowKey -> {origin noticeId: aggregated row}; a key can carry rows from
+    # several notices of the lineage that do not replace one another
+    state: Dict[str, Dict[str, List[Any]]] = {}
+    covers: Dict[str, Set[str]] = {}
+    applied: List[str] = []
+
+    for nid in order:
+        links = targets_of.get(nid, [])
+        supersedes = any(link.kind == "supersedes" for link in links)
+        # A notice replaces what its targets (and whatever they replaced) said
+        covered: Set[str] = set()
+        for link in links:
+            covered.add(link.target)
+            covered |= covers.get(link.target, set())
+        if supersedes:
+            # ...and a superseded notice takes its amendments with it
+            for m in applied:
+                if (
+                    all(link.kind == "amends" for link in targets_of.get(m, []))
+                    and covers[m] & covered
+                ):
+                    covered.add(m)
+        covers[nid] = covered
+        applied.append(nid)
+
+        rows: Dict[str, List[Any]] = {}
+        for r in by_id[nid].get("jobTitleImpacts", []):
+            row = impact_row(nid, r)
+            key = row_key(lineage_id, row[1].strip(), row[3] or row[2])
+            if key in rows:
+                rows[key][4] += row[4]
+            else:
+                rows[key] = list(row)
+
+        if supersedes:
+            replaced_keys: Iterable[str] = list(state)
+        else:
+            replaced_keys = [k for k in rows if k in state]
+        for key in replaced_keys:
+            entries = state[key]
+            for origin in [o for o in entries if o in covered]:
+                old = entries.pop(origin)
+                result.dropped.append(
+                    {
+                        "rowKey": key,
+                        "noticeId": origin,
+                        "facilityId": old[1],
+                        "jobTitleCanonical": old[3],
+                        "affectedCount": old[4],
+                        "replacedBy": nid,
+                        "reason": "superseded" if supersedes else "restated",
+                    }
+                )
+            if not entries:
+                del state[key]
+        for key, row in rows.items():
+            state.setdefault(key, {})[nid] = row
+
+    for entries in state.values():
+        for origin, row in entries.items():
+            result._by_notice.setdefault(origin, []).append(tuple(row))  # type: ignore[arg-type]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Reconcile amended and superseding notices in combined.json"
+    )
+    ap.add_argument("--combined", default=os.path.join("data", "normalized", "combined.json"))
+    ap.add_argument("--report", default=os.path.join("data", "exports", "reconciliation.json"))
+    args = ap.parse_args()
+
+    with open(args.combined, "r", encoding="utf-8") as f:
+        combined = json.load(f)
+    try:
+        result = reconcile(combined.get("notices", []))
+    except ReconcileError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(result.to_json(), f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+    print(f"OK: wrote {args.report}")
+    print(
+        f"  lineages={len(result.lineages)} links={len(result.links)} "
+        f"unresolved={len(result.unresolved)}"
+    )
+    print(f"  rows={result.rows_in} -> {len(result.rows)}")
+    print(f"  affected={result.affected_in} -> {result.affected_out}")
+    for link in result.links:
+        print(f"  {link.notice} {link.kind} {link.target} ({link.reason})")
+    for u in result.unresolved:
+        print(f"  warning: {u['notice']} {u['kind']} unknown notice {u['target']!r}")
+    for d in result.possible_duplicates:
+        print(
+            f"  warning: {d['notice']} repeats the rows of {d['target']}; both are counted "
+            f'(add "supersedes" if it is a re-filing)'
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,10 +10,24 @@ Data Sources:
     - data/exports/impacts_by_facility.csv: Row-level impact data
     - data/exports/facility_rollup.csv: Facility-level aggregated totals
     - data/normalized/facility_geocodes.csv: Facility geocoding data
+    - data/exports/impacts.snapshot: Binary form of the two CSVs above, used
+      instead of them when it is up to date (see tools/impact_snapshot.py)
+    - data/exports/top_tables.json: Precomputed top titles per facility and top
+      facilities per title, used when it is up to date (see tools/top_tables.py)
+    - data/normalized/job_title_aliases.json: Title aliases for free-text titles
+
+Titles are resolved with tools/title_matcher.py: abbreviations, roman numerals
+and aliases ("SDE 2", "Sr Mgr", "PgM III") resolve to the canonical title;
+anything else is looked up as given and the closest canonical titles are listed
+as suggestions. Pass --exact_title to skip matching.
 
 Usage:
     python tools/risk_assessment.py --facility SEA40 --title "Program Manager III"
     python tools/risk_assessment.py --facility SEA93 --title "SDE II" --nearest 5 --radius_km 30
+    python tools/risk_assessment.py --batch roster.csv --format csv --output results.csv
+    python tools/risk_assessment.py --stdin < queries.jsonl > results.jsonl
+    python tools/risk_assessment.py --db data/impacts.db --facility SEA40 \
+        --title "Program Manager III"
 
 Version: 1.0.0
 """
@@ -22,22 +36,52 @@ from __future__ import annotations
 
 import argparse
 import csv
+import json
 import logging
 import math
 import sys
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+# Package-relative when imported as tools.risk_assessment (the risk-assessment
+# console script), bare when run as a script from tools/
+try:
+    from .impact_snapshot import ImpactSnapshot, load_current_snapshot
+    from .spatial_index import SphereKDTree
+    from .title_matcher import TitleMatcher, load_aliases
+    from .top_tables import TopTables, load_current_tables, top_k
+except ImportError:
+    from impact_snapshot import ImpactSnapshot, load_current_snapshot
+    from spatial_index import SphereKDTree
+    from title_matcher import TitleMatcher, load_aliases
+    from top_tables import TopTables, load_current_tables, top_k
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format="%(levelname)s: %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
+    handlers=[logging.StreamHandler(sys.stderr)],
 )
 logger = logging.getLogger(__name__)
 
 
+# Synthetic facility IDs that are not physical sites and never count as "nearby"
+NON_PHYSICAL_FACILITIES = {"REMOTE_WA"}
+
+
 class RiskAssessmentError(Exception):
     """Base exception for risk assessment errors."""
 
@@ -215,19 +259,176 @@ def haversine_km(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> fl
     return R * c
 
 
+class ImpactIndex:
+    """
+    In-memory lookup tables over impact records, built once at load time.
+
+    Every record is normalized (strings stripped, counts parsed with ``to_int``)
+    exactly once, so each report section becomes a dictionary lookup instead of
+    a full scan of the impacts list.
+
+    Attributes:
+        pair_totals: (facility_id, title) -> total affected count
+        pair_notices: (facility_id, title) -> set of notice IDs
+        facility_titles: facility_id -> {title: affected count}
+        facility_totals: facility_id -> total affected count
+        facility_notices: facility_id -> set of notice IDs
+        title_facilities: title -> {facility_id: affected count}
+        title_facility_notices: title -> {facility_id: set of notice IDs}
+        title_totals: title -> total affected count
+        title_notices: title -> set of notice IDs
+        facility_metadata: facility_id -> facility rollup record
+        top_tables: Precomputed top-K lists for the same rows, or None
+    """
+
+    def __init__(self) -> None:
+        self.pair_totals: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.pair_notices: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self.facility_titles: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.facility_totals: Dict[str, int] = defaultdict(int)
+        self.facility_notices: Dict[str, Set[str]] = defaultdict(set)
+        self.title_facilities: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.title_facility_notices: Dict[str, Dict[str, Set[str]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self.title_totals: Dict[str, int] = defaultdict(int)
+        self.title_notices: Dict[str, Set[str]] = defaultdict(set)
+        self.facility_metadata: Dict[str, Dict[str, str]] = {}
+        self.top_tables: Optional[TopTables] = None
+        self.record_count = 0
+
+    @classmethod
+    def from_records(
+        cls,
+        impacts: List[Dict[str, str]],
+        facility_rollup: Optional[List[Dict[str, str]]] = None,
+    ) -> ImpactIndex:
+        """
+        Build an index from impact records and (optionally) facility rollup records.
+
+        Args:
+            impacts: List of impact records (rows of impacts_by_facility.csv)
+            facility_rollup: List of facility rollup records (rows of facility_rollup.csv)
+
+        Returns:
+            Populated ImpactIndex
+
+        Example:
+            >>> index = ImpactIndex.from_records(load_csv("data/exports/impacts_by_facility.csv"))
+            >>> index.pair_totals[("SEA40", "Program Manager III")]
+            6
+        """
+        index = cls()
+        for record in impacts:
+            index.add(
+                (record.get("facilityId") or "").strip(),
+                (record.get("jobTitleCanonical") or record.get("jobTitle") or "").strip(),
+                to_int(record.get("affectedCount")),
+                (record.get("noticeId") or "").strip(),
+            )
+        for record in facility_rollup or []:
+            facility_id = (record.get("facilityId") or "").strip()
+            if facility_id and facility_id not in index.facility_metadata:
+                index.facility_metadata[facility_id] = record
+        return index
+
+    @classmethod
+    def from_snapshot(cls, snapshot: ImpactSnapshot) -> ImpactIndex:
+        """
+        Build an index from a binary snapshot.
+
+        The lookup tables were folded when the snapshot was built and come
+        back from the unpickle as plain dicts; they are only rewrapped in
+        the defaultdicts ImpactIndex uses, with no per-row work.
+
+        Args:
+            snapshot: Loaded ImpactSnapshot
+
+        Returns:
+            Populated ImpactIndex
+        """
+        index = cls()
+        agg = snapshot.aggregates
+        index.pair_totals.update(agg["pair_totals"])
+        index.pair_notices.update(agg["pair_notices"])
+        index.facility_totals.update(agg["facility_totals"])
+        index.facility_notices.update(agg["facility_notices"])
+        index.title_totals.update(agg["title_totals"])
+        index.title_notices.update(agg["title_notices"])
+        for facility_id, titles in agg["facility_titles"].items():
+            index.facility_titles[facility_id] = defaultdict(int, titles)
+        for title, facilities in agg["title_facilities"].items():
+            index.title_facilities[title] = defaultdict(int, facilities)
+        for title, notices in agg["title_facility_notices"].items():
+            index.title_facility_notices[title] = defaultdict(set, notices)
+        index.record_count = len(snapshot)
+        for record in snapshot.iter_rollup_records():
+            facility_id = (record.get("facilityId") or "").strip()
+            if facility_id and facility_id not in index.facility_metadata:
+                index.facility_metadata[facility_id] = record
+        return index
+
+    def add(self, facility_id: str, title: str, count: int, notice_id: str = "") -> None:
+        """
+        Fold one already-normalized impact row into the index.
+
+        Rows without a facility ID or title only count toward the sides they have,
+        matching the filters the report sections have always applied.
+
+        Args:
+            facility_id: Stripped facility ID (may be empty)
+            title: Stripped canonical job title (may be empty)
+            count: Parsed affected count
+            notice_id: Stripped notice ID (may be empty)
+        """
+        self.record_count += 1
+
+        if facility_id and title:
+            key = (facility_id, title)
+            self.pair_totals[key] += count
+            if notice_id:
+                self.pair_notices[key].add(notice_id)
+
+        if facility_id:
+            self.facility_totals[facility_id] += count
+            if notice_id:
+                self.facility_notices[facility_id].add(notice_id)
+            if title:
+                self.facility_titles[facility_id][title] += count
+
+        if title:
+            self.title_totals[title] += count
+            if notice_id:
+                self.title_notices[title].add(notice_id)
+            if facility_id:
+                self.title_facilities[title][facility_id] += count
+                if notice_id:
+                    self.title_facility_notices[title][facility_id].add(notice_id)
+
+
+def _ensure_index(impacts: Union[ImpactIndex, List[Dict[str, str]]]) -> ImpactIndex:
+    """Accept either a prebuilt ImpactIndex or raw impact records."""
+    if isinstance(impacts, ImpactIndex):
+        return impacts
+    return ImpactIndex.from_records(impacts)
+
+
 def find_facility_metadata(
-    facility_id: str, facility_rollup: List[Dict[str, str]]
+    facility_id: str, facility_rollup: Union[ImpactIndex, List[Dict[str, str]]]
 ) -> Optional[Dict[str, str]]:
     """
     Find metadata for a specific facility from the rollup data.
 
     Args:
         facility_id: The facility ID to search for
-        facility_rollup: List of facility rollup records
+        facility_rollup: ImpactIndex, or list of facility rollup records
 
     Returns:
         Dictionary with facility metadata, or None if not found
     """
+    if isinstance(facility_rollup, ImpactIndex):
+        return facility_rollup.facility_metadata.get(facility_id)
+
     for record in facility_rollup:
         if (record.get("facilityId") or "").strip() == facility_id:
             return record
@@ -235,7 +436,7 @@ def find_facility_metadata(
 
 
 def calculate_direct_match(
-    facility_id: str, title: str, impacts: List[Dict[str, str]]
+    facility_id: str, title: str, impacts: Union[ImpactIndex, List[Dict[str, str]]]
 ) -> Tuple[int, Set[str]]:
     """
     Calculate direct matches for a facility and job title combination.
@@ -243,72 +444,46 @@ def calculate_direct_match(
     Args:
         facility_id: The facility ID to match
         title: The job title to match
-        impacts: List of impact records
+        impacts: ImpactIndex, or list of impact records
 
     Returns:
         Tuple of (total_affected_count, set_of_notice_ids)
     """
-    total_affected = 0
-    notice_ids: Set[str] = set()
-
-    for record in impacts:
-        if (record.get("facilityId") or "").strip() != facility_id:
-            continue
-
-        record_title = (
-            record.get("jobTitleCanonical") or record.get("jobTitle") or ""
-        ).strip()
-        if record_title != title:
-            continue
-
-        total_affected += to_int(record.get("affectedCount"))
-        notice_id = (record.get("noticeId") or "").strip()
-        if notice_id:
-            notice_ids.add(notice_id)
-
-    return total_affected, notice_ids
+    index = _ensure_index(impacts)
+    key = (facility_id, title)
+    return index.pair_totals.get(key, 0), set(index.pair_notices.get(key, set()))
 
 
 def get_top_titles_at_facility(
-    facility_id: str, impacts: List[Dict[str, str]], top_n: int = 10
+    facility_id: str, impacts: Union[ImpactIndex, List[Dict[str, str]]], top_n: int = 10
 ) -> List[Tuple[str, int]]:
     """
     Get the top job titles at a facility by affected count.
 
     Args:
         facility_id: The facility ID to analyze
-        impacts: List of impact records
+        impacts: ImpactIndex, or list of impact records
         top_n: Number of top titles to return
 
     Returns:
         List of (job_title, affected_count) tuples, sorted by count descending
     """
-    title_counts: Dict[str, int] = defaultdict(int)
-
-    for record in impacts:
-        if (record.get("facilityId") or "").strip() != facility_id:
-            continue
-
-        title = (
-            record.get("jobTitleCanonical") or record.get("jobTitle") or ""
-        ).strip()
-        if not title:
-            continue
-
-        title_counts[title] += to_int(record.get("affectedCount"))
-
-    return sorted(title_counts.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    index = _ensure_index(impacts)
+    tables = index.top_tables
+    if tables is not None and tables.covers(top_n):
+        return tables.titles_at(facility_id, top_n)
+    return top_k(index.facility_titles.get(facility_id, {}), top_n)
 
 
 def get_top_facilities_for_title(
-    title: str, impacts: List[Dict[str, str]], top_n: int = 10
+    title: str, impacts: Union[ImpactIndex, List[Dict[str, str]]], top_n: int = 10
 ) -> Tuple[List[Tuple[str, int]], Dict[str, Set[str]]]:
     """
     Get the top facilities where a job title appears.
 
     Args:
         title: The job title to search for
-        impacts: List of impact records
+        impacts: ImpactIndex, or list of impact records
         top_n: Number of top facilities to return
 
     Returns:
@@ -316,30 +491,398 @@ def get_top_facilities_for_title(
             - List of (facility_id, affected_count) tuples
             - Dictionary mapping facility_id to set of notice_ids
     """
-    facility_counts: Dict[str, int] = defaultdict(int)
-    facility_notices: Dict[str, Set[str]] = defaultdict(set)
+    index = _ensure_index(impacts)
+    facility_notices = index.title_facility_notices.get(title, {})
 
-    for record in impacts:
-        record_title = (
-            record.get("jobTitleCanonical") or record.get("jobTitle") or ""
-        ).strip()
-        if record_title != title:
-            continue
+    tables = index.top_tables
+    if tables is not None and tables.covers(top_n):
+        top_facilities = tables.facilities_for(title, top_n)
+    else:
+        top_facilities = top_k(index.title_facilities.get(title, {}), top_n)
+    return top_facilities, dict(facility_notices)
 
-        facility_id = (record.get("facilityId") or "").strip()
-        if not facility_id:
-            continue
 
-        facility_counts[facility_id] += to_int(record.get("affectedCount"))
+def build_spatial_index(
+    index: ImpactIndex, geocodes: Dict[str, Tuple[float, float]]
+) -> SphereKDTree:
+    """
+    Build a spatial index over impacted, physical facilities that have geocodes.
+
+    Only facilities that appear in the impact data are indexed, so proximity
+    results never include sites that are not listed in a notice.
+
+    Args:
+        index: Prebuilt ImpactIndex
+        geocodes: Dictionary mapping facilityId to (latitude, longitude)
+
+    Returns:
+        SphereKDTree keyed by facility ID
+    """
+    points = {
+        fid: coord
+        for fid, coord in geocodes.items()
+        if fid in index.facility_totals and fid not in NON_PHYSICAL_FACILITIES
+    }
+    logger.debug(f"Spatial index built over {len(points)} impacted facilities")
+    return SphereKDTree(points)
+
+
+def get_nearby_facilities(
+    facility_id: str,
+    title: str,
+    index: ImpactIndex,
+    geocodes: Dict[str, Tuple[float, float]],
+    tree: SphereKDTree,
+    nearest: int = 10,
+    radius_km: Optional[float] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Find impacted facilities near the selected facility.
 
-        notice_id = (record.get("noticeId") or "").strip()
-        if notice_id:
-            facility_notices[facility_id].add(notice_id)
+    With ``radius_km`` set, results are limited to that radius (and to
+    ``nearest`` results when ``nearest`` > 0). Without it, the ``nearest``
+    closest impacted facilities are returned.
 
-    top_facilities = sorted(facility_counts.items(), key=lambda x: x[1], reverse=True)[
-        :top_n
+    Args:
+        facility_id: The facility being assessed
+        title: The job title being assessed
+        index: Prebuilt ImpactIndex
+        geocodes: Dictionary mapping facilityId to (latitude, longitude)
+        tree: Spatial index from build_spatial_index
+        nearest: Maximum number of facilities to return
+        radius_km: Optional search radius in kilometers
+
+    Returns:
+        List of dicts with facilityId, distanceKm, totalAffected and titleAffected,
+        nearest first; None if the facility has no geocode (proximity skipped)
+    """
+    origin = geocodes.get(facility_id)
+    if origin is None:
+        return None
+
+    lat, lon = origin
+    exclude = [facility_id]
+    if nearest > 0:
+        hits = tree.nearest(lat, lon, nearest, max_km=radius_km, exclude=exclude)
+    elif radius_km is not None:
+        hits = tree.within(lat, lon, radius_km, exclude=exclude)
+    else:
+        hits = []
+
+    return [
+        {
+            "facilityId": fid,
+            "distanceKm": round(km, 2),
+            "totalAffected": index.facility_totals.get(fid, 0),
+            "titleAffected": index.pair_totals.get((fid, title), 0),
+        }
+        for fid, km in hits
     ]
-    return top_facilities, facility_notices
+
+
+def build_report(
+    index: ImpactIndex,
+    facility_id: str,
+    title: str,
+    top_n: int = 10,
+    geocodes: Optional[Dict[str, Tuple[float, float]]] = None,
+    tree: Optional[SphereKDTree] = None,
+    nearest: int = 10,
+    radius_km: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Assemble every report section for one facility/title pair as plain data.
+
+    The returned dictionary is JSON-serializable and is what batch mode emits
+    per input row.
+
+    Args:
+        index: Prebuilt ImpactIndex
+        facility_id: The facility being assessed
+        title: The job title being assessed
+        top_n: Number of top results per ranked section
+        geocodes: Optional facility geocodes (enables the nearby section)
+        tree: Optional spatial index from build_spatial_index
+        nearest: Number of nearby facilities to include
+        radius_km: Optional radius for the nearby section
+
+    Returns:
+        Dictionary with facility totals, direct match, top titles, top facilities
+        and nearby facilities (None when proximity is skipped)
+    """
+    facility_metadata = find_facility_metadata(facility_id, index)
+    direct_total, direct_notices = calculate_direct_match(facility_id, title, index)
+    top_titles = get_top_titles_at_facility(facility_id, index, top_n)
+    top_facilities, facility_notices = get_top_facilities_for_title(title, index, top_n)
+
+    nearby = None
+    if geocodes is not None and tree is not None:
+        nearby = get_nearby_facilities(
+            facility_id, title, index, geocodes, tree, nearest, radius_km
+        )
+
+    facility_totals = None
+    if facility_metadata:
+        facility_totals = {
+            "totalAffected": to_int(facility_metadata.get("totalAffected")),
+            "jobTitleCount": to_int(facility_metadata.get("jobTitleCount")),
+            "noticeCount": to_int(facility_metadata.get("noticeCount")),
+        }
+
+    return {
+        "facilityId": facility_id,
+        "title": title,
+        "facilityTotals": facility_totals,
+        "directMatch": {
+            "affectedCount": direct_total,
+            "notices": sorted(direct_notices),
+        },
+        "topTitles": [{"title": t, "affected": n} for t, n in top_titles],
+        "topFacilities": [
+            {
+                "facilityId": fid,
+                "affected": n,
+                "notices": sorted(facility_notices.get(fid, set())),
+            }
+            for fid, n in top_facilities
+        ],
+        "nearbyFacilities": nearby,
+    }
+
+
+def resolve_title(
+    title: str, matcher: Optional[TitleMatcher], similar_n: int = 5
+) -> Tuple[str, Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Resolve a free-text title against the canonical titles.
+
+    Only High-confidence matches (exact, normalized or alias) replace the title
+    used for lookups; fuzzy candidates are returned as suggestions only.
+
+    Args:
+        title: Title as entered
+        matcher: TitleMatcher over the dataset's titles, or None to use the title as-is
+        similar_n: Number of similar titles to suggest when the title is not exact
+
+    Returns:
+        (lookup title, titleMatch dict or None without a matcher, similar title dicts)
+    """
+    if matcher is None:
+        return title, None, []
+
+    match = matcher.match(title)
+    if match is None:
+        info: Dict[str, Any] = {
+            "query": title,
+            "title": None,
+            "confidence": "None",
+            "score": 0.0,
+            "via": None,
+            "affected": None,
+        }
+    else:
+        info = {"query": title, **match.to_dict()}
+
+    lookup = match.title if match is not None and match.confidence == "High" else title
+    similar: List[Dict[str, Any]] = []
+    if match is None or match.via != "exact":
+        similar = [m.to_dict() for m in matcher.similar(title, similar_n, exclude=lookup)]
+    return lookup, info, similar
+
+
+def build_title_matcher(
+    title_totals: Dict[str, int], aliases_path: Optional[str]
+) -> TitleMatcher:
+    """
+    Build a TitleMatcher over the dataset's canonical titles.
+
+    Args:
+        title_totals: {canonical title: total affected}
+        aliases_path: job_title_aliases.json path (missing file = no aliases)
+
+    Returns:
+        TitleMatcher
+    """
+    aliases = load_aliases(Path(aliases_path)) if aliases_path else {}
+    matcher = TitleMatcher(title_totals.keys(), aliases, title_totals)
+    logger.debug(f"Title matcher: {len(matcher)} titles, {len(aliases)} aliases")
+    return matcher
+
+
+BATCH_FACILITY_COLUMNS = ["facility", "facilityId", "facility_id"]
+BATCH_TITLE_COLUMNS = ["title", "jobTitleCanonical", "jobTitle", "job_title"]
+
+BATCH_CSV_COLUMNS = [
+    "facilityId",
+    "title",
+    "facilityTotalAffected",
+    "facilityJobTitleCount",
+    "facilityNoticeCount",
+    "directAffected",
+    "directNotices",
+    "topTitles",
+    "topFacilities",
+    "nearbyFacilities",
+]
+
+# Appended to BATCH_CSV_COLUMNS when titles are resolved with a TitleMatcher
+BATCH_TITLE_MATCH_COLUMNS = ["queryTitle", "titleConfidence", "titleMatchedVia", "similarTitles"]
+
+
+def _pick(row: Dict[str, Any], candidates: List[str]) -> str:
+    """Return the first non-empty value among candidate keys, stripped."""
+    for key in candidates:
+        value = row.get(key)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return ""
+
+
+def iter_batch_queries(
+    stream: TextIO, fmt: str
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Stream query rows from a CSV or JSONL input.
+
+    Each row must carry a facility (``facility``/``facilityId``) and a title
+    (``title``/``jobTitleCanonical``/``jobTitle``). Other columns are passed
+    through untouched so callers can keep roster identifiers alongside results.
+
+    Args:
+        stream: Open text stream
+        fmt: "csv" or "jsonl"
+
+    Yields:
+        (line_number, row) tuples
+
+    Raises:
+        DataLoadError: If a JSONL line is not a JSON object
+    """
+    if fmt == "csv":
+        for line_no, row in enumerate(csv.DictReader(stream), start=2):
+            yield line_no, row
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise DataLoadError(f"Invalid JSON on input line {line_no}: {e}") from e
+        if not isinstance(row, dict):
+            raise DataLoadError(f"Input line {line_no} is not a JSON object")
+        yield line_no, row
+
+
+def flatten_report(report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten a report dictionary into one CSV row (see BATCH_CSV_COLUMNS).
+
+    Ranked sections are joined as ``name:count`` pairs separated by ``; ``;
+    nearby facilities as ``name:<distance>km``. Reports carrying a
+    ``titleMatch`` also get the BATCH_TITLE_MATCH_COLUMNS.
+    """
+    totals = report.get("facilityTotals") or {}
+    direct = report["directMatch"]
+    flat = {
+        "facilityId": report["facilityId"],
+        "title": report["title"],
+        "facilityTotalAffected": totals.get("totalAffected", ""),
+        "facilityJobTitleCount": totals.get("jobTitleCount", ""),
+        "facilityNoticeCount": totals.get("noticeCount", ""),
+        "directAffected": direct["affectedCount"],
+        "directNotices": ";".join(direct["notices"]),
+        "topTitles": "; ".join(f"{t['title']}:{t['affected']}" for t in report["topTitles"]),
+        "topFacilities": "; ".join(
+            f"{f['facilityId']}:{f['affected']}" for f in report["topFacilities"]
+        ),
+        "nearbyFacilities": "; ".join(
+            f"{f['facilityId']}:{f['distanceKm']}km" for f in report["nearbyFacilities"] or []
+        ),
+    }
+    match = report.get("titleMatch")
+    if match is not None:
+        flat["queryTitle"] = match["query"]
+        flat["titleConfidence"] = match["confidence"]
+        flat["titleMatchedVia"] = match["via"] or ""
+        flat["similarTitles"] = "; ".join(
+            f"{t['title']}:{t['confidence']}" for t in report.get("similarTitles") or []
+        )
+    return flat
+
+
+def run_batch(
+    index: Optional[ImpactIndex],
+    queries: Iterable[Tuple[int, Dict[str, Any]]],
+    out: TextIO,
+    out_format: str,
+    top_n: int = 10,
+    geocodes: Optional[Dict[str, Tuple[float, float]]] = None,
+    tree: Optional[SphereKDTree] = None,
+    nearest: int = 10,
+    radius_km: Optional[float] = None,
+    report_fn: Optional[Callable[[str, str], Dict[str, Any]]] = None,
+    matcher: Optional[TitleMatcher] = None,
+) -> int:
+    """
+    Evaluate every query row against a shared index and stream one result per row.
+
+    Args:
+        index: Prebuilt ImpactIndex (loaded once for the whole batch)
+        queries: Iterable of (line_number, row) from iter_batch_queries
+        out: Output text stream
+        out_format: "jsonl" or "csv"
+        top_n: Number of top results per ranked section
+        geocodes: Optional facility geocodes (enables the nearby section)
+        tree: Optional spatial index shared by every query
+        nearest: Number of nearby facilities per result
+        radius_km: Optional radius for the nearby section
+        report_fn: Optional (facility_id, title) -> report callable used instead
+            of build_report (e.g. ImpactDB.report for --db)
+        matcher: Optional TitleMatcher; when given, each title is resolved with
+            resolve_title and the report gains ``titleMatch``/``similarTitles``
+
+    Returns:
+        Number of rows written
+    """
+    writer: Optional[csv.DictWriter] = None
+    written = 0
+
+    for line_no, row in queries:
+        facility_id = _pick(row, BATCH_FACILITY_COLUMNS)
+        title = _pick(row, BATCH_TITLE_COLUMNS)
+        if not facility_id or not title:
+            logger.warning(f"Input line {line_no}: missing facility or title, skipped")
+            continue
+
+        title, title_match, similar = resolve_title(title, matcher, top_n)
+        if report_fn is not None:
+            report = report_fn(facility_id, title)
+        else:
+            report = build_report(
+                index, facility_id, title, top_n, geocodes, tree, nearest, radius_km
+            )
+        if title_match is not None:
+            report["titleMatch"] = title_match
+            report["similarTitles"] = similar
+
+        if out_format == "jsonl":
+            out.write(json.dumps({"input": row, **report}, ensure_ascii=False))
+            out.write("\n")
+        else:
+            flat = flatten_report(report)
+            passthrough = {f"input.{k}": v for k, v in row.items() if k is not None}
+            if writer is None:
+                writer = csv.DictWriter(
+                    out, fieldnames=list(passthrough.keys()) + list(flat.keys())
+                )
+                writer.writeheader()
+            writer.writerow({**passthrough, **flat})
+        written += 1
+
+    return written
 
 
 def print_report(
@@ -351,6 +894,10 @@ def print_report(
     top_titles: List[Tuple[str, int]],
     top_facilities: List[Tuple[str, int]],
     facility_notices: Dict[str, Set[str]],
+    nearby: Optional[List[Dict[str, Any]]] = None,
+    radius_km: Optional[float] = None,
+    title_match: Optional[Dict[str, Any]] = None,
+    similar_titles: Optional[List[Dict[str, Any]]] = None,
 ) -> None:
     """
     Print the risk assessment report to stdout.
@@ -364,6 +911,10 @@ def print_report(
         top_titles: Top job titles at the facility
         top_facilities: Top facilities for the job title
         facility_notices: Notice IDs by facility
+        nearby: Nearby impacted facilities (None if proximity was skipped)
+        radius_km: Radius used for the nearby search, if any
+        title_match: titleMatch from resolve_title (shown unless the title was exact)
+        similar_titles: Similar canonical titles from resolve_title
     """
     print()
     print("=" * 80)
@@ -371,6 +922,12 @@ def print_report(
     print("=" * 80)
     print(f"Facility: {facility_id}")
     print(f"Title:    {title}")
+    if title_match is not None and title_match["via"] != "exact":
+        if title_match["confidence"] == "High":
+            print(f"Entered:  {title_match['query']}  ({title_match['via']} match)")
+        else:
+            confidence = title_match["confidence"]
+            print(f"          (not a canonical title; best match confidence: {confidence})")
     print()
 
     # Facility totals
@@ -413,10 +970,84 @@ def print_report(
         print("  (Title not found in impact dataset)")
     print()
 
+    # Nearby impacted facilities
+    scope = f"within {radius_km:g} km" if radius_km is not None else "nearest"
+    print(f"Nearby Impacted Facilities ({scope}):")
+    print("-" * 40)
+    if nearby is None:
+        print("  (No geocode for this facility; proximity skipped)")
+    elif nearby:
+        for item in nearby:
+            print(
+                f"  {item['distanceKm']:>7.1f} km  {item['facilityId']:<15}  "
+                f"total={item['totalAffected']}  title={item['titleAffected']}"
+            )
+    else:
+        print("  (No impacted facilities found nearby)")
+    print()
+
+    # Suggestions for titles that did not resolve exactly
+    if title_match is not None and title_match["via"] != "exact":
+        print(f"Similar Titles to '{title_match['query']}':")
+        print("-" * 40)
+        if similar_titles:
+            for item in similar_titles:
+                print(f"  {item['affected'] or 0:>5}  {item['confidence']:<6}  {item['title']}")
+        else:
+            print("  (No similar titles in impact dataset)")
+        print()
+
     print("=" * 80)
     print()
 
 
+def load_index(
+    impacts_path: str,
+    facility_rollup_path: str,
+    snapshot_path: Optional[str] = None,
+    top_tables_path: Optional[str] = None,
+) -> ImpactIndex:
+    """
+    Build the ImpactIndex from the snapshot if it is current, otherwise from the CSVs.
+
+    Args:
+        impacts_path: Path to impacts_by_facility.csv
+        facility_rollup_path: Path to facility_rollup.csv
+        snapshot_path: Path to impacts.snapshot, or None to skip it
+        top_tables_path: Path to top_tables.json, or None to rank on each query
+
+    Returns:
+        Populated ImpactIndex
+
+    Raises:
+        DataLoadError: If the CSVs are needed and cannot be loaded
+    """
+    index = None
+    if snapshot_path:
+        snapshot, reason = load_current_snapshot(snapshot_path, impacts_path, facility_rollup_path)
+        if snapshot is not None:
+            logger.info(f"Loaded {len(snapshot)} impact records from snapshot")
+            logger.info(f"Loaded {len(snapshot.rollup_rows)} facility records from snapshot")
+            index = ImpactIndex.from_snapshot(snapshot)
+        elif Path(snapshot_path).exists():
+            logger.info(f"Not using snapshot ({reason}); reading CSVs")
+
+    if index is None:
+        impacts = load_csv(impacts_path)
+        facility_rollup = load_csv(facility_rollup_path)
+        logger.info(f"Loaded {len(impacts)} impact records")
+        logger.info(f"Loaded {len(facility_rollup)} facility records")
+        index = ImpactIndex.from_records(impacts, facility_rollup)
+
+    if top_tables_path:
+        index.top_tables, reason = load_current_tables(top_tables_path, impacts_path)
+        if index.top_tables is not None:
+            logger.info(f"Loaded top-{index.top_tables.k} tables from {top_tables_path}")
+        elif Path(top_tables_path).exists():
+            logger.info(f"Not using top tables ({reason})")
+    return index
+
+
 def parse_arguments() -> argparse.Namespace:
     """
     Parse command-line arguments.
@@ -432,6 +1063,8 @@ Examples:
   %(prog)s --facility SEA40 --title "Program Manager III"
   %(prog)s --facility SEA93 --title "SDE II" --nearest 5 --radius_km 30
   %(prog)s --facility REMOTE_WA --title "Product Manager" --top 15
+  %(prog)s --batch roster.csv --format csv --output results.csv
+  %(prog)s --stdin --format jsonl < queries.jsonl > results.jsonl
 
 For more information, see docs/SPEC.md
         """,
@@ -439,14 +1072,49 @@ For more information, see docs/SPEC.md
 
     parser.add_argument(
         "--facility",
-        required=True,
         help="Facility ID (e.g., SEA40, SEA93, REMOTE_WA)",
     )
 
     parser.add_argument(
         "--title",
-        required=True,
-        help="Job title canonical string (exact match required)",
+        help="Job title; abbreviations and aliases resolve to the canonical title (e.g. \"SDE 2\")",
+    )
+
+    parser.add_argument(
+        "--aliases",
+        default=r"data\normalized\job_title_aliases.json",
+        help="Job title alias file (default: data/normalized/job_title_aliases.json)",
+    )
+
+    parser.add_argument(
+        "--exact_title",
+        action="store_true",
+        help="Use --title and batch titles exactly as given (no normalization or suggestions)",
+    )
+
+    batch = parser.add_mutually_exclusive_group()
+    batch.add_argument(
+        "--batch",
+        metavar="INPUT_CSV",
+        help="Evaluate every row of a CSV with facility/title columns (loads data once)",
+    )
+    batch.add_argument(
+        "--stdin",
+        action="store_true",
+        help="Evaluate JSONL queries read from stdin, one object per line",
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "csv"],
+        default="jsonl",
+        help="Batch output format (default: jsonl)",
+    )
+
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Batch output path, or - for stdout (default: -)",
     )
 
     parser.add_argument(
@@ -467,6 +1135,32 @@ For more information, see docs/SPEC.md
         help="Path to geocodes CSV (default: data/normalized/facility_geocodes.csv)",
     )
 
+    parser.add_argument(
+        "--snapshot",
+        default=r"data\exports\impacts.snapshot",
+        help="Binary snapshot of the two CSVs above; used when current, else the CSVs are read "
+        "(default: data/exports/impacts.snapshot)",
+    )
+
+    parser.add_argument(
+        "--top_tables",
+        default=r"data\exports\top_tables.json",
+        help="Precomputed top titles/facilities; used when current, else ranked per query "
+        "(default: data/exports/top_tables.json)",
+    )
+
+    parser.add_argument(
+        "--db",
+        default=None,
+        help="Answer from a SQLite database built by tools/impact_db.py instead of the CSVs",
+    )
+
+    parser.add_argument(
+        "--no_snapshot",
+        action="store_true",
+        help="Always read the CSVs, even if a current snapshot exists",
+    )
+
     parser.add_argument(
         "--top",
         type=int,
@@ -478,7 +1172,7 @@ For more information, see docs/SPEC.md
         "--nearest",
         type=int,
         default=10,
-        help="Number of nearest facilities to show (default: 10)",
+        help="Number of nearest impacted facilities to show, 0 for no limit (default: 10)",
     )
 
     parser.add_argument(
@@ -495,7 +1189,125 @@ For more information, see docs/SPEC.md
         help="Enable verbose logging",
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not (args.batch or args.stdin) and not (args.facility and args.title):
+        parser.error("--facility and --title are required unless --batch or --stdin is given")
+    return args
+
+
+def main_batch(
+    args: argparse.Namespace,
+    index: Optional[ImpactIndex],
+    geocodes: Optional[Dict[str, Tuple[float, float]]],
+    tree: Optional[SphereKDTree],
+    report_fn: Optional[Callable[[str, str], Dict[str, Any]]] = None,
+    matcher: Optional[TitleMatcher] = None,
+) -> int:
+    """
+    Run batch mode: stream queries from --batch CSV or --stdin JSONL.
+
+    Args:
+        args: Parsed arguments
+        index: Prebuilt ImpactIndex shared by every query
+        geocodes: Facility geocodes
+        tree: Spatial index shared by every query
+        report_fn: Optional report callable used instead of the index (--db)
+        matcher: Optional TitleMatcher for free-text titles
+
+    Returns:
+        Exit code
+    """
+    if args.batch:
+        in_stream: TextIO = open(args.batch, "r", newline="", encoding="utf-8-sig")
+        in_format = "csv"
+    else:
+        in_stream = sys.stdin
+        in_format = "jsonl"
+
+    if args.output == "-":
+        out_stream: TextIO = sys.stdout
+    else:
+        out_stream = open(args.output, "w", newline="", encoding="utf-8")
+
+    try:
+        written = run_batch(
+            index,
+            iter_batch_queries(in_stream, in_format),
+            out_stream,
+            args.format,
+            args.top,
+            geocodes,
+            tree,
+            args.nearest,
+            args.radius_km,
+            report_fn,
+            matcher,
+        )
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+
+    logger.info(f"Batch complete: {written} results written")
+    return 0
+
+
+def main_db(args: argparse.Namespace) -> int:
+    """
+    Run single or batch mode against a SQLite database (--db).
+
+    Every report section is an indexed query, so nothing is loaded up front.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Exit code
+    """
+    # Imported here: impact_db builds on this module
+    try:
+        from .impact_db import ImpactDB, ImpactDBError
+    except ImportError:
+        from impact_db import ImpactDB, ImpactDBError
+
+    try:
+        db = ImpactDB(args.db)
+    except ImpactDBError as e:
+        # impact_db sees this module under its import name, not __main__
+        raise DataLoadError(str(e)) from e
+    logger.info(f"Using database {args.db}")
+    try:
+        matcher = None if args.exact_title else build_title_matcher(db.title_totals(), args.aliases)
+        if args.batch or args.stdin:
+            return main_batch(
+                args, None, None, None,
+                lambda f, t: db.report(f, t, args.top, args.nearest, args.radius_km),
+                matcher,
+            )
+
+        facility_id = args.facility.strip()
+        title, title_match, similar = resolve_title(args.title.strip(), matcher, args.top)
+        top_facilities, facility_notices = db.top_facilities(title, args.top)
+        direct_total, direct_notices = db.direct_match(facility_id, title)
+        print_report(
+            facility_id,
+            title,
+            db.facility_metadata(facility_id),
+            direct_total,
+            direct_notices,
+            db.top_titles(facility_id, args.top),
+            top_facilities,
+            facility_notices,
+            db.nearby(facility_id, title, args.nearest, args.radius_km),
+            args.radius_km,
+            title_match,
+            similar,
+        )
+        logger.info("Assessment complete")
+        return 0
+    finally:
+        db.close()
 
 
 def main() -> int:
@@ -513,35 +1325,50 @@ def main() -> int:
             logger.setLevel(logging.DEBUG)
             logger.debug("Verbose logging enabled")
 
-        # Normalize inputs
-        facility_id = args.facility.strip()
-        title = args.title.strip()
+        if args.db:
+            return main_db(args)
 
         logger.info("Loading data files...")
 
-        # Load data
-        impacts = load_csv(args.impacts)
-        facility_rollup = load_csv(args.facility_rollup)
+        # Load data and build lookup tables once; every section below is a dict lookup
+        index = load_index(
+            args.impacts,
+            args.facility_rollup,
+            None if args.no_snapshot else args.snapshot,
+            args.top_tables,
+        )
         geocodes = load_geocodes_csv(args.geocodes)
-
-        logger.info(f"Loaded {len(impacts)} impact records")
-        logger.info(f"Loaded {len(facility_rollup)} facility records")
         logger.info(f"Loaded {len(geocodes)} geocode records")
 
+        tree = build_spatial_index(index, geocodes)
+        matcher = None
+        if not args.exact_title:
+            matcher = build_title_matcher(index.title_totals, args.aliases)
+
+        if args.batch or args.stdin:
+            return main_batch(args, index, geocodes, tree, None, matcher)
+
+        # Normalize inputs; free-text titles resolve to a canonical title when unambiguous
+        facility_id = args.facility.strip()
+        title, title_match, similar = resolve_title(args.title.strip(), matcher, args.top)
+
         # Find facility metadata
-        facility_metadata = find_facility_metadata(facility_id, facility_rollup)
+        facility_metadata = find_facility_metadata(facility_id, index)
 
         # Calculate direct match
-        direct_total, direct_notices = calculate_direct_match(
-            facility_id, title, impacts
-        )
+        direct_total, direct_notices = calculate_direct_match(facility_id, title, index)
 
         # Get top titles at facility
-        top_titles = get_top_titles_at_facility(facility_id, impacts, args.top)
+        top_titles = get_top_titles_at_facility(facility_id, index, args.top)
 
         # Get top facilities for title
         top_facilities, facility_notices = get_top_facilities_for_title(
-            title, impacts, args.top
+            title, index, args.top
+        )
+
+        # Find nearby impacted facilities
+        nearby = get_nearby_facilities(
+            facility_id, title, index, geocodes, tree, args.nearest, args.radius_km
         )
 
         # Print report
@@ -554,6 +1381,10 @@ def main() -> int:
             top_titles,
             top_facilities,
             facility_notices,
+            nearby,
+            args.radius_km,
+            title_match,
+            similar,
         )
 
         logger.info("Assessment complete")
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Risk Assessment Query Server
+
+A small long-running HTTP server that loads the exports once and answers the
+same report as tools/risk_assessment.py as JSON. It also serves the map
+(app/public), including facilities.geojson, with ETag revalidation and gzip
+(one ETag per Content-Encoding). HEAD is answered like GET without the body.
+Precompressed siblings written by the exporters (facilities.geojson.br/.gz)
+are sent as-is when the client accepts that encoding.
+
+Endpoints:
+    GET /api/assess?facility=SEA40&title=Program+Manager+III
+        [&top=10&nearest=10&radius_km=30&exact=1]
+    GET /api/titles?q=sde+2[&k=10]  (canonical match and similar titles for free text)
+    GET /api/health
+    GET /<static file>              (default: index.html from app/public)
+
+Usage:
+    python tools/risk_server.py
+    python tools/risk_server.py --port 8000 --static_dir app/public
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import re
+import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from risk_assessment import (
+    DataLoadError,
+    ImpactIndex,
+    build_report,
+    build_spatial_index,
+    build_title_matcher,
+    load_geocodes_csv,
+    load_index,
+    resolve_title,
+)
+
+logger = logging.getLogger("risk_server")
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+# Content-Encoding -> suffix of a precompressed sibling file, in order of preference
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+mimetypes.add_type("application/geo+json", ".geojson")
+
+# One entity tag in an If-None-Match list, weak or strong
+_ETAG_RE = re.compile(r'(?:W/)?("[^"]*")')
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Return True if an If-None-Match header matches etag.
+
+    Handles "*", comma-separated lists and W/ prefixes; If-None-Match uses the
+    weak comparison, so W/"x" matches "x".
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return etag in _ETAG_RE.findall(if_none_match)
+
+
+class StaticFile:
+    """A static file held in memory with its ETag and compressed variants."""
+
+    def __init__(self, path: Path) -> None:
+        stat = path.stat()
+        self.path = path
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        self.body = path.read_bytes()
+        self.digest = hashlib.sha1(self.body).hexdigest()
+        self.content_type = mimetypes.guess_type(str(path))[0] or "application/octet-stream"
+
+        # Content-Encoding -> body. Siblings only count when written after the file itself.
+        self.encoded: Dict[str, bytes] = {}
+        self._siblings: Dict[Path, float] = {}
+        for encoding, suffix in PRECOMPRESSED:
+            sibling = path.with_name(path.name + suffix)
+            try:
+                sibling_stat = sibling.stat()
+            except OSError:
+                continue
+            if sibling_stat.st_mtime >= self.mtime:
+                self.encoded[encoding] = sibling.read_bytes()
+                self._siblings[sibling] = sibling_stat.st_mtime
+        if "gzip" not in self.encoded and len(self.body) >= GZIP_MIN_BYTES:
+            self.encoded["gzip"] = gzip.compress(self.body, compresslevel=6)
+
+    def is_stale(self) -> bool:
+        """Return True if the file (or a precompressed sibling) changed since it was loaded."""
+        try:
+            stat = self.path.stat()
+            if stat.st_mtime != self.mtime or stat.st_size != self.size:
+                return True
+            return any(
+                sibling.stat().st_mtime != mtime for sibling, mtime in self._siblings.items()
+            )
+        except OSError:
+            return True
+
+    def encoding_for(self, accept_encoding: str) -> Optional[str]:
+        """Pick the preferred encoding the client accepts, or None for the plain body."""
+        accepted = {token.split(";")[0].strip().lower() for token in accept_encoding.split(",")}
+        for encoding, _ in PRECOMPRESSED:
+            if encoding in self.encoded and encoding in accepted:
+                return encoding
+        return None
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong ETag of the representation sent with this Content-Encoding (None: plain body)."""
+        if encoding is None:
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+
+class RiskService:
+    """
+    Shared, read-only state for request handlers.
+
+    Data files are loaded once at startup; static files are loaded on first
+    request and reloaded when they change on disk (e.g., after a map rebuild).
+    """
+
+    def __init__(
+        self,
+        impacts_path: str,
+        facility_rollup_path: str,
+        geocodes_path: str,
+        static_dir: Path,
+        snapshot_path: Optional[str] = None,
+        aliases_path: Optional[str] = None,
+        top_tables_path: Optional[str] = None,
+    ) -> None:
+        started = time.perf_counter()
+        self.index: ImpactIndex = load_index(
+            impacts_path, facility_rollup_path, snapshot_path, top_tables_path
+        )
+        self.geocodes = load_geocodes_csv(geocodes_path)
+        self.tree = build_spatial_index(self.index, self.geocodes)
+        self.matcher = build_title_matcher(self.index.title_totals, aliases_path)
+        self.static_dir = static_dir.resolve()
+        self._static: Dict[Path, StaticFile] = {}
+        self._lock = threading.Lock()
+
+        seconds = time.perf_counter() - started
+        logger.info(
+            f"Loaded {self.index.record_count} impact records, {len(self.index.facility_metadata)} "
+            f"facility records, {len(self.geocodes)} geocodes in {seconds:.3f}s"
+        )
+
+    def assess(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Build a report from query parameters.
+
+        Raises:
+            ValueError: If a required parameter is missing or malformed
+        """
+        facility_id = (params.get("facility") or "").strip()
+        if not facility_id:
+            raise ValueError("missing required parameter: facility")
+        title = (params.get("title") or "").strip()
+
+        top_n = int(params.get("top") or 10)
+        nearest = int(params.get("nearest") or 10)
+        radius_raw = (params.get("radius_km") or "").strip()
+        radius_km = float(radius_raw) if radius_raw else None
+
+        if params.get("exact") in ("1", "true"):
+            return build_report(
+                self.index, facility_id, title, top_n, self.geocodes, self.tree, nearest, radius_km
+            )
+        title, title_match, similar = resolve_title(title, self.matcher, top_n)
+        report = build_report(
+            self.index, facility_id, title, top_n, self.geocodes, self.tree, nearest, radius_km
+        )
+        report["titleMatch"] = title_match
+        report["similarTitles"] = similar
+        return report
+
+    def titles(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Resolve free text to a canonical title and list similar titles.
+
+        Raises:
+            ValueError: If q is missing or k is malformed
+        """
+        query = (params.get("q") or "").strip()
+        if not query:
+            raise ValueError("missing required parameter: q")
+        k = int(params.get("k") or 10)
+        match = self.matcher.match(query)
+        return {
+            "query": query,
+            "match": match.to_dict() if match else None,
+            "similarTitles": [
+                m.to_dict()
+                for m in self.matcher.similar(query, k, exclude=match.title if match else None)
+            ],
+        }
+
+    def health(self) -> Dict[str, Any]:
+        """Summarize what the server has loaded."""
+        return {
+            "status": "ok",
+            "impactRecords": self.index.record_count,
+            "facilities": len(self.index.facility_totals),
+            "titles": len(self.index.title_totals),
+            "geocodes": len(self.geocodes),
+        }
+
+    def static_file(self, url_path: str) -> Optional[StaticFile]:
+        """
+        Resolve a URL path to a cached static file under static_dir.
+
+        Returns None for missing files and for paths that escape static_dir.
+        """
+        rel = unquote(url_path).lstrip("/") or "index.html"
+        path = (self.static_dir / rel).resolve()
+        try:
+            path.relative_to(self.static_dir)
+        except ValueError:
+            return None
+        if not path.is_file():
+            return None
+
+        with self._lock:
+            cached = self._static.get(path)
+            if cached is None or cached.is_stale():
+                cached = StaticFile(path)
+                self._static[path] = cached
+            return cached
+
+
+class RiskRequestHandler(BaseHTTPRequestHandler):
+    """Routes /api/* to the RiskService and everything else to static files."""
+
+    server_version = "RiskServer/1.0"
+    service: RiskService  # injected by make_server
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+        self._route(head_only=False)
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        self._route(head_only=True)
+
+    def _route(self, head_only: bool) -> None:
+        """Answer GET and HEAD alike; HEAD only leaves out the body."""
+        parts = urlsplit(self.path)
+        if parts.path in ("/api/assess", "/api/titles"):
+            params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+            handler = self.service.assess if parts.path == "/api/assess" else self.service.titles
+            try:
+                self._send_json(handler(params), head_only=head_only)
+            except ValueError as e:
+                self._send_json({"error": str(e)}, HTTPStatus.BAD_REQUEST, head_only)
+            return
+        if parts.path == "/api/health":
+            self._send_json(self.service.health(), head_only=head_only)
+            return
+        self._send_static(parts.path, head_only)
+
+    def _send_json(
+        self, payload: Dict[str, Any], status: HTTPStatus = HTTPStatus.OK, head_only: bool = False
+    ) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def _send_static(self, url_path: str, head_only: bool) -> None:
+        entry = self.service.static_file(url_path)
+        if entry is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        # Each encoding is its own representation, so it gets its own ETag
+        encoding = entry.encoding_for(self.headers.get("Accept-Encoding") or "")
+        etag = entry.etag_for(encoding)
+        if etag_matches(self.headers.get("If-None-Match") or "", etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        body = entry.body
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", entry.content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            body = entry.encoded[encoding]
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(host: str, port: int, service: RiskService) -> ThreadingHTTPServer:
+    """Create (but do not start) a threaded HTTP server bound to ``service``."""
+    handler = type("BoundRiskRequestHandler", (RiskRequestHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse command-line arguments.
+
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve risk assessment lookups and the facility map over HTTP",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    parser.add_argument(
+        "--impacts",
+        default=str(REPO_ROOT / "data" / "exports" / "impacts_by_facility.csv"),
+        help="Path to impacts CSV file",
+    )
+    parser.add_argument(
+        "--facility_rollup",
+        default=str(REPO_ROOT / "data" / "exports" / "facility_rollup.csv"),
+        help="Path to facility rollup CSV",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=str(REPO_ROOT / "data" / "exports" / "impacts.snapshot"),
+        help="Binary impact snapshot, used when it matches the CSVs",
+    )
+    parser.add_argument(
+        "--top_tables",
+        default=str(REPO_ROOT / "data" / "exports" / "top_tables.json"),
+        help="Precomputed top titles/facilities, used when they match the impacts CSV",
+    )
+    parser.add_argument(
+        "--geocodes",
+        default=str(REPO_ROOT / "data" / "normalized" / "facility_geocodes.csv"),
+        help="Path to geocodes CSV",
+    )
+    parser.add_argument(
+        "--aliases",
+        default=str(REPO_ROOT / "data" / "normalized" / "job_title_aliases.json"),
+        help="Job title alias file used to resolve free-text titles",
+    )
+    parser.add_argument(
+        "--static_dir",
+        default=str(REPO_ROOT / "app" / "public"),
+        help="Directory served for non-API paths (default: app/public)",
+    )
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log every request")
+    return parser.parse_args()
+
+
+def main() -> int:
+    """
+    Main entry point for the query server.
+
+    Returns:
+        Exit code (0 for success, non-zero for errors)
+    """
+    args = parse_arguments()
+
+    # risk_assessment configures the root handler (stderr) on import
+    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+
+    try:
+        service = RiskService(
+            args.impacts,
+            args.facility_rollup,
+            args.geocodes,
+            Path(args.static_dir),
+            args.snapshot,
+            args.aliases,
+            args.top_tables,
+        )
+    except DataLoadError as e:
+        logger.error(f"Data loading error: {e}")
+        return 1
+
+    server = make_server(args.host, args.port, service)
+    logger.info(f"Serving on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server stopped")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
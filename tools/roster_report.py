@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Roster Impact Report
+
+Assigns every employee of an HR roster (facility, title, remote flag and
+state, team) a docs/SCORING.md tier with scoring.score_roster, and summarizes
+the tiers per team. Like scoring.py it reports what the notices say, not a
+prediction.
+
+    High     the notices list their title (High-confidence match) at their facility
+    Medium   their facility is in a notice with other titles, their title is a
+             Medium-confidence match there, or the title is listed without a facility
+    Low      affected facilities within scoring.NEARBY_RADIUS_KM, or the title
+             (or only similar titles) listed elsewhere
+    Unknown  nothing in the notices relates to them
+
+The rules, the nearby radius and the remote handling are scoring.py's: a
+remote employee is also scored against REMOTE_<state> only when a notice's
+remote clause names the state they reside in.
+
+The roster is split into byte ranges on line boundaries and the shards are
+scored on a process pool. Workers read their own shard from disk and share
+one read-only ScoringIndex: on platforms with fork they inherit the parent's,
+and elsewhere each worker builds it from combined.json. Each distinct
+(facility, title, remote, state) key is scored once per worker (results are
+cached on the index across shards), so cost grows with roster size only
+through CSV parsing and counting, which spread evenly across the workers.
+Workers return per-team counts, merged in shard order.
+
+Roster columns (first non-empty wins, other columns are ignored):
+    facility      facility, facilityId, facility_id
+    title         title, jobTitle, jobTitleCanonical, job_title
+    remote        isRemote, remote, is_remote                 (1/true/yes/y/t)
+    remote state  remoteState, remote_state, state
+    team          team, teamName, team_name, department, org
+    employee      employeeId, employee_id, id, alias          (only for --employees)
+
+Records must be one per line (no quoted newlines). Rows with neither a
+facility nor a title are skipped.
+
+Output (in --out_dir, default data/roster/):
+    team_summary.csv    one row per team, most High first
+    roster_summary.json totals, per-team tier counts and each team's most
+                        common High facility/title pairs
+    employees.csv       with --employees: one row per scored employee
+
+Usage:
+    python tools/roster_report.py roster.csv
+    python tools/roster_report.py roster.csv --jobs 8 --employees
+
+Version: 1.1.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import instrumentation
+from risk_assessment import DataLoadError, logger
+from scoring import (
+    DEFAULT_ALIASES,
+    DEFAULT_COMBINED,
+    DEFAULT_GEOCODES,
+    NEARBY_RADIUS_KM,
+    ROSTER_FACILITY_COLUMNS,
+    ROSTER_REMOTE_COLUMNS,
+    ROSTER_STATE_COLUMNS,
+    ROSTER_TITLE_COLUMNS,
+    TIER_HIGH,
+    TIERS,
+    TRUE_VALUES,
+    ScoringIndex,
+    load_scoring_index,
+    remote_facility,
+    score_roster,
+)
+from top_tables import top_k
+
+TEAM_COLUMNS = ["team", "teamName", "team_name", "department", "org"]
+EMPLOYEE_COLUMNS = ["employeeId", "employee_id", "id", "alias"]
+
+NO_TEAM = "(no team)"
+
+# Shards per worker; smaller shards even out workers that get slower parts of the file
+SHARDS_PER_JOB = 4
+
+# Most common High (facility, title) pairs listed per team in the JSON
+TEAM_TOP_PAIRS = 5
+
+TEAM_SUMMARY_COLUMNS = [
+    "team",
+    "employees",
+    "remote",
+    "remoteInScope",
+    "high",
+    "medium",
+    "low",
+    "unknown",
+    "highShare",
+    "unknownFacilities",
+    "unmatchedTitles",
+]
+EMPLOYEE_COLUMNS_OUT = [
+    "employeeId",
+    "team",
+    "facilityId",
+    "title",
+    "remote",
+    "remoteState",
+    "jobTitleCanonical",
+    "jobTitleConfidence",
+    "tier",
+    "noticeIds",
+]
+
+
+class TeamSummary:
+    """Tier counts for one team; merged across shards by addition."""
+
+    __slots__ = (
+        "employees",
+        "remote",
+        "remote_in_scope",
+        "tiers",
+        "unknown_facilities",
+        "unmatched_titles",
+        "high_pairs",
+    )
+
+    def __init__(self) -> None:
+        self.employees = 0
+        self.remote = 0
+        self.remote_in_scope = 0
+        self.tiers = [0] * len(TIERS)
+        self.unknown_facilities = 0
+        self.unmatched_titles = 0
+        self.high_pairs: Counter = Counter()
+
+    def merge(self, other: TeamSummary) -> None:
+        self.employees += other.employees
+        self.remote += other.remote
+        self.remote_in_scope += other.remote_in_scope
+        self.tiers = [a + b for a, b in zip(self.tiers, other.tiers)]
+        self.unknown_facilities += other.unknown_facilities
+        self.unmatched_titles += other.unmatched_titles
+        self.high_pairs.update(other.high_pairs)
+
+    def csv_row(self, team: str) -> List[Any]:
+        share = self.tiers[0] / self.employees if self.employees else 0.0
+        return [
+            team,
+            self.employees,
+            self.remote,
+            self.remote_in_scope,
+            *self.tiers,
+            f"{share:.4f}",
+            self.unknown_facilities,
+            self.unmatched_titles,
+        ]
+
+    def to_json(self, team: str) -> Dict[str, Any]:
+        return {
+            "team": team,
+            "employees": self.employees,
+            "remote": self.remote,
+            "remoteInScope": self.remote_in_scope,
+            "tiers": dict(zip(TIERS, self.tiers)),
+            "unknownFacilities": self.unknown_facilities,
+            "unmatchedTitles": self.unmatched_titles,
+            "topHighPairs": [
+                {"facilityId": fid, "jobTitleCanonical": title, "employees": n}
+                for (fid, title), n in top_k(self.high_pairs, TEAM_TOP_PAIRS)
+            ],
+        }
+
+
+# Set in the parent before forking, or by _init_worker in each spawned worker
+_INDEX: Optional[ScoringIndex] = None
+
+
+def load_index(args: argparse.Namespace) -> ScoringIndex:
+    return load_scoring_index(args.combined, args.geocodes, args.aliases)
+
+
+def _init_worker(args: argparse.Namespace) -> None:
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = load_index(args)
+
+
+def shard_ranges(path: str, shards: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Split a roster CSV into byte ranges that start and end on line boundaries.
+
+    Returns:
+        (header columns, [(start, end)]) with empty ranges dropped
+    """
+    with open(path, "rb") as f:
+        header_line = f.readline()
+        body_start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        header = next(csv.reader([header_line.decode("utf-8-sig")]), [])
+        bounds = [body_start]
+        for i in range(1, shards):
+            target = body_start + (size - body_start) * i // shards
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # finish the line the target falls in
+            bounds.append(min(f.tell(), size))
+        bounds.append(size)
+    ranges = [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+    return header, ranges
+
+
+def _columns(header: List[str], candidates: List[str]) -> List[int]:
+    # Positions of the candidate columns present in the header, in candidate order
+    return [header.index(name) for name in candidates if name in header]
+
+
+def _pick_at(values: List[str], positions: List[int]) -> str:
+    """Like scoring._column, over a csv.reader row and precomputed positions."""
+    for i in positions:
+        if i < len(values):
+            value = values[i].strip()
+            if value:
+                return value
+    return ""
+
+
+def assess_shard(
+    task: Tuple[str, List[str], int, int, Optional[str]]
+) -> Tuple[Dict[str, TeamSummary], int, int]:
+    """
+    Score one byte range of the roster.
+
+    Args:
+        task: (roster path, header, start, end, employees part path or None)
+
+    Returns:
+        ({team: TeamSummary}, rows scored, rows skipped)
+    """
+    path, header, start, end, part_path = task
+    index = _INDEX
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    facility_at = _columns(header, ROSTER_FACILITY_COLUMNS)
+    title_at = _columns(header, ROSTER_TITLE_COLUMNS)
+    remote_at = _columns(header, ROSTER_REMOTE_COLUMNS)
+    state_at = _columns(header, ROSTER_STATE_COLUMNS)
+    team_at = _columns(header, TEAM_COLUMNS)
+    employee_at = _columns(header, EMPLOYEE_COLUMNS)
+
+    facility_ids: List[str] = []
+    titles: List[str] = []
+    remotes: List[bool] = []
+    states: List[str] = []
+    teams_of: List[str] = []
+    employee_ids: List[str] = []
+    skipped = 0
+    for values in csv.reader(io.StringIO(text)):
+        if not values:
+            continue
+        facility_id = _pick_at(values, facility_at)
+        title = _pick_at(values, title_at)
+        if not facility_id and not title:
+            skipped += 1
+            continue
+        facility_ids.append(facility_id)
+        titles.append(title)
+        remotes.append(_pick_at(values, remote_at).lower() in TRUE_VALUES)
+        states.append(_pick_at(values, state_at))
+        teams_of.append(_pick_at(values, team_at) or NO_TEAM)
+        if part_path:
+            employee_ids.append(_pick_at(values, employee_at))
+
+    scores = score_roster(index, facility_ids, titles, remotes, states)
+
+    teams: Dict[str, TeamSummary] = {}
+    tier_at = {tier: i for i, tier in enumerate(TIERS)}
+    part = open(part_path, "w", newline="", encoding="utf-8") if part_path else None
+    writer = csv.writer(part) if part else None
+    try:
+        for i, result in enumerate(scores):
+            team = teams_of[i]
+            summary = teams.get(team)
+            if summary is None:
+                summary = teams[team] = TeamSummary()
+            summary.employees += 1
+            summary.tiers[tier_at[result.tier]] += 1
+            remote = remotes[i]
+            if remote:
+                summary.remote += 1
+                if remote_facility(index, True, states[i]):
+                    summary.remote_in_scope += 1
+            if titles[i] and result.title_canonical is None:
+                summary.unmatched_titles += 1
+            fid = result.facility_id
+            if fid and fid not in index.facility_listings and fid not in index.geocodes:
+                summary.unknown_facilities += 1
+            if result.tier == TIER_HIGH:
+                summary.high_pairs[(fid, result.title_canonical)] += 1
+            if writer is not None:
+                writer.writerow(
+                    [
+                        employee_ids[i],
+                        team,
+                        fid,
+                        titles[i],
+                        "true" if remote else "false",
+                        states[i].upper() if remote else "",
+                        result.title_canonical or "",
+                        result.title_confidence,
+                        result.tier,
+                        ";".join(result.notice_ids()),
+                    ]
+                )
+    finally:
+        if part is not None:
+            part.close()
+    return teams, len(scores), skipped
+
+
+def run(args: argparse.Namespace, prof: instrumentation.Profiler) -> Dict[str, Any]:
+    """Score the roster and write the summaries; returns the JSON summary."""
+    global _INDEX
+    started = time.perf_counter()
+    jobs = args.jobs or os.cpu_count() or 1
+    start_methods = multiprocessing.get_all_start_methods()
+    use_fork = jobs > 1 and "fork" in start_methods
+
+    # With fork the workers inherit the parent's index; otherwise each loads its own
+    if jobs == 1 or use_fork:
+        _INDEX = load_index(args)
+        prof.lap("load")
+
+    header, ranges = shard_ranges(args.roster, jobs * SHARDS_PER_JOB if jobs > 1 else 1)
+    os.makedirs(args.out_dir, exist_ok=True)
+    parts_dir = os.path.join(args.out_dir, ".parts")
+    if args.employees:
+        os.makedirs(parts_dir, exist_ok=True)
+    tasks = [
+        (
+            args.roster,
+            header,
+            a,
+            b,
+            os.path.join(parts_dir, f"part-{i:05d}.csv") if args.employees else None,
+        )
+        for i, (a, b) in enumerate(ranges)
+    ]
+
+    if jobs == 1:
+        results = [assess_shard(t) for t in tasks]
+    else:
+        ctx = multiprocessing.get_context("fork" if use_fork else "spawn")
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=ctx, initializer=_init_worker, initargs=(args,)
+        ) as pool:
+            results = list(pool.map(assess_shard, tasks))
+
+    teams: Dict[str, TeamSummary] = {}
+    assessed = skipped = 0
+    for shard_teams, n, s in results:
+        assessed += n
+        skipped += s
+        for team, summary in shard_teams.items():
+            if team in teams:
+                teams[team].merge(summary)
+            else:
+                teams[team] = summary
+    prof.lap("assess", rows=assessed + skipped)
+
+    # Most High first, then by team name
+    order = sorted(teams, key=lambda t: (-teams[t].tiers[0], -teams[t].employees, t))
+    total = TeamSummary()
+    for summary in teams.values():
+        total.merge(summary)
+
+    summary_csv = os.path.join(args.out_dir, "team_summary.csv")
+    with open(summary_csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(TEAM_SUMMARY_COLUMNS)
+        w.writerows(teams[t].csv_row(t) for t in order)
+
+    report = {
+        "version": 2,
+        "roster": args.roster,
+        "employees": assessed,
+        "skipped": skipped,
+        "jobs": jobs,
+        "shards": len(tasks),
+        "radiusKm": NEARBY_RADIUS_KM,
+        "tiers": dict(zip(TIERS, total.tiers)),
+        "remote": total.remote,
+        "remoteInScope": total.remote_in_scope,
+        "unknownFacilities": total.unknown_facilities,
+        "unmatchedTitles": total.unmatched_titles,
+        "teams": [teams[t].to_json(t) for t in order],
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    summary_json = os.path.join(args.out_dir, "roster_summary.json")
+    with open(summary_json, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+    written = [summary_csv, summary_json]
+    if args.employees:
+        employees_csv = os.path.join(args.out_dir, "employees.csv")
+        with open(employees_csv, "w", newline="", encoding="utf-8") as out:
+            csv.writer(out).writerow(EMPLOYEE_COLUMNS_OUT)
+            for _, _, _, _, part_path in tasks:
+                with open(part_path, "r", newline="", encoding="utf-8") as part:
+                    shutil.copyfileobj(part, out)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        written.append(employees_csv)
+    prof.lap("write", rows=len(teams))
+
+    for path in written:
+        print(f"OK: wrote {path}")
+    print(
+        f"  employees={assessed} skipped={skipped} teams={len(teams)} "
+        f"jobs={jobs} shards={len(tasks)}"
+    )
+    print("  " + " ".join(f"{k}={v}" for k, v in report["tiers"].items()))
+    if skipped:
+        logger.warning(f"{skipped} roster rows had neither a facility nor a title and were skipped")
+    return report
+
+
+def parse_arguments() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        description="Assign docs/SCORING.md tiers to each employee of a roster, summarized per team"
+    )
+    ap.add_argument("roster", help="Roster CSV (facility, title, team, remote and state columns)")
+    ap.add_argument("--out_dir", default=os.path.join("data", "roster"))
+    ap.add_argument("--jobs", type=int, default=0, help="Worker processes (default: one per CPU)")
+    ap.add_argument(
+        "--employees", action="store_true", help="Also write one row per employee to employees.csv"
+    )
+    ap.add_argument("--combined", default=DEFAULT_COMBINED)
+    ap.add_argument("--geocodes", default=DEFAULT_GEOCODES)
+    ap.add_argument("--aliases", default=DEFAULT_ALIASES)
+    instrumentation.add_arguments(ap)
+    return ap.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    prof = instrumentation.start("roster_report", args)
+    try:
+        run(args, prof)
+    except DataLoadError as e:
+        logger.error(f"Data loading error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,904 @@
+#!/usr/bin/env python3
+"""
+Tier Scoring Engine
+
+Implements the deterministic tier rules in docs/SCORING.md (High / Medium /
+Low / Unknown) with plain-language reasons and structured evidence.
+
+The rules are pure functions over a ScoringIndex, which is built once from
+combined.json (plus geocodes and the title alias file). Every lookup a rule
+needs is a dict access on that index.
+
+score_roster() scores a whole roster given as parallel sequences (facility,
+title, remote flag, remote state). It resolves each distinct title once and
+scores each distinct (facility, title, remote, state) key once. Every row then
+points at its key's result. Rosters repeat the same facility/title pairs
+heavily, so 100k employees typically reduce to a few thousand scorings. Title
+resolutions, similar titles, nearby facilities and key results are cached on
+the ScoringIndex, so later calls (e.g. one per roster shard) only pay for keys
+they have not seen. Each cache is capped (least recently used entries go
+first), so a long-lived index serving many rosters stays bounded in memory.
+
+Usage:
+    python tools/scoring.py --facility SEA40 --title "Program Manager III"
+    python tools/scoring.py --facility REMOTE_WA --title "sde 2" --remote --remote_state WA
+    python tools/scoring.py --roster roster.csv --output tiers.csv
+    python tools/scoring.py --roster roster.csv --format jsonl --output tiers.jsonl
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import operator
+import os
+import sys
+import time
+from array import array
+from collections import Counter, OrderedDict, defaultdict
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from reconcile import reconcile
+from risk_assessment import NON_PHYSICAL_FACILITIES, DataLoadError, load_geocodes_csv, logger
+from spatial_index import SphereKDTree
+from title_matcher import TitleMatcher, load_aliases
+
+DEFAULT_COMBINED = os.path.join("data", "normalized", "combined.json")
+DEFAULT_GEOCODES = os.path.join("data", "normalized", "facility_geocodes.csv")
+DEFAULT_ALIASES = os.path.join("data", "normalized", "job_title_aliases.json")
+
+TIER_HIGH = "High"
+TIER_MEDIUM = "Medium"
+TIER_LOW = "Low"
+TIER_UNKNOWN = "Unknown"
+TIERS = [TIER_HIGH, TIER_MEDIUM, TIER_LOW, TIER_UNKNOWN]
+
+# docs/SCORING.md defaults
+SIMILAR_TITLES_K = 5
+NEARBY_FACILITIES_N = 3
+
+# "Same metro area or nearby region" for the Low tier
+NEARBY_RADIUS_KM = 50.0
+
+# Other facilities listing the title, shown as Low evidence
+ELSEWHERE_FACILITIES_N = 5
+
+ROSTER_FACILITY_COLUMNS = ["facility", "facilityId", "facility_id"]
+ROSTER_TITLE_COLUMNS = ["title", "jobTitle", "jobTitleCanonical", "job_title"]
+ROSTER_REMOTE_COLUMNS = ["isRemote", "remote", "is_remote"]
+ROSTER_STATE_COLUMNS = ["remoteState", "remote_state", "state"]
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+
+# Entries kept per ScoringIndex cache. Scored keys are the largest (a few KB
+# each with evidence); 100k of them covers the distinct keys of any roster
+# seen so far. Titles and facilities repeat far more than keys do.
+SCORE_CACHE_SIZE = 100_000
+TITLE_CACHE_SIZE = 50_000
+NEARBY_CACHE_SIZE = 20_000
+
+
+_MISSING = object()
+
+
+class LRUCache(OrderedDict):
+    """
+    Dict capped at ``maxsize`` entries, evicting the least recently used.
+
+    get() and assignment count as a use; plain indexing and ``in`` do not.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return default
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class ScoringIndex:
+    """
+    Precomputed lookups for the tier rules.
+
+    Attributes:
+        notices: noticeId -> notice metadata (filename, dates, jurisdiction)
+        facility_listings: facilityId -> facility entries from notice facility lists
+        pair_rows: (facilityId, canonical title) -> JobTitleImpact rows
+        unassigned_rows: canonical title -> JobTitleImpact rows without a facility
+        title_facilities: canonical title -> {facilityId: affected}
+        facility_totals: facilityId -> affected across JobTitleImpact rows
+        remote_clauses: state -> [(noticeId, clause)] for REMOTE_RESIDENCE_STATE clauses
+        geocodes: facilityId -> (lat, lon)
+        tree: SphereKDTree over listed physical facilities with geocodes
+        matcher: TitleMatcher over the canonical titles
+    """
+
+    def __init__(self) -> None:
+        self.notices: Dict[str, Dict[str, Any]] = {}
+        self.facility_listings: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.pair_rows: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self.unassigned_rows: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.title_facilities: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.facility_totals: Dict[str, int] = defaultdict(int)
+        self.remote_clauses: Dict[str, List[Tuple[str, Dict[str, Any]]]] = defaultdict(list)
+        self.geocodes: Dict[str, Tuple[float, float]] = {}
+        self.tree = SphereKDTree({})
+        self.matcher = TitleMatcher([])
+        self._nearby_cache = LRUCache(NEARBY_CACHE_SIZE)
+        self._similar_cache = LRUCache(TITLE_CACHE_SIZE)
+        self._resolve_cache = LRUCache(TITLE_CACHE_SIZE)
+        self._score_cache = LRUCache(SCORE_CACHE_SIZE)
+
+    @classmethod
+    def from_combined(
+        cls,
+        combined: Dict[str, Any],
+        geocodes: Optional[Dict[str, Tuple[float, float]]] = None,
+        aliases: Optional[Dict[str, str]] = None,
+    ) -> ScoringIndex:
+        """
+        Build the index from a combined.json document.
+
+        Args:
+            combined: Parsed combined.json
+            geocodes: Optional facility geocodes (enables proximity)
+            aliases: Optional {alias: canonical} title aliases
+
+        Returns:
+            ScoringIndex
+        """
+        idx = cls()
+        title_totals: Dict[str, int] = defaultdict(int)
+        # Title totals and facility rows count amended/superseded rows once
+        recon = reconcile(combined.get("notices", []))
+
+        for notice in combined.get("notices", []):
+            notice_id = notice.get("noticeId") or ""
+            source = notice.get("source") or {}
+            idx.notices[notice_id] = {
+                "noticeId": notice_id,
+                "filename": source.get("filename"),
+                "receivedDate": source.get("receivedDate"),
+                "letterDate": source.get("letterDate"),
+                "jurisdiction": notice.get("jurisdiction"),
+            }
+
+            for fac in notice.get("facilities", []):
+                fid = (fac.get("facilityId") or "").strip().upper()
+                if fid:
+                    idx.facility_listings[fid].append(
+                        {**fac, "noticeId": notice_id, "facilityId": fid}
+                    )
+
+            for row in recon.impacts_for(notice):
+                fid = (row.get("facilityId") or "").strip().upper()
+                # notice_2-style rows carry only "jobTitle"
+                title = (row.get("jobTitleCanonical") or row.get("jobTitle") or "").strip()
+                count = int(row.get("affectedCount") or 0)
+                row = {
+                    **row,
+                    "noticeId": notice_id,
+                    "facilityId": fid,
+                    "jobTitleRaw": row.get("jobTitleRaw") or row.get("jobTitle"),
+                    "jobTitleCanonical": title,
+                }
+                if title:
+                    title_totals[title] += count
+                if fid:
+                    idx.facility_totals[fid] += count
+                if fid and title:
+                    idx.pair_rows[(fid, title)].append(row)
+                    idx.title_facilities[title][fid] += count
+                elif title:
+                    idx.unassigned_rows[title].append(row)
+
+            for clause in notice.get("remoteClauses", []):
+                state = (clause.get("state") or "").strip().upper()
+                if state:
+                    idx.remote_clauses[state].append((notice_id, clause))
+
+        if geocodes:
+            idx.geocodes = {fid.upper(): coord for fid, coord in geocodes.items()}
+            # Nearby results only ever include facilities explicitly listed in notices
+            idx.tree = SphereKDTree(
+                {
+                    fid: coord
+                    for fid, coord in idx.geocodes.items()
+                    if fid in idx.facility_listings and fid not in NON_PHYSICAL_FACILITIES
+                }
+            )
+        idx.matcher = TitleMatcher(title_totals.keys(), aliases, title_totals)
+        return idx
+
+    def notice_ids(self, facility_id: str) -> List[str]:
+        """Sorted notice IDs listing a facility."""
+        return sorted({f["noticeId"] for f in self.facility_listings.get(facility_id, [])})
+
+    def similar_titles(self, title: str, k: int = SIMILAR_TITLES_K) -> List[Dict[str, Any]]:
+        """Top-k similar canonical titles as dicts (cached per title)."""
+        key = f"{k}|{title}"
+        cached = self._similar_cache.get(key)
+        if cached is None:
+            cached = self._similar_cache[key] = [
+                m.to_dict() for m in self.matcher.similar(title, k)
+            ]
+        return cached
+
+    def resolve_title(self, title: str) -> Tuple[Optional[str], str]:
+        """
+        Resolve a title to (canonical title or None, confidence), cached per title.
+
+        A title without an exact, alias or normalized match takes the best of
+        its similar titles, so the fuzzy ranking is computed once for both.
+        """
+        hit = self._resolve_cache.get(title)
+        if hit is None:
+            match = self.matcher.exact(title) if title else None
+            if match is not None:
+                hit = (match.title, match.confidence)
+            else:
+                similar = self.similar_titles(title) if title else []
+                hit = (similar[0]["title"], similar[0]["confidence"]) if similar else (None, "None")
+            self._resolve_cache[title] = hit
+        return hit
+
+    def nearby(
+        self,
+        facility_id: str,
+        n: int = NEARBY_FACILITIES_N,
+        radius_km: Optional[float] = NEARBY_RADIUS_KM,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Nearest affected facilities to a facility (cached per facility).
+
+        Returns:
+            List of {facilityId, distanceKm, totalAffected, noticeIds}, nearest
+            first; None when the facility has no geocode
+        """
+        key = f"{facility_id}|{n}|{radius_km}"
+        cached = self._nearby_cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        origin = self.geocodes.get(facility_id)
+        result = None
+        if origin is not None:
+            hits = self.tree.nearest(
+                origin[0], origin[1], n, max_km=radius_km, exclude=[facility_id]
+            )
+            result = [
+                {
+                    "facilityId": fid,
+                    "distanceKm": round(km, 2),
+                    "totalAffected": self.facility_totals.get(fid, 0),
+                    "noticeIds": self.notice_ids(fid),
+                }
+                for fid, km in hits
+            ]
+        self._nearby_cache[key] = result
+        return result
+
+
+class TierResult:
+    """
+    Outcome of scoring one facility/title.
+
+    Attributes:
+        tier: "High", "Medium", "Low" or "Unknown"
+        reasons: [{"text": str, "evidence": [evidence indexes]}]
+        evidence: Structured evidence items (see docs/SCORING.md, Evidence model)
+        facility_id: Facility scored
+        title: Title as entered
+        title_canonical: Resolved canonical title, if any
+        title_confidence: "High", "Medium", "Low" or "None"
+        similar_titles: Top-K similar canonical titles (only without a High title match)
+        nearby_facilities: Nearest affected facilities (None without a geocode)
+    """
+
+    __slots__ = (
+        "tier",
+        "reasons",
+        "evidence",
+        "facility_id",
+        "title",
+        "title_canonical",
+        "title_confidence",
+        "similar_titles",
+        "nearby_facilities",
+    )
+
+    def __init__(
+        self, facility_id: str, title: str, title_canonical: Optional[str], title_confidence: str
+    ) -> None:
+        self.tier = TIER_UNKNOWN
+        self.reasons: List[Dict[str, Any]] = []
+        self.evidence: List[Dict[str, Any]] = []
+        self.facility_id = facility_id
+        self.title = title
+        self.title_canonical = title_canonical
+        self.title_confidence = title_confidence
+        self.similar_titles: List[Dict[str, Any]] = []
+        self.nearby_facilities: Optional[List[Dict[str, Any]]] = None
+
+    def add_reason(self, text: str, items: List[Dict[str, Any]]) -> None:
+        """Record a reason together with the evidence items that support it."""
+        start = len(self.evidence)
+        self.evidence.extend(items)
+        self.reasons.append({"text": text, "evidence": list(range(start, len(self.evidence)))})
+
+    def notice_ids(self) -> List[str]:
+        return sorted({e["noticeId"] for e in self.evidence if e.get("noticeId")})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "facilityId": self.facility_id,
+            "title": self.title,
+            "jobTitleCanonical": self.title_canonical,
+            "jobTitleConfidence": self.title_confidence,
+            "tier": self.tier,
+            "reasons": self.reasons,
+            "evidence": self.evidence,
+            "similarTitles": self.similar_titles,
+            "nearbyFacilities": self.nearby_facilities,
+        }
+
+
+def _with_notice(index: ScoringIndex, item: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach source metadata (filename, dates) of the item's notice."""
+    meta = index.notices.get(item.get("noticeId") or "", {})
+    return {
+        **item,
+        "filename": meta.get("filename"),
+        "receivedDate": meta.get("receivedDate"),
+        "letterDate": meta.get("letterDate"),
+    }
+
+
+def impact_evidence(
+    index: ScoringIndex, rows: List[Dict[str, Any]], confidence: str
+) -> List[Dict[str, Any]]:
+    """Evidence items for JobTitleImpact rows, with the title-match confidence."""
+    return [
+        _with_notice(
+            index,
+            {
+                "kind": "jobTitleImpact",
+                "noticeId": r.get("noticeId"),
+                "facilityId": r.get("facilityId") or None,
+                "jobTitleRaw": r.get("jobTitleRaw"),
+                "jobTitleCanonical": r.get("jobTitleCanonical"),
+                "affectedCount": int(r.get("affectedCount") or 0),
+                "titleConfidence": confidence,
+            },
+        )
+        for r in rows
+    ]
+
+
+def facility_evidence(index: ScoringIndex, facility_id: str) -> List[Dict[str, Any]]:
+    """Evidence items for every notice that lists a facility."""
+    return [
+        _with_notice(
+            index,
+            {
+                "kind": "facility",
+                "noticeId": f["noticeId"],
+                "facilityId": facility_id,
+                "affectedApprox": f.get("affectedApprox"),
+                "notes": f.get("notes"),
+            },
+        )
+        for f in index.facility_listings.get(facility_id, [])
+    ]
+
+
+def remote_evidence(index: ScoringIndex, state: str) -> List[Dict[str, Any]]:
+    """Evidence items for notice remote clauses naming a state."""
+    return [
+        _with_notice(
+            index,
+            {
+                "kind": "remoteClause",
+                "noticeId": notice_id,
+                "state": state,
+                "affectedCount": clause.get("affectedCount"),
+                "notes": clause.get("notes") or clause.get("text"),
+            },
+        )
+        for notice_id, clause in index.remote_clauses.get(state, [])
+    ]
+
+
+def remote_facility(
+    index: ScoringIndex, is_remote: bool, remote_state: Optional[str]
+) -> Optional[str]:
+    """
+    Synthetic remote facility (e.g. REMOTE_WA) that applies to a remote employee.
+
+    Remote scope applies only when a notice explicitly names the state.
+    """
+    state = (remote_state or "").strip().upper()
+    if not is_remote or not state or not index.remote_clauses.get(state):
+        return None
+    return f"REMOTE_{state}"
+
+
+def score(
+    index: ScoringIndex,
+    facility_id: str,
+    title: str,
+    title_canonical: Optional[str],
+    title_confidence: str,
+    is_remote: bool = False,
+    remote_state: Optional[str] = None,
+) -> TierResult:
+    """
+    Assign a tier to one facility/title following docs/SCORING.md.
+
+    Conditions are evaluated in priority order (High, Medium, Low, Unknown)
+    and the first satisfied tier is applied. Every reason points at the
+    evidence items that support it.
+
+    Args:
+        index: ScoringIndex
+        facility_id: Facility ID (may be empty)
+        title: Title as entered (may be empty)
+        title_canonical: Canonical title the entry resolved to, if any
+        title_confidence: "High", "Medium", "Low" or "None"
+        is_remote: Whether the employee is remote
+        remote_state: State the remote employee resides in
+
+    Returns:
+        TierResult
+    """
+    facility_id = (facility_id or "").strip().upper()
+    result = TierResult(facility_id, title, title_canonical, title_confidence)
+
+    facilities = [facility_id] if facility_id else []
+    remote_fid = remote_facility(index, is_remote, remote_state)
+    if remote_fid and remote_fid not in facilities:
+        facilities.append(remote_fid)
+
+    if title_confidence != TIER_HIGH and title:
+        result.similar_titles = index.similar_titles(title)
+    if facility_id:
+        result.nearby_facilities = index.nearby(facility_id)
+
+    # 1. High: facility + title in the same notice with a High title match
+    if title_canonical and title_confidence == TIER_HIGH:
+        for fid in facilities:
+            rows = index.pair_rows.get((fid, title_canonical))
+            if rows:
+                notices = sorted({r["noticeId"] for r in rows})
+                result.add_reason(
+                    f"{title_canonical} is listed for {fid} in {', '.join(notices)} "
+                    f"({sum(int(r.get('affectedCount') or 0) for r in rows)} affected).",
+                    impact_evidence(index, rows, title_confidence),
+                )
+        if result.reasons:
+            result.tier = TIER_HIGH
+            return result
+
+    # 2. Medium: facility-level impact, a Medium title match, or a title without a facility
+    fuzzy_hits: Set[str] = set()
+    if title_canonical and title_confidence == TIER_MEDIUM:
+        for fid in facilities:
+            rows = index.pair_rows.get((fid, title_canonical))
+            if rows:
+                fuzzy_hits.add(fid)
+                result.add_reason(
+                    f"'{title}' is a close (Medium confidence) match for {title_canonical}, "
+                    f"which is listed for {fid}.",
+                    impact_evidence(index, rows, title_confidence),
+                )
+    for fid in facilities:
+        if fid in fuzzy_hits:
+            continue
+        if fid == remote_fid:
+            state = remote_fid[len("REMOTE_") :]
+            items = remote_evidence(index, state) + facility_evidence(index, fid)
+            text = f"The notices explicitly include remote employees residing in {state}"
+        else:
+            items = facility_evidence(index, fid)
+            text = f"{fid} appears in {', '.join(index.notice_ids(fid))}"
+        if not items:
+            continue
+        if title_canonical and title_confidence in (TIER_HIGH, TIER_MEDIUM):
+            text += f", but {title_canonical} is not listed for it."
+        else:
+            text += "; no job title match is listed for it."
+        result.add_reason(text, items)
+    if title_canonical and title_confidence in (TIER_HIGH, TIER_MEDIUM):
+        rows = index.unassigned_rows.get(title_canonical)
+        if rows:
+            result.add_reason(
+                f"{title_canonical} appears in a notice without a specific facility.",
+                impact_evidence(index, rows, title_confidence),
+            )
+    if result.reasons:
+        result.tier = TIER_MEDIUM
+        return result
+
+    # 3. Low: nearby affected facilities, or title evidence without a facility tie
+    if result.nearby_facilities:
+        result.add_reason(
+            f"No notice lists {facility_id}, but {len(result.nearby_facilities)} affected "
+            f"facilit{'y is' if len(result.nearby_facilities) == 1 else 'ies are'} within "
+            f"{NEARBY_RADIUS_KM:g} km. Nearby impact is context only.",
+            [
+                {
+                    "kind": "nearbyFacility",
+                    "noticeId": nid,
+                    "facilityId": n["facilityId"],
+                    "distanceKm": n["distanceKm"],
+                    "totalAffected": n["totalAffected"],
+                }
+                for n in result.nearby_facilities
+                for nid in n["noticeIds"]
+            ],
+        )
+    if title_canonical and title_confidence in (TIER_HIGH, TIER_MEDIUM):
+        elsewhere = sorted(
+            index.title_facilities.get(title_canonical, {}).items(), key=lambda kv: (-kv[1], kv[0])
+        )
+        rows = [
+            r
+            for fid, _ in elsewhere[:ELSEWHERE_FACILITIES_N]
+            for r in index.pair_rows.get((fid, title_canonical), [])
+        ]
+        if rows:
+            result.add_reason(
+                f"{title_canonical} is listed at other facilities ({len(elsewhere)} in total), "
+                f"not at {facility_id or 'the selected facility'}.",
+                impact_evidence(index, rows, title_confidence),
+            )
+    elif result.similar_titles:
+        items = []
+        for sim in result.similar_titles:
+            elsewhere = sorted(
+                index.title_facilities.get(sim["title"], {}).items(), key=lambda kv: (-kv[1], kv[0])
+            )
+            for fid, _ in elsewhere[:ELSEWHERE_FACILITIES_N]:
+                items.extend(
+                    impact_evidence(
+                        index, index.pair_rows.get((fid, sim["title"]), []), sim["confidence"]
+                    )
+                )
+        best = result.similar_titles[0]
+        result.add_reason(
+            f"'{title}' only loosely resembles titles in the notices "
+            f"(best: {best['title']}, {best['confidence']} confidence).",
+            items,
+        )
+    if result.reasons:
+        result.tier = TIER_LOW
+        return result
+
+    # 4. Unknown: nothing in the notices relates to this facility/title
+    result.add_reason(
+        "No matching facility, job title, or nearby affected facility was found in the notices.", []
+    )
+    return result
+
+
+def resolve(index: ScoringIndex, title: str) -> Tuple[Optional[str], str]:
+    """Resolve a title to (canonical title or None, confidence)."""
+    return index.resolve_title(title)
+
+
+class RosterScores:
+    """
+    Per-row view over the distinct results of score_roster.
+
+    Attributes:
+        results: One TierResult per distinct key (shared by rows; treat as read-only)
+        row_keys: array('i') mapping each roster row to its entry in ``results``
+    """
+
+    def __init__(self, results: List[TierResult], row_keys: array) -> None:
+        self.results = results
+        self.row_keys = row_keys
+
+    def __len__(self) -> int:
+        return len(self.row_keys)
+
+    def __getitem__(self, row: int) -> TierResult:
+        return self.results[self.row_keys[row]]
+
+    def __iter__(self) -> Iterator[TierResult]:
+        results = self.results
+        return (results[k] for k in self.row_keys)
+
+    def tiers(self) -> List[str]:
+        """Tier per roster row."""
+        key_tiers = [r.tier for r in self.results]
+        return [key_tiers[k] for k in self.row_keys]
+
+    def tier_counts(self) -> Dict[str, int]:
+        """Number of roster rows in each tier, in tier priority order."""
+        per_key = Counter(self.row_keys)
+        counts = {t: 0 for t in TIERS}
+        for k, n in per_key.items():
+            counts[self.results[k].tier] += n
+        return counts
+
+
+def _map_distinct(values: Sequence[Any], normalize: Any) -> Iterator[Any]:
+    """Apply normalize once per distinct value and map every row through it."""
+    table = {v: normalize(v) for v in set(values)}
+    return map(table.__getitem__, values)
+
+
+def score_roster(
+    index: ScoringIndex,
+    facility_ids: Sequence[str],
+    titles: Sequence[str],
+    is_remote: Optional[Sequence[bool]] = None,
+    remote_states: Optional[Sequence[Optional[str]]] = None,
+) -> RosterScores:
+    """
+    Score a whole roster in one call.
+
+    Titles are resolved once per distinct title, and each distinct
+    (facility, title, remote, state) key is scored once. The cost is per
+    distinct key, not per row: a 100k-row roster with 49k distinct keys
+    spends nearly all its time in score() and title matching for those keys.
+    Results are cached on the index (up to SCORE_CACHE_SIZE keys), so scoring
+    the same keys again (in a later call or another shard) is a dict lookup;
+    the returned TierResults are shared and must be treated as read-only.
+
+    Args:
+        index: ScoringIndex
+        facility_ids: Facility ID per employee
+        titles: Job title per employee (free text is resolved with the matcher)
+        is_remote: Optional remote flag per employee
+        remote_states: Optional remote state per employee
+
+    Returns:
+        RosterScores
+
+    Raises:
+        ValueError: If the sequences differ in length
+    """
+    n = len(facility_ids)
+    if (
+        len(titles) != n
+        or (is_remote is not None and len(is_remote) != n)
+        or (remote_states is not None and len(remote_states) != n)
+    ):
+        raise ValueError(
+            "facility_ids, titles, is_remote and remote_states must have the same length"
+        )
+
+    # Column-wise: each column is normalized once per distinct value, and the
+    # per-row passes (map/zip over C-level callables) build no Python frames
+    fids = _map_distinct(facility_ids, lambda v: (v or "").strip().upper())
+    title_keys = _map_distinct(titles, lambda v: (v or "").strip())
+    if is_remote is None:
+        remotes: Iterator[bool] = repeat(False, n)
+        states: Iterator[str] = repeat("", n)
+    else:
+        remotes = list(map(bool, is_remote))
+        states = repeat("", n)
+        if remote_states is not None:
+            # str * bool keeps the state only for remote rows
+            states = map(
+                operator.mul,
+                _map_distinct(remote_states, lambda v: (v or "").strip().upper()),
+                remotes,
+            )
+    row_tuples = list(zip(fids, title_keys, remotes, states))
+    # First-appearance order, then one index per distinct key
+    key_ids: Dict[Tuple[str, str, bool, str], int] = dict.fromkeys(row_tuples)
+    keys = list(key_ids)
+    key_ids.update(zip(keys, range(len(keys))))
+    row_keys = array("i", map(key_ids.__getitem__, row_tuples))
+
+    cache = index._score_cache
+    results = []
+    scored = 0
+    for key in keys:
+        result = cache.get(key)
+        if result is None:
+            fid, title, remote, state = key
+            canonical, confidence = index.resolve_title(title)
+            result = cache[key] = score(
+                index, fid, title, canonical, confidence, remote, state or None
+            )
+            scored += 1
+        results.append(result)
+
+    logger.debug(f"Scored {n} roster rows as {len(keys)} distinct keys ({scored} not cached)")
+    return RosterScores(results, row_keys)
+
+
+def load_scoring_index(
+    combined_path: str, geocodes_path: Optional[str], aliases_path: Optional[str]
+) -> ScoringIndex:
+    """
+    Build a ScoringIndex from files.
+
+    Raises:
+        DataLoadError: If combined.json cannot be read
+    """
+    try:
+        with open(combined_path, "r", encoding="utf-8") as f:
+            combined = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise DataLoadError(f"Cannot load {combined_path}: {e}") from e
+    geocodes = (
+        load_geocodes_csv(geocodes_path)
+        if geocodes_path and os.path.exists(geocodes_path)
+        else None
+    )
+    aliases = load_aliases(Path(aliases_path)) if aliases_path else {}
+    return ScoringIndex.from_combined(combined, geocodes, aliases)
+
+
+def _column(row: Dict[str, Any], candidates: List[str]) -> str:
+    for key in candidates:
+        value = row.get(key)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return ""
+
+
+def print_result(result: TierResult) -> None:
+    print()
+    print("=" * 80)
+    print(f"TIER: {result.tier}")
+    print("=" * 80)
+    print(f"Facility: {result.facility_id or '(none)'}")
+    print(
+        f"Title:    {result.title or '(none)'}"
+        + (
+            f"  -> {result.title_canonical} ({result.title_confidence})"
+            if result.title_canonical
+            else ""
+        )
+    )
+    print()
+    print("Reasons:")
+    for reason in result.reasons:
+        print(f"  - {reason['text']}")
+    print()
+    print(f"Evidence ({len(result.evidence)} items):")
+    for item in result.evidence:
+        details = ", ".join(
+            f"{k}={item[k]}"
+            for k in (
+                "facilityId",
+                "jobTitleRaw",
+                "affectedCount",
+                "affectedApprox",
+                "distanceKm",
+                "titleConfidence",
+            )
+            if item.get(k) is not None
+        )
+        notice_id = item.get("noticeId") or ""
+        received = item.get("receivedDate") or ""
+        print(f"  [{item['kind']}] {notice_id} {received}  {details}")
+    if result.similar_titles:
+        print()
+        print("Similar Titles:")
+        for sim in result.similar_titles:
+            print(f"  {sim['affected'] or 0:>5}  {sim['confidence']:<6}  {sim['title']}")
+    print()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Assign docs/SCORING.md tiers to a facility/title or a whole roster"
+    )
+    ap.add_argument("--facility", default="")
+    ap.add_argument("--title", default="")
+    ap.add_argument("--remote", action="store_true", help="Employee is remote")
+    ap.add_argument(
+        "--remote_state", default=None, help="State a remote employee resides in (e.g. WA)"
+    )
+    ap.add_argument(
+        "--roster", help="CSV with facility, title and optional isRemote/remoteState columns"
+    )
+    ap.add_argument(
+        "--format", choices=["csv", "jsonl"], default="csv", help="Roster output format"
+    )
+    ap.add_argument("--output", default="-", help="Roster output path, or - for stdout")
+    ap.add_argument("--json", action="store_true", help="Print the single result as JSON")
+    ap.add_argument("--combined", default=DEFAULT_COMBINED)
+    ap.add_argument("--geocodes", default=DEFAULT_GEOCODES)
+    ap.add_argument("--aliases", default=DEFAULT_ALIASES)
+    args = ap.parse_args()
+
+    if not args.roster and not (args.facility or args.title):
+        ap.error("--facility and/or --title are required unless --roster is given")
+
+    try:
+        started = time.perf_counter()
+        index = load_scoring_index(args.combined, args.geocodes, args.aliases)
+        logger.info(f"Scoring index built in {time.perf_counter() - started:.3f}s")
+    except DataLoadError as e:
+        logger.error(f"Data loading error: {e}")
+        return 1
+
+    if not args.roster:
+        canonical, confidence = resolve(index, args.title.strip())
+        result = score(
+            index,
+            args.facility,
+            args.title.strip(),
+            canonical,
+            confidence,
+            args.remote,
+            args.remote_state,
+        )
+        if args.json:
+            print(json.dumps(result.to_dict(), indent=2, ensure_ascii=False))
+        else:
+            print_result(result)
+        return 0
+
+    with open(args.roster, "r", newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    started = time.perf_counter()
+    scores = score_roster(
+        index,
+        [_column(r, ROSTER_FACILITY_COLUMNS) for r in rows],
+        [_column(r, ROSTER_TITLE_COLUMNS) for r in rows],
+        [_column(r, ROSTER_REMOTE_COLUMNS).lower() in TRUE_VALUES for r in rows],
+        [_column(r, ROSTER_STATE_COLUMNS) for r in rows],
+    )
+    elapsed = time.perf_counter() - started
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        if args.format == "jsonl":
+            for row, result in zip(rows, scores):
+                out.write(json.dumps({"input": row, **result.to_dict()}, ensure_ascii=False))
+                out.write("\n")
+        else:
+            fields = list(rows[0].keys()) if rows else []
+            writer = csv.writer(out)
+            writer.writerow(
+                fields + ["tier", "jobTitleCanonical", "jobTitleConfidence", "reasons", "noticeIds"]
+            )
+            for row, result in zip(rows, scores):
+                writer.writerow(
+                    [row.get(k, "") for k in fields]
+                    + [
+                        result.tier,
+                        result.title_canonical or "",
+                        result.title_confidence,
+                        " | ".join(r["text"] for r in result.reasons),
+                        ";".join(result.notice_ids()),
+                    ]
+                )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    counts = scores.tier_counts()
+    logger.info(
+        f"Scored {len(scores)} rows ({len(scores.results)} distinct) in {elapsed:.3f}s: "
+        + ", ".join(f"{t}={counts[t]}" for t in TIERS)
+    )
+    if args.output != "-":
+        print(f"OK: wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Spatial Index for Facility Geocodes
+
+A static KD-tree over facility coordinates projected onto the unit sphere.
+Points are stored as 3D unit vectors, so straight-line (chord) distance is a
+monotonic function of great-circle distance and the tree answers k-nearest and
+radius queries without any special handling near the poles or antimeridian.
+
+Build is O(N log N); queries visit O(log N + k) nodes on typical data instead
+of computing a haversine distance to every facility.
+
+group_near_duplicates() finds points within a few meters of each other by
+bucketing them into a tolerance-sized grid (linear time), and ring_layout()
+spreads each such group out so their map markers do not overlap. The map
+exporter and check_geocodes.py share both.
+
+Usage:
+    >>> tree = SphereKDTree({"SEA40": (47.6230, -122.3365), "SEA41": (47.6220, -122.3380)})
+    >>> tree.nearest(47.62, -122.33, k=1)
+    [('SEA40', 0.59...)]
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Mean Earth radius in kilometers (same constant as risk_assessment.haversine_km)
+EARTH_RADIUS_KM = 6371.0
+
+Vector = Tuple[float, float, float]
+
+
+def to_unit_vector(lat: float, lon: float) -> Vector:
+    """
+    Project a latitude/longitude pair onto the unit sphere.
+
+    Args:
+        lat: Latitude in decimal degrees
+        lon: Longitude in decimal degrees
+
+    Returns:
+        (x, y, z) unit vector
+    """
+    phi = math.radians(lat)
+    lam = math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+def chord_to_km(chord: float) -> float:
+    """Convert a unit-sphere chord length to great-circle distance in kilometers."""
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2.0))
+
+
+def km_to_chord(km: float) -> float:
+    """Convert a great-circle distance in kilometers to a unit-sphere chord length."""
+    angle = min(math.pi, max(0.0, km) / EARTH_RADIUS_KM)
+    return 2.0 * math.sin(angle / 2.0)
+
+
+class SphereKDTree:
+    """
+    Immutable KD-tree over keyed points on the Earth's surface.
+
+    The tree is stored as flat parallel lists (key, vector, split axis, child
+    indexes) rather than node objects, which keeps construction cheap and the
+    structure easy to pickle alongside other lookup tables.
+    """
+
+    def __init__(self, points: Dict[str, Tuple[float, float]]) -> None:
+        """
+        Build the tree.
+
+        Args:
+            points: Mapping of key (facility ID) to (latitude, longitude)
+        """
+        items = [(key, to_unit_vector(lat, lon)) for key, (lat, lon) in points.items()]
+
+        self._keys: List[str] = []
+        self._vecs: List[Vector] = []
+        self._axis: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._root = self._build(items, 0)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _build(self, items: List[Tuple[str, Vector]], depth: int) -> int:
+        """Recursively build the subtree for ``items`` and return its node index."""
+        if not items:
+            return -1
+
+        axis = depth % 3
+        items.sort(key=lambda item: item[1][axis])
+        mid = len(items) // 2
+
+        node = len(self._keys)
+        self._keys.append(items[mid][0])
+        self._vecs.append(items[mid][1])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+
+        self._left[node] = self._build(items[:mid], depth + 1)
+        self._right[node] = self._build(items[mid + 1 :], depth + 1)
+        return node
+
+    def _search(
+        self,
+        target: Vector,
+        k: Optional[int],
+        max_dist2: Optional[float],
+        exclude: Optional[Set[str]],
+    ) -> List[Tuple[float, str]]:
+        """
+        Core branch-and-bound search.
+
+        Returns (squared_chord, key) pairs sorted by distance. ``k=None`` means
+        "every point within sqrt(max_dist2)".
+        """
+        # Max-heap (negated distances) of the best candidates found so far
+        best: List[Tuple[float, str]] = []
+        bound = max_dist2 if max_dist2 is not None else math.inf
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+
+            vec = self._vecs[node]
+            dx = vec[0] - target[0]
+            dy = vec[1] - target[1]
+            dz = vec[2] - target[2]
+            dist2 = dx * dx + dy * dy + dz * dz
+
+            key = self._keys[node]
+            if dist2 <= bound and not (exclude and key in exclude):
+                if k is None:
+                    best.append((-dist2, key))
+                elif len(best) < k:
+                    heapq.heappush(best, (-dist2, key))
+                    if len(best) == k:
+                        bound = min(bound, -best[0][0])
+                elif dist2 < -best[0][0]:
+                    heapq.heapreplace(best, (-dist2, key))
+                    bound = min(bound, -best[0][0])
+
+            axis = self._axis[node]
+            diff = target[axis] - vec[axis]
+            near, far = (self._left[node], self._right[node])
+            if diff > 0:
+                near, far = far, near
+
+            # Visit the far side only if the splitting plane is within the bound
+            if diff * diff <= bound:
+                stack.append(far)
+            stack.append(near)
+
+        return sorted((-neg, key) for neg, key in best)
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        max_km: Optional[float] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the k nearest points, optionally limited to a radius.
+
+        Args:
+            lat: Query latitude
+            lon: Query longitude
+            k: Maximum number of results
+            max_km: Optional search radius in kilometers
+            exclude: Keys to leave out of the results (e.g., the query facility)
+
+        Returns:
+            List of (key, distance_km) tuples, nearest first
+        """
+        if k <= 0 or not self._keys:
+            return []
+        target = to_unit_vector(lat, lon)
+        excluded = set(exclude) if exclude else None
+        max_dist2 = km_to_chord(max_km) ** 2 if max_km is not None else None
+        hits = self._search(target, k, max_dist2, excluded)
+        if len(hits) == k:
+            # Points tied with the k-th distance are kept in traversal order by the
+            # heap; re-collect everything up to that distance so ties break by key
+            hits = self._search(target, None, hits[-1][0], excluded)[:k]
+        return [(key, chord_to_km(math.sqrt(d2))) for d2, key in hits]
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Find every point within a radius.
+
+        Args:
+            lat: Query latitude
+            lon: Query longitude
+            radius_km: Search radius in kilometers
+            exclude: Keys to leave out of the results
+
+        Returns:
+            List of (key, distance_km) tuples, nearest first
+        """
+        if not self._keys:
+            return []
+        hits = self._search(
+            to_unit_vector(lat, lon),
+            None,
+            km_to_chord(radius_km) ** 2,
+            set(exclude) if exclude else None,
+        )
+        return [(key, chord_to_km(math.sqrt(d2))) for d2, key in hits]
+
+
+# Points closer than this are treated as one location (meters)
+DUPLICATE_TOLERANCE_M = 30.0
+# Distance between rings when spreading a group of duplicates apart (meters)
+RING_SPACING_M = 60.0
+
+METERS_PER_DEGREE_LAT = 111320.0
+
+
+def group_near_duplicates(
+    points: List[Tuple[float, float]], tolerance_m: float = DUPLICATE_TOLERANCE_M
+) -> List[List[int]]:
+    """
+    Group points that lie within a tolerance of each other.
+
+    Points are projected onto the unit sphere and bucketed into a grid of
+    tolerance-sized cubes, so each point only compares against the 27 cells
+    around it and the pass is linear in the number of points. Grouping is
+    transitive: if A is near B and B is near C, all three form one group.
+
+    Args:
+        points: (lat, lon) pairs
+        tolerance_m: Maximum distance between neighbouring members, in meters
+
+    Returns:
+        Groups of two or more indexes into ``points``, each in input order,
+        ordered by their first member
+    """
+    parent = list(range(len(points)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    tol = km_to_chord(tolerance_m / 1000.0)
+    cell = max(tol, 1e-12)
+    tol2 = tol * tol
+    grid: Dict[Tuple[int, int, int], List[int]] = {}
+    vectors = [to_unit_vector(lat, lon) for lat, lon in points]
+    for i, v in enumerate(vectors):
+        cx, cy, cz = (int(math.floor(c / cell)) for c in v)
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for gz in (cz - 1, cz, cz + 1):
+                    for j in grid.get((gx, gy, gz), ()):
+                        o = vectors[j]
+                        if (o[0] - v[0]) ** 2 + (o[1] - v[1]) ** 2 + (o[2] - v[2]) ** 2 <= tol2:
+                            ri, rj = find(i), find(j)
+                            if ri != rj:
+                                parent[max(ri, rj)] = min(ri, rj)
+        grid.setdefault((cx, cy, cz), []).append(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(points)):
+        groups.setdefault(find(i), []).append(i)
+    return [members for _, members in sorted(groups.items()) if len(members) > 1]
+
+
+def ring_layout(
+    lat: float, lon: float, count: int, spacing_m: float = RING_SPACING_M
+) -> List[Tuple[float, float]]:
+    """
+    Deterministic positions for ``count`` markers sharing one location.
+
+    The first marker keeps the original position. The rest fill rings around
+    it: ring r has radius ``r * spacing_m`` and holds 6r markers, placed
+    clockwise from north.
+
+    Returns:
+        ``count`` (lat, lon) pairs
+    """
+    positions = [(lat, lon)]
+    meters_per_degree_lon = METERS_PER_DEGREE_LAT * max(0.1, math.cos(math.radians(lat)))
+    ring = 1
+    while len(positions) < count:
+        slots = min(6 * ring, count - len(positions))
+        radius = ring * spacing_m
+        for k in range(slots):
+            angle = 2.0 * math.pi * k / (6 * ring)
+            positions.append(
+                (
+                    lat + radius * math.cos(angle) / METERS_PER_DEGREE_LAT,
+                    lon + radius * math.sin(angle) / meters_per_degree_lon,
+                )
+            )
+        ring += 1
+    return positions
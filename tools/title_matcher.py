@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Job Title Matcher
+
+Resolves free-text job titles ("sde 2", "Sr. Mgr, Business Intel", "PgM III")
+to canonical notice titles and ranks similar titles, with the confidence
+levels from docs/SPEC.md (Job title normalization):
+
+    High    exact, normalized or alias match
+    Medium  fuzzy match with trigram similarity >= MEDIUM_MIN_SCORE
+    Low     weaker fuzzy match (>= LOW_MIN_SCORE), including the same role
+            at a different level
+
+Normalization lowercases, strips punctuation, splits "sde2" into "sde 2",
+expands abbreviations (Sr -> Senior, Mgr -> Manager, SDE -> Software Dev
+Engineer, ...) and maps roman numerals to digits, so "SDE II", "sde 2" and
+"Software Dev Engineer II" share one key.
+
+Fuzzy ranking uses an inverted index from character trigrams to titles, so a
+query only scores titles that share at least one trigram with it.
+
+Usage:
+    >>> matcher = TitleMatcher(["Software Dev Engineer II", "Program Manager III"])
+    >>> matcher.match("sde 2").title
+    'Software Dev Engineer II'
+    >>> python tools/title_matcher.py "sr mgr business intel" --top 5
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import json
+import re
+import sys
+from collections import Counter, defaultdict
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+DEFAULT_ALIASES = Path("data") / "normalized" / "job_title_aliases.json"
+
+MEDIUM_MIN_SCORE = 0.75
+LOW_MIN_SCORE = 0.4
+
+# Same role, different level ("SDE III" vs "Software Dev Engineer II") is never more than Low
+LEVEL_MISMATCH_PENALTY = 0.75
+
+ROMAN_TO_LEVEL = {
+    "i": "1",
+    "ii": "2",
+    "iii": "3",
+    "iv": "4",
+    "v": "5",
+    "vi": "6",
+    "vii": "7",
+    "viii": "8",
+    "ix": "9",
+    "x": "10",
+}
+
+# Token -> expansion; applied identically to queries and canonical titles
+ABBREVIATIONS = {
+    "sr": "senior",
+    "snr": "senior",
+    "jr": "junior",
+    "mgr": "manager",
+    "mngr": "manager",
+    "mgmt": "management",
+    "eng": "engineer",
+    "engr": "engineer",
+    "acct": "account",
+    "mktg": "marketing",
+    "dir": "director",
+    "spec": "specialist",
+    "exec": "executive",
+    "tech": "technical",
+    "intel": "intelligence",
+    "bus": "business",
+    "prod": "product",
+    "sde": "software dev engineer",
+    "swe": "software dev engineer",
+    "tpm": "technical program manager",
+    "bie": "business intelligence engineer",
+}
+
+
+def normalize_title(title: str) -> str:
+    """
+    Reduce a title to its matching key.
+
+    Args:
+        title: Free-text or canonical job title
+
+    Returns:
+        Lowercase, space-separated tokens with abbreviations expanded and levels as digits
+
+    Example:
+        >>> normalize_title("Sr. Mgr, SDE-II")
+        'senior manager software dev engineer 2'
+    """
+    text = re.sub(r"[^a-z0-9]+", " ", title.lower())
+    text = re.sub(r"(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])", " ", text)
+    out: List[str] = []
+    for tok in text.split():
+        tok = ROMAN_TO_LEVEL.get(tok, tok)
+        out.extend(ABBREVIATIONS.get(tok, tok).split())
+    return " ".join(out)
+
+
+def _level(key: str) -> Optional[str]:
+    """Trailing-most numeric token of a normalized key (the title level), if any."""
+    for tok in reversed(key.split()):
+        if tok.isdigit():
+            return tok
+    return None
+
+
+def trigrams(key: str) -> Set[str]:
+    """Character trigrams of a normalized key, padded so word starts count."""
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def load_aliases(path: Path) -> Dict[str, str]:
+    """
+    Load job_title_aliases.json into {input: canonical}.
+
+    A missing file yields no aliases.
+    """
+    if not path.exists():
+        return {}
+    blob = json.loads(path.read_text(encoding="utf-8"))
+    return {
+        (a.get("input") or "").strip().lower(): (a.get("canonical") or "").strip()
+        for a in blob.get("aliases", [])
+        if a.get("input") and a.get("canonical")
+    }
+
+
+class TitleMatch:
+    """
+    One candidate title for a query.
+
+    Attributes:
+        title: Canonical title
+        confidence: "High", "Medium" or "Low"
+        score: Similarity in [0, 1] (1.0 for High matches)
+        via: "exact", "normalized", "alias" or "fuzzy"
+        affected: Total affected count for the title, if known
+    """
+
+    __slots__ = ("title", "confidence", "score", "via", "affected")
+
+    def __init__(
+        self, title: str, confidence: str, score: float, via: str, affected: Optional[int]
+    ) -> None:
+        self.title = title
+        self.confidence = confidence
+        self.score = score
+        self.via = via
+        self.affected = affected
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "confidence": self.confidence,
+            "score": round(self.score, 3),
+            "via": self.via,
+            "affected": self.affected,
+        }
+
+    def __repr__(self) -> str:
+        return f"TitleMatch({self.title!r}, {self.confidence}, {self.score:.3f}, {self.via})"
+
+
+class TitleMatcher:
+    """
+    Canonical title vocabulary with a normalized-key map and a trigram inverted index.
+
+    Build cost is linear in the vocabulary; a fuzzy query touches only the
+    posting lists of its own trigrams.
+    """
+
+    def __init__(
+        self,
+        titles: Iterable[str],
+        aliases: Optional[Mapping[str, str]] = None,
+        counts: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        """
+        Args:
+            titles: Canonical titles
+            aliases: {alias input: canonical title}; aliases to unknown titles are ignored
+            counts: Optional {title: total affected} shown alongside matches
+        """
+        self.titles: List[str] = sorted({t for t in titles if t})
+        self.counts = dict(counts or {})
+        self._title_set = set(self.titles)
+
+        self._keys: List[str] = []
+        self._sizes: List[int] = []
+        self._levels: List[Optional[str]] = []
+        self._by_key: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        for idx, title in enumerate(self.titles):
+            key = normalize_title(title)
+            grams = trigrams(key)
+            self._keys.append(key)
+            self._sizes.append(len(grams))
+            self._levels.append(_level(key))
+            for g in grams:
+                self._postings[g].append(idx)
+            # Several titles can share a key ("Sr Mgr X" / "Sr Manager X"): prefer the most affected
+            prev = self._by_key.get(key)
+            if prev is None or self.counts.get(title, 0) > self.counts.get(self.titles[prev], 0):
+                self._by_key[key] = idx
+
+        self._aliases: Dict[str, str] = {}
+        for alias, canonical in (aliases or {}).items():
+            if canonical in self._title_set:
+                self._aliases[normalize_title(alias)] = canonical
+
+    @classmethod
+    def from_counts(
+        cls, counts: Mapping[str, int], aliases_path: Optional[Path] = DEFAULT_ALIASES
+    ) -> TitleMatcher:
+        """Build from {title: affected} (e.g. ImpactIndex.title_totals) and the alias file."""
+        aliases = load_aliases(aliases_path) if aliases_path else {}
+        return cls(counts.keys(), aliases, counts)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def exact(self, query: str) -> Optional[TitleMatch]:
+        """High match for a canonical title, alias or normalized key, or None."""
+        stripped = query.strip()
+        if stripped in self._title_set:
+            return TitleMatch(stripped, "High", 1.0, "exact", self.counts.get(stripped))
+        key = normalize_title(stripped)
+        alias = self._aliases.get(key)
+        if alias is not None:
+            return TitleMatch(alias, "High", 1.0, "alias", self.counts.get(alias))
+        idx = self._by_key.get(key)
+        if idx is not None:
+            title = self.titles[idx]
+            return TitleMatch(title, "High", 1.0, "normalized", self.counts.get(title))
+        return None
+
+    def _scored(self, query: str) -> List[Tuple[float, int]]:
+        """(score, title index) for every title sharing a trigram with the query."""
+        key = normalize_title(query)
+        grams = trigrams(key)
+        if not key or not grams:
+            return []
+        postings = self._postings
+        shared = Counter(chain.from_iterable(postings[g] for g in grams if g in postings))
+
+        level = _level(key)
+        size = len(grams)
+        out = []
+        for idx, n in shared.items():
+            score = 2.0 * n / (size + self._sizes[idx])
+            if level and self._levels[idx] and level != self._levels[idx]:
+                score *= LEVEL_MISMATCH_PENALTY
+            if score >= LOW_MIN_SCORE:
+                out.append((score, idx))
+        return out
+
+    def _fuzzy(self, score: float, idx: int) -> TitleMatch:
+        title = self.titles[idx]
+        confidence = "Medium" if score >= MEDIUM_MIN_SCORE else "Low"
+        return TitleMatch(title, confidence, score, "fuzzy", self.counts.get(title))
+
+    def match(self, query: str) -> Optional[TitleMatch]:
+        """
+        Best single match for a query.
+
+        Returns:
+            A High match when the query is a canonical title, alias or normalizes
+            to one; otherwise the best fuzzy match (Medium/Low); None if nothing
+            clears LOW_MIN_SCORE
+        """
+        exact = self.exact(query)
+        if exact is not None:
+            return exact
+        best = self.similar(query, 1)
+        return best[0] if best else None
+
+    def similar(self, query: str, k: int = 5, exclude: Optional[str] = None) -> List[TitleMatch]:
+        """
+        Top-k fuzzy matches, best first (ties broken alphabetically).
+
+        Args:
+            query: Free-text title
+            k: Number of results
+            exclude: Canonical title to leave out (e.g. the query's own exact match)
+
+        Returns:
+            List of Medium/Low TitleMatch objects
+        """
+        if k <= 0:
+            return []
+        scored = [(s, i) for s, i in self._scored(query) if self.titles[i] != exclude]
+        top = heapq.nsmallest(k, scored, key=lambda si: (-si[0], self.titles[si[1]]))
+        return [self._fuzzy(s, i) for s, i in top]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Match a free-text job title against canonical notice titles"
+    )
+    ap.add_argument("query")
+    ap.add_argument(
+        "--titles",
+        default=str(Path("data") / "exports" / "job_title_rollup.csv"),
+        help="CSV with jobTitleCanonical (and totalAffected) columns",
+    )
+    ap.add_argument("--aliases", default=str(DEFAULT_ALIASES))
+    ap.add_argument("--top", type=int, default=5)
+    args = ap.parse_args()
+
+    with open(args.titles, "r", newline="", encoding="utf-8-sig") as f:
+        counts = {
+            r["jobTitleCanonical"]: int(r.get("totalAffected") or 0)
+            for r in csv.DictReader(f)
+            if r.get("jobTitleCanonical")
+        }
+    matcher = TitleMatcher.from_counts(counts, Path(args.aliases))
+
+    best = matcher.match(args.query)
+    print(f"Query:     {args.query}")
+    print(f"Key:       {normalize_title(args.query)}")
+    if best is None:
+        print("Match:     (none)")
+    else:
+        print(f"Match:     {best.title}  [{best.confidence}, {best.via}, score={best.score:.2f}]")
+    print("Similar:")
+    for m in matcher.similar(args.query, args.top, exclude=best.title if best else None):
+        print(f"  {m.score:.2f}  {m.confidence:<6}  {m.title}  (affected={m.affected})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
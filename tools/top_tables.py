@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Top-K Tables
+
+Precomputed "top titles at each facility" and "top facilities for each title"
+lists, so risk_assessment.py, risk_server.py and the map exporters read a
+ranked list instead of sorting a facility's (or title's) full breakdown on
+every query.
+
+Rows are selected with heapq.nlargest, which keeps only K candidates per key
+and ranks exactly like sorted(..., reverse=True)[:K]: by affected count,
+ties in first-seen order. Any prefix of a stored list is therefore the same
+as asking for that many directly, for every top_n up to K.
+
+File layout (data/exports/top_tables.json, minified JSON):
+    version       format version
+    k             entries kept per key
+    sources       {"impacts": sha256 of the impacts CSV the tables came from}
+    facilities    facility ID string table
+    titles        canonical title string table
+    byFacility    {facilityId: [titleIdx, count, titleIdx, count, ...]}
+    byTitle       {title: [facilityIdx, count, ...]}
+
+Keys and counts are normalized the way ImpactIndex normalizes
+impacts_by_facility.csv (stripped strings, blank or malformed counts are 0).
+Readers compare the recorded hash with the current CSV and ignore stale
+tables.
+
+Usage:
+    python tools/top_tables.py build
+    python tools/top_tables.py build --impacts data/exports/impacts_by_facility.csv --k 25 \\
+        --out data/exports/top_tables.json
+    python tools/top_tables.py info data/exports/top_tables.json
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .impact_snapshot import Interner, file_sha256, parse_count
+except ImportError:
+    from impact_snapshot import Interner, file_sha256, parse_count
+
+FORMAT_VERSION = 1
+
+# Covers the CLI and server default (--top 10) and the map's --top_titles (5)
+DEFAULT_K = 25
+
+DEFAULT_IMPACTS = os.path.join("data", "exports", "impacts_by_facility.csv")
+DEFAULT_TOP_TABLES = os.path.join("data", "exports", "top_tables.json")
+
+_by_count = itemgetter(1)
+
+
+class TopTablesError(Exception):
+    """Raised when a top tables file is missing, malformed or from another format version."""
+
+
+def top_k(counts: Dict[str, int], k: int) -> List[Tuple[str, int]]:
+    """
+    The k largest (key, count) pairs, ranked like sorted(..., reverse=True)[:k].
+
+    Args:
+        counts: {key: count}, iterated in insertion order
+        k: Entries wanted
+
+    Returns:
+        List of (key, count), count descending, ties in insertion order
+    """
+    if k <= 0:
+        return []
+    return heapq.nlargest(k, counts.items(), key=_by_count)
+
+
+class TopTables:
+    """
+    Top-K lists in both directions of the facility/title breakdown.
+
+    Attributes:
+        k: Entries kept per facility and per title
+        by_facility: facility_id -> [(title, count)], count descending
+        by_title: title -> [(facility_id, count)], count descending
+        sources: sha256 of the impacts CSV the tables were built from
+    """
+
+    def __init__(self, k: int = DEFAULT_K) -> None:
+        self.k = k
+        self.by_facility: Dict[str, List[Tuple[str, int]]] = {}
+        self.by_title: Dict[str, List[Tuple[str, int]]] = {}
+        self.sources: Dict[str, str] = {}
+
+    def covers(self, top_n: int) -> bool:
+        """Return True if a top_n query can be answered from the stored lists."""
+        return top_n <= self.k
+
+    def titles_at(self, facility_id: str, top_n: int) -> List[Tuple[str, int]]:
+        return self.by_facility.get(facility_id, [])[: max(top_n, 0)]
+
+    def facilities_for(self, title: str, top_n: int) -> List[Tuple[str, int]]:
+        return self.by_title.get(title, [])[: max(top_n, 0)]
+
+    @classmethod
+    def from_totals(
+        cls,
+        facility_titles: Dict[str, Dict[str, int]],
+        title_facilities: Dict[str, Dict[str, int]],
+        k: int = DEFAULT_K,
+    ) -> TopTables:
+        """
+        Select the top k of already aggregated breakdowns.
+
+        Args:
+            facility_titles: facility_id -> {title: affected}, in first-seen order
+            title_facilities: title -> {facility_id: affected}, in first-seen order
+            k: Entries to keep per key
+        """
+        tables = cls(k)
+        tables.by_facility = {fid: top_k(titles, k) for fid, titles in facility_titles.items()}
+        tables.by_title = {title: top_k(facs, k) for title, facs in title_facilities.items()}
+        return tables
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, int]], k: int = DEFAULT_K) -> TopTables:
+        """
+        Aggregate (facility_id, title, count) rows and select the top k.
+
+        Rows must already be normalized; rows missing either side are skipped,
+        as ImpactIndex skips them for these breakdowns.
+        """
+        facility_titles: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        title_facilities: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for facility_id, title, count in rows:
+            if facility_id and title:
+                facility_titles[facility_id][title] += count
+                title_facilities[title][facility_id] += count
+        return cls.from_totals(facility_titles, title_facilities, k)
+
+    @classmethod
+    def from_csv(cls, impacts_path: str, k: int = DEFAULT_K) -> TopTables:
+        """Build from impacts_by_facility.csv, normalizing as ImpactIndex.from_records does."""
+        with open(impacts_path, "r", newline="", encoding="utf-8-sig") as f:
+            rows = [
+                (
+                    (r.get("facilityId") or "").strip(),
+                    (r.get("jobTitleCanonical") or r.get("jobTitle") or "").strip(),
+                    parse_count(r.get("affectedCount")),
+                )
+                for r in csv.DictReader(f)
+            ]
+        tables = cls.from_rows(rows, k)
+        tables.sources = {"impacts": file_sha256(impacts_path)}
+        return tables
+
+    def is_current(self, impacts_path: str) -> bool:
+        """Return True if the tables were built from these exact CSV contents."""
+        try:
+            return self.sources.get("impacts") == file_sha256(impacts_path)
+        except OSError:
+            return False
+
+    def write(self, path: str) -> None:
+        facilities = Interner()
+        titles = Interner()
+        by_facility = {
+            fid: [x for title, n in ranked for x in (titles(title), n)]
+            for fid, ranked in self.by_facility.items()
+        }
+        by_title = {
+            title: [x for fid, n in ranked for x in (facilities(fid), n)]
+            for title, ranked in self.by_title.items()
+        }
+        # The string tables are filled while the lists above are encoded
+        payload = {
+            "version": FORMAT_VERSION,
+            "k": self.k,
+            "sources": self.sources,
+            "facilities": facilities.table,
+            "titles": titles.table,
+            "byFacility": by_facility,
+            "byTitle": by_title,
+        }
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def read(cls, path: str) -> TopTables:
+        """
+        Load a top tables file.
+
+        Raises:
+            TopTablesError: If the file is missing, not valid JSON, or another format version
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except OSError as e:
+            raise TopTablesError(f"{path}: {e}") from e
+        except json.JSONDecodeError as e:
+            raise TopTablesError(f"{path}: corrupt payload ({e})") from e
+        if type(payload) is not dict or payload.get("version") != FORMAT_VERSION:
+            version = payload.get("version") if type(payload) is dict else None
+            raise TopTablesError(f"{path}: format version {version}, expected {FORMAT_VERSION}")
+
+        facilities = payload["facilities"]
+        titles = payload["titles"]
+        tables = cls(int(payload["k"]))
+        tables.sources = payload.get("sources") or {}
+        tables.by_facility = {
+            fid: [(titles[flat[i]], flat[i + 1]) for i in range(0, len(flat), 2)]
+            for fid, flat in payload["byFacility"].items()
+        }
+        tables.by_title = {
+            title: [(facilities[flat[i]], flat[i + 1]) for i in range(0, len(flat), 2)]
+            for title, flat in payload["byTitle"].items()
+        }
+        return tables
+
+
+def load_current_tables(path: str, impacts_path: str) -> Tuple[Optional[TopTables], str]:
+    """
+    Load top tables only if they match the current impacts CSV.
+
+    Returns:
+        (tables, "") when usable, otherwise (None, reason)
+    """
+    if not os.path.exists(path):
+        return None, f"no top tables at {path}"
+    try:
+        tables = TopTables.read(path)
+    except TopTablesError as e:
+        return None, str(e)
+    if not tables.is_current(impacts_path):
+        return None, f"{path} is older than {impacts_path}"
+    return tables, ""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Build or inspect the top-K facility/title tables")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("build", help="Build top tables from impacts_by_facility.csv")
+    b.add_argument("--impacts", default=DEFAULT_IMPACTS)
+    b.add_argument(
+        "--k",
+        type=int,
+        default=DEFAULT_K,
+        help=f"Entries kept per facility and title (default {DEFAULT_K})",
+    )
+    b.add_argument("--out", default=DEFAULT_TOP_TABLES)
+
+    i = sub.add_parser("info", help="Summarize a top tables file")
+    i.add_argument("path", nargs="?", default=DEFAULT_TOP_TABLES)
+
+    args = ap.parse_args(argv)
+
+    if args.command == "build":
+        tables = TopTables.from_csv(args.impacts, args.k)
+        tables.write(args.out)
+        print(f"OK: wrote {args.out}")
+        print(f"  k={tables.k} facilities={len(tables.by_facility)} titles={len(tables.by_title)}")
+        print(f"  bytes={os.path.getsize(args.out)}")
+        return 0
+
+    try:
+        tables = TopTables.read(args.path)
+    except TopTablesError as e:
+        print(f"ERROR: {e}")
+        return 1
+    print(f"{args.path}")
+    print(f"  k={tables.k} facilities={len(tables.by_facility)} titles={len(tables.by_title)}")
+    for name, digest in sorted(tables.sources.items()):
+        print(f"  source {name}: {digest[:16]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1291 @@
+#!/usr/bin/env python3
+"""
+Schema validation for notices, combined.json and the export CSVs
+
+Checks the shapes described in docs/DATA_SCHEMA.md and reports every
+problem with its location instead of stopping at the first:
+
+    $.notice.jobTitleImpacts[41].affectedCount: expected non-negative integer, got -3
+    line 17.totalAffected: expected non-negative integer, got 'n/a'
+
+Schemas are declared with small combinators (obj, arr, string, integer, ...)
+that compile into plain closures, so checking a row is a handful of type
+tests. JSON is read incrementally: objects and arrays near the top of the
+document are walked token by token and only array items are decoded whole,
+so a large combined.json is never held in memory at once. CSVs are checked
+row by row.
+
+Rules that span records (unique ids, impacts referencing known facilities
+and titles, byFacility consistency) are collected while streaming and
+checked at the end of each file. When several files are validated together,
+references are also checked across files, e.g. every facilityId in
+impacts_by_facility.csv must be defined by combined.json. Files are
+validated in parallel worker processes.
+
+Usage:
+    python tools/validation.py
+    python tools/validation.py data/normalized/notice_2.json data/exports/impacts_by_facility.csv
+    python tools/validation.py --jobs 4 --report data/.validation_report.json
+
+Exit code is 1 when any file has errors.
+
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import fnmatch
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Errors listed per file on the console (all are counted)
+DEFAULT_MAX_ERRORS = 50
+
+# Characters read from a JSON file at a time
+CHUNK_SIZE = 1 << 20
+
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+ISO_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})$")
+
+# A path is a linked (parent, key) tuple, rendered only when an error is reported
+Path = Optional[Tuple[Any, Any]]
+
+
+def render_path(path: Any) -> str:
+    """Render a linked path as ``$.a.b[3].c`` (CSV locations are plain strings)."""
+    if isinstance(path, str):
+        return path
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    out = "$"
+    for key in reversed(keys):
+        out += f"[{key}]" if isinstance(key, int) else f".{key}"
+    return out
+
+
+class Issue:
+    """One validation error: where it is and what is wrong."""
+
+    __slots__ = ("path", "message")
+
+    def __init__(self, path: Any, message: str) -> None:
+        self.path = path
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"{render_path(self.path)}: {self.message}"
+
+
+def _describe(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (dict, list)):
+        return type(value).__name__ if isinstance(value, list) else "object"
+    text = repr(value)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+
+# ---------------------------------------------------------------------------
+# Schema combinators
+#
+# A leaf check takes a value and returns an error message or None. Containers
+# compile into Node objects whose check() walks an already decoded value and
+# whose stream() walks the same shape directly from a JsonReader.
+# ---------------------------------------------------------------------------
+
+Leaf = Callable[[Any], Optional[str]]
+
+
+def string(
+    nonempty: bool = False, pattern: Optional["re.Pattern[str]"] = None, what: str = "string"
+) -> Leaf:
+    def check(v: Any) -> Optional[str]:
+        if type(v) is not str:
+            return f"expected {what}, got {_describe(v)}"
+        if nonempty and not v.strip():
+            return f"expected non-empty {what}"
+        if pattern is not None and not pattern.match(v):
+            return f"expected {what}, got {_describe(v)}"
+        return None
+
+    return check
+
+
+def integer(minimum: Optional[int] = None) -> Leaf:
+    what = "non-negative integer" if minimum == 0 else "integer"
+
+    def check(v: Any) -> Optional[str]:
+        if type(v) is not int or (minimum is not None and v < minimum):
+            return f"expected {what}, got {_describe(v)}"
+        return None
+
+    return check
+
+
+def number(minimum: Optional[float] = None, maximum: Optional[float] = None) -> Leaf:
+    def check(v: Any) -> Optional[str]:
+        if type(v) not in (int, float):
+            return f"expected number, got {_describe(v)}"
+        if (minimum is not None and v < minimum) or (maximum is not None and v > maximum):
+            return f"expected number in [{minimum}, {maximum}], got {_describe(v)}"
+        return None
+
+    return check
+
+
+def boolean() -> Leaf:
+    def check(v: Any) -> Optional[str]:
+        return None if type(v) is bool else f"expected boolean, got {_describe(v)}"
+
+    return check
+
+
+def nullable(inner: Leaf) -> Leaf:
+    def check(v: Any) -> Optional[str]:
+        return None if v is None else inner(v)
+
+    return check
+
+
+def string_list() -> Leaf:
+    def check(v: Any) -> Optional[str]:
+        if type(v) is not list:
+            return f"expected array, got {_describe(v)}"
+        for i, item in enumerate(v):
+            if type(item) is not str:
+                return f"expected string at [{i}], got {_describe(item)}"
+        return None
+
+    return check
+
+
+def notice_refs() -> Leaf:
+    # supersedes / amends: one noticeId or a list of them
+    def check(v: Any) -> Optional[str]:
+        items = [v] if type(v) is str else v
+        if type(items) is not list:
+            return f"expected noticeId or array of noticeIds, got {_describe(v)}"
+        for i, item in enumerate(items):
+            if type(item) is not str or not item.strip():
+                return f"expected non-empty noticeId at [{i}], got {_describe(item)}"
+        return None
+
+    return check
+
+
+class Node:
+    """A compiled container schema (object or array)."""
+
+    def check(self, value: Any, path: Path, issues: List[Issue]) -> None:
+        raise NotImplementedError
+
+    def stream(self, reader: "JsonReader", path: Path, issues: List[Issue], hooks: "Hooks") -> None:
+        raise NotImplementedError
+
+
+Hooks = Dict[str, Callable[[Any, Path], None]]
+
+
+class obj(Node):
+    """
+    An object with required and optional fields.
+
+    Args:
+        required: {field: leaf check or Node}
+        optional: {field: leaf check or Node}, checked when present
+        one_of: Groups of fields of which at least one must be present
+    """
+
+    def __init__(
+        self,
+        required: Optional[Dict[str, Any]] = None,
+        optional: Optional[Dict[str, Any]] = None,
+        one_of: Sequence[Sequence[str]] = (),
+    ) -> None:
+        fields = dict(optional or {})
+        fields.update(required or {})
+        self.required = tuple(required or {})
+        self.leaves = tuple((k, v) for k, v in fields.items() if not isinstance(v, Node))
+        self.nodes = tuple((k, v) for k, v in fields.items() if isinstance(v, Node))
+        self.node_map = dict(self.nodes)
+        self.leaf_map = dict(self.leaves)
+        self.one_of = tuple(tuple(g) for g in one_of)
+
+    def _check_keys(self, keys: Any, path: Path, issues: List[Issue]) -> None:
+        for name in self.required:
+            if name not in keys:
+                issues.append(Issue(path, f"missing required field {name!r}"))
+        for group in self.one_of:
+            if not any(k in keys for k in group):
+                issues.append(Issue(path, f"needs one of {', '.join(repr(k) for k in group)}"))
+
+    def check(self, value: Any, path: Path, issues: List[Issue]) -> None:
+        if type(value) is not dict:
+            issues.append(Issue(path, f"expected object, got {_describe(value)}"))
+            return
+        for name, leaf in self.leaves:
+            if name in value:
+                msg = leaf(value[name])
+                if msg is not None:
+                    issues.append(Issue((path, name), msg))
+        for name, node in self.nodes:
+            if name in value:
+                node.check(value[name], (path, name), issues)
+        self._check_keys(value, path, issues)
+
+    def stream(self, reader: "JsonReader", path: Path, issues: List[Issue], hooks: Hooks) -> None:
+        if reader.peek() != "{":
+            self.check(reader.value(), path, issues)
+            return
+        seen: Set[str] = set()
+        for name in reader.members():
+            seen.add(name)
+            node = self.node_map.get(name)
+            if node is not None:
+                node.stream(reader, (path, name), issues, hooks)
+                continue
+            value = reader.value()
+            leaf = self.leaf_map.get(name)
+            if leaf is not None:
+                msg = leaf(value)
+                if msg is not None:
+                    issues.append(Issue((path, name), msg))
+        self._check_keys(seen, path, issues)
+
+
+class arr(Node):
+    """
+    An array of items.
+
+    Args:
+        item: Leaf check or Node for every item
+        hook: Name under which each item is passed to the file's cross-record
+            rules while streaming
+    """
+
+    def __init__(self, item: Any, hook: Optional[str] = None) -> None:
+        self.item = item
+        self.hook = hook
+        self.is_node = isinstance(item, Node)
+
+    def check(self, value: Any, path: Path, issues: List[Issue]) -> None:
+        if type(value) is not list:
+            issues.append(Issue(path, f"expected array, got {_describe(value)}"))
+            return
+        item = self.item
+        if self.is_node:
+            for i, v in enumerate(value):
+                item.check(v, (path, i), issues)
+        else:
+            for i, v in enumerate(value):
+                msg = item(v)
+                if msg is not None:
+                    issues.append(Issue((path, i), msg))
+
+    def stream(self, reader: "JsonReader", path: Path, issues: List[Issue], hooks: Hooks) -> None:
+        if reader.peek() != "[":
+            self.check(reader.value(), path, issues)
+            return
+        hook = hooks.get(self.hook) if self.hook else None
+        item = self.item
+        for i, v in enumerate(reader.items()):
+            if self.is_node:
+                item.check(v, (path, i), issues)
+            else:
+                msg = item(v)
+                if msg is not None:
+                    issues.append(Issue((path, i), msg))
+            if hook is not None:
+                hook(v, (path, i))
+
+
+class mapping(Node):
+    """An object used as a dictionary: any keys, each value checked the same way."""
+
+    def __init__(self, value: Leaf) -> None:
+        self.value = value
+
+    def check(self, value: Any, path: Path, issues: List[Issue]) -> None:
+        if type(value) is not dict:
+            issues.append(Issue(path, f"expected object, got {_describe(value)}"))
+            return
+        for k, v in value.items():
+            msg = self.value(v)
+            if msg is not None:
+                issues.append(Issue((path, k), msg))
+
+    def stream(self, reader: "JsonReader", path: Path, issues: List[Issue], hooks: Hooks) -> None:
+        self.check(reader.value(), path, issues)
+
+
+# ---------------------------------------------------------------------------
+# Incremental JSON reading
+# ---------------------------------------------------------------------------
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class JsonSyntaxError(Exception):
+    """Raised when a file is not well-formed JSON."""
+
+
+class JsonReader:
+    """
+    Walks a JSON document from a text stream.
+
+    Containers can be entered with members()/items(); anything else is
+    decoded whole with value(). Only the text of the value being decoded
+    needs to be in memory.
+    """
+
+    def __init__(self, f: Any, chunk_size: int = CHUNK_SIZE) -> None:
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0  # characters dropped from the front of buf
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        # Read at least as much as is buffered so re-decoding a long value stays linear
+        data = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not data:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def error(self, message: str) -> JsonSyntaxError:
+        return JsonSyntaxError(f"{message} at character {self.offset + self.pos}")
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input)."""
+        while True:
+            buf, pos = self.buf, self.pos
+            n = len(buf)
+            while pos < n and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise self.error(f"expected {ch!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete value."""
+        if not self.peek():
+            raise self.error("unexpected end of input")
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                if self._fill():
+                    continue
+                # Some json messages already end in "at" ("Unterminated string starting at")
+                message = exc.msg[:-3] if exc.msg.endswith(" at") else exc.msg
+                raise JsonSyntaxError(f"{message} at character {self.offset + exc.pos}") from None
+            # A number ending at the buffer edge may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _separator(self, close: str) -> bool:
+        ch = self.peek()
+        if ch == ",":
+            self.pos += 1
+            return True
+        if ch == close:
+            self.pos += 1
+            return False
+        raise self.error(f"expected ',' or {close!r}")
+
+    def members(self) -> Iterable[str]:
+        """Enter an object and yield its keys; the caller must consume each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self.error("expected object key")
+            key = self.value()
+            self.expect(":")
+            yield key
+            if not self._separator("}"):
+                return
+
+    def items(self) -> Iterable[Any]:
+        """Enter an array and yield its decoded items."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if not self._separator("]"):
+                return
+
+    def finish(self) -> None:
+        if self.peek():
+            raise self.error("extra data after JSON document")
+
+
+# ---------------------------------------------------------------------------
+# Schemas (docs/DATA_SCHEMA.md)
+# ---------------------------------------------------------------------------
+
+NONNEG_INT = integer(minimum=0)
+
+SOURCE = obj(
+    required={"filename": string(nonempty=True)},
+    optional={
+        "receivedDate": string(pattern=ISO_DATE, what="ISO date"),
+        "letterDate": string(pattern=ISO_DATE, what="ISO date"),
+    },
+)
+
+# notice_1 style {type, state, notes} and layoff2 style {text, affectedCount, state}
+REMOTE_CLAUSE = obj(
+    required={"state": string(nonempty=True)},
+    optional={"type": string(), "notes": string(), "text": string(), "affectedCount": NONNEG_INT},
+)
+
+FACILITY_IMPACT = obj(
+    required={"facilityId": string(nonempty=True)},
+    optional={
+        "noticeId": string(nonempty=True),
+        "affectedApprox": nullable(number(minimum=0)),
+        "notes": string(),
+        "includesRemoteWA": boolean(),
+        "scopeFlags": obj(optional={"includesRemoteWA": boolean()}),
+    },
+)
+
+# Parsed layoff2 rows carry a single jobTitle instead of raw + canonical
+JOB_TITLE_IMPACT = obj(
+    required={"facilityId": string(nonempty=True), "affectedCount": NONNEG_INT},
+    optional={
+        "noticeId": string(nonempty=True),
+        "jobTitleRaw": string(nonempty=True),
+        "jobTitleCanonical": string(nonempty=True),
+        "jobTitle": string(nonempty=True),
+    },
+    one_of=[("jobTitleCanonical", "jobTitle", "jobTitleRaw")],
+)
+
+NOTICE = obj(
+    required={
+        "noticeId": string(nonempty=True),
+        "source": SOURCE,
+        "jurisdiction": string(nonempty=True),
+        "separationDates": arr(string(pattern=ISO_DATE, what="ISO date")),
+        "facilities": arr(FACILITY_IMPACT, hook="facility_impact"),
+        "jobTitleImpacts": arr(JOB_TITLE_IMPACT, hook="job_title_impact"),
+    },
+    optional={
+        "remoteClauses": arr(REMOTE_CLAUSE),
+        "supersedes": notice_refs(),
+        "amends": notice_refs(),
+    },
+)
+
+NOTICE_LINKS = ("supersedes", "amends")
+
+FACILITY = obj(
+    required={
+        "facilityId": string(nonempty=True),
+        "label": string(),
+        "address": obj(
+            required={"line1": string(), "city": string(), "state": string()},
+            optional={"postalCode": string()},
+        ),
+    },
+)
+
+CANONICAL_TITLE = obj(
+    required={"jobTitleCanonical": string(nonempty=True)},
+    optional={
+        "affectedCount": NONNEG_INT,
+        "facilityCount": NONNEG_INT,
+        "facilityIds": string_list(),
+    },
+)
+
+NOTICE_FILE = obj(
+    required={
+        "version": string(nonempty=True),
+        "generatedAt": string(pattern=ISO_DATETIME, what="ISO datetime"),
+        "notice": NOTICE,
+    },
+)
+
+COMBINED_FILE = obj(
+    required={
+        "version": string(nonempty=True),
+        "generatedAt": string(pattern=ISO_DATETIME, what="ISO datetime"),
+        "notices": arr(NOTICE, hook="notice"),
+        "facilities": arr(FACILITY, hook="facility"),
+        "jobTitles": obj(
+            required={
+                "canonicalTitles": arr(CANONICAL_TITLE, hook="canonical_title"),
+                "byFacility": mapping(string_list()),
+            },
+        ),
+    },
+)
+
+ALIASES_FILE = obj(
+    required={
+        "version": string(nonempty=True),
+        "aliases": arr(
+            obj(
+                required={"input": string(nonempty=True), "canonical": string(nonempty=True)},
+                optional={"notes": string()},
+            ),
+            hook="alias",
+        ),
+    },
+)
+
+
+# CSV cells are strings; these checks parse them
+def csv_int(v: str) -> Optional[str]:
+    if v.isdigit():
+        return None
+    return f"expected non-negative integer, got {_describe(v)}"
+
+
+def csv_float(minimum: float, maximum: float) -> Leaf:
+    def check(v: str) -> Optional[str]:
+        try:
+            x = float(v)
+        except ValueError:
+            return f"expected number, got {_describe(v)}"
+        if not (minimum <= x <= maximum):
+            return f"expected number in [{minimum:g}, {maximum:g}], got {_describe(v)}"
+        return None
+
+    return check
+
+
+def csv_bool(v: str) -> Optional[str]:
+    return None if v in ("true", "false") else f"expected true or false, got {_describe(v)}"
+
+
+def csv_text(v: str) -> Optional[str]:
+    return None if v.strip() else "expected non-empty value"
+
+
+class CsvSchema:
+    """
+    Columns of an export CSV.
+
+    Args:
+        columns: {column: cell check or None}; all are required in the header
+        key: Column whose values must be unique
+        refs: {column: kind} values that must be defined elsewhere
+            (facilityId, noticeId, jobTitleCanonical)
+        descending: Column that must be sorted high to low
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, Optional[Leaf]],
+        key: Optional[str] = None,
+        refs: Optional[Dict[str, str]] = None,
+        descending: Optional[str] = None,
+        optional: Optional[Dict[str, Optional[Leaf]]] = None,
+    ) -> None:
+        self.columns = columns
+        self.optional = optional or {}
+        self.key = key
+        self.refs = refs or {}
+        self.descending = descending
+
+
+FACILITY_ROLLUP_CSV = CsvSchema(
+    {
+        "facilityId": csv_text,
+        "totalAffected": csv_int,
+        "jobTitleCount": csv_int,
+        "noticeCount": csv_int,
+    },
+    optional={"hasImpacts": csv_bool},
+    key="facilityId",
+    refs={"facilityId": "facilityId"},
+)
+TOP_FACILITIES_CSV = CsvSchema(
+    FACILITY_ROLLUP_CSV.columns,
+    optional=FACILITY_ROLLUP_CSV.optional,
+    key="facilityId",
+    refs={"facilityId": "facilityId"},
+    descending="totalAffected",
+)
+TITLE_ROLLUP_CSV = CsvSchema(
+    {"jobTitleCanonical": csv_text, "totalAffected": csv_int, "facilityCount": csv_int},
+    optional={"noticeCount": csv_int},
+    key="jobTitleCanonical",
+    refs={"jobTitleCanonical": "jobTitleCanonical"},
+)
+TOP_TITLES_CSV = CsvSchema(
+    TITLE_ROLLUP_CSV.columns,
+    optional=TITLE_ROLLUP_CSV.optional,
+    key="jobTitleCanonical",
+    refs={"jobTitleCanonical": "jobTitleCanonical"},
+    descending="totalAffected",
+)
+
+CSV_SCHEMAS: Dict[str, CsvSchema] = {
+    "impacts_csv": CsvSchema(
+        {
+            "noticeId": csv_text,
+            "facilityId": csv_text,
+            "jobTitleRaw": None,
+            "jobTitleCanonical": csv_text,
+            "affectedCount": csv_int,
+        },
+        refs={
+            "noticeId": "noticeId",
+            "facilityId": "facilityId",
+            "jobTitleCanonical": "jobTitleCanonical",
+        },
+    ),
+    "facility_rollup_csv": FACILITY_ROLLUP_CSV,
+    "top_facilities_csv": TOP_FACILITIES_CSV,
+    "title_rollup_csv": TITLE_ROLLUP_CSV,
+    "top_titles_csv": TOP_TITLES_CSV,
+    "notice_summary_csv": CsvSchema(
+        {
+            "noticeId": csv_text,
+            "totalAffected": csv_int,
+            "totalFacilities": csv_int,
+            "totalTitles": csv_int,
+        },
+        key="noticeId",
+        refs={"noticeId": "noticeId"},
+    ),
+    "geocodes_csv": CsvSchema(
+        {"facilityId": csv_text, "lat": csv_float(-90, 90), "lon": csv_float(-180, 180)},
+        key="facilityId",
+        refs={"facilityId": "facilityId"},
+    ),
+}
+
+# (filename pattern, kind); first match wins
+FILE_KINDS: List[Tuple[str, str]] = [
+    ("combined.json", "combined"),
+    ("notice_*.json", "notice"),
+    ("*aliases*.json", "aliases"),
+    ("impacts_by_facility*.csv", "impacts_csv"),
+    ("facility_rollup*.csv", "facility_rollup_csv"),
+    ("top_facilities*.csv", "top_facilities_csv"),
+    ("job_title_rollup*.csv", "title_rollup_csv"),
+    ("job_titles.csv", "title_rollup_csv"),
+    ("top_job_titles*.csv", "top_titles_csv"),
+    ("notice_summary*.csv", "notice_summary_csv"),
+    ("facility_geocodes*.csv", "geocodes_csv"),
+]
+
+JSON_SCHEMAS: Dict[str, obj] = {
+    "notice": NOTICE_FILE,
+    "combined": COMBINED_FILE,
+    "aliases": ALIASES_FILE,
+}
+
+KINDS = sorted(list(JSON_SCHEMAS) + list(CSV_SCHEMAS))
+
+
+def detect_kind(path: str) -> Optional[str]:
+    name = os.path.basename(path).lower()
+    for pattern, kind in FILE_KINDS:
+        if fnmatch.fnmatch(name, pattern):
+            return kind
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Cross-record rules
+# ---------------------------------------------------------------------------
+
+
+def _link_targets(value: Any) -> List[str]:
+    items = [value] if isinstance(value, str) else value if type(value) is list else []
+    return [v for v in items if isinstance(v, str)]
+
+
+def _title(row: Dict[str, Any]) -> Optional[str]:
+    # Same fallback as build_combined.row_title
+    return row.get("jobTitleCanonical") or row.get("jobTitle") or row.get("jobTitleRaw")
+
+
+class FileResult:
+    """Outcome of validating one file (picklable, returned from worker processes)."""
+
+    def __init__(self, path: str, kind: Optional[str]) -> None:
+        self.path = path
+        self.kind = kind
+        self.records = 0
+        self.counts: Dict[str, int] = {}  # records per section, e.g. facilities / jobTitleImpacts
+        self.issues: List[Issue] = []
+        # {kind: ids} this file defines, and {kind: {id: first path}} it refers to
+        self.defines: Dict[str, Set[str]] = {}
+        self.refs: Dict[str, Dict[str, Any]] = {}
+        self.seconds = 0.0
+
+    def count(self, section: str) -> None:
+        self.records += 1
+        self.counts[section] = self.counts.get(section, 0) + 1
+
+    def define(self, kind: str, value: Any) -> None:
+        if isinstance(value, str):
+            self.defines.setdefault(kind, set()).add(value)
+
+    def refer(self, kind: str, value: Any, path: Any) -> None:
+        if isinstance(value, str):
+            self.refs.setdefault(kind, {}).setdefault(value, path)
+
+    def to_json(self, max_errors: int) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "kind": self.kind,
+            "records": self.records,
+            "counts": self.counts,
+            "errorCount": len(self.issues),
+            "errors": [str(i) for i in self.issues[:max_errors]],
+            "seconds": round(self.seconds, 3),
+        }
+
+
+class NoticeRules:
+    """Unique facility ids per notice and impacts that point at the notice's facilities."""
+
+    def __init__(self, result: FileResult) -> None:
+        self.result = result
+        self.facility_paths: Dict[str, Any] = {}
+        self.impact_refs: Dict[str, Any] = {}
+        self.notice_id: Optional[str] = None
+
+    def facility_impact(self, row: Any, path: Path) -> None:
+        self.result.count("facilities")
+        if type(row) is not dict:
+            return
+        fid = row.get("facilityId")
+        if not isinstance(fid, str):
+            return
+        if fid in self.facility_paths:
+            self.result.issues.append(Issue((path, "facilityId"), f"duplicate facilityId {fid!r}"))
+        else:
+            self.facility_paths[fid] = path
+        self._notice_ref(row, path)
+        self.result.define("facilityId", fid)
+
+    def job_title_impact(self, row: Any, path: Path) -> None:
+        self.result.count("jobTitleImpacts")
+        if type(row) is not dict:
+            return
+        self.impact_refs.setdefault(row.get("facilityId"), path)
+        self._notice_ref(row, path)
+
+    def _notice_ref(self, row: Dict[str, Any], path: Path) -> None:
+        nid = row.get("noticeId")
+        if nid is not None and self.notice_id is not None and nid != self.notice_id:
+            self.result.issues.append(
+                Issue((path, "noticeId"), f"{nid!r} does not match notice {self.notice_id!r}")
+            )
+
+    def finish(self) -> None:
+        for fid, path in self.impact_refs.items():
+            if isinstance(fid, str) and fid not in self.facility_paths:
+                self.result.issues.append(
+                    Issue(
+                        (path, "facilityId"),
+                        f"unknown facilityId {fid!r} (not in notice facilities)",
+                    )
+                )
+
+    def hooks(self) -> Hooks:
+        return {"facility_impact": self.facility_impact, "job_title_impact": self.job_title_impact}
+
+
+class CombinedRules:
+    """References between notices, facilities and the jobTitles indexes of combined.json."""
+
+    def __init__(self, result: FileResult) -> None:
+        self.result = result
+        self.notice_paths: Dict[str, Any] = {}
+        self.facility_paths: Dict[str, Any] = {}
+        self.title_paths: Dict[str, Any] = {}
+        self.facility_refs: Dict[str, Any] = {}
+        self.title_refs: Dict[str, Any] = {}
+        self.link_refs: Dict[str, Any] = {}
+        self.by_facility: Any = None
+
+    def notice(self, notice: Any, path: Path) -> None:
+        if type(notice) is not dict:
+            return
+        nid = notice.get("noticeId")
+        if isinstance(nid, str):
+            if nid in self.notice_paths:
+                self.result.issues.append(Issue((path, "noticeId"), f"duplicate noticeId {nid!r}"))
+            self.notice_paths.setdefault(nid, path)
+            self.result.define("noticeId", nid)
+        for key in NOTICE_LINKS:
+            for target in _link_targets(notice.get(key)):
+                self.link_refs.setdefault(target, (path, key))
+        rules = NoticeRules(self.result)
+        rules.notice_id = nid if isinstance(nid, str) else None
+        for key, hook in (
+            ("facilities", rules.facility_impact),
+            ("jobTitleImpacts", rules.job_title_impact),
+        ):
+            rows = notice.get(key)
+            if type(rows) is not list:
+                continue
+            for i, row in enumerate(rows):
+                hook(row, ((path, key), i))
+                if type(row) is not dict:
+                    continue
+                self.facility_refs.setdefault(row.get("facilityId"), ((path, key), i))
+                if key == "jobTitleImpacts":
+                    self.title_refs.setdefault(_title(row), ((path, key), i))
+        rules.finish()
+
+    def facility(self, row: Any, path: Path) -> None:
+        if type(row) is not dict or not isinstance(row.get("facilityId"), str):
+            return
+        fid = row["facilityId"]
+        if fid in self.facility_paths:
+            self.result.issues.append(Issue((path, "facilityId"), f"duplicate facilityId {fid!r}"))
+        self.facility_paths.setdefault(fid, path)
+        self.result.define("facilityId", fid)
+
+    def canonical_title(self, row: Any, path: Path) -> None:
+        if type(row) is not dict or not isinstance(row.get("jobTitleCanonical"), str):
+            return
+        title = row["jobTitleCanonical"]
+        if title in self.title_paths:
+            self.result.issues.append(
+                Issue((path, "jobTitleCanonical"), f"duplicate title {title!r}")
+            )
+        self.title_paths.setdefault(title, path)
+        self.result.define("jobTitleCanonical", title)
+
+    def finish(self) -> None:
+        issues = self.result.issues
+        for fid, path in self.facility_refs.items():
+            if isinstance(fid, str) and fid not in self.facility_paths:
+                issues.append(
+                    Issue((path, "facilityId"), f"facilityId {fid!r} is not in facilities[]")
+                )
+        for title, path in self.title_refs.items():
+            if isinstance(title, str) and title not in self.title_paths:
+                issues.append(Issue(path, f"title {title!r} is not in jobTitles.canonicalTitles"))
+        for target, path in self.link_refs.items():
+            if target not in self.notice_paths:
+                issues.append(Issue(path, f"noticeId {target!r} is not in notices[]"))
+        by_facility = self.by_facility
+        if type(by_facility) is dict:
+            base = ((None, "jobTitles"), "byFacility")
+            for fid, titles in by_facility.items():
+                if fid not in self.facility_paths:
+                    issues.append(Issue((base, fid), f"unknown facilityId {fid!r}"))
+                if type(titles) is not list:
+                    continue
+                for i, title in enumerate(titles):
+                    if isinstance(title, str) and title not in self.title_paths:
+                        issues.append(
+                            Issue(((base, fid), i), f"title {title!r} is not in canonicalTitles")
+                        )
+
+    def hooks(self) -> Hooks:
+        return {
+            "notice": self.notice,
+            "facility": self.facility,
+            "canonical_title": self.canonical_title,
+        }
+
+
+class AliasRules:
+    """Alias inputs stored lowercase, trimmed and unique."""
+
+    def __init__(self, result: FileResult) -> None:
+        self.result = result
+        self.inputs: Set[str] = set()
+
+    def alias(self, row: Any, path: Path) -> None:
+        self.result.count("aliases")
+        if type(row) is not dict:
+            return
+        text = row.get("input")
+        if isinstance(text, str):
+            if text != text.strip().lower():
+                self.result.issues.append(
+                    Issue((path, "input"), f"{text!r} is not lowercase and trimmed")
+                )
+            if text in self.inputs:
+                self.result.issues.append(Issue((path, "input"), f"duplicate alias {text!r}"))
+            self.inputs.add(text)
+        self.result.refer("jobTitleCanonical", row.get("canonical"), (path, "canonical"))
+
+    def finish(self) -> None:
+        pass
+
+    def hooks(self) -> Hooks:
+        return {"alias": self.alias}
+
+
+# ---------------------------------------------------------------------------
+# Validating files
+# ---------------------------------------------------------------------------
+
+
+def _validate_json(path: str, kind: str, result: FileResult) -> None:
+    schema = JSON_SCHEMAS[kind]
+    if kind == "combined":
+        rules: Any = CombinedRules(result)
+    elif kind == "aliases":
+        rules = AliasRules(result)
+    else:
+        rules = NoticeRules(result)
+
+    with open(path, "r", encoding="utf-8-sig") as f:
+        reader = JsonReader(f)
+        try:
+            if kind == "notice":
+                _stream_notice_file(reader, rules, result)
+            elif kind == "combined":
+                _stream_combined(reader, rules, result)
+            else:
+                schema.stream(reader, None, result.issues, rules.hooks())
+            reader.finish()
+        except JsonSyntaxError as exc:
+            result.issues.append(Issue("$", f"invalid JSON: {exc}"))
+            return
+    rules.finish()
+
+
+def _stream_notice_file(reader: JsonReader, rules: NoticeRules, result: FileResult) -> None:
+    # As NOTICE_FILE.stream, but records notice.noticeId before the row arrays stream past
+    if reader.peek() != "{":
+        NOTICE_FILE.check(reader.value(), None, result.issues)
+        return
+    seen: Set[str] = set()
+    hooks = rules.hooks()
+    for name in reader.members():
+        seen.add(name)
+        if name != "notice" or reader.peek() != "{":
+            value = reader.value()
+            if name == "notice":
+                NOTICE.check(value, (None, name), result.issues)
+            elif name in NOTICE_FILE.leaf_map:
+                msg = NOTICE_FILE.leaf_map[name](value)
+                if msg is not None:
+                    result.issues.append(Issue((None, name), msg))
+            continue
+        notice_path = (None, "notice")
+        notice_seen: Set[str] = set()
+        for key in reader.members():
+            notice_seen.add(key)
+            node = NOTICE.node_map.get(key)
+            if node is not None:
+                node.stream(reader, (notice_path, key), result.issues, hooks)
+                continue
+            value = reader.value()
+            if key == "noticeId" and isinstance(value, str):
+                rules.notice_id = value
+                result.define("noticeId", value)
+            elif key in NOTICE_LINKS:
+                # Checked against the other validated files by check_references
+                for target in _link_targets(value):
+                    result.refer("noticeId", target, (notice_path, key))
+            leaf = NOTICE.leaf_map.get(key)
+            if leaf is not None:
+                msg = leaf(value)
+                if msg is not None:
+                    result.issues.append(Issue((notice_path, key), msg))
+        NOTICE._check_keys(notice_seen, notice_path, result.issues)
+    NOTICE_FILE._check_keys(seen, None, result.issues)
+
+
+def _stream_combined(reader: JsonReader, rules: CombinedRules, result: FileResult) -> None:
+    hooks = rules.hooks()
+    if reader.peek() != "{":
+        COMBINED_FILE.check(reader.value(), None, result.issues)
+        return
+    seen: Set[str] = set()
+    job_titles = COMBINED_FILE.node_map["jobTitles"]
+    for name in reader.members():
+        seen.add(name)
+        if name == "jobTitles" and reader.peek() == "{":
+            jt_path = (None, name)
+            jt_seen: Set[str] = set()
+            for key in reader.members():
+                jt_seen.add(key)
+                if key == "byFacility":
+                    # byFacility is a single index object; keep it for the end-of-file checks
+                    value = reader.value()
+                    job_titles.node_map[key].check(value, (jt_path, key), result.issues)
+                    rules.by_facility = value
+                elif key in job_titles.node_map:
+                    job_titles.node_map[key].stream(reader, (jt_path, key), result.issues, hooks)
+                else:
+                    reader.value()
+            job_titles._check_keys(jt_seen, jt_path, result.issues)
+            continue
+        node = COMBINED_FILE.node_map.get(name)
+        if node is not None:
+            node.stream(reader, (None, name), result.issues, hooks)
+            continue
+        value = reader.value()
+        leaf = COMBINED_FILE.leaf_map.get(name)
+        if leaf is not None:
+            msg = leaf(value)
+            if msg is not None:
+                result.issues.append(Issue((None, name), msg))
+    COMBINED_FILE._check_keys(seen, None, result.issues)
+
+
+def _validate_csv(path: str, kind: str, result: FileResult) -> None:
+    schema = CSV_SCHEMAS[kind]
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            result.issues.append(Issue("line 1", "empty file (no header)"))
+            return
+        header = [h.strip() for h in header]
+        positions = {name: i for i, name in enumerate(header)}
+        missing = [c for c in schema.columns if c not in positions]
+        if missing:
+            result.issues.append(Issue("line 1", f"missing columns: {', '.join(missing)}"))
+        checks = [
+            (name, positions[name], check)
+            for name, check in list(schema.columns.items()) + list(schema.optional.items())
+            if check is not None and name in positions
+        ]
+        refs = [
+            (col, positions[col], kind_) for col, kind_ in schema.refs.items() if col in positions
+        ]
+        key_pos = positions.get(schema.key) if schema.key else None
+        desc_pos = positions.get(schema.descending) if schema.descending else None
+        keys: Set[str] = set()
+        previous: Optional[int] = None
+        width = len(header)
+        issues = result.issues
+
+        for lineno, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            result.records += 1
+            if len(row) != width:
+                issues.append(Issue(f"line {lineno}", f"expected {width} fields, got {len(row)}"))
+                if len(row) < width:
+                    continue
+            for name, pos, check in checks:
+                msg = check(row[pos])
+                if msg is not None:
+                    issues.append(Issue(f"line {lineno}.{name}", msg))
+            for col, pos, kind_ in refs:
+                result.refer(kind_, row[pos], f"line {lineno}.{col}")
+            if key_pos is not None:
+                key = row[key_pos]
+                if key in keys:
+                    issues.append(
+                        Issue(f"line {lineno}.{schema.key}", f"duplicate {schema.key} {key!r}")
+                    )
+                keys.add(key)
+            if desc_pos is not None and row[desc_pos].isdigit():
+                value = int(row[desc_pos])
+                if previous is not None and value > previous:
+                    issues.append(
+                        Issue(
+                            f"line {lineno}.{schema.descending}", "rows are not sorted high to low"
+                        )
+                    )
+                previous = value
+
+
+def validate_file(path: str, kind: Optional[str] = None) -> FileResult:
+    """
+    Validate one file.
+
+    Args:
+        path: File to check
+        kind: Schema name (see KINDS); detected from the file name when omitted
+
+    Returns:
+        FileResult with every issue found
+    """
+    kind = kind or detect_kind(path)
+    result = FileResult(path, kind)
+    start = time.perf_counter()
+    if kind is None:
+        result.issues.append(Issue("$", "unknown file kind (use --kind)"))
+    elif not os.path.exists(path):
+        result.issues.append(Issue("$", "file not found"))
+    elif kind in JSON_SCHEMAS:
+        _validate_json(path, kind, result)
+    elif kind in CSV_SCHEMAS:
+        _validate_csv(path, kind, result)
+    else:
+        result.issues.append(Issue("$", f"unknown kind {kind!r}"))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def check_references(results: List[FileResult]) -> None:
+    """
+    Check ids referenced by one file against those defined by the others.
+
+    Only applies to id kinds some file in the batch defines, so e.g. CSVs
+    validated on their own are not reported against an absent combined.json.
+    Combined definitions take precedence over those of single notices.
+    Notice links (supersedes/amends) are only checked against a combined.json,
+    since an amending notice is usually validated without the one it amends.
+    """
+    combined = [r for r in results if r.kind == "combined"]
+    sources = combined or results
+    defined: Dict[str, Set[str]] = {}
+    for r in sources:
+        for kind, ids in r.defines.items():
+            defined.setdefault(kind, set()).update(ids)
+    for r in results:
+        for kind, refs in r.refs.items():
+            ids = defined.get(kind)
+            if ids is None or (kind == "noticeId" and not combined):
+                continue
+            for value, path in refs.items():
+                if value not in ids:
+                    r.issues.append(
+                        Issue(path, f"{kind} {value!r} is not defined by the validated data")
+                    )
+
+
+def _validate_task(task: Tuple[str, Optional[str]]) -> FileResult:
+    return validate_file(*task)
+
+
+def validate_many(
+    paths: Sequence[str], kind: Optional[str] = None, jobs: int = 0
+) -> List[FileResult]:
+    """
+    Validate files in parallel and cross-check their references.
+
+    Args:
+        paths: Files to check
+        kind: Schema for every file (default: detect per file)
+        jobs: Worker processes (0 = one per CPU, 1 = in this process)
+
+    Returns:
+        One FileResult per path, in the given order
+    """
+    tasks = [(p, kind) for p in paths]
+    jobs = jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(tasks))
+    if jobs <= 1:
+        results = [_validate_task(t) for t in tasks]
+    else:
+        # Largest files first so one big file does not start last
+        order = sorted(range(len(tasks)), key=lambda i: -_size(tasks[i][0]))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            done = list(pool.map(_validate_task, [tasks[i] for i in order]))
+        results = [None] * len(tasks)  # type: ignore[list-item]
+        for i, r in zip(order, done):
+            results[i] = r
+    check_references(results)
+    return results
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def default_paths() -> List[str]:
+    normalized = os.path.join("data", "normalized")
+    paths = sorted(glob.glob(os.path.join(normalized, "notice_*.json")))
+    paths += [
+        os.path.join(normalized, "combined.json"),
+        os.path.join(normalized, "job_title_aliases.json"),
+        os.path.join(normalized, "facility_geocodes.csv"),
+    ]
+    paths += sorted(glob.glob(os.path.join("data", "exports", "*.csv")))
+    return [p for p in paths if os.path.exists(p)]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Validate notices, combined.json and export CSVs")
+    ap.add_argument(
+        "paths", nargs="*", help="Files to check (default: the normalized data and exports)"
+    )
+    ap.add_argument(
+        "--kind", choices=KINDS, help="Schema to use for every file (default: from the file name)"
+    )
+    ap.add_argument("--jobs", type=int, default=0, help="Worker processes (0 = one per CPU)")
+    ap.add_argument(
+        "--max_errors", type=int, default=DEFAULT_MAX_ERRORS, help="Errors listed per file"
+    )
+    ap.add_argument("--report", help="Also write the results as JSON here")
+    args = ap.parse_args()
+
+    paths = args.paths or default_paths()
+    if not paths:
+        print("ERROR: no files to validate")
+        return 2
+
+    start = time.perf_counter()
+    results = validate_many(paths, kind=args.kind, jobs=args.jobs)
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for r in results:
+        if not r.issues:
+            print(f"OK: {r.path} ({r.kind}, records={r.records})")
+            continue
+        failed += 1
+        print(f"FAIL: {r.path} ({r.kind}, errors={len(r.issues)})")
+        for issue in r.issues[: args.max_errors]:
+            print(f"  {issue}")
+        if len(r.issues) > args.max_errors:
+            print(f"  ... {len(r.issues) - args.max_errors} more")
+
+    if args.report:
+        report = {
+            "files": [r.to_json(args.max_errors) for r in results],
+            "errorCount": sum(len(r.issues) for r in results),
+            "seconds": round(elapsed, 3),
+        }
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    print(f"{len(results) - failed}/{len(results)} files valid in {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())